@@ -4,16 +4,20 @@ Performance cache system for Enhanced Streamlit App
 TTL-based caching with progressive loading and error handling
 """
 
-import time
 from collections.abc import Callable
 from datetime import datetime
 from typing import Any
 
 import streamlit as st
 
+from src.config import settings
+from src.shared_cache import get_shared_cache
+
 
 class DataCache:
-    """TTL-basert cache system for værdata"""
+    """TTL-basert cache for værdata i det delte cache-laget (`src/shared_cache.py`)"""
+
+    NAMESPACE = 'data_cache'
 
     @staticmethod
     def get_cached_data(key: str, fetch_func: Callable, ttl_seconds: int = 300,
@@ -21,6 +25,10 @@ class DataCache:
         """
         Hent cachet data eller utfør ny henting hvis TTL er utløpt
 
+        Cachen deles av alle økter. Utløpte data hentes på nytt med en gang,
+        men beholdes i (ttl_fallback_multiplier - 1) × TTL og returneres hvis
+        hentingen feiler.
+
         Args:
             key: Cache nøkkel
             fetch_func: Funksjon for å hente nye data
@@ -30,40 +38,18 @@ class DataCache:
         Returns:
             Cachet eller nye data
         """
-        if 'cache_store' not in st.session_state:
-            st.session_state.cache_store = {}
-
-        cache = st.session_state.cache_store
-        current_time = time.time()
-
-        # Sjekk om data finnes og er gyldig
-        if key in cache:
-            data, timestamp = cache[key]
-            if current_time - timestamp < ttl_seconds:
-                return data
-
-        # Hent nye data
-        try:
-            if params:
-                new_data = fetch_func(**params)
-            else:
-                new_data = fetch_func()
-
-            # Lagre i cache
-            cache[key] = (new_data, current_time)
-
-            # Cleanup gamle entries
-            DataCache._cleanup_cache()
-
-            return new_data
-
-        except Exception as e:
-            # Returner cachet data hvis mulig, ellers raise error
-            if key in cache:
-                st.warning(f"Bruker cachet data pga feil: {e}")
-                return cache[key][0]
-            else:
-                raise e
+        def fetch() -> Any:
+            return fetch_func(**params) if params else fetch_func()
+
+        return get_shared_cache().get_or_fetch(
+            f"{DataCache.NAMESPACE}.{key}",
+            sorted((params or {}).items()),
+            fetch,
+            ttl_seconds=ttl_seconds,
+            stale_seconds=ttl_seconds * max(settings.performance_cache.ttl_fallback_multiplier - 1, 0),
+            # Som før: utløpte data serveres ikke ved vellykket henting, bare som reserve ved feil
+            serve_stale=False,
+        )
 
     @staticmethod
     def invalidate_cache(key_pattern: str = None):
@@ -71,69 +57,23 @@ class DataCache:
         Tøm cache helt eller deler av cache
 
         Args:
-            key_pattern: Mønster for å matche keys (None = tøm alt)
+            key_pattern: Prefiks for keys (None = tøm alt)
         """
-        if 'cache_store' not in st.session_state:
-            return
-
-        if key_pattern is None:
-            st.session_state.cache_store = {}
-        else:
-            # Fjern keys som matcher mønster
-            cache = st.session_state.cache_store
-            keys_to_remove = [k for k in cache.keys() if key_pattern in k]
-            for key in keys_to_remove:
-                del cache[key]
+        namespace = DataCache.NAMESPACE if key_pattern is None else f"{DataCache.NAMESPACE}.{key_pattern}"
+        get_shared_cache().invalidate(namespace)
 
     @staticmethod
     def get_cache_stats() -> dict[str, Any]:
         """Få cache statistikk"""
-        if 'cache_store' not in st.session_state:
-            return {
-                'entries': 0,
-                'newest_age': None,
-                'oldest_age': None,
-                'total_size': 0
-            }
-
-        cache = st.session_state.cache_store
-        current_time = time.time()
-
-        if not cache:
-            return {
-                'entries': 0,
-                'newest_age': None,
-                'oldest_age': None,
-                'total_size': 0
-            }
-
-        ages = [current_time - timestamp for _, timestamp in cache.values()]
-
+        stats = get_shared_cache().stats()
         return {
-            'entries': len(cache),
-            'newest_age': min(ages) if ages else None,
-            'oldest_age': max(ages) if ages else None,
-            'total_size': len(str(cache))
+            'entries': stats.entries,
+            'hits': stats.hits,
+            'misses': stats.misses,
+            'evictions': stats.evictions,
+            'total_size': stats.bytes
         }
 
-    @staticmethod
-    def _cleanup_cache(max_entries: int = 20):
-        """Rydd opp i cache - fjern eldste entries"""
-        if 'cache_store' not in st.session_state:
-            return
-
-        cache = st.session_state.cache_store
-
-        if len(cache) <= max_entries:
-            return
-
-        # Sorter etter timestamp og fjern eldste
-        sorted_items = sorted(cache.items(), key=lambda x: x[1][1], reverse=True)
-
-        # Behold kun max_entries nyeste
-        new_cache = dict(sorted_items[:max_entries])
-        st.session_state.cache_store = new_cache
-
 
 class ProgressiveLoader:
     """Progressive loading for store datasett"""
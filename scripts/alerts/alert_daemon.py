@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Kjør varslingstjenesten (`src/alert_service.py`) som én langvarig prosess.
+
+Erstatter de separate cron-skriptene for snøfokk og glatte veier: én Frost-
+henting per runde, samme analysatorer og vedlikeholdsstans som dashboardet,
+og cooldown/dedupe per analysator i `settings.alerts.state_file`.
+
+Bruk:
+    python scripts/alerts/alert_daemon.py              # kjør til den stoppes
+    python scripts/alerts/alert_daemon.py --once       # én runde (cron/test)
+    python scripts/alerts/alert_daemon.py --interval 10
+"""
+
+import argparse
+import logging
+import signal
+import sys
+import threading
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Gjør repo-roten importerbar slik at `import src...` virker uansett cwd.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.alert_service import AlertService  # noqa: E402
+from src.config import settings  # noqa: E402
+
+load_dotenv()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Varslingstjeneste for snøfokk/glatte veier (e-post)')
+    parser.add_argument('--once', action='store_true', help='Kjør én runde og avslutt')
+    parser.add_argument(
+        '--interval', type=float, default=settings.alerts.interval_minutes,
+        help='Minutter mellom runder',
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    service = AlertService()
+
+    if args.once:
+        report = service.tick()
+        print(report.summary())
+        sys.exit(1 if report.error else 0)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    service.run_forever(stop, interval_minutes=args.interval)
+
+
+if __name__ == '__main__':
+    main()
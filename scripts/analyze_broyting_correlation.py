@@ -5,7 +5,8 @@ Første steg i en stegvis gjennomgang av appen:
 - Les værdata fra en CSV (typisk `data/analyzed/enhanced_features_*.csv`).
 - Les brøyteloggen `data/analyzed/Rapport 2022-2025.csv` (semikolon-separert).
 - For hver unik brøytehendelse: hent vær i et vindu før start og beregn enkle
-  statistikker + scenario.
+  statistikker + scenario. Alle hendelser og vinduer (f.eks. 6/12/24t)
+  aggregeres i én pass (searchsorted-grenser + kumulative summer).
 
 Eksempel:
     python scripts/analyze_broyting_correlation.py \
@@ -17,11 +18,12 @@ Eksempel:
 from __future__ import annotations
 
 import argparse
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, datetime
 from pathlib import Path
 import re
 import sys
 
+import numpy as np
 import pandas as pd
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -260,12 +262,6 @@ def load_weather_data(path: Path) -> pd.DataFrame:
     return df
 
 
-def get_weather_before(weather_df: pd.DataFrame, dt_utc: datetime, hours: int) -> pd.DataFrame:
-    start = dt_utc - timedelta(hours=hours)
-    mask = (weather_df["timestamp_utc"] >= start) & (weather_df["timestamp_utc"] <= dt_utc)
-    return weather_df.loc[mask]
-
-
 def _col(df: pd.DataFrame, *names: str) -> str | None:
     for name in names:
         if name in df.columns:
@@ -273,36 +269,249 @@ def _col(df: pd.DataFrame, *names: str) -> str | None:
     return None
 
 
-def _safe_mean(df: pd.DataFrame, col: str | None) -> float | None:
-    if not col:
-        return None
-    return float(df[col].mean())
-
-
-def _safe_min(df: pd.DataFrame, col: str | None) -> float | None:
-    if not col:
-        return None
-    return float(df[col].min())
-
+# Statistikker per vindu: (utkolonne, kandidatkolonner i vær-CSV, statistikk).
+# Vinduet er [start - N timer, start]. mean/min/max hopper over NaN (NaN for tomt
+# vindu), sum gir 0.0 for tomt vindu, first/last er første/siste rad i vinduet.
+WINDOW_STATS: tuple[tuple[str, tuple[str, ...], str], ...] = (
+    ("air_temp_avg", ("air_temperature",), "mean"),
+    ("air_temp_min", ("air_temperature",), "min"),
+    ("air_temp_max", ("air_temperature",), "max"),
+    ("surface_temp_avg", ("surface_temperature",), "mean"),
+    ("surface_temp_min", ("surface_temperature",), "min"),
+    ("wind_avg", ("wind_speed",), "mean"),
+    ("wind_max", ("wind_speed",), "max"),
+    ("gust_max", ("max_wind_gust", "wind_speed_gust"), "max"),
+    ("precip_total", ("precipitation_1h", "precip_mm_h", "sum(precipitation_amount PT1H)", "precipitation"), "sum"),
+    ("snow_depth_start", ("surface_snow_thickness",), "first"),
+    ("snow_depth_end", ("surface_snow_thickness",), "last"),
+    ("snow_change", ("surface_snow_thickness",), "change"),
+    ("humidity_avg", ("relative_humidity",), "mean"),
+    ("dew_point_avg", ("dew_point_temperature",), "mean"),
+)
 
-def _safe_max(df: pd.DataFrame, col: str | None) -> float | None:
-    if not col:
-        return None
-    return float(df[col].max())
 
+def window_bounds(times: pd.Series, event_times: pd.Series, hours: float) -> tuple[np.ndarray, np.ndarray]:
+    """Radindekser [lo, hi) for vinduet [t - hours, t] før hver hendelse (times må være sortert)."""
+    t = pd.to_datetime(times, utc=True).to_numpy(dtype="datetime64[ns]")
+    ev = pd.to_datetime(event_times, utc=True).to_numpy(dtype="datetime64[ns]")
+    lo = np.searchsorted(t, ev - np.timedelta64(int(hours * 3600), "s"), side="left")
+    hi = np.searchsorted(t, ev, side="right")
+    return lo, hi
+
+
+# Summer/snitt fra kumulative summer avrundes hit, så avrundingsfeil fra lange
+# summer (~1e-12) ikke vipper terskler som `surface_temp_avg < 0.0`.
+_CUMSUM_DECIMALS = 9
+
+
+class _ColumnWindows:
+    """Vindusstatistikk for én kolonne via kumulative summer og sparse table (min/max)."""
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        valid = ~np.isnan(values)
+        self._csum = np.concatenate([[0.0], np.cumsum(np.where(valid, values, 0.0))])
+        self._ccount = np.concatenate([[0], np.cumsum(valid, dtype=np.int64)])
+        self._tables: dict[str, list[np.ndarray]] = {}
+
+    def _table(self, op: str) -> list[np.ndarray]:
+        if op not in self._tables:
+            fill = np.inf if op == "min" else -np.inf
+            reduce = np.minimum if op == "min" else np.maximum
+            level = np.where(np.isnan(self.values), fill, self.values)
+            levels = [level]
+            width = 1
+            while width * 2 <= len(level):
+                level = reduce(level[:-width], level[width:])
+                levels.append(level)
+                width *= 2
+            self._tables[op] = levels
+        return self._tables[op]
+
+    def reduce(self, stat: str, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        n = hi - lo
+        count = self._ccount[hi] - self._ccount[lo]
+        total = np.round(self._csum[hi] - self._csum[lo], _CUMSUM_DECIMALS)
+        if stat == "sum":
+            return total
+        if stat == "mean":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(count > 0, np.round(total / count, _CUMSUM_DECIMALS), np.nan)
+        if stat in ("min", "max"):
+            if len(self.values) == 0:
+                return np.full(len(lo), np.nan)
+            levels = self._table(stat)
+            reduce = np.minimum if stat == "min" else np.maximum
+            k = np.floor(np.log2(np.maximum(n, 1))).astype(int)
+            out = np.full(len(lo), np.nan)
+            for level in np.unique(k[count > 0]):
+                rows = np.flatnonzero((k == level) & (count > 0))
+                table = levels[level]
+                out[rows] = reduce(table[lo[rows]], table[hi[rows] - (1 << level)])
+            return out
+        last_idx = np.minimum(np.maximum(hi - 1, 0), max(len(self.values) - 1, 0))
+        first_idx = np.minimum(lo, max(len(self.values) - 1, 0))
+        first = np.where(n > 0, self.values[first_idx], np.nan) if len(self.values) else np.full(len(lo), np.nan)
+        last = np.where(n > 0, self.values[last_idx], np.nan) if len(self.values) else np.full(len(lo), np.nan)
+        if stat == "first":
+            return first
+        if stat == "last":
+            return last
+        if stat == "change":
+            return last - first
+        raise ValueError(f"Ukjent statistikk: {stat}")
+
+
+def aggregate_windows(
+    weather_df: pd.DataFrame,
+    event_times: pd.Series,
+    hours_list: list[int],
+    stats: tuple[tuple[str, tuple[str, ...], str], ...] = WINDOW_STATS,
+) -> dict[int, pd.DataFrame]:
+    """
+    Beregn alle vindusstatistikker for alle hendelser og vinduslengder i én pass.
+
+    Vinduene finnes med searchsorted på den sorterte tidsaksen; sum/mean fra
+    kumulative summer og min/max fra en sparse table, så kostnaden er
+    O(n log n + hendelser) per kolonne uansett antall vinduer.
+
+    Returns:
+        {timer: DataFrame med wx_rows + én kolonne per statistikk (None der
+        værkolonnen mangler), samme rekkefølge som event_times}
+    """
+    columns: dict[str, _ColumnWindows] = {}
+    out: dict[int, pd.DataFrame] = {}
+    for hours in hours_list:
+        lo, hi = window_bounds(weather_df["timestamp_utc"], event_times, hours)
+        frame: dict[str, object] = {"wx_rows": (hi - lo).astype(int)}
+        for name, candidates, stat in stats:
+            col = _col(weather_df, *candidates)
+            if col is None:
+                frame[name] = None
+                continue
+            if col not in columns:
+                values = pd.to_numeric(weather_df[col], errors="coerce").to_numpy(dtype=float)
+                columns[col] = _ColumnWindows(values)
+            frame[name] = columns[col].reduce(stat, lo, hi)
+        out[hours] = pd.DataFrame(frame, index=range(len(lo)))
+    return out
+
+
+def _event_report(plow_df: pd.DataFrame, wx: pd.DataFrame, hours: int, missing: set[str]) -> pd.DataFrame:
+    """
+    Brøytehendelser + vindusstatistikk → rapportrader med triggere og scenario.
+
+    `missing` er statistikkene der værkolonnen mangler helt (None i rapporten).
+    """
+    n = len(plow_df)
+
+    def field(name: str, default: object = None) -> pd.Series:
+        if name in plow_df.columns:
+            return plow_df[name].reset_index(drop=True)
+        return pd.Series([default] * n, dtype=object)
+
+    def flag(name: str, default: bool) -> pd.Series:
+        return field(name, default).fillna(default).astype(bool)
+
+    out = pd.DataFrame({
+        "dato": field("Dato"),
+        "rode": field("Rode"),
+        "enhet": field("Enhet"),
+        "operator_id": field("Operatør ID"),
+        "operator": field("Operatør"),
+        "work_type_raw": field("work_type_raw"),
+        "work_types": field("work_types").map(lambda items: ",".join(items or [])),
+        "has_tun_component": flag("has_tun_component", False),
+        "has_road_component": flag("has_road_component", False),
+        "is_pure_tun": flag("is_pure_tun", False),
+        "event_relevant_for_thresholds": flag("event_relevant_for_thresholds", True),
+        "start_utc": field("start_utc"),
+        "window_hours": hours,
+        "duration_minutes": field("duration_minutes"),
+        "distance_km": field("distance_km"),
+    })
+    out = pd.concat([out, wx.reset_index(drop=True)], axis=1)
+
+    script_thresholds = settings.scripts
+
+    def num(name: str) -> np.ndarray:
+        # Manglende kolonne/verdi → NaN, som sammenlignes som False (samme som `is not None and ...`)
+        return pd.to_numeric(out[name], errors="coerce").to_numpy(dtype=float)
+
+    duration_minutes = num("duration_minutes")
+    distance_km = num("distance_km")
+
+    out["short_run_45m"] = duration_minutes <= script_thresholds.short_run_45m_max_minutes
+    out["short_run_30m"] = duration_minutes <= script_thresholds.short_run_30m_max_minutes
+
+    # Legacy/stricter inspection proxy (short + short distance)
+    out["likely_inspection"] = (
+        (duration_minutes <= script_thresholds.inspection_duration_max_minutes)
+        & (distance_km <= script_thresholds.inspection_distance_max_km)
+    )
 
-def _safe_sum(df: pd.DataFrame, col: str | None) -> float | None:
-    if not col:
-        return None
-    return float(df[col].sum())
+    # Enkel scenario-heuristikk for sanity check
+    temp = num("air_temp_avg")
+    precip = np.zeros(n) if "precip_total" in missing else num("precip_total")
+    surface_temp = num("surface_temp_avg")
+    wind = num("wind_avg")
+    gust = num("gust_max")
+    snow_delta = num("snow_change")
+
+    # Simple trigger flags (for separating quick "check" runs from weather-driven need)
+    out["trigger_fresh_snow"] = snow_delta >= script_thresholds.trigger_fresh_snow_min_cm
+    out["trigger_slaps"] = (
+        (temp > script_thresholds.trigger_slaps_air_temp_min_c)
+        & (precip >= script_thresholds.trigger_slaps_precip_total_min_mm)
+    )
+    out["trigger_freezing"] = (
+        (surface_temp < settings.slippery.surface_temp_freeze)
+        & (temp > script_thresholds.trigger_freezing_air_temp_min_c)
+    )
+    out["trigger_snowdrift"] = (
+        (gust >= script_thresholds.trigger_snowdrift_gust_min_ms)
+        & (temp < script_thresholds.trigger_snowdrift_air_temp_max_c)
+        & (wind >= script_thresholds.trigger_snowdrift_wind_min_ms)
+    )
+    out["has_weather_trigger"] = (
+        out["trigger_fresh_snow"] | out["trigger_slaps"] | out["trigger_freezing"] | out["trigger_snowdrift"]
+    )
+    out["short_45m_no_trigger"] = out["short_run_45m"] & ~out["has_weather_trigger"]
+
+    unknown = (out["wx_rows"].to_numpy() == 0) | ("air_temp_avg" in missing)
+    out["scenario"] = np.select(
+        [
+            unknown,
+            (temp > script_thresholds.trigger_slaps_air_temp_min_c)
+            & (precip > script_thresholds.scenario_slaps_precip_total_min_mm),
+            (temp <= settings.display.freezing_max) & (precip > script_thresholds.scenario_snow_precip_total_min_mm),
+            (surface_temp < settings.slippery.surface_temp_freeze)
+            & (temp > script_thresholds.trigger_freezing_air_temp_min_c),
+            (wind > script_thresholds.scenario_snowdrift_wind_min_ms)
+            & (temp < script_thresholds.scenario_snowdrift_air_temp_max_c),
+        ],
+        ["UKJENT", "SLAPS", "NYSNØ", "FRYSEFARE", "SNØFOKK"],
+        default="ANNET",
+    )
+    return out
 
 
 def analyze_weather_vs_plowing(
     weather_path: Path,
     plowing_path: Path,
-    hours: int,
+    hours: int | list[int],
     output_path: Path | None,
 ) -> pd.DataFrame:
+    """
+    Lag rapport per brøytehendelse for ett eller flere vinduer.
+
+    Med flere vinduer (f.eks. 6/12/24) beregnes alle i én pass og hvert vindu
+    skrives til `weather_vs_broyting_<stem>_h<timer>.csv` (leses av
+    `scripts/reports/compare_broyting_windows.py`); med `output_path` blir det
+    `<output_path>_h<timer>.csv`. Returnerer alle rader samlet.
+    """
+    hours_list = [hours] if isinstance(hours, int) else list(dict.fromkeys(hours))
+
     print("=" * 70)
     print("SJEKK: VÆR-CSV MOT BRØYTELOGG")
     print("=" * 70)
@@ -315,161 +524,35 @@ def analyze_weather_vs_plowing(
     print(f"  Værobservasjoner: {len(wx_df)}")
     print(f"  Værperiode (UTC): {wx_df['timestamp_utc'].min()} til {wx_df['timestamp_utc'].max()}")
 
-    results: list[dict] = []
-
-    for _, row in plow_df.iterrows():
-        start_utc: datetime = row["start_utc"]
-        wx = get_weather_before(wx_df, start_utc, hours)
-
-        air_col = _col(wx, "air_temperature")
-        surface_col = _col(wx, "surface_temperature")
-        wind_col = _col(wx, "wind_speed")
-        gust_col = _col(wx, "max_wind_gust", "wind_speed_gust")
-        precip_col = _col(wx, "precipitation_1h", "precip_mm_h", "sum(precipitation_amount PT1H)", "precipitation")
-        snow_col = _col(wx, "surface_snow_thickness")
-        humidity_col = _col(wx, "relative_humidity")
-        dew_col = _col(wx, "dew_point_temperature")
-
-        snow_start = float(wx[snow_col].iloc[0]) if (snow_col and len(wx) > 0) else None
-        snow_end = float(wx[snow_col].iloc[-1]) if (snow_col and len(wx) > 0) else None
-        snow_change = (snow_end - snow_start) if (snow_start is not None and snow_end is not None) else None
-
-        out: dict = {
-            "dato": row.get("Dato"),
-            "rode": row.get("Rode"),
-            "enhet": row.get("Enhet"),
-            "operator_id": row.get("Operatør ID"),
-            "operator": row.get("Operatør"),
-            "work_type_raw": row.get("work_type_raw"),
-            "work_types": ",".join(row.get("work_types") or []),
-            "has_tun_component": bool(row.get("has_tun_component", False)),
-            "has_road_component": bool(row.get("has_road_component", False)),
-            "is_pure_tun": bool(row.get("is_pure_tun", False)),
-            "event_relevant_for_thresholds": bool(row.get("event_relevant_for_thresholds", True)),
-            "start_utc": start_utc,
-            "window_hours": hours,
-            "duration_minutes": row.get("duration_minutes"),
-            "distance_km": row.get("distance_km"),
-            "wx_rows": int(len(wx)),
-            "air_temp_avg": _safe_mean(wx, air_col),
-            "air_temp_min": _safe_min(wx, air_col),
-            "air_temp_max": _safe_max(wx, air_col),
-            "surface_temp_avg": _safe_mean(wx, surface_col),
-            "surface_temp_min": _safe_min(wx, surface_col),
-            "wind_avg": _safe_mean(wx, wind_col),
-            "wind_max": _safe_max(wx, wind_col),
-            "gust_max": _safe_max(wx, gust_col),
-            "precip_total": _safe_sum(wx, precip_col),
-            "snow_depth_start": snow_start,
-            "snow_depth_end": snow_end,
-            "snow_change": snow_change,
-            "humidity_avg": _safe_mean(wx, humidity_col),
-            "dew_point_avg": _safe_mean(wx, dew_col),
-        }
-
-        duration_minutes = out.get("duration_minutes")
-        distance_km = out.get("distance_km")
-
-        script_thresholds = settings.scripts
-
-        out["short_run_45m"] = bool(
-            duration_minutes is not None and duration_minutes <= script_thresholds.short_run_45m_max_minutes
-        )
-        out["short_run_30m"] = bool(
-            duration_minutes is not None and duration_minutes <= script_thresholds.short_run_30m_max_minutes
-        )
-
-        # Legacy/stricter inspection proxy (short + short distance)
-        out["likely_inspection"] = bool(
-            duration_minutes is not None
-            and distance_km is not None
-            and duration_minutes <= script_thresholds.inspection_duration_max_minutes
-            and distance_km <= script_thresholds.inspection_distance_max_km
-        )
-
-        # Enkel scenario-heuristikk for sanity check
-        temp = out["air_temp_avg"]
-        precip = out["precip_total"] or 0.0
-        surface_temp = out["surface_temp_avg"]
-        wind = out["wind_avg"]
-
-        gust = out.get("gust_max")
-        snow_delta = out.get("snow_change")
-
-        # Simple trigger flags (for separating quick "check" runs from weather-driven need)
-        out["trigger_fresh_snow"] = bool(
-            snow_delta is not None and snow_delta >= script_thresholds.trigger_fresh_snow_min_cm
-        )
-        out["trigger_slaps"] = bool(
-            temp is not None
-            and temp > script_thresholds.trigger_slaps_air_temp_min_c
-            and precip >= script_thresholds.trigger_slaps_precip_total_min_mm
-        )
-        out["trigger_freezing"] = bool(
-            surface_temp is not None
-            and surface_temp < settings.slippery.surface_temp_freeze
-            and temp is not None
-            and temp > script_thresholds.trigger_freezing_air_temp_min_c
-        )
-        out["trigger_snowdrift"] = bool(
-            gust is not None
-            and gust >= script_thresholds.trigger_snowdrift_gust_min_ms
-            and temp is not None
-            and temp < script_thresholds.trigger_snowdrift_air_temp_max_c
-            and wind is not None
-            and wind >= script_thresholds.trigger_snowdrift_wind_min_ms
-        )
-        out["has_weather_trigger"] = bool(
-            out["trigger_fresh_snow"]
-            or out["trigger_slaps"]
-            or out["trigger_freezing"]
-            or out["trigger_snowdrift"]
-        )
-        out["short_45m_no_trigger"] = bool(out["short_run_45m"] and (not out["has_weather_trigger"]))
-
-        if out["wx_rows"] == 0 or temp is None:
-            out["scenario"] = "UKJENT"
-        elif temp > script_thresholds.trigger_slaps_air_temp_min_c and precip > script_thresholds.scenario_slaps_precip_total_min_mm:
-            out["scenario"] = "SLAPS"
-        elif temp <= settings.display.freezing_max and precip > script_thresholds.scenario_snow_precip_total_min_mm:
-            out["scenario"] = "NYSNØ"
-        elif (
-            surface_temp is not None
-            and surface_temp < settings.slippery.surface_temp_freeze
-            and temp > script_thresholds.trigger_freezing_air_temp_min_c
-        ):
-            out["scenario"] = "FRYSEFARE"
-        elif (
-            wind is not None
-            and wind > script_thresholds.scenario_snowdrift_wind_min_ms
-            and temp < script_thresholds.scenario_snowdrift_air_temp_max_c
-        ):
-            out["scenario"] = "SNØFOKK"
+    windows = aggregate_windows(wx_df, plow_df["start_utc"], hours_list)
+    missing = {name for name, candidates, _ in WINDOW_STATS if _col(wx_df, *candidates) is None}
+
+    reports = []
+    for h in hours_list:
+        out_df = _event_report(plow_df, windows[h], h, missing)
+        reports.append(out_df)
+
+        matched = int((out_df["wx_rows"] > 0).sum())
+        print(f"\nOppsummering ({h}t):")
+        print(f"  Matchede brøytehendelser (har vær i vindu): {matched}/{len(out_df)}")
+        if len(out_df) > 0:
+            print(f"  Match-rate: {matched/len(out_df)*100:.1f}%")
+
+        if "scenario" in out_df.columns and len(out_df) > 0:
+            print("\nScenariofordeling:")
+            for scenario, count in out_df["scenario"].value_counts().items():
+                print(f"  {scenario}: {count}")
+
+        if output_path is None:
+            path = DATA_DIR / "analyzed" / f"weather_vs_broyting_{weather_path.stem}_h{h}.csv"
+        elif len(hours_list) > 1:
+            path = output_path.with_name(f"{output_path.stem}_h{h}{output_path.suffix}")
         else:
-            out["scenario"] = "ANNET"
-
-        results.append(out)
-
-    out_df = pd.DataFrame(results)
-
-    matched = int((out_df["wx_rows"] > 0).sum())
-    print("\nOppsummering:")
-    print(f"  Matchede brøytehendelser (har vær i vindu): {matched}/{len(out_df)}")
-    if len(out_df) > 0:
-        print(f"  Match-rate: {matched/len(out_df)*100:.1f}%")
-
-    if "scenario" in out_df.columns and len(out_df) > 0:
-        print("\nScenariofordeling:")
-        for scenario, count in out_df["scenario"].value_counts().items():
-            print(f"  {scenario}: {count}")
-
-    if output_path is None:
-        output_path = DATA_DIR / "analyzed" / f"weather_vs_broyting_{weather_path.stem}_h{hours}.csv"
-
-    out_df.to_csv(output_path, index=False)
-    print(f"\nSkrev rapport: {output_path}")
+            path = output_path
+        out_df.to_csv(path, index=False)
+        print(f"\nSkrev rapport: {path}")
 
-    return out_df
+    return pd.concat(reports, ignore_index=True)
 
 
 def main() -> None:
@@ -479,18 +562,20 @@ def main() -> None:
     parser.add_argument(
         "--hours",
         type=int,
-        default=settings.scripts.snow_change_window_hours,
-        help="Antall timer før brøyting som analyseres",
+        nargs="+",
+        default=[settings.scripts.snow_change_window_hours],
+        help="Antall timer før brøyting som analyseres (flere vinduer: --hours 6 12 24)",
     )
     parser.add_argument(
         "--out",
         type=Path,
         default=None,
-        help="Output CSV (default: data/analyzed/weather_vs_broyting_<stem>_h<hours>.csv)",
+        help="Output CSV (default: data/analyzed/weather_vs_broyting_<stem>_h<hours>.csv; flere vinduer får _h<hours>)",
     )
 
     args = parser.parse_args()
-    analyze_weather_vs_plowing(args.weather, args.plowing, args.hours, args.out)
+    hours = args.hours[0] if len(args.hours) == 1 else args.hours
+    analyze_weather_vs_plowing(args.weather, args.plowing, hours, args.out)
 
 
 if __name__ == "__main__":
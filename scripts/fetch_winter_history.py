@@ -1,22 +1,40 @@
 #!/usr/bin/env python3
 """
 Hent historiske vinterdata (nov-apr) fra Frost API for Gullingen.
-Lagrer per sesong og som samlet fil.
+
+Bruker backfill-motoren (`src/backfill.py`): perioden deles i måned ×
+elementgruppe, hentes parallelt med backoff ved rate limit, og skrives til det
+lokale observasjonslageret (data/store/observations). En avbrutt kjøring
+fortsetter fra manifestet. Til slutt eksporteres sesongfiler og samlet fil som
+CSV for eldre analyseskript.
+
+Bruk:
+    python scripts/fetch_winter_history.py
+    python scripts/fetch_winter_history.py --start-year 2022 --workers 6
+    python scripts/fetch_winter_history.py --reset   # ignorer manifest
 """
 
-import os
-import time
-from datetime import datetime
+import argparse
+import logging
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
 
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 
+# Gjør repo-roten importerbar slik at `import src...` virker uansett cwd.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.backfill import BackfillEngine  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.frost_client import FrostAPIError, FrostClient  # noqa: E402
+from src.operational_logger import get_operational_store  # noqa: E402
+from src.rollup_store import get_rollup_store  # noqa: E402
+
 load_dotenv()
 
-# Konfigurasjon
-STATION = 'SN46220'
-OUTPUT_DIR = '/Users/tor.inge.jossang@aftenbladet.no/dev/alarm-system/data/raw/winter_seasons'
+OUTPUT_DIR = Path(__file__).resolve().parent.parent / 'data' / 'raw' / 'winter_seasons'
 
 # Alle relevante elementer
 ELEMENTS = [
@@ -34,129 +52,108 @@ ELEMENTS = [
     'max(air_temperature PT1H)',
 ]
 
-# Vintersesonger å hente (nov-apr)
-SEASONS = [
-    ('2018-2019', '2018-11-01', '2019-04-30'),
-    ('2019-2020', '2019-11-01', '2020-04-30'),
-    ('2020-2021', '2020-11-01', '2021-04-30'),
-    ('2021-2022', '2021-11-01', '2022-04-30'),
-    ('2022-2023', '2022-11-01', '2023-04-30'),
-    ('2023-2024', '2023-11-01', '2024-04-30'),
-    ('2024-2025', '2024-11-01', '2025-04-30'),  # Pågående sesong
-]
-
-def fetch_season_data(client_id: str, start_date: str, end_date: str) -> pd.DataFrame:
-    """Hent data for én sesong."""
-
-    url = "https://frost.met.no/observations/v0.jsonld"
-
-    # Juster sluttdato hvis i fremtiden
-    today = datetime.now().strftime('%Y-%m-%d')
-    if end_date > today:
-        end_date = today
-
-    params = {
-        'sources': STATION,
-        'elements': ','.join(ELEMENTS),
-        'referencetime': f'{start_date}/{end_date}',
-        'timeresolutions': 'PT1H',
-    }
-
-    print(f"  Henter {start_date} til {end_date}...")
-
-    response = requests.get(url, params=params, auth=(client_id, ''), timeout=120)
-
-    if response.status_code != 200:
-        print(f"  FEIL: HTTP {response.status_code}")
-        return pd.DataFrame()
-
-    data = response.json()
-    observations = data.get('data', [])
-
-    if not observations:
-        print("  Ingen data funnet")
-        return pd.DataFrame()
-
-    print(f"  Mottok {len(observations)} tidspunkter")
-
-    # Konverter til DataFrame
-    rows = []
-    for obs in observations:
-        timestamp = obs['referenceTime'][:19].replace('T', ' ')
-        row = {'timestamp': timestamp}
-
-        for elem in obs.get('observations', []):
-            elem_id = elem['elementId']
-            value = elem['value']
-
-            # Forenkle kolonnenavn
-            col_name = elem_id.replace('sum(', '').replace('max(', '').replace('min(', '')
-            col_name = col_name.replace(' PT1H)', '').replace(')', '')
-            col_name = col_name.replace('_amount', '').replace('_of_gust', '_gust')
-
-            row[col_name] = value
-
-        rows.append(row)
-
-    df = pd.DataFrame(rows)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df = df.sort_values('timestamp').drop_duplicates(subset=['timestamp'])
-
-    return df
-
-
-def main():
-    client_id = os.getenv('FROST_CLIENT_ID')
-    if not client_id:
-        print("FROST_CLIENT_ID ikke funnet i .env")
-        return
-
-    # Opprett output-mappe
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+# Kolonnenavn i eksporterte CSV-filer (eldre skript leser disse)
+CSV_COLUMNS = {
+    'reference_time': 'timestamp',
+    'precipitation_1h': 'precipitation',
+    'max_wind_gust': 'wind_speed_gust',
+    'sum(duration_of_precipitation PT1H)': 'duration_of_precipitation',
+}
+
+
+def seasons(start_year: int, now: datetime) -> list[tuple[str, datetime, datetime]]:
+    """Vintersesonger (1. nov - 30. apr) fra start_year til inneværende sesong."""
+    result = []
+    for year in range(start_year, now.year + 1):
+        start = datetime(year, 11, 1, tzinfo=UTC)
+        if start > now:
+            break
+        end = min(datetime(year + 1, 5, 1, tzinfo=UTC), now)
+        result.append((f'{year}-{year + 1}', start, end))
+    return result
+
+
+def export_season_csv(df: pd.DataFrame, path: Path) -> None:
+    """Skriv sesongdata i det gamle CSV-formatet (naiv UTC-tid i `timestamp`)."""
+    out = df.rename(columns=CSV_COLUMNS)
+    out['timestamp'] = out['timestamp'].dt.tz_convert(None)
+    out.to_csv(path, index=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Backfill vinterdata fra Frost til lokalt lager')
+    parser.add_argument('--start-year', type=int, default=settings.backfill.first_year)
+    parser.add_argument('--workers', type=int, default=settings.backfill.max_workers)
+    parser.add_argument('--reset', action='store_true', help='Hent alt på nytt (nullstill manifest)')
+    parser.add_argument('--no-csv', action='store_true', help='Ikke eksporter CSV-filer')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    try:
+        client = FrostClient()
+    except FrostAPIError as exc:
+        print(exc)
+        sys.exit(1)
+
+    engine = BackfillEngine(client=client, max_workers=args.workers)
+    if args.reset:
+        engine.manifest.reset()
+
+    now = datetime.now(UTC)
+    season_list = seasons(args.start_year, now)
 
     print("=" * 60)
     print("HENTER HISTORISKE VINTERDATA FRA GULLINGEN")
-    print(f"Stasjon: {STATION}")
-    print(f"Elementer: {len(ELEMENTS)} stk")
+    print(f"Stasjon: {client.station_id}")
+    print(f"Elementer: {len(ELEMENTS)} stk, {args.workers} parallelle kall")
+    print(f"Lager: {engine.store.station_dir}")
     print("=" * 60)
 
-    all_seasons = []
-
-    for season_name, start_date, end_date in SEASONS:
+    failed = []
+    for season_name, start, end in season_list:
         print(f"\nSesong {season_name}:")
-
-        df = fetch_season_data(client_id, start_date, end_date)
-
-        if df.empty:
-            print("  Hopper over - ingen data")
-            continue
-
-        # Lagre sesongfil
-        season_file = os.path.join(OUTPUT_DIR, f'winter_{season_name}.csv')
-        df.to_csv(season_file, index=False)
-        print(f"  Lagret: {season_file} ({len(df)} rader)")
-
-        all_seasons.append(df)
-
-        # Pause mellom API-kall
-        time.sleep(1)
-
-    # Kombiner alle sesonger
-    if all_seasons:
-        combined = pd.concat(all_seasons, ignore_index=True)
-        combined = combined.sort_values('timestamp').drop_duplicates(subset=['timestamp'])
-
-        combined_file = os.path.join(OUTPUT_DIR, 'historical_winter_all.csv')
-        combined.to_csv(combined_file, index=False)
-
-        print()
-        print("=" * 60)
-        print("FERDIG!")
-        print(f"Samlet fil: {combined_file}")
-        print(f"Totalt: {len(combined)} rader")
-        print(f"Periode: {combined['timestamp'].min()} til {combined['timestamp'].max()}")
-        print(f"Kolonner: {list(combined.columns)}")
-        print("=" * 60)
+        report = engine.run(start, end, elements=ELEMENTS)
+        print(f"  {report.summary()}")
+        failed.extend(report.failed)
+
+    # Varselloggen gjelder den konfigurerte stasjonen
+    alerts = get_operational_store() if engine.store.station_id == settings.station.station_id else None
+    rolled = get_rollup_store().sync(engine.store, alerts=alerts)
+    print(f"\nDagsaggregater oppdatert: {rolled} døgn")
+
+    if not args.no_csv:
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        all_seasons = []
+        for season_name, start, end in season_list:
+            df = engine.store.read(start, end)
+            if df.empty:
+                print(f"\nSesong {season_name}: ingen data i lageret")
+                continue
+            season_file = OUTPUT_DIR / f'winter_{season_name}.csv'
+            export_season_csv(df, season_file)
+            print(f"Lagret: {season_file} ({len(df)} rader)")
+            all_seasons.append(df)
+
+        if all_seasons:
+            combined = pd.concat(all_seasons, ignore_index=True)
+            combined = combined.sort_values('reference_time').drop_duplicates(subset=['reference_time'])
+            combined_file = OUTPUT_DIR / 'historical_winter_all.csv'
+            export_season_csv(combined, combined_file)
+
+            print()
+            print("=" * 60)
+            print("FERDIG!")
+            print(f"Samlet fil: {combined_file}")
+            print(f"Totalt: {len(combined)} rader")
+            print(f"Periode: {combined['reference_time'].min()} til {combined['reference_time'].max()}")
+            print("=" * 60)
+
+    if failed:
+        print(f"\n{len(failed)} oppgaver feilet; kjør skriptet på nytt for å fortsette:")
+        for key in failed:
+            print(f"  {key}")
+        sys.exit(1)
 
 
 if __name__ == '__main__':
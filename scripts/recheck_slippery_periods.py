@@ -5,6 +5,7 @@ import json
 import sys
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 # Make repo-root importable so `import src...` works regardless of cwd.
@@ -12,7 +13,11 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from src.analyzers.slippery_road import SlipperyRoadAnalyzer
+from src.analyzers.slippery_road import SlipperyRoadAnalyzer  # noqa: E402
+from src.observation_store import ObservationStore  # noqa: E402
+
+SEASON_START = '2023-11-01'
+SEASON_END = '2024-04-30T23:59:59'
 
 
 def _load_weather_csv(csv_path: Path) -> pd.DataFrame:
@@ -54,6 +59,45 @@ def _load_weather_csv(csv_path: Path) -> pd.DataFrame:
     return df
 
 
+def _load_weather_store(start: str, end: str) -> pd.DataFrame:
+    """Read the season from the local observation store (empty if not populated)."""
+    df = ObservationStore().read(pd.Timestamp(start, tz='UTC'), pd.Timestamp(end, tz='UTC'))
+    if df.empty:
+        return df
+
+    if 'surface_snow_thickness' in df.columns:
+        df.loc[df['surface_snow_thickness'] < 0, 'surface_snow_thickness'] = pd.NA
+    return df
+
+
+def _evaluate_at(analyzer, df: pd.DataFrame, eval_times, context_hours: int):
+    """Yield (time, last row, result) with a fresh context slice per evaluation time."""
+    for t_eval in eval_times:
+        t_eval = pd.to_datetime(t_eval)
+        sample = df[df['reference_time'] <= t_eval]
+        sample = sample[sample['reference_time'] >= (t_eval - pd.Timedelta(hours=context_hours))]
+        if sample.empty:
+            continue
+        yield t_eval, sample.iloc[-1], analyzer.analyze(sample)
+
+
+def _stream_results(analyzer, df: pd.DataFrame, needed: np.ndarray, context_hours: int) -> dict:
+    """Analyze each needed row once by streaming the season through `analyzer.stream()`.
+
+    Same results as `_evaluate_at` on each row time: the stream keeps exactly
+    the last `context_hours` of rows. Other rows only update the running
+    aggregates.
+    """
+    stream = analyzer.stream(history_hours=context_hours)
+    results = {}
+    for i, (row, evaluate) in enumerate(zip(df.to_dict('records'), needed, strict=True)):
+        if evaluate:
+            results[i] = (row['reference_time'], row, stream.push(row))
+        else:
+            stream.feed(row)
+    return results
+
+
 def _format_val(val) -> str:
     if val is None or pd.isna(val):
         return 'None'
@@ -88,12 +132,15 @@ def main() -> None:
     csv_path = Path('data/raw/winter_seasons/winter_2023-2024.csv')
     periods_path = Path('data/analyzed/rain_on_snow_slippery_periods.json')
 
-    if not csv_path.exists():
-        raise SystemExit(f"Missing {csv_path}")
     if not periods_path.exists():
         raise SystemExit(f"Missing {periods_path}")
 
-    df = _load_weather_csv(csv_path)
+    # Prefer the columnar store; fall back to the legacy season CSV.
+    df = _load_weather_store(SEASON_START, SEASON_END)
+    if df.empty:
+        if not csv_path.exists():
+            raise SystemExit(f"Missing {csv_path}")
+        df = _load_weather_csv(csv_path)
     periods = json.loads(periods_path.read_text())
 
     analyzer = SlipperyRoadAnalyzer()
@@ -107,6 +154,15 @@ def main() -> None:
     def _is_higher(a: str, b: str) -> bool:
         return risk_order.get(a, 0) > risk_order.get(b, 0)
 
+    # Peak mode evaluates every row inside a period; stream the season once.
+    streamed = {}
+    if args.eval == 'peak':
+        needed = np.zeros(len(df), dtype=bool)
+        for p in periods:
+            needed |= ((df['reference_time'] >= pd.to_datetime(p['start_time']))
+                       & (df['reference_time'] <= pd.to_datetime(p['end_time']))).to_numpy()
+        streamed = _stream_results(analyzer, df, needed, args.context_hours)
+
     results = []
 
     stats = {
@@ -123,14 +179,12 @@ def main() -> None:
         start = pd.to_datetime(p['start_time'])
         end = pd.to_datetime(p['end_time'])
 
-        # Times to evaluate: either just period end, or every available hour inside the period.
-        if args.eval == 'end':
-            eval_times = [end]
+        # Evaluate either just at period end, or at every available hour inside the period.
+        in_period = ((df['reference_time'] >= start) & (df['reference_time'] <= end)).to_numpy()
+        if args.eval == 'peak' and in_period.any():
+            evaluations = (streamed[i] for i in in_period.nonzero()[0])
         else:
-            eval_times = df.loc[(df['reference_time'] >= start) & (df['reference_time'] <= end), 'reference_time']
-            eval_times = list(pd.to_datetime(eval_times).tolist())
-            if not eval_times:
-                eval_times = [end]
+            evaluations = _evaluate_at(analyzer, df, [end], args.context_hours)
 
         peak = None
         peak_time = None
@@ -139,32 +193,26 @@ def main() -> None:
         saw_dewpoint = False
         saw_dewpoint_above_zero = False
 
-        for t_eval in eval_times:
-            sample = df[df['reference_time'] <= t_eval].copy()
-            sample = sample[sample['reference_time'] >= (pd.to_datetime(t_eval) - pd.Timedelta(hours=args.context_hours))]
-            if sample.empty:
-                continue
-
+        for t_eval, last_row, res in evaluations:
             stats["periods_evaluated"] += 1
 
             # Track whether we ever saw rain in the evaluated window inside the period
             if args.only_rain:
-                last_p = sample.iloc[-1].get('precipitation_1h')
+                last_p = last_row.get('precipitation_1h')
                 if last_p is not None and not pd.isna(last_p) and float(last_p) >= rain_threshold:
                     saw_rain = True
 
             if args.require_dewpoint:
-                last_dp = sample.iloc[-1].get('dew_point_temperature')
+                last_dp = last_row.get('dew_point_temperature')
                 if last_dp is not None and not pd.isna(last_dp):
                     saw_dewpoint = True
                     if float(last_dp) > 0.0:
                         saw_dewpoint_above_zero = True
 
-            res = analyzer.analyze(sample)
             if peak is None or _is_higher(res.risk_level.name, peak.risk_level.name):
                 peak = res
-                peak_time = pd.to_datetime(t_eval)
-                peak_last_row = sample.iloc[-1]
+                peak_time = t_eval
+                peak_last_row = last_row
 
             # Fast exit: cannot beat HIGH
             if res.risk_level.name == 'HIGH':
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Replay stored weather history through the production analyzers.
+
+Unlike `calibrate_event_thresholds.py` and
+`evaluate_thresholds_against_broyting_correlation.py`, which re-implement
+simplified predictors on pre-aggregated event CSVs, this runs the real
+`src/analyzers` hour by hour with a causal window (see `src/backtest.py`).
+Threshold changes in `src/config.py` are therefore validated against the exact
+production logic.
+
+Inputs
+- The local observation store (fill it with scripts/fetch_winter_history.py).
+
+Output
+- Prints hours per risk level and alert episodes per analyzer and season.
+- Optionally writes the full alert timeline and the episode list as CSV.
+
+Usage:
+  python scripts/reports/backtest_seasons.py --start-year 2018
+  python scripts/reports/backtest_seasons.py --start-year 2023 --end-year 2024 \
+    --timeline-out data/analyzed/backtest_timeline.csv \
+    --episodes-out data/analyzed/backtest_episodes.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.backtest import BacktestEngine  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.observation_store import ObservationStore  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--start-year", type=int, default=settings.backfill.first_year, help="First season (October)")
+    parser.add_argument("--end-year", type=int, default=None, help="Last season start year (default: current)")
+    parser.add_argument("--station", default=None, help="Station id (default: settings.station)")
+    parser.add_argument("--all-months", action="store_true", help="Include summer months in the timeline")
+    parser.add_argument("--timeline-out", type=Path, default=None, help="Write full alert timeline CSV")
+    parser.add_argument("--episodes-out", type=Path, default=None, help="Write alert episodes CSV")
+    args = parser.parse_args()
+
+    now = datetime.now(UTC)
+    end_year = args.end_year if args.end_year is not None else now.year
+    start = datetime(args.start_year, 10, 1, tzinfo=UTC)
+    end = min(datetime(end_year + 1, 5, 1, tzinfo=UTC), now)
+
+    engine = BacktestEngine(store=ObservationStore(args.station))
+    result = engine.run(start, end, winter_only=not args.all_months)
+    if result.timeline.empty:
+        print("No observations in store for the period. Run scripts/fetch_winter_history.py first.")
+        return
+
+    print(
+        f"Replayed {result.rows} hours × {len(result.analyzers)} analyzers "
+        f"in {result.elapsed_seconds:.1f}s ({start:%Y-%m-%d} → {end:%Y-%m-%d})"
+    )
+    print(result.summary().to_string(index=False))
+
+    if args.timeline_out:
+        args.timeline_out.parent.mkdir(parents=True, exist_ok=True)
+        result.timeline.to_csv(args.timeline_out, index=False)
+        print(f"Wrote {args.timeline_out}")
+
+    if args.episodes_out:
+        args.episodes_out.parent.mkdir(parents=True, exist_ok=True)
+        result.episodes().to_csv(args.episodes_out, index=False)
+        print(f"Wrote {args.episodes_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,8 +16,14 @@ Labeling ("need" proxy)
     duration_minutes <= need_duration_min AND distance_km <= need_distance_km
 
 Grid search
-- Searches a small set of thresholds for snowdrift / fresh snow / slaps / freezing.
+- Searches the `settings.scripts.calibrate_grid_*` thresholds for
+  snowdrift / fresh snow / slaps / freezing.
 - Scores with weighted penalties (false positives on no-need are expensive).
+- Report columns are converted to NumPy once; each sub-rule mask is computed
+  once per threshold value and combined with bitwise ops. The freezing block
+  is scored as one matrix per outer combination, outer combinations are spread
+  over a process pool, and only a top-K heap of candidates is kept. Outer
+  combinations whose best possible loss cannot enter the heap are skipped.
 
 Output
 - Prints best parameters and writes a CSV with top candidates.
@@ -30,9 +36,14 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import heapq
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from src.config import settings
@@ -138,6 +149,239 @@ def score(df: pd.DataFrame, pred: pd.Series, w_fn: float, w_fp: float, w_fp_no_n
     }
 
 
+@dataclass(frozen=True)
+class Weights:
+    w_fn: float
+    w_fp: float
+    w_fp_no_need: float
+    target_alert_rate: float
+    w_alert_rate: float
+
+
+@dataclass(frozen=True)
+class Grid:
+    snow_change_cm: tuple[float, ...]
+    slaps_precip_mm: tuple[float, ...]
+    slaps_temp_max: tuple[float, ...]
+    gust_mps: tuple[float, ...]
+    wind_mps: tuple[float, ...]
+    freeze_surface_max: tuple[float, ...]
+    freeze_air_max: tuple[float, ...]
+    freeze_precip_mm: tuple[float, ...]
+    slaps_temp_min: float
+    drift_temp_max: float
+    freeze_air_min: float
+
+    @classmethod
+    def from_settings(cls) -> Grid:
+        th = settings.scripts
+        return cls(
+            snow_change_cm=tuple(th.calibrate_grid_snow_change_cm),
+            slaps_precip_mm=tuple(th.calibrate_grid_slaps_precip_mm),
+            slaps_temp_max=tuple(th.calibrate_grid_slaps_temp_max_c),
+            gust_mps=tuple(th.calibrate_grid_gust_mps),
+            wind_mps=tuple(th.calibrate_grid_wind_mps),
+            freeze_surface_max=tuple(th.calibrate_grid_freeze_surface_max_c),
+            freeze_air_max=tuple(th.calibrate_grid_freeze_air_max_c),
+            freeze_precip_mm=tuple(th.calibrate_grid_freeze_precip_mm),
+            slaps_temp_min=th.calibrate_slaps_temp_min_c,
+            drift_temp_max=th.calibrate_drift_temp_max_c,
+            freeze_air_min=th.calibrate_freeze_air_min_c,
+        )
+
+    def size(self) -> int:
+        return int(np.prod([
+            len(self.snow_change_cm), len(self.slaps_precip_mm), len(self.slaps_temp_max),
+            len(self.gust_mps), len(self.wind_mps), len(self.freeze_surface_max),
+            len(self.freeze_air_max), len(self.freeze_precip_mm),
+        ]))
+
+
+class EventArrays:
+    """Report columns as NumPy arrays, converted once (NaN compares False, as in `predict_trigger`)."""
+
+    def __init__(self, df: pd.DataFrame):
+        def col(name: str) -> np.ndarray:
+            return pd.to_numeric(df.get(name), errors="coerce").to_numpy(dtype=float)
+
+        self.air = col("air_temp_avg")
+        self.surface = col("surface_temp_avg")
+        self.wind = col("wind_avg")
+        self.gust = col("gust_max")
+        self.precip = np.nan_to_num(col("precip_total"), nan=0.0)
+        self.snow_change = col("snow_change")
+        self.need = df["need_event"].to_numpy(dtype=bool)
+        self.no_need = df["no_need_event"].to_numpy(dtype=bool)
+
+
+# Candidate ordering, same as the original sort: loss, alert_rate_pct, fn, fp_no_need, fp
+def _rank_key(s: dict) -> tuple:
+    return (s["loss"], s["alert_rate_pct"], s["fn"], s["fp_no_need"], s["fp"])
+
+
+class TopK:
+    """
+    Keeps the K best candidates (lowest rank key) in a max-heap.
+
+    Ties are broken by `order` (position in the full grid), so the result does
+    not depend on how the grid was split across workers.
+    """
+
+    def __init__(self, k: int):
+        self.k = max(1, int(k))
+        self._heap: list[tuple[tuple, int, dict]] = []
+
+    def worst_loss(self) -> float:
+        if len(self._heap) < self.k:
+            return float("inf")
+        return -self._heap[0][0][0]
+
+    def push(self, candidate: dict, order: int) -> None:
+        item = (tuple(-v for v in _rank_key(candidate)), -order, candidate)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def extend(self, ranked: list[tuple[int, dict]]) -> None:
+        for order, candidate in ranked:
+            self.push(candidate, order)
+
+    def ranked(self) -> list[tuple[int, dict]]:
+        """Best first, as (order, candidate) pairs."""
+        return [(-neg_order, c) for _, neg_order, c in sorted(self._heap, key=lambda item: item[:2], reverse=True)]
+
+
+def _score_block(
+    pred: np.ndarray, ev: EventArrays, w: Weights
+) -> dict[str, np.ndarray]:
+    """Vectorized `score` + alert-rate penalty for a (k, n) block of predictions."""
+    n = pred.shape[1]
+    need_n = int(ev.need.sum())
+    tp = (pred & ev.need).sum(axis=1)
+    fp = (pred & ~ev.need).sum(axis=1)
+    fp_no_need = (pred & ev.no_need).sum(axis=1)
+    fn = need_n - tp
+    alert_rate = pred.sum(axis=1) / n * 100.0 if n else np.zeros(len(pred))
+    hit_rate = tp / need_n * 100.0 if need_n else np.zeros(len(pred))
+    over = np.maximum(0.0, alert_rate - float(w.target_alert_rate))
+    loss = (w.w_fn * fn) + (w.w_fp * fp) + (w.w_fp_no_need * fp_no_need) + w.w_alert_rate * over ** 2
+    return {
+        "tp": tp, "fn": fn, "fp": fp, "fp_no_need": fp_no_need,
+        "alert_rate_pct": alert_rate, "hit_rate_pct": hit_rate,
+        "alert_rate_over_pct": over, "loss": loss,
+    }
+
+
+def _search_chunk(
+    ev: EventArrays, grid: Grid, w: Weights, outer: list[tuple[int, tuple[int, int, int]]], top: int
+) -> list[tuple[int, dict]]:
+    """
+    Score every candidate whose (snow_change, slaps_precip, slaps_temp_max) index is in `outer`.
+
+    Sub-rule masks are built once per threshold value; the freezing rule is
+    evaluated as a (k, n) matrix so each outer combination is one bitwise OR.
+    """
+    air_ok = ~np.isnan(ev.air)
+    fresh = {v: ~np.isnan(ev.snow_change) & (ev.snow_change >= v) for v in grid.snow_change_cm}
+    slaps_temp = {
+        t: air_ok & (ev.air >= grid.slaps_temp_min) & (ev.air <= t) for t in grid.slaps_temp_max
+    }
+    slaps_precip = {v: ev.precip >= v for v in grid.slaps_precip_mm}
+
+    drift_base = ~np.isnan(ev.gust) & ~np.isnan(ev.wind) & air_ok & (ev.air <= grid.drift_temp_max)
+    drift_params = list(itertools.product(grid.gust_mps, grid.wind_mps))
+    drift = np.array([drift_base & (ev.gust >= g) & (ev.wind >= wm) for g, wm in drift_params])
+
+    freeze_base = air_ok & ~np.isnan(ev.surface) & (ev.air >= grid.freeze_air_min)
+    freeze_params = list(itertools.product(grid.freeze_surface_max, grid.freeze_air_max, grid.freeze_precip_mm))
+    freeze = np.array([
+        freeze_base & (ev.surface <= s) & (ev.air <= a) & (ev.precip >= fp)
+        for s, a, fp in freeze_params
+    ])
+    freeze_any = freeze.any(axis=0)
+    need_n = int(ev.need.sum())
+    n = len(ev.need)
+
+    best = TopK(top)
+    block = len(drift_params) * len(freeze_params)
+    for outer_order, (i_snow, i_precip, i_temp) in outer:
+        snow_change_cm = grid.snow_change_cm[i_snow]
+        slaps_precip_mm = grid.slaps_precip_mm[i_precip]
+        slaps_temp_max = grid.slaps_temp_max[i_temp]
+        partial = fresh[snow_change_cm] | (slaps_temp[slaps_temp_max] & slaps_precip[slaps_precip_mm])
+
+        for i_drift, ((gust_mps, wind_mps), drift_mask) in enumerate(zip(drift_params, drift, strict=True)):
+            base = partial | drift_mask
+
+            # Prune: freezing only adds alerts, so fp/fp_no_need/alert rate can only grow
+            # and fn can at best drop to what the union of all freezing masks leaves.
+            fp_min = int((base & ~ev.need).sum())
+            fp_no_need_min = int((base & ev.no_need).sum())
+            fn_min = need_n - int(((base | freeze_any) & ev.need).sum())
+            over_min = max(0.0, (base.sum() / n * 100.0 if n else 0.0) - float(w.target_alert_rate))
+            loss_min = (
+                w.w_fn * fn_min + w.w_fp * fp_min + w.w_fp_no_need * fp_no_need_min
+                + w.w_alert_rate * over_min ** 2
+            )
+            if loss_min > best.worst_loss():
+                continue
+
+            scores = _score_block(base | freeze, ev, w)
+            for k in np.flatnonzero(scores["loss"] <= best.worst_loss()):
+                freeze_surface_max, freeze_air_max, freeze_precip_mm = freeze_params[k]
+                p = Params(
+                    snow_change_cm=snow_change_cm,
+                    slaps_precip_mm=slaps_precip_mm,
+                    slaps_temp_min=grid.slaps_temp_min,
+                    slaps_temp_max=slaps_temp_max,
+                    gust_mps=gust_mps,
+                    wind_mps=wind_mps,
+                    drift_temp_max=grid.drift_temp_max,
+                    freeze_surface_max=freeze_surface_max,
+                    freeze_air_min=grid.freeze_air_min,
+                    freeze_air_max=freeze_air_max,
+                    freeze_precip_mm=freeze_precip_mm,
+                )
+                best.push({
+                    **p.__dict__,
+                    "tp": int(scores["tp"][k]),
+                    "fn": int(scores["fn"][k]),
+                    "fp": int(scores["fp"][k]),
+                    "fp_no_need": int(scores["fp_no_need"][k]),
+                    "need_n": need_n,
+                    "no_need_n": int(ev.no_need.sum()),
+                    "alert_rate_pct": float(scores["alert_rate_pct"][k]),
+                    "hit_rate_pct": float(scores["hit_rate_pct"][k]),
+                    "loss": float(scores["loss"][k]),
+                    "alert_rate_over_pct": float(scores["alert_rate_over_pct"][k]),
+                }, order=outer_order * block + i_drift * len(freeze_params) + int(k))
+    return best.ranked()
+
+
+def grid_search(
+    df: pd.DataFrame, grid: Grid, weights: Weights, top: int, workers: int = 1
+) -> pd.DataFrame:
+    """Return the `top` best candidates over `grid`, sorted like the original full search."""
+    ev = EventArrays(df)
+    outer = list(enumerate(itertools.product(
+        range(len(grid.snow_change_cm)), range(len(grid.slaps_precip_mm)), range(len(grid.slaps_temp_max))
+    )))
+
+    if workers <= 1 or len(outer) < 2:
+        ranked = _search_chunk(ev, grid, weights, outer, top)
+    else:
+        chunks = [outer[i::workers] for i in range(workers)]
+        merged = TopK(top)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_search_chunk, ev, grid, weights, chunk, top) for chunk in chunks if chunk]
+            for future in futures:
+                merged.extend(future.result())
+        ranked = merged.ranked()
+
+    return pd.DataFrame([candidate for _, candidate in ranked])
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--report", type=Path, required=True, help="Event report CSV (from analyze_broyting_correlation.py)")
@@ -179,6 +423,7 @@ def main() -> None:
 
     parser.add_argument("--top", type=int, default=th.calibrate_top_default, help="How many top parameter sets to write")
     parser.add_argument("--out", type=Path, default=None, help="Output CSV (default: alongside report)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Process pool size (1 = serial)")
 
     args = parser.parse_args()
 
@@ -192,40 +437,16 @@ def main() -> None:
     if len(df) == 0:
         raise SystemExit("No labeled rows after applying duration/distance rules")
 
-    candidates: list[dict] = []
-
-    for snow_change_cm in th.calibrate_grid_snow_change_cm:
-        for slaps_precip_mm in th.calibrate_grid_slaps_precip_mm:
-            for slaps_temp_max in th.calibrate_grid_slaps_temp_max_c:
-                for gust_mps in th.calibrate_grid_gust_mps:
-                    for wind_mps in th.calibrate_grid_wind_mps:
-                        for freeze_surface_max in th.calibrate_grid_freeze_surface_max_c:
-                            for freeze_air_max in th.calibrate_grid_freeze_air_max_c:
-                                for freeze_precip_mm in th.calibrate_grid_freeze_precip_mm:
-                                    p = Params(
-                                        snow_change_cm=snow_change_cm,
-                                        slaps_precip_mm=slaps_precip_mm,
-                                        slaps_temp_min=th.calibrate_slaps_temp_min_c,
-                                        slaps_temp_max=slaps_temp_max,
-                                        gust_mps=gust_mps,
-                                        wind_mps=wind_mps,
-                                        drift_temp_max=th.calibrate_drift_temp_max_c,
-                                        freeze_surface_max=freeze_surface_max,
-                                        freeze_air_min=th.calibrate_freeze_air_min_c,
-                                        freeze_air_max=freeze_air_max,
-                                        freeze_precip_mm=freeze_precip_mm,
-                                    )
-                                    pred = predict_trigger(df, p)
-                                    s = score(df, pred, args.w_fn, args.w_fp, args.w_fp_no_need)
-
-                                    # Additional penalty if the model alerts too often.
-                                    over = max(0.0, s["alert_rate_pct"] - float(args.target_alert_rate))
-                                    s["alert_rate_over_pct"] = over
-                                    s["loss"] = float(s["loss"] + (args.w_alert_rate * (over ** 2)))
-
-                                    candidates.append({**p.__dict__, **s})
-
-    res = pd.DataFrame(candidates).sort_values(["loss", "alert_rate_pct", "fn", "fp_no_need", "fp"])
+    weights = Weights(
+        w_fn=args.w_fn,
+        w_fp=args.w_fp,
+        w_fp_no_need=args.w_fp_no_need,
+        target_alert_rate=args.target_alert_rate,
+        w_alert_rate=args.w_alert_rate,
+    )
+    grid = Grid.from_settings()
+    print(f"Searching {grid.size()} candidates on {len(df)} labeled events ({args.workers} workers)")
+    res = grid_search(df, grid, weights, top=int(args.top), workers=int(args.workers))
 
     best = res.iloc[0].to_dict()
     print("Best params (event-level):")
@@ -252,7 +473,7 @@ def main() -> None:
         print(f"  {k}: {best.get(k)}")
 
     out_path = args.out or (args.report.parent / f"calibration_top_{args.report.stem}.csv")
-    res.head(int(args.top)).to_csv(out_path, index=False)
+    res.to_csv(out_path, index=False)
     print(f"Wrote: {out_path}")
 
 
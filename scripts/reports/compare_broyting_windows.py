@@ -7,15 +7,25 @@ This reads CSV outputs produced by scripts/analyze_broyting_correlation.py
 - share of likely inspections (short duration + short distance)
 - how often scenario changes when expanding the window
 
+With --weather, the per-window reports are (re)built first from the weather
+CSV in a single aggregation pass over all windows, instead of reading
+reports produced by separate runs.
+
 Usage:
   python scripts/reports/compare_broyting_windows.py \
     --stem historical_winter_all \
     --hours 6 12 18
+
+  python scripts/reports/compare_broyting_windows.py \
+    --weather data/analyzed/weather_SN46220_2025-11-01_to_2026-03-01_PT1H.csv \
+    --plowing data/analyzed/arbeidstidsrapport_2025-11-01_til_2026-03-01.csv \
+    --hours 6 12 24
 """
 
 from __future__ import annotations
 
 import argparse
+import sys
 from pathlib import Path
 
 import pandas as pd
@@ -141,7 +151,13 @@ def start_hour_distribution(plowing_csv: Path) -> dict:
 
 def main() -> None:
     parser = argparse.ArgumentParser()
-    parser.add_argument("--stem", required=True, help="Weather report stem (e.g. historical_winter_all)")
+    parser.add_argument("--stem", default=None, help="Weather report stem (e.g. historical_winter_all)")
+    parser.add_argument(
+        "--weather",
+        type=Path,
+        default=None,
+        help="Weather CSV: build all window reports in one pass (stem defaults to its file stem)",
+    )
     parser.add_argument("--hours", nargs="+", type=int, required=True, help="Hours windows to compare")
     parser.add_argument(
         "--plowing",
@@ -158,8 +174,22 @@ def main() -> None:
 
     args = parser.parse_args()
 
+    if args.stem is None and args.weather is None:
+        parser.error("--stem or --weather is required")
+
     hours_list = list(dict.fromkeys(args.hours))
-    frames = {h: _read_report(args.stem, h) for h in hours_list}
+    if args.weather is not None:
+        sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+        from analyze_broyting_correlation import analyze_weather_vs_plowing
+
+        args.stem = args.stem or args.weather.stem
+        combined = analyze_weather_vs_plowing(args.weather, args.plowing, hours_list, None)
+        frames = {
+            h: combined.loc[combined["window_hours"] == h].reset_index(drop=True)
+            for h in hours_list
+        }
+    else:
+        frames = {h: _read_report(args.stem, h) for h in hours_list}
 
     rows = [summarize_report(frames[h], h) for h in hours_list]
     summary_df = pd.DataFrame(rows).sort_values("window_hours")
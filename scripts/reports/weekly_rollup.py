@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Weekly operational summary, tun-plowing status and season comparison.
+
+Reads the materialized daily/ISO-week aggregates (`src/rollup_store.py`)
+instead of scanning hourly observations. Month partitions that changed since
+the last run are rolled up first, so the output is always current.
+
+Inputs
+- The local observation store (fill it with scripts/fetch_winter_history.py).
+- The operational alert log (alert counts per day), if present.
+
+Usage:
+  python scripts/reports/weekly_rollup.py
+  python scripts/reports/weekly_rollup.py --weeks 12 --seasons
+  python scripts/reports/weekly_rollup.py --day 2026-01-16
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.observation_store import ObservationStore  # noqa: E402
+from src.operational_logger import get_operational_store  # noqa: E402
+from src.rollup_store import get_rollup_store  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--station", default=None, help="Station id (default: settings.station)")
+    parser.add_argument("--weeks", type=int, default=4, help="Number of ISO weeks to show")
+    parser.add_argument("--day", type=date.fromisoformat, default=None, help="Reference day (default: today)")
+    parser.add_argument("--seasons", action="store_true", help="Also print season totals")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute all partitions")
+    args = parser.parse_args()
+
+    observations = ObservationStore(args.station)
+    station_id = observations.station_id
+    rollups = get_rollup_store()
+    alerts = get_operational_store() if args.station is None else None
+    rolled = rollups.sync(observations, alerts=alerts, full=args.rebuild)
+    print(f"Rolled up {rolled} days for {station_id} ({rollups.path})")
+
+    day = args.day or date.today()
+    weekly = rollups.weekly(station_id, start=day - timedelta(weeks=args.weeks), end=day)
+    if weekly.empty:
+        print("No aggregates for the period. Run scripts/fetch_winter_history.py first.")
+        return
+    print(weekly.tail(args.weeks).round(1).to_string(index=False))
+
+    status = rollups.tun_plowing_status(station_id, day)
+    coverage = "" if status.complete else f" (data for {status.days_with_data} days)"
+    print(f"\nNew snow {status.since:%a %d.%m} → {status.until:%a %d.%m}: {status.new_snow_cm:.1f} cm{coverage}")
+
+    if args.seasons:
+        print()
+        print(rollups.seasons(station_id).round(1).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Samlet varslingstjeneste for e-post (erstatter `scripts/alerts/*`).
+
+Én prosess kjører `AlertService.tick()` på fast intervall. Hver runde henter
+siste `lookback_hours` fra Frost én gang via `FrostClient`, kjører de
+konfigurerte analysatorene i `src/analyzers` på samme DataFrame, stanser
+farevarsel ved nylig vedlikehold (samme regel som dashboardet,
+`apply_maintenance_suppression`) og sender e-post.
+
+Nedkjøling og dedupe gjøres per analysator og lagres i en JSON-tilstandsfil,
+slik at en omstart ikke gir dobbeltvarsler: samme eller lavere nivå varsles
+tidligst igjen etter `cooldown_hours`, mens økt nivå varsles straks.
+
+Eksempel:
+    service = AlertService()
+    service.run_forever()
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import smtplib
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from email.mime.text import MIMEText
+from pathlib import Path
+
+import pandas as pd
+
+from src.analyzers import (
+    AnalysisResult,
+    BaseAnalyzer,
+    FreshSnowAnalyzer,
+    RiskLevel,
+    SlapsAnalyzer,
+    SlipperyRoadAnalyzer,
+    SnowdriftAnalyzer,
+)
+from src.config import get_secret, settings
+from src.frost_client import FrostAPIError, FrostClient
+from src.plowing_service import PlowingInfo, apply_maintenance_suppression, get_plowing_info
+
+logger = logging.getLogger(__name__)
+
+
+ANALYZERS: dict[str, Callable[[], BaseAnalyzer]] = {
+    "Nysnø": FreshSnowAnalyzer,
+    "Snøfokk": SnowdriftAnalyzer,
+    "Slaps": SlapsAnalyzer,
+    "Glatte veier": SlipperyRoadAnalyzer,
+}
+
+_RISK_RANK = {
+    RiskLevel.UNKNOWN: 0,
+    RiskLevel.LOW: 1,
+    RiskLevel.MEDIUM: 2,
+    RiskLevel.HIGH: 3,
+}
+
+
+def _project_root() -> Path:
+    return Path(__file__).parent.parent
+
+
+def _parse_utc(value: str) -> datetime | None:
+    try:
+        ts = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return ts.replace(tzinfo=UTC) if ts.tzinfo is None else ts.astimezone(UTC)
+
+
+class AlertState:
+    """Siste sendte varsel per analysator (trådsikker, atomisk lagring)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sent: dict[str, dict] = self._load()
+
+    def _load(self) -> dict[str, dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.warning("Kunne ikke lese varseltilstand %s: %s", self.path, exc)
+            return {}
+        sent = data.get("sent", {})
+        return sent if isinstance(sent, dict) else {}
+
+    def last_sent(self, name: str) -> tuple[RiskLevel, datetime] | None:
+        """Nivå og tidspunkt for siste varsel (None hvis aldri sendt)."""
+        with self._lock:
+            entry = self._sent.get(name)
+        if not isinstance(entry, dict):
+            return None
+        level_name = entry.get("level")
+        sent_at = _parse_utc(entry.get("sent_at", ""))
+        # Ukjent eller korrupt nivå i tilstandsfilen tolkes som "aldri sendt"
+        if not isinstance(level_name, str) or level_name not in RiskLevel.__members__:
+            return None
+        if sent_at is None:
+            return None
+        return RiskLevel[level_name], sent_at
+
+    def should_send(self, name: str, level: RiskLevel, now: datetime, cooldown: timedelta) -> bool:
+        """True hvis nivået er høyere enn sist sendt, eller cooldown er over."""
+        previous = self.last_sent(name)
+        if previous is None:
+            return True
+        previous_level, sent_at = previous
+        if _RISK_RANK[level] > _RISK_RANK[previous_level]:
+            return True
+        return now - sent_at >= cooldown
+
+    def mark_sent(self, name: str, result: AnalysisResult, now: datetime) -> None:
+        with self._lock:
+            self._sent[name] = {
+                "level": result.risk_level.name,
+                "scenario": result.scenario,
+                "sent_at": now.isoformat(),
+            }
+            self._save_locked()
+
+    def _save_locked(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"sent": self._sent}, indent=2, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        tmp.replace(self.path)
+
+
+@dataclass(frozen=True)
+class EmailNotifier:
+    """SMTP-utsending (STARTTLS) med oppsett fra secrets/miljøvariabler."""
+    email_from: str
+    email_to: str
+    smtp_server: str
+    smtp_username: str
+    smtp_password: str
+    smtp_port: int = 587
+
+    @classmethod
+    def from_secrets(cls) -> EmailNotifier:
+        return cls(
+            email_from=get_secret("ALERT_EMAIL_FROM", ""),
+            email_to=get_secret("ALERT_EMAIL_TO", ""),
+            smtp_server=get_secret("ALERT_SMTP_SERVER", "smtp.gmail.com"),
+            smtp_username=get_secret("ALERT_SMTP_USERNAME", ""),
+            smtp_password=get_secret("ALERT_SMTP_PASSWORD", ""),
+            smtp_port=settings.alerts.smtp_port,
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.email_from and self.email_to and self.smtp_username)
+
+    def send(self, subject: str, body: str) -> None:
+        """Send e-post (kaster OSError/smtplib.SMTPException ved feil)."""
+        msg = MIMEText(body, "plain", "utf-8")
+        msg["From"] = self.email_from
+        msg["To"] = self.email_to
+        msg["Subject"] = subject
+        with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+            server.starttls()
+            server.login(self.smtp_username, self.smtp_password)
+            server.send_message(msg)
+
+
+@dataclass
+class TickReport:
+    """Oppsummering av én varslingsrunde."""
+    started_at: datetime
+    rows: int = 0
+    data_time: datetime | None = None
+    results: dict[str, AnalysisResult] = field(default_factory=dict)
+    suppressed_by_maintenance: bool = False
+    sent: list[str] = field(default_factory=list)
+    skipped_cooldown: list[str] = field(default_factory=list)
+    error: str | None = None
+
+    def summary(self) -> str:
+        if self.error:
+            return f"feil: {self.error}"
+        levels = ", ".join(f"{name}={r.risk_level.name}" for name, r in self.results.items())
+        return (
+            f"{self.rows} rader ({levels or 'ingen analyser'}); "
+            f"sendt: {', '.join(self.sent) or 'ingen'}"
+            + (f"; cooldown: {', '.join(self.skipped_cooldown)}" if self.skipped_cooldown else "")
+            + ("; stanset av vedlikehold" if self.suppressed_by_maintenance else "")
+        )
+
+
+def format_alert(name: str, result: AnalysisResult, data_time: datetime | None) -> tuple[str, str]:
+    """Emne og tekst for ett varsel."""
+    level = result.risk_level.norwegian.lower()
+    subject = f"VARSEL: {level} risiko – {name.lower()} i Fjellbergsskardet"
+    when = (data_time or datetime.now(UTC)).astimezone().strftime("%Y-%m-%d %H:%M")
+
+    lines = [
+        f"VARSEL: {name} – {result.risk_level.norwegian} risiko",
+        "",
+        f"Tid (siste måling): {when}",
+        f"Scenario: {result.scenario or '-'}",
+        f"Vurdering: {result.message}",
+    ]
+    if result.factors:
+        lines += ["", "FAKTORER:"] + [f"- {factor}" for factor in result.factors]
+    if result.caveat:
+        lines += ["", result.caveat]
+    lines += [
+        "",
+        "-------------------",
+        "Dette er et automatisk varsel med værdata fra Gullingen værstasjon.",
+        "Terskler hentes fra `src/config.py` (samme analyse som dashboardet).",
+        "",
+        "Gi gjerne tilbakemelding dersom varsler ikke samsvarer med faktiske forhold.",
+    ]
+    return subject, "\n".join(lines)
+
+
+class AlertService:
+    """Henter data én gang per runde, vurderer alle analysatorer og sender varsler."""
+
+    def __init__(
+        self,
+        client: FrostClient | None = None,
+        analyzers: dict[str, BaseAnalyzer] | None = None,
+        state: AlertState | None = None,
+        notifier: EmailNotifier | None = None,
+        plowing: Callable[[], PlowingInfo] | None = None,
+        clock: Callable[[], datetime] | None = None,
+        cooldown_hours: float | None = None,
+    ):
+        """
+        Initialiser tjenesten.
+
+        Args:
+            client: FrostClient (default: ny klient for standard stasjon)
+            analyzers: Navn -> analysator (default: `settings.alerts.analyzers`)
+            state: Tilstand for cooldown/dedupe (default: `settings.alerts.state_file`)
+            notifier: E-postutsending (default: fra secrets)
+            plowing: Henter vedlikeholdsinfo (default: `get_plowing_info`)
+            clock: Gir nåtid i UTC (kan byttes ut i tester)
+            cooldown_hours: Overstyrer cooldown (default: ALERT_COOLDOWN_HOURS / config)
+        """
+        cfg = settings.alerts
+        self.client = client or FrostClient()
+        self.analyzers = analyzers if analyzers is not None else {
+            name: ANALYZERS[name]() for name in cfg.analyzers
+        }
+        self.state = state or AlertState(_project_root() / cfg.state_file)
+        self.notifier = notifier or EmailNotifier.from_secrets()
+        self._plowing = plowing or get_plowing_info
+        self._clock = clock or (lambda: datetime.now(UTC))
+
+        if cooldown_hours is None:
+            try:
+                cooldown_hours = float(get_secret("ALERT_COOLDOWN_HOURS", str(cfg.cooldown_hours)))
+            except ValueError:
+                cooldown_hours = cfg.cooldown_hours
+        self.cooldown = timedelta(hours=cooldown_hours)
+        self.min_level = RiskLevel[cfg.min_risk_level]
+
+    def tick(self) -> TickReport:
+        """Én runde: hent, vurder, stans ved vedlikehold og send nye varsler."""
+        cfg = settings.alerts
+        now = self._clock()
+        report = TickReport(started_at=now)
+
+        try:
+            weather = self.client.fetch_recent(hours_back=cfg.lookback_hours)
+        except FrostAPIError as exc:
+            report.error = str(exc)
+            return report
+
+        df = weather.df
+        report.rows = weather.record_count
+        if weather.is_empty:
+            return report
+
+        report.data_time = pd.Timestamp(df["reference_time"].iloc[-1]).to_pydatetime()
+        if now - report.data_time > timedelta(minutes=cfg.max_data_age_minutes):
+            report.error = f"siste måling er fra {report.data_time:%Y-%m-%d %H:%M} UTC"
+            return report
+
+        results = {name: analyzer.analyze(df) for name, analyzer in self.analyzers.items()}
+
+        try:
+            plowing_info = self._plowing()
+        except (RuntimeError, ValueError, TypeError, KeyError, OSError) as exc:
+            # Uten vedlikeholdsinfo varsler vi heller enn å tie
+            logger.warning("Kunne ikke hente vedlikeholdsinfo: %s", exc)
+        else:
+            suppressed = apply_maintenance_suppression(results, plowing_info)
+            report.suppressed_by_maintenance = suppressed is not results
+            results = suppressed
+        report.results = results
+
+        for name, result in results.items():
+            if _RISK_RANK[result.risk_level] < _RISK_RANK[self.min_level]:
+                continue
+            if not self.state.should_send(name, result.risk_level, now, self.cooldown):
+                report.skipped_cooldown.append(name)
+                continue
+            if self._dispatch(name, result, report.data_time):
+                self.state.mark_sent(name, result, now)
+                report.sent.append(name)
+
+        return report
+
+    def _dispatch(self, name: str, result: AnalysisResult, data_time: datetime | None) -> bool:
+        subject, body = format_alert(name, result, data_time)
+        if not self.notifier.configured:
+            logger.warning("E-post er ikke konfigurert (ALERT_EMAIL_*); varsel ikke sendt: %s", subject)
+            return False
+        try:
+            self.notifier.send(subject, body)
+        except (OSError, smtplib.SMTPException) as exc:
+            logger.error("Kunne ikke sende varsel for %s: %s", name, exc)
+            return False
+        logger.info("Varsel sendt: %s", subject)
+        return True
+
+    def run_forever(
+        self,
+        stop: threading.Event | None = None,
+        interval_minutes: float | None = None,
+        max_ticks: int | None = None,
+    ) -> None:
+        """
+        Kjør `tick()` på fast intervall til `stop` settes.
+
+        Args:
+            stop: Stoppsignal (default: kjør til prosessen avsluttes)
+            interval_minutes: Tid mellom runder (default: `settings.alerts.interval_minutes`)
+            max_ticks: Antall runder før retur (None = ubegrenset)
+        """
+        stop = stop or threading.Event()
+        interval = 60.0 * (interval_minutes or settings.alerts.interval_minutes)
+        ticks = 0
+
+        while not stop.is_set():
+            started = time.monotonic()
+            try:
+                report = self.tick()
+            except Exception:
+                # Én feilet runde skal ikke stoppe tjenesten
+                logger.exception("Varslingsrunde feilet")
+            else:
+                logger.info(
+                    "Varslingsrunde %s: %s", report.started_at.strftime("%Y-%m-%d %H:%M"), report.summary()
+                )
+
+            ticks += 1
+            if max_ticks is not None and ticks >= max_ticks:
+                return
+            stop.wait(max(0.0, interval - (time.monotonic() - started)))
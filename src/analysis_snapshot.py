@@ -0,0 +1,204 @@
+"""
+Ferdig analysert standardperiode, holdt varm i bakgrunnen.
+
+Uten dette betaler første besøkende etter at cachen har gått ut hele kjeden:
+Frost, brøyting, de fire analysatorene, datakvalitet og stabilisering. Med
+`SnapshotRefresher` kjøres kjeden i en bakgrunnstråd hvert N. minutt, og
+resultatet publiseres som et uforanderlig `AnalysisSnapshot`. Sidevisninger
+for standardperioden leser bare siste snapshot, så svartiden avhenger ikke av
+eksterne API-er.
+
+Selve kjeden (henting og analyse) sendes inn som `build`, slik at modulen
+ikke kjenner Streamlit eller appens funksjoner. Feiler en oppfriskning,
+beholdes forrige snapshot til det blir for gammelt (`max_age_seconds`).
+
+Eksempel:
+    refresher = SnapshotRefresher(build, interval_seconds=300, max_age_seconds=1800)
+    refresher.start()
+    ...
+    snapshot = refresher.latest()
+    if snapshot is None:
+        ...  # beregn selv
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from types import MappingProxyType
+from typing import Any
+
+import pandas as pd
+
+from src.analyzers import AnalysisResult
+from src.plowing_service import PlowingInfo
+
+logger = logging.getLogger(__name__)
+
+
+def _frozen(mapping: Mapping[str, Any] | None) -> Mapping[str, Any]:
+    return MappingProxyType(dict(mapping or {}))
+
+
+@dataclass(frozen=True)
+class AnalysisSnapshot:
+    """
+    Alt dashboardet trenger for én periode, klart til visning.
+
+    Mappingene er skrivebeskyttede. DataFrames deles mellom alle økter og
+    skal kun leses.
+    """
+    period_start_utc: datetime
+    period_end_utc: datetime
+    weather: pd.DataFrame
+    plowing_info: PlowingInfo
+    raw_results: Mapping[str, AnalysisResult]
+    results: Mapping[str, AnalysisResult]
+    confidence: Mapping[str, int]
+    quality_metrics: Mapping[str, Any]
+    quality_note: str | None = None
+    suppress_alerts: bool = False
+    maintenance_reason: str = ""
+    # Prognose (None: ikke hentet i snapshotet; seksjonen henter selv)
+    forecast: Any = None
+    # Ferdig rendrede grafer (PNG) per plotnavn; tom = rendres ved visning
+    charts: Mapping[str, bytes] = field(default_factory=dict)
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    build_seconds: float = 0.0
+
+    def __post_init__(self) -> None:
+        for name in ("raw_results", "results", "confidence", "quality_metrics", "charts"):
+            object.__setattr__(self, name, _frozen(getattr(self, name)))
+
+    def age_seconds(self, now: datetime | None = None) -> float:
+        return ((now or datetime.now(UTC)) - self.created_at).total_seconds()
+
+
+@dataclass(frozen=True)
+class RefresherStats:
+    """Tilstand for bakgrunnsoppfriskningen."""
+    refreshes: int
+    failures: int
+    last_build_seconds: float
+    last_refresh_at: datetime | None
+    last_error: str | None
+    running: bool
+
+
+class SnapshotRefresher:
+    """Kjører `build` periodisk i en daemon-tråd og publiserer siste snapshot (trådsikker)."""
+
+    def __init__(
+        self,
+        build: Callable[[], AnalysisSnapshot],
+        *,
+        interval_seconds: float,
+        max_age_seconds: float,
+        name: str = "analysis-snapshot",
+    ):
+        """
+        Initialiser oppfriskeren (start med `start()`).
+
+        Args:
+            build: Henter data og kjører hele analysen; kalles kun fra bakgrunnstråden
+            interval_seconds: Tid mellom oppfriskninger
+            max_age_seconds: Eldre snapshot returneres ikke fra `latest()`
+            name: Trådnavn
+        """
+        self._build = build
+        self.interval_seconds = max(1.0, float(interval_seconds))
+        self.max_age_seconds = float(max_age_seconds)
+        self._name = name
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._snapshot: AnalysisSnapshot | None = None
+        self._refreshes = 0
+        self._failures = 0
+        self._last_build_seconds = 0.0
+        self._last_refresh_at: datetime | None = None
+        self._last_error: str | None = None
+
+    def start(self) -> SnapshotRefresher:
+        """Start bakgrunnstråden (idempotent). Første oppfriskning kjøres med en gang."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def refresh_now(self) -> None:
+        """Be tråden friske opp uten å vente på neste intervall."""
+        self._wake.set()
+
+    def refresh(self) -> AnalysisSnapshot | None:
+        """Kjør én oppfriskning i kallende tråd. Ved feil beholdes forrige snapshot."""
+        started = time.perf_counter()
+        try:
+            snapshot = self._build()
+        except Exception as e:  # noqa: BLE001 - bakgrunnstråden skal overleve alle feil i kjeden
+            elapsed = time.perf_counter() - started
+            logger.warning("Oppfriskning av analyse feilet etter %.1fs: %s", elapsed, e)
+            with self._lock:
+                self._failures += 1
+                self._last_error = str(e) or type(e).__name__
+                self._last_build_seconds = elapsed
+            return None
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._snapshot = snapshot
+            self._refreshes += 1
+            self._last_error = None
+            self._last_build_seconds = elapsed
+            self._last_refresh_at = datetime.now(UTC)
+        logger.info("Analyse-snapshot oppfrisket på %.1fs", elapsed)
+        return snapshot
+
+    def latest(self, now: datetime | None = None) -> AnalysisSnapshot | None:
+        """Siste publiserte snapshot, eller None hvis ingen finnes eller det er for gammelt."""
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None or snapshot.age_seconds(now) > self.max_age_seconds:
+            return None
+        return snapshot
+
+    def wait_for_snapshot(self, timeout: float) -> AnalysisSnapshot | None:
+        """Vent inntil `timeout` sekunder på første snapshot (nyttig rett etter oppstart)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self.latest()
+            if snapshot is not None or time.monotonic() >= deadline:
+                return snapshot
+            time.sleep(0.05)
+
+    def stats(self) -> RefresherStats:
+        with self._lock:
+            return RefresherStats(
+                refreshes=self._refreshes,
+                failures=self._failures,
+                last_build_seconds=self._last_build_seconds,
+                last_refresh_at=self._last_refresh_at,
+                last_error=self._last_error,
+                running=self._thread is not None and self._thread.is_alive(),
+            )
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
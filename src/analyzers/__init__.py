@@ -1,15 +1,19 @@
 """Væranalyse-moduler."""
 
 from src.analyzers.base import AnalysisResult, BaseAnalyzer, RiskLevel
+from src.analyzers.features import FeatureFrame
 from src.analyzers.fresh_snow import FreshSnowAnalyzer
 from src.analyzers.slaps import SlapsAnalyzer
 from src.analyzers.slippery_road import SlipperyRoadAnalyzer
 from src.analyzers.snowdrift import SnowdriftAnalyzer
+from src.analyzers.stream import AnalyzerStream
 
 __all__ = [
     'AnalysisResult',
     'RiskLevel',
     'BaseAnalyzer',
+    'FeatureFrame',
+    'AnalyzerStream',
     'SnowdriftAnalyzer',
     'SlipperyRoadAnalyzer',
     'FreshSnowAnalyzer',
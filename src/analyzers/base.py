@@ -5,13 +5,19 @@ Definerer felles interface og hjelpefunksjoner for alle analysatorer.
 """
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, datetime
 from enum import Enum
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
+from src.analyzers.features import FeatureFrame, WindowFeatures, sort_by_time
+from src.analyzers.stream import AnalyzerStream, LatestFeatures
+
 
 class RiskLevel(Enum):
     """
@@ -112,6 +118,9 @@ class BaseAnalyzer(ABC):
     # Overstyr i subklasser
     REQUIRED_COLUMNS: list[str] = []
 
+    # Faste kolonner i `analyze_series`; subklasser legger til egne detaljkolonner.
+    SERIES_COLUMNS: tuple[str, ...] = ('reference_time', 'risk_level', 'scenario')
+
     @abstractmethod
     def analyze(self, df: pd.DataFrame) -> AnalysisResult:
         """
@@ -125,6 +134,110 @@ class BaseAnalyzer(ABC):
         """
         ...
 
+    def analyze_series(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vurder risiko for hvert tidspunkt i en hel tidsserie i én vektorisert pass.
+
+        Rad i tilsvarer `analyze(df.iloc[:i + 1])`: hvert tidspunkt er «nå», og
+        bare data frem til og med raden brukes (kausalt vindu). Forskjell fra
+        `analyze()`: sesong avgjøres av radens måned (`settings.WINTER_MONTHS`),
+        ikke dagens dato, slik at en hel sesong kan backtestes.
+
+        Args:
+            df: DataFrame med værdata sortert på reference_time
+
+        Returns:
+            DataFrame med reference_time, risk_level (RiskLevel.value), scenario
+            og analysatorens nøkkeldetaljer, én rad per tidspunkt
+        """
+        if df is None or df.empty or 'reference_time' not in df.columns:
+            return pd.DataFrame(columns=list(self.SERIES_COLUMNS))
+
+        df = sort_by_time(df).reset_index(drop=True)
+        features = FeatureFrame.of(df)
+
+        if not self._validate_data(df):
+            out = pd.DataFrame({
+                'risk_level': RiskLevel.UNKNOWN.value,
+                'scenario': "Data mangler",
+            }, index=df.index)
+        else:
+            out = self._classify_series(features)
+
+        out.insert(0, 'reference_time', features.times)
+        return out
+
+    @abstractmethod
+    def _classify_series(self, features: FeatureFrame) -> pd.DataFrame:
+        """
+        Vektorisert klassifisering per rad (brukes av `analyze_series`).
+
+        Returns:
+            DataFrame med risk_level (RiskLevel.value), scenario og detaljkolonner,
+            én rad per rad i `features`
+        """
+        ...
+
+    def stream(self, history_hours: float | None = None) -> AnalyzerStream:
+        """
+        Inkrementell analyse med konstant arbeid per ny observasjon.
+
+        `push(row)` gir samme resultat som `analyze()` på radene fra de siste
+        `history_hours` timene (default 48t) til og med raden.
+
+        Eksempel:
+            stream = SlipperyRoadAnalyzer().stream(history_hours=48)
+            for row in df.to_dict('records'):
+                result = stream.push(row)
+        """
+        return AnalyzerStream(self, history_hours)
+
+    def _analyze_stream(self, features: LatestFeatures) -> AnalysisResult:
+        """Vurder siste rad i en strøm. Vinduer leses fra strømmens aggregater via `_features`."""
+        with WindowFeatures.scope(features):
+            return self.analyze(features.df)
+
+    @staticmethod
+    def _features(df: pd.DataFrame) -> WindowFeatures:
+        """
+        Features for `df`: instansen bundet med `WindowFeatures.scope` for samme
+        objekt, ellers delte, memoiserte features (se `FeatureFrame.of`).
+        """
+        scoped = WindowFeatures.scoped(df)
+        return scoped if scoped is not None else FeatureFrame.of(df)
+
+    @classmethod
+    @contextmanager
+    def _feature_scope(cls, df: pd.DataFrame) -> Iterator[WindowFeatures]:
+        """
+        Slå opp features for `df` én gang og del dem med hjelpemetodene.
+
+        Brukes rundt vinteranalysen i `analyze()`, der `_calculate_snow_change`,
+        `_precip_total` o.l. ellers tar fingeravtrykk av hele rammen per kall.
+        """
+        with WindowFeatures.scope(cls._features(df)) as features:
+            yield features
+
+    @staticmethod
+    def _series_result(
+        rules: list[tuple[np.ndarray, RiskLevel, str]],
+        default: tuple[RiskLevel, str],
+        details: dict[str, Any],
+        index: pd.Index,
+    ) -> pd.DataFrame:
+        """
+        Bygg resultatramme fra ordnede regler (første treff vinner, som if-kjeden i `analyze`).
+        """
+        conditions = [cond for cond, _, _ in rules]
+        risk = np.select(conditions, [level.value for _, level, _ in rules], default=default[0].value)
+        scenario = np.select(conditions, [name for _, _, name in rules], default=default[1])
+        return pd.DataFrame({'risk_level': risk, 'scenario': scenario, **details}, index=index)
+
+    @staticmethod
+    def _chronological(df: pd.DataFrame) -> pd.DataFrame:
+        """`df` sortert på reference_time; rullerende vinduer og «siste måling» forutsetter tidsrekkefølge."""
+        return sort_by_time(df) if isinstance(df, pd.DataFrame) else df
+
     def _get_latest(self, df: pd.DataFrame) -> pd.Series:
         """Hent siste måling."""
         return df.iloc[-1]
@@ -222,17 +335,7 @@ class BaseAnalyzer(ABC):
         if df.empty:
             return 0.0
 
-        now = self._analysis_now(df)
-        cutoff = now - timedelta(hours=hours)
-        recent = df[pd.to_datetime(df['reference_time']) > cutoff].copy()
-        if len(recent) < 2:
-            return 0.0
-
-        snow = recent['surface_snow_thickness'].dropna()
-        if len(snow) < 2:
-            return 0.0
-
-        return float(snow.iloc[-1] - snow.iloc[0])
+        return float(self._features(df).snow_change(hours)[-1])
 
     def _precip_total(self, df: pd.DataFrame, hours: int = 12) -> float:
         """
@@ -246,14 +349,7 @@ class BaseAnalyzer(ABC):
         if df.empty:
             return 0.0
 
-        now = self._analysis_now(df)
-        cutoff = now - timedelta(hours=hours)
-        recent = df[pd.to_datetime(df['reference_time']) > cutoff].copy()
-        if recent.empty:
-            return 0.0
-
-        vals = pd.to_numeric(recent['precipitation_1h'], errors='coerce').fillna(0.0)
-        return float(vals.sum())
+        return float(self._features(df).precip_total(hours)[-1])
 
     @staticmethod
     def is_winter_season() -> bool:
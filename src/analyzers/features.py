@@ -0,0 +1,348 @@
+"""
+Felles feature-lag for analysatorene.
+
+`FeatureFrame` parser tidsaksen én gang og beregner rullerende vinduer
+(summer, endringer, tellinger, snitt) som hele arrays med searchsorted/cumsum.
+Resultatene memoiseres per (feature, vindu), og `FeatureFrame.of(df)` deler
+samme instans mellom analysatorene som ser samme DataFrame. Én dashboard-rerun
+gjør dermed O(n) arbeid per feature i stedet for en maskert kopi per kall.
+
+`WindowFeatures.scope(features)` binder en ferdig instans for én analyse, slik
+at hjelpemetodene (`BaseAnalyzer._features(df)` på samme objekt) slipper
+fingeravtrykket per kall. `WindowFeatures` er grensesnittet analysatorenes
+per-«nå»-hjelpere bruker; strømmodus (`src/analyzers/stream.py`) implementerer
+det over løpende aggregater i stedet for radindekser.
+
+Alle vinduer er kausale og slutter i raden selv: for rad i dekker de
+(t_i - N timer, t_i] (`inclusive=False`, som `> cutoff`) eller
+[t_i - N timer, t_i] (`inclusive=True`, som `>= cutoff`).
+
+Vinduene finnes med searchsorted, så radene må være sortert på
+reference_time (manglende tidspunkt ignoreres); `sort_by_time` sorterer en
+kopi stabilt, og `FeatureFrame` avviser usortert input med ValueError.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+TIME_COLUMN = 'reference_time'
+
+# Antall DataFrames `FeatureFrame.of` husker (dashboardet har én aktiv ramme)
+_REGISTRY_SIZE = 8
+
+# Vinduessummer rundes slik at cumsum-differanser og løpende summer
+# (`src/analyzers/stream.py`) gir samme verdi, og terskler ikke vipper på
+# flyttallsstøy (f.eks. 2.5 + 2.5 -> 4.999999999999999)
+SUM_DECIMALS = 9
+
+# Instans bundet med `WindowFeatures.scope` (per tråd/kontekst)
+_SCOPED: ContextVar[WindowFeatures | None] = ContextVar('scoped_features', default=None)
+
+
+def _window_count(mask: np.ndarray, start: np.ndarray) -> np.ndarray:
+    csum = np.concatenate([[0], np.cumsum(mask, dtype=np.int64)])
+    return csum[np.arange(len(mask)) + 1] - csum[start]
+
+
+def _window_sum(values: np.ndarray, start: np.ndarray) -> np.ndarray:
+    csum = np.concatenate([[0.0], np.cumsum(np.nan_to_num(values, nan=0.0))])
+    return np.round(csum[np.arange(len(values)) + 1] - csum[start], SUM_DECIMALS)
+
+
+def _is_chronological(times: pd.Series) -> bool:
+    return bool(times.dropna().is_monotonic_increasing)
+
+
+def sort_by_time(df: pd.DataFrame) -> pd.DataFrame:
+    """`df` sortert stabilt på reference_time (samme objekt når den allerede er sortert)."""
+    if len(df) < 2 or TIME_COLUMN not in df.columns:
+        return df
+    times = pd.to_datetime(df[TIME_COLUMN], utc=True, errors='coerce')
+    if _is_chronological(times):
+        return df
+    # NaT sorteres sist
+    return df.iloc[np.argsort(times.to_numpy(dtype='datetime64[ns]'), kind='stable')]
+
+
+class WindowFeatures(ABC):
+    """
+    Kolonner og kausale vindusfeatures for radene i `df`, som arrays.
+
+    Felles for `FeatureFrame` (hele serien) og strømmens `LatestFeatures`
+    (bare siste rad); analysatorene leser `[-1]` for «nå».
+    """
+
+    def __init__(self, df: pd.DataFrame, times: pd.Series):
+        self.df = df
+        self.times = times.reset_index(drop=True)
+        self._cache: dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    @contextmanager
+    def scope(features: WindowFeatures) -> Iterator[WindowFeatures]:
+        """
+        Bind `features` slik at `scoped(features.df)` returnerer dem uten oppslag.
+
+        Brukes rundt én analyse: hjelpemetodene som slår opp features for
+        samme DataFrame for hvert «nå» deler instansen.
+        """
+        token = _SCOPED.set(features)
+        try:
+            yield features
+        finally:
+            _SCOPED.reset(token)
+
+    @staticmethod
+    def scoped(df: pd.DataFrame) -> WindowFeatures | None:
+        """Instansen bundet med `scope` for nettopp dette `df`-objektet, ellers None."""
+        features = _SCOPED.get()
+        return features if features is not None and features.df is df else None
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def _memo(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+        value = compute()
+        with self._lock:
+            return self._cache.setdefault(key, value)
+
+    @property
+    def now(self) -> datetime:
+        """Siste tidspunkt i dataene som UTC-datetime (nå hvis det mangler)."""
+        if len(self) and not pd.isna(self.times.iloc[-1]):
+            return self.times.iloc[-1].to_pydatetime()
+        return datetime.now(UTC)
+
+    def has(self, column: str) -> bool:
+        return column in self.df.columns
+
+    def values(self, column: str) -> np.ndarray:
+        """Kolonne som float-array (NaN for manglende kolonne/verdier)."""
+        def compute() -> np.ndarray:
+            if column not in self.df.columns:
+                return np.full(len(self), np.nan)
+            return pd.to_numeric(self.df[column], errors='coerce').to_numpy(dtype=float)
+        return self._memo(('values', column), compute)
+
+    @abstractmethod
+    def window_rows(self, hours: float, inclusive: bool) -> np.ndarray:
+        """Antall rader i vinduet."""
+
+    @abstractmethod
+    def window_sum(self, column: str, hours: float, inclusive: bool = False) -> np.ndarray:
+        """Sum i vinduet (NaN teller som 0)."""
+
+    @abstractmethod
+    def window_valid(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        """Antall gyldige (ikke-NaN) verdier i vinduet."""
+
+    @abstractmethod
+    def window_count_where(
+        self, column: str, op: str, value: float, hours: float, inclusive: bool = True
+    ) -> np.ndarray:
+        """Antall verdier i vinduet som er `<= value` (op='le') eller `> value` (op='gt')."""
+
+    @abstractmethod
+    def window_has_pair(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        """True der vinduet har minst to rader og to gyldige verdier."""
+
+    @abstractmethod
+    def window_delta(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        """Siste minus første gyldige verdi i vinduet (0.0 uten to rader/verdier)."""
+
+    @abstractmethod
+    def window_mean(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        """Snitt av gyldige verdier i vinduet (NaN uten gyldige verdier)."""
+
+    @abstractmethod
+    def window_last(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        """Siste gyldige verdi i vinduet."""
+
+    # Navngitte features som analysatorene bruker
+
+    def snow_change(self, hours: int) -> np.ndarray:
+        """Snøendring (cm) siste N timer, som `BaseAnalyzer._calculate_snow_change`."""
+        if not self.has('surface_snow_thickness'):
+            return np.zeros(len(self))
+        return self.window_delta('surface_snow_thickness', hours, inclusive=False)
+
+    def precip_total(self, hours: int) -> np.ndarray:
+        """Akkumulert nedbør (mm) siste N timer, som `BaseAnalyzer._precip_total`."""
+        if not self.has('precipitation_1h'):
+            return np.zeros(len(self))
+        return self.window_sum('precipitation_1h', hours, inclusive=False)
+
+    def frost_hours(self, hours: float, max_temp: float = 0.0) -> np.ndarray:
+        """Antall målinger med lufttemperatur <= max_temp siste N timer."""
+        return self.window_count_where('air_temperature', 'le', max_temp, hours, inclusive=True)
+
+    def winter_mask(self) -> np.ndarray:
+        """True for rader i vintermånedene (`settings.WINTER_MONTHS`)."""
+        from src.config import settings
+        return self._memo('winter', lambda: self.times.dt.month.isin(settings.WINTER_MONTHS).to_numpy())
+
+
+class FeatureFrame(WindowFeatures):
+    """
+    Parset tidsakse og memoiserte rullerende features for én DataFrame.
+
+    Eksempel:
+        features = FeatureFrame.of(df)
+        snow_change_now = features.snow_change(6)[-1]
+    """
+
+    _registry: OrderedDict[int, FeatureFrame] = OrderedDict()
+    _registry_lock = threading.Lock()
+
+    def __init__(self, df: pd.DataFrame, fingerprint: tuple | None = None):
+        if TIME_COLUMN in df.columns:
+            times = pd.to_datetime(df[TIME_COLUMN], utc=True, errors='coerce')
+        else:
+            times = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns, UTC]')
+        if not _is_chronological(times):
+            raise ValueError(f"Rader må være sortert på {TIME_COLUMN} (se sort_by_time)")
+        super().__init__(df, times)
+        self._fingerprint = fingerprint
+        self._t = self.times.to_numpy(dtype='datetime64[ns]')
+
+    @classmethod
+    def of(cls, df: pd.DataFrame) -> FeatureFrame:
+        """
+        Delt instans for `df` (samme objekt og innhold gir samme FeatureFrame).
+
+        Er en FeatureFrame for `df` bundet med `scope`, returneres den direkte.
+        Ellers er fingeravtrykket form, kolonner og en hash av verdiene, så også
+        endringer på stedet (`df.loc[i, col] = ...`) gir nye features. Hashen
+        beregnes utenfor registerlåsen.
+        """
+        scoped = cls.scoped(df)
+        if isinstance(scoped, FeatureFrame):
+            return scoped
+
+        fingerprint = cls._fingerprint_of(df)
+        key = id(df)
+        with cls._registry_lock:
+            features = cls._registry.get(key)
+            if features is not None and features.df is df and features._fingerprint == fingerprint:
+                cls._registry.move_to_end(key)
+                return features
+
+        features = cls(df, fingerprint)
+        if fingerprint is None:
+            return features
+        with cls._registry_lock:
+            cls._registry[key] = features
+            cls._registry.move_to_end(key)
+            while len(cls._registry) > _REGISTRY_SIZE:
+                cls._registry.popitem(last=False)
+        return features
+
+    @staticmethod
+    def _fingerprint_of(df: pd.DataFrame) -> tuple | None:
+        try:
+            hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+        except TypeError:
+            # Uhashbare verdier (f.eks. lister): kan ikke verifiseres, memoiseres ikke
+            return None
+        digest = hashlib.blake2b(hashes.tobytes(), digest_size=16).digest()
+        return (len(df), tuple(df.columns), digest)
+
+    def window_start(self, hours: float, inclusive: bool) -> np.ndarray:
+        """Indeks til første rad i vinduet som slutter i hver rad."""
+        def compute() -> np.ndarray:
+            cutoff = self._t - np.timedelta64(int(hours * 3600), 's')
+            return np.searchsorted(self._t, cutoff, side='left' if inclusive else 'right')
+        return self._memo(('start', hours, inclusive), compute)
+
+    def window_rows(self, hours: float, inclusive: bool) -> np.ndarray:
+        """Antall rader i vinduet."""
+        return np.arange(len(self)) - self.window_start(hours, inclusive) + 1
+
+    def window_sum(self, column: str, hours: float, inclusive: bool = False) -> np.ndarray:
+        """Sum i vinduet (NaN teller som 0)."""
+        return self._memo(
+            ('sum', column, hours, inclusive),
+            lambda: _window_sum(self.values(column), self.window_start(hours, inclusive)),
+        )
+
+    def window_valid(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        """Antall gyldige (ikke-NaN) verdier i vinduet."""
+        return self._memo(
+            ('valid', column, hours, inclusive),
+            lambda: _window_count(~np.isnan(self.values(column)), self.window_start(hours, inclusive)),
+        )
+
+    def window_count_where(
+        self, column: str, op: str, value: float, hours: float, inclusive: bool = True
+    ) -> np.ndarray:
+        """Antall verdier i vinduet som er `<= value` (op='le') eller `> value` (op='gt')."""
+        def compute() -> np.ndarray:
+            vals = self.values(column)
+            if op == 'le':
+                mask = vals <= value
+            elif op == 'gt':
+                mask = vals > value
+            else:
+                raise ValueError(f"Ukjent operator: {op}")
+            return _window_count(mask, self.window_start(hours, inclusive))
+        return self._memo(('count', column, op, value, hours, inclusive), compute)
+
+    def window_bounds(self, column: str, hours: float, inclusive: bool) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Første og siste gyldige indeks i vinduet.
+
+        Bare meningsfulle der vinduet har minst én gyldig verdi.
+        """
+        def compute() -> tuple[np.ndarray, np.ndarray]:
+            vals = self.values(column)
+            n = len(vals)
+            idx = np.arange(n)
+            valid = ~np.isnan(vals)
+            last_valid = np.maximum.accumulate(np.where(valid, idx, -1))
+            next_valid = np.minimum.accumulate(np.where(valid, idx, n)[::-1])[::-1]
+            start = self.window_start(hours, inclusive)
+            first = np.minimum(next_valid[np.minimum(start, n - 1)], n - 1)
+            return first, np.maximum(last_valid, 0)
+        return self._memo(('bounds', column, hours, inclusive), compute)
+
+    def window_has_pair(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        """True der vinduet har minst to rader og to gyldige verdier."""
+        return (self.window_rows(hours, inclusive) >= 2) & (self.window_valid(column, hours, inclusive) >= 2)
+
+    def window_delta(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        """Siste minus første gyldige verdi i vinduet (0.0 uten to rader/verdier)."""
+        def compute() -> np.ndarray:
+            vals = self.values(column)
+            first, last = self.window_bounds(column, hours, inclusive)
+            return np.where(self.window_has_pair(column, hours, inclusive), vals[last] - vals[first], 0.0)
+        return self._memo(('delta', column, hours, inclusive), compute)
+
+    def window_mean(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        """Snitt av gyldige verdier i vinduet (NaN uten gyldige verdier)."""
+        def compute() -> np.ndarray:
+            n_valid = self.window_valid(column, hours, inclusive)
+            total = self.window_sum(column, hours, inclusive)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(n_valid > 0, total / n_valid, np.nan)
+        return self._memo(('mean', column, hours, inclusive), compute)
+
+    def window_last(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        """Siste gyldige verdi i vinduet."""
+        _, last = self.window_bounds(column, hours, inclusive)
+        return self.values(column)[last]
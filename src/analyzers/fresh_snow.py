@@ -5,9 +5,11 @@ Varsler brøytemannskaper og hytteeiere om nysnø som krever brøyting.
 Bruker duggpunkt som primær indikator for snø vs regn.
 """
 
+import numpy as np
 import pandas as pd
 
 from src.analyzers.base import AnalysisResult, BaseAnalyzer, RiskLevel
+from src.analyzers.features import FeatureFrame
 from src.config import settings
 
 
@@ -44,6 +46,7 @@ class FreshSnowAnalyzer(BaseAnalyzer):
         Returns:
             AnalysisResult med risikovurdering
         """
+        df = self._chronological(df)
         if not self._validate_data(df):
             return AnalysisResult(
                 risk_level=RiskLevel.UNKNOWN,
@@ -55,7 +58,8 @@ class FreshSnowAnalyzer(BaseAnalyzer):
         if not self.is_winter_season():
             return self._summer_result()
 
-        return self._winter_analysis(df)
+        with self._feature_scope(df):
+            return self._winter_analysis(df)
 
     def _summer_result(self) -> AnalysisResult:
         """Returner lav risiko for sommersesong."""
@@ -231,6 +235,79 @@ class FreshSnowAnalyzer(BaseAnalyzer):
 
     # _calculate_snow_change og _precip_total er arvet fra BaseAnalyzer
 
+    def _classify_series(self, features: FeatureFrame) -> pd.DataFrame:
+        """Vektorisert `_winter_analysis` (se `BaseAnalyzer.analyze_series`)."""
+        thresholds = settings.fresh_snow
+        window_hours = int(getattr(thresholds, "lookback_hours", 12))
+        precip_fallback_hours = 6
+
+        snow_now = np.nan_to_num(features.values('surface_snow_thickness'), nan=0.0)
+        temp = features.values('air_temperature')
+        surface_temp = features.values('surface_temperature')
+        dew_point = features.values('dew_point_temperature')
+        precip = np.nan_to_num(features.values('precipitation_1h'), nan=0.0)
+        wind = features.values('wind_speed')
+
+        snow_change = features.snow_change(window_hours)
+        precip_total = features.precip_total(window_hours)
+        precip_fallback_total = features.precip_total(precip_fallback_hours)
+
+        has_dew = ~np.isnan(dew_point)
+        has_temp = ~np.isnan(temp)
+        has_surface = ~np.isnan(surface_temp)
+
+        is_snow = (precip > 0) & np.where(
+            has_dew, dew_point < thresholds.dew_point_max, has_temp & (temp < thresholds.air_temp_max)
+        )
+        snow_favorable = (has_dew & (dew_point < thresholds.dew_point_max)) | (
+            ~has_dew & has_temp & (temp < thresholds.air_temp_max)
+        )
+        surface_cold_enough = ~has_surface | (surface_temp <= thresholds.surface_temp_max)
+        wet_snow = (
+            ((temp >= thresholds.wet_snow_air_temp_min) & (temp <= thresholds.wet_snow_air_temp_max))
+            | ((dew_point >= thresholds.wet_snow_dew_point_min) & (dew_point <= thresholds.wet_snow_dew_point_max))
+            | ((surface_temp >= -0.5) & (surface_temp <= 0.5))
+        )
+
+        snow_increase_warning = np.where(wet_snow, thresholds.snow_increase_warning, thresholds.snow_increase_warning_dry)
+        snow_increase_critical = np.where(wet_snow, thresholds.snow_increase_critical, thresholds.snow_increase_critical_dry)
+        precip_6h_warning = np.where(
+            wet_snow, thresholds.precipitation_6h_warning_mm, thresholds.precipitation_6h_warning_mm_dry
+        )
+        precip_6h_critical = np.where(
+            wet_snow, thresholds.precipitation_6h_critical_mm, thresholds.precipitation_6h_critical_mm_dry
+        )
+
+        windy = wind >= settings.snowdrift.wind_speed_gust_warning_gate
+        snow_sensor_suspect = windy & (snow_change < snow_increase_warning)
+        fallback_ok = snow_sensor_suspect & snow_favorable & surface_cold_enough
+        active_snowfall = (precip > thresholds.precipitation_min) & is_snow & surface_cold_enough
+        light_snow = is_snow & (precip >= thresholds.precipitation_min)
+        winter = features.winter_mask()
+
+        return self._series_result(
+            rules=[
+                (~winter, RiskLevel.LOW, "Sommer"),
+                (snow_change >= snow_increase_critical, RiskLevel.HIGH, "Kraftig nysnø"),
+                (snow_change >= snow_increase_warning, RiskLevel.MEDIUM, "Nysnø"),
+                (fallback_ok & (precip_fallback_total >= precip_6h_critical), RiskLevel.HIGH, "Kraftig nysnø (nedbør)"),
+                (fallback_ok & (precip_fallback_total >= precip_6h_warning), RiskLevel.MEDIUM, "Nysnø (nedbør)"),
+                (active_snowfall, RiskLevel.MEDIUM, "Snøfall pågår"),
+                (light_snow & surface_cold_enough, RiskLevel.LOW, "Lett snø"),
+                (light_snow, RiskLevel.LOW, "Mild bakke"),
+            ],
+            default=(RiskLevel.LOW, "Stabilt"),
+            details={
+                "snow_depth_cm": snow_now,
+                "snow_change_cm": snow_change,
+                "precip_total_mm": precip_total,
+                "precip_fallback_total_mm": precip_fallback_total,
+                "is_snow": is_snow,
+                "wet_snow": wet_snow,
+            },
+            index=features.df.index,
+        )
+
     def _is_wet_snow(
         self,
         *,
@@ -7,11 +7,11 @@ Oppstår når snø smelter (varmegrader) eller regn faller på snø.
 VIKTIG: Slaps er IKKE is. Hvis slaps fryser, blir det is (→ glatte veier).
 """
 
-from datetime import timedelta
-
+import numpy as np
 import pandas as pd
 
 from src.analyzers.base import AnalysisResult, BaseAnalyzer, RiskLevel
+from src.analyzers.features import FeatureFrame, WindowFeatures
 from src.config import settings
 
 
@@ -41,6 +41,7 @@ class SlapsAnalyzer(BaseAnalyzer):
         Returns:
             AnalysisResult med risikovurdering
         """
+        df = self._chronological(df)
         if not self._validate_data(df):
             return AnalysisResult(
                 risk_level=RiskLevel.UNKNOWN,
@@ -52,7 +53,8 @@ class SlapsAnalyzer(BaseAnalyzer):
         if not self.is_winter_season():
             return self._summer_result()
 
-        return self._winter_analysis(df)
+        with self._feature_scope(df):
+            return self._winter_analysis(df)
 
     def _summer_result(self) -> AnalysisResult:
         """Returner lav risiko for sommersesong."""
@@ -232,6 +234,68 @@ class SlapsAnalyzer(BaseAnalyzer):
         )
 
     # _calculate_snow_change og _precip_total er arvet fra BaseAnalyzer
+
+    def _classify_series(self, features: FeatureFrame) -> pd.DataFrame:
+        """Vektorisert `_winter_analysis` (se `BaseAnalyzer.analyze_series`)."""
+        thresholds = settings.slaps
+        snow_change_hours = int(getattr(thresholds, "snow_change_hours", 6))
+        precip_hours = int(getattr(thresholds, "precipitation_accum_hours", 12))
+
+        temp = features.values('air_temperature')
+        snow = np.nan_to_num(features.values('surface_snow_thickness'), nan=0.0)
+        dew_point = features.values('dew_point_temperature')
+
+        snow_change = features.snow_change(snow_change_hours)
+        precip_total = features.precip_total(precip_hours)
+
+        precip_scale = max(precip_hours, 1) / 12.0
+        precip_accum_min = thresholds.precipitation_12h_min * precip_scale
+        precip_accum_heavy = thresholds.precipitation_12h_heavy * precip_scale
+
+        is_rain = np.where(
+            ~np.isnan(dew_point),
+            dew_point >= settings.fresh_snow.dew_point_max,
+            temp >= settings.fresh_snow.air_temp_max,
+        )
+        rain_on_snow = is_rain & (precip_total >= precip_accum_min)
+        melting = snow_change < thresholds.snow_melt_change_threshold_cm
+        cooling = self._series_temperature_falling(features)
+        winter = features.winter_mask()
+
+        return self._series_result(
+            rules=[
+                (~winter, RiskLevel.LOW, "Sommer"),
+                (np.isnan(temp), RiskLevel.UNKNOWN, "Data mangler"),
+                (snow < thresholds.snow_depth_min, RiskLevel.LOW, "Lite snø"),
+                (temp < thresholds.temp_min, RiskLevel.LOW, "Frost"),
+                ((temp > thresholds.temp_max) & melting, RiskLevel.MEDIUM, "Smelting"),
+                (temp > thresholds.temp_max, RiskLevel.LOW, "Varmt"),
+                (rain_on_snow & melting, RiskLevel.HIGH, "Kraftig slaps"),
+                (rain_on_snow & (precip_total >= precip_accum_heavy), RiskLevel.HIGH, "Regn på snø"),
+                (rain_on_snow, RiskLevel.MEDIUM, "Regn på snø"),
+                (melting, RiskLevel.MEDIUM, "Smelting"),
+                (cooling, RiskLevel.MEDIUM, "Frysefare"),
+            ],
+            default=(RiskLevel.LOW, "Potensielt slaps"),
+            details={
+                "temperature": temp,
+                "snow_depth_cm": snow,
+                "snow_change_cm": snow_change,
+                "precipitation_total_mm": precip_total,
+                "is_rain": is_rain,
+            },
+            index=features.df.index,
+        )
+
+    def _series_temperature_falling(self, features: WindowFeatures, hours: int = 3) -> np.ndarray:
+        """Vektorisert `_is_temperature_falling` for alle rader."""
+        if not features.has('air_temperature'):
+            return np.zeros(len(features), dtype=bool)
+        return features.window_has_pair('air_temperature', hours, True) & (
+            features.window_last('air_temperature', hours, True)
+            < features.window_mean('air_temperature', hours, True)
+        )
+
     def _is_precipitation_rain(
         self,
         temp: float | None,
@@ -261,19 +325,8 @@ class SlapsAnalyzer(BaseAnalyzer):
 
     def _is_temperature_falling(self, df: pd.DataFrame, hours: int = 3) -> bool:
         """Sjekk om temperatur synker (basert på dataens tidsakse)."""
-        if 'air_temperature' not in df.columns:
-            return False
-
-        now = self._analysis_now(df)
-        cutoff = now - timedelta(hours=hours)
-
-        recent = df[pd.to_datetime(df['reference_time']) >= cutoff].copy()
-        if len(recent) < 2:
-            return False
-
-        temps = recent['air_temperature'].dropna()
-        if len(temps) < 2:
+        if 'air_temperature' not in df.columns or df.empty:
             return False
 
-        # Synkende hvis siste temp er lavere enn snitt
-        return bool(temps.iloc[-1] < temps.mean())
+        # Synkende hvis siste temp er lavere enn snitt i vinduet
+        return bool(self._series_temperature_falling(self._features(df), hours)[-1])
@@ -7,11 +7,11 @@ Fokuserer på:
 - Rimfrost (duggpunkt nær lufttemperatur)
 """
 
-from datetime import timedelta
-
+import numpy as np
 import pandas as pd
 
 from src.analyzers.base import AnalysisResult, BaseAnalyzer, RiskLevel
+from src.analyzers.features import FeatureFrame, WindowFeatures
 from src.config import settings
 
 # Forbehold som vises ved alle MEDIUM/HIGH varsler fra SlipperyRoadAnalyzer.
@@ -50,6 +50,7 @@ class SlipperyRoadAnalyzer(BaseAnalyzer):
         Returns:
             AnalysisResult med risikovurdering
         """
+        df = self._chronological(df)
         if not self._validate_data(df):
             return AnalysisResult(
                 risk_level=RiskLevel.UNKNOWN,
@@ -80,16 +81,17 @@ class SlipperyRoadAnalyzer(BaseAnalyzer):
             return self._summer_analysis(temp, precip, surface_temp, dew_point)
 
         # Vintersesong = full analyse
-        return self._winter_analysis(
-            df=df,
-            temp=temp,
-            snow=snow,
-            precip=precip,
-            surface_temp=surface_temp,
-            dew_point=dew_point,
-            humidity=humidity,
-            wind=wind
-        )
+        with self._feature_scope(df):
+            return self._winter_analysis(
+                df=df,
+                temp=temp,
+                snow=snow,
+                precip=precip,
+                surface_temp=surface_temp,
+                dew_point=dew_point,
+                humidity=humidity,
+                wind=wind
+            )
 
     def _summer_analysis(
         self,
@@ -398,40 +400,145 @@ class SlipperyRoadAnalyzer(BaseAnalyzer):
             details=details
         )
 
-    def _recent_min_leq(self, df: pd.DataFrame, *, column: str, hours: int, max_value: float) -> bool:
-        """True hvis minimum i `column` siste `hours` er <= `max_value` (basert på dataens tidsakse)."""
-        if df.empty or 'reference_time' not in df.columns or column not in df.columns:
-            return False
+    def _classify_series(self, features: FeatureFrame) -> pd.DataFrame:
+        """Vektorisert `analyze` (se `BaseAnalyzer.analyze_series`)."""
+        thresholds = settings.slippery
+        snow_thresholds = settings.fresh_snow
+
+        temp = features.values('air_temperature')
+        snow = np.nan_to_num(features.values('surface_snow_thickness'), nan=0.0)
+        precip = np.nan_to_num(features.values('precipitation_1h'), nan=0.0)
+        surface_temp = features.values('surface_temperature')
+        dew_point = features.values('dew_point_temperature')
+        humidity = features.values('relative_humidity')
+        wind = features.values('wind_speed')
+
+        has_dew = ~np.isnan(dew_point)
+        has_surface = ~np.isnan(surface_temp)
+        winter = features.winter_mask()
+
+        # Sommer: bare rimfrost og regn
+        summer_frost = (
+            has_surface & has_dew
+            & (surface_temp <= thresholds.surface_temp_freeze)
+            & (np.abs(temp - dew_point) < thresholds.rimfrost_dewpoint_delta_max)
+        )
 
-        now = self._analysis_now(df)
-        cutoff = now - timedelta(hours=hours)
-        recent = df[df['reference_time'] >= cutoff].copy()
-        if recent.empty:
-            return False
+        rain_falling_now = (precip >= thresholds.rain_threshold_mm) & (
+            (has_dew & (dew_point >= snow_thresholds.dew_point_max))
+            | (~has_dew & (temp >= snow_thresholds.air_temp_max))
+        )
+        recent_snow = self._series_recent_snow(features)
 
-        vals = pd.to_numeric(recent[column], errors='coerce').dropna()
-        if vals.empty:
-            return False
+        mild_weather = (temp >= thresholds.mild_temp_min) & (temp <= thresholds.mild_temp_max)
+        existing_snow = snow >= thresholds.snow_depth_min_cm
+        near_freezing = (temp >= thresholds.near_freezing_temp_min) & (temp <= thresholds.near_freezing_temp_max)
+        precip_12h = features.precip_total(12)
+
+        precip_is_liquid = ~has_dew | (dew_point >= snow_thresholds.dew_point_max)
+        rain_now = (precip >= thresholds.rain_threshold_mm) & precip_is_liquid
+        freezing_precip_warning = (precip >= thresholds.freezing_precip_warning_mm) & precip_is_liquid
+        freezing_precip_critical = (precip >= thresholds.freezing_precip_critical_mm) & precip_is_liquid
+        liquid_precip_12h = (precip_12h >= thresholds.hidden_freeze_precip_12h_min) & precip_is_liquid
+
+        ice_risk = has_surface & (surface_temp <= thresholds.surface_temp_freeze)
+        hidden_freeze = (
+            has_surface
+            & (temp >= thresholds.hidden_freeze_air_min)
+            & (temp <= thresholds.hidden_freeze_air_max)
+            & (surface_temp <= thresholds.hidden_freeze_surface_max)
+        )
+        frost_risk = (
+            summer_frost
+            & (np.isnan(humidity) | (humidity >= thresholds.rimfrost_humidity_min))
+            & (np.isnan(wind) | (wind <= thresholds.rimfrost_wind_max))
+        )
+        temp_rising = self._series_temp_rise(features)
+
+        rain_on_snow = mild_weather & existing_snow & rain_now
+        recent_hours = thresholds.rain_on_snow_recent_cold_hours
+        cold_context = (
+            (has_surface & (surface_temp <= thresholds.rain_on_snow_surface_temp_max_c))
+            | self._series_recent_min_leq(
+                features, column='surface_temperature', hours=recent_hours,
+                max_value=thresholds.rain_on_snow_recent_surface_temp_freeze_max_c,
+            )
+            | self._series_recent_min_leq(
+                features, column='air_temperature', hours=recent_hours,
+                max_value=thresholds.rain_on_snow_recent_air_temp_freeze_max_c,
+            )
+        )
 
-        return float(vals.min()) <= float(max_value)
+        return self._series_result(
+            rules=[
+                (np.isnan(temp), RiskLevel.UNKNOWN, "Data mangler"),
+                (~winter & summer_frost, RiskLevel.MEDIUM, "Rimfrost"),
+                (~winter & (precip >= thresholds.summer_rain_threshold_mm_per_h), RiskLevel.LOW, "Sommerregn"),
+                (~winter, RiskLevel.LOW, "Sommer"),
+                (recent_snow & ~rain_falling_now, RiskLevel.LOW, "Snøfall"),
+                (hidden_freeze & rain_now, RiskLevel.HIGH, "Skjult frysefare"),
+                (hidden_freeze & liquid_precip_12h, RiskLevel.MEDIUM, "Skjult frysefare"),
+                (hidden_freeze, RiskLevel.LOW, "Kald bakke uten regn"),
+                (rain_on_snow & ~cold_context, RiskLevel.MEDIUM, "Regn på snø (uten kald kontekst)"),
+                (rain_on_snow & recent_snow, RiskLevel.MEDIUM, "Regn på snø"),
+                (rain_on_snow, RiskLevel.HIGH, "Regn på snø"),
+                (ice_risk & freezing_precip_critical & near_freezing, RiskLevel.HIGH, "Underkjølt regn / frysing"),
+                (ice_risk & freezing_precip_warning & near_freezing, RiskLevel.MEDIUM, "Lett frysing"),
+                (ice_risk & existing_snow, RiskLevel.LOW, "Tørr vinterføre"),
+                (frost_risk, RiskLevel.LOW, "Rimfrost"),
+                (mild_weather & existing_snow & temp_rising, RiskLevel.LOW, "Snøsmelting"),
+                ((temp < thresholds.stable_cold_air_temp_max) & existing_snow, RiskLevel.LOW, "Stabilt kaldt"),
+            ],
+            default=(RiskLevel.LOW, "Normal"),
+            details={
+                "temperature": temp,
+                "snow_depth": snow,
+                "surface_temp": surface_temp,
+                "precipitation_12h": precip_12h,
+                "rain_now": rain_now,
+            },
+            index=features.df.index,
+        )
 
-    def _check_recent_snow(self, df: pd.DataFrame) -> bool:
-        """Sjekk om snødybden har økt nylig (naturlig strøing)."""
-        if 'surface_snow_thickness' not in df.columns:
-            return False
+    def _series_recent_min_leq(
+        self, features: WindowFeatures, *, column: str, hours: int, max_value: float
+    ) -> np.ndarray:
+        """Vektorisert `_recent_min_leq` for alle rader."""
+        if not features.has(column):
+            return np.zeros(len(features), dtype=bool)
+        return features.window_count_where(column, 'le', max_value, hours, inclusive=True) > 0
+
+    def _series_recent_snow(self, features: WindowFeatures) -> np.ndarray:
+        """Vektorisert `_check_recent_snow` for alle rader."""
+        if not features.has('surface_snow_thickness'):
+            return np.zeros(len(features), dtype=bool)
+        hours = settings.slippery.recent_snow_relief_hours
+        return features.window_has_pair('surface_snow_thickness', hours, True) & (
+            features.window_delta('surface_snow_thickness', hours, True) >= settings.slippery.recent_snow_relief_cm
+        )
 
-        now = self._analysis_now(df)
-        window = settings.slippery.recent_snow_relief_hours
-        sample = df[df['reference_time'] >= (now - timedelta(hours=window))]
+    def _series_temp_rise(self, features: WindowFeatures) -> np.ndarray:
+        """Vektorisert `_check_temp_rise` for alle rader."""
+        if not features.has('air_temperature'):
+            return np.zeros(len(features), dtype=bool)
+        # Økning på minst 1°C siste 6 timer
+        return features.window_has_pair('air_temperature', 6, True) & (
+            features.window_delta('air_temperature', 6, True) >= settings.slippery.temp_rise_threshold
+        )
 
-        if len(sample) < 2:
+    def _recent_min_leq(self, df: pd.DataFrame, *, column: str, hours: int, max_value: float) -> bool:
+        """True hvis minimum i `column` siste `hours` er <= `max_value` (basert på dataens tidsakse)."""
+        if df.empty or 'reference_time' not in df.columns or column not in df.columns:
             return False
+        return bool(self._series_recent_min_leq(
+            self._features(df), column=column, hours=hours, max_value=max_value
+        )[-1])
 
-        snow = sample['surface_snow_thickness'].dropna()
-        if len(snow) < 2:
+    def _check_recent_snow(self, df: pd.DataFrame) -> bool:
+        """Sjekk om snødybden har økt nylig (naturlig strøing)."""
+        if 'surface_snow_thickness' not in df.columns or df.empty:
             return False
-
-        return bool((snow.iloc[-1] - snow.iloc[0]) >= settings.slippery.recent_snow_relief_cm)
+        return bool(self._series_recent_snow(self._features(df))[-1])
 
     def _recent_snow_absent(self, df: pd.DataFrame) -> bool:
         """True hvis ingen fersk snø (øker sensitivitet for regn på snø)."""
@@ -439,20 +546,8 @@ class SlipperyRoadAnalyzer(BaseAnalyzer):
 
     def _check_temp_rise(self, df: pd.DataFrame) -> bool:
         """Sjekk om temperaturen stiger markant."""
-        if 'air_temperature' not in df.columns:
-            return False
-
-        now = self._analysis_now(df)
-        last_6h = df[df['reference_time'] >= (now - timedelta(hours=6))]
-
-        if len(last_6h) < 2:
-            return False
-
-        temps = last_6h['air_temperature'].dropna()
-        if len(temps) < 2:
+        if 'air_temperature' not in df.columns or df.empty:
             return False
-
-        # Økning på minst 1°C siste 6 timer
-        return bool((temps.iloc[-1] - temps.iloc[0]) >= settings.slippery.temp_rise_threshold)
+        return bool(self._series_temp_rise(self._features(df))[-1])
 
     # _analysis_now, _calculate_snow_change og _precip_total er arvet fra BaseAnalyzer
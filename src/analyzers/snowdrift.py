@@ -6,12 +6,17 @@ Vindkjøling har 73.1% viktighet i modellen.
 """
 from __future__ import annotations
 
+import math
+from collections.abc import Mapping
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 from src.analyzers.base import AnalysisResult, BaseAnalyzer, RiskLevel
+from src.analyzers.features import FeatureFrame
+from src.analyzers.stream import LatestFeatures
 from src.config import settings
 
 
@@ -42,6 +47,7 @@ class SnowdriftAnalyzer(BaseAnalyzer):
         Returns:
             AnalysisResult med risikovurdering
         """
+        df = self._chronological(df)
         if not self._validate_data(df):
             return AnalysisResult(
                 risk_level=RiskLevel.UNKNOWN,
@@ -86,31 +92,32 @@ class SnowdriftAnalyzer(BaseAnalyzer):
         loose_snow = self._check_loose_snow(window)
         snow_change = self._snow_change_over_window(window)
 
-        best_result: AnalysisResult | None = None
-        best_priority = -1
+        # Beste rad: høyest risiko, deretter høyest (avrundet) vindkast, første ved likhet.
+        # Rangeres vektorisert som i `_classify_series`; bare vinnerraden bygges som resultat.
+        def column(name: str) -> np.ndarray:
+            if name not in window.columns:
+                return np.full(len(window), np.nan)
+            return pd.to_numeric(window[name], errors='coerce').to_numpy(dtype=float)
+
+        _, key_loose, key_no_loose = self._series_row_keys(
+            column('air_temperature'),
+            column('wind_speed'),
+            column('max_wind_gust'),
+            np.nan_to_num(column('surface_snow_thickness'), nan=0.0),
+            window.index,
+        )
+        key = key_loose if loose_snow["available"] else key_no_loose
 
-        for _, row in window.iterrows():
-            snapshot = self._evaluate_snapshot(
-                row=row,
+        best_result: AnalysisResult | None = None
+        if len(key) and np.isfinite(key.max()):
+            best_result = self._evaluate_snapshot(
+                row=window.iloc[int(np.argmax(key))],
                 loose_snow=loose_snow,
                 snow_change=snow_change,
                 thresholds=thresholds,
                 lookback_hours=lookback_hours
             )
 
-            if snapshot is None:
-                continue
-
-            priority = self._risk_priority(snapshot.risk_level)
-            if priority > best_priority:
-                best_priority = priority
-                best_result = snapshot
-            elif priority == best_priority and best_result is not None:
-                current_gust = snapshot.details.get('wind_gust') or 0
-                best_gust = best_result.details.get('wind_gust') or 0
-                if current_gust > best_gust:
-                    best_result = snapshot
-
         if best_result is not None:
             return best_result
 
@@ -120,6 +127,230 @@ class SnowdriftAnalyzer(BaseAnalyzer):
             scenario="Data mangler"
         )
 
+    def _analyze_stream(self, features: LatestFeatures) -> AnalysisResult:
+        """
+        Strømversjon av `analyze` for siste rad.
+
+        Som `_winter_analysis`, men beste rad i vinduet hentes fra en monoton
+        kø (nøkkel: risikoprioritet, deretter vindkast), og løssnø/snøendring
+        fra strømmens løpende aggregater i stedet for å scanne vinduet.
+        """
+        df = features.df
+        if not self._validate_data(df):
+            return self.analyze(df)
+        if not self.is_winter_season():
+            return self._summer_analysis(df)
+
+        thresholds = settings.snowdrift
+        interval = thresholds.interval_hours
+        loose_hours = min(interval, thresholds.loose_snow_lookback_hours)
+        loose_snow = self._loose_snow_state(
+            n_valid=int(features.window_valid('air_temperature', loose_hours, inclusive=True)[0]),
+            mild_hours=int(features.window_count_where(
+                'air_temperature', 'gt', thresholds.loose_snow_mild_temp_min_c, loose_hours, inclusive=True
+            )[0]),
+            continuous_frost=int(features.window_count_where(
+                'air_temperature', 'gt', thresholds.loose_snow_continuous_frost_temp_max_c, loose_hours, inclusive=True
+            )[0]) == 0,
+        )
+
+        snow_change = 0.0
+        bounds = features.window_first_last('surface_snow_thickness', interval, inclusive=True)
+        if bounds is not None:
+            t_first, first, t_last, last = bounds
+            snow_change = self._snow_change_rate(float(last - first), (t_last - t_first).total_seconds() / 3600.0)
+
+        available = bool(loose_snow["available"])
+        best = features.stream.window_max(
+            f"snowdrift_best_{'loose' if available else 'no_loose'}",
+            interval,
+            True,
+            lambda row: self._stream_row_key(row, loose_available=available),
+        )
+        result = None
+        if best is not None:
+            result = self._evaluate_snapshot(
+                row=pd.Series(best),
+                loose_snow=loose_snow,
+                snow_change=snow_change,
+                thresholds=thresholds,
+                lookback_hours=interval
+            )
+        if result is not None:
+            return result
+
+        return AnalysisResult(
+            risk_level=RiskLevel.UNKNOWN,
+            message="Mangler temperatur eller vinddata",
+            scenario="Data mangler"
+        )
+
+    def _stream_row_key(self, row: Mapping[str, Any], *, loose_available: bool) -> float:
+        """Rangering som i `_winter_analysis`: prioritet, deretter avrundet vindkast (-inf: ugyldig rad)."""
+        thresholds = settings.snowdrift
+        snapshot = self._evaluate_snapshot(
+            row=pd.Series(row),
+            loose_snow={"available": loose_available, "reason": ""},
+            snow_change=0.0,
+            thresholds=thresholds,
+            lookback_hours=thresholds.interval_hours
+        )
+        if snapshot is None:
+            return -math.inf
+        gust = snapshot.details.get('wind_gust') or 0
+        return self._risk_priority(snapshot.risk_level) * 1000.0 + gust
+
+    def _classify_series(self, features: FeatureFrame) -> pd.DataFrame:
+        """
+        Vektorisert `analyze` (se `BaseAnalyzer.analyze_series`).
+
+        Som i `_winter_analysis` vinner raden i vinduet med høyest risiko (ved
+        likt nivå: høyest vindkast, første rad ved likhet). Risikoen til én rad
+        avhenger bare av radens egne verdier og om løssnø er tilgjengelig i
+        vinduet, så hver rad klassifiseres én gang og vinduene scannes etterpå.
+        """
+        thresholds = settings.snowdrift
+
+        temp = features.values('air_temperature')
+        wind = features.values('wind_speed')
+        gust = features.values('max_wind_gust')
+        snow = np.nan_to_num(features.values('surface_snow_thickness'), nan=0.0)
+        wind_chill = self._series_wind_chill(temp, wind)
+        valid = ~np.isnan(temp) & ~np.isnan(wind)
+        row_result, key_loose, key_no_loose = self._series_row_keys(temp, wind, gust, snow, features.df.index)
+
+        # Vinduer: analysevindu [t - interval, t] og løssnø-vindu innenfor det
+        interval = thresholds.interval_hours
+        start = features.window_start(interval, inclusive=True)
+        loose_hours = min(interval, thresholds.loose_snow_lookback_hours)
+        loose_n = features.window_valid('air_temperature', loose_hours, inclusive=True)
+        mild_hours = features.window_count_where(
+            'air_temperature', 'gt', thresholds.loose_snow_mild_temp_min_c, loose_hours, inclusive=True
+        )
+        not_frost = features.window_count_where(
+            'air_temperature', 'gt', thresholds.loose_snow_continuous_frost_temp_max_c, loose_hours, inclusive=True
+        )
+        loose_available = ~((loose_n > 0) & (not_frost > 0) & (mild_hours >= thresholds.loose_snow_mild_hours_min))
+
+        # Beste rad i vinduet: høyest prioritet, deretter høyest vindkast, første ved likhet.
+        best_loose = self._window_argmax(key_loose, start)
+        best_no_loose = self._window_argmax(key_no_loose, start)
+        best = np.where(loose_available, best_loose, best_no_loose)
+        # Minst én gyldig rad i vinduet: siste gyldige rad ligger innenfor det
+        any_valid = np.maximum.accumulate(np.where(valid, np.arange(len(valid)), -1)) >= start
+
+        best_level = row_result['risk_level'].to_numpy()[best]
+        best_scenario = row_result['scenario'].to_numpy()[best]
+        risk = np.where(loose_available, best_level, RiskLevel.LOW.value)
+        scenario = np.where(loose_available, best_scenario, "Ingen løssnø")
+        risk = np.where(any_valid, risk, RiskLevel.UNKNOWN.value)
+        scenario = np.where(any_valid, scenario, "Data mangler")
+
+        winter = features.winter_mask()
+        summer_snow = snow >= thresholds.summer_snow_depth_min_cm
+        risk = np.where(winter, risk, np.where(summer_snow, RiskLevel.MEDIUM.value, RiskLevel.LOW.value))
+        scenario = np.where(winter, scenario, np.where(summer_snow, "Sommer-snø", "Sommer"))
+
+        return pd.DataFrame({
+            'risk_level': risk,
+            'scenario': scenario,
+            'temperature': temp[best],
+            'wind_speed': wind[best],
+            'wind_gust': gust[best],
+            'wind_chill': wind_chill[best],
+            'snow_depth': snow[best],
+            'snow_change': self._series_snow_change_rate(features, interval),
+            'loose_snow_available': loose_available,
+        }, index=features.df.index)
+
+    def _series_row_keys(
+        self, temp: np.ndarray, wind: np.ndarray, gust: np.ndarray, snow: np.ndarray, index: pd.Index
+    ) -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+        """
+        Risiko per rad (gitt løssnø) og rangeringsnøkler for å velge beste rad.
+
+        Risikoen til én rad avhenger bare av radens egne verdier og om løssnø er
+        tilgjengelig. Nøkkelen med løssnø er prioritet × 1000 + vindkast avrundet
+        som i details; uten løssnø er alle rader LOW, så bare vindkast avgjør.
+        Rader uten temperatur eller vind får -inf.
+        """
+        thresholds = settings.snowdrift
+        wind_chill = self._series_wind_chill(temp, wind)
+        valid = ~np.isnan(temp) & ~np.isnan(wind)
+
+        # Samme rekkefølge som _classify_risk
+        has_gust = ~np.isnan(gust)
+        frost = temp <= thresholds.temperature_max
+        traditional = (wind >= thresholds.wind_speed_warning) & frost
+        row_rules = [
+            (snow < thresholds.snow_depth_min_cm, RiskLevel.LOW, "Lite snø"),
+            (
+                has_gust & (wind >= thresholds.wind_speed_warning)
+                & (gust >= thresholds.wind_gust_critical) & frost,
+                RiskLevel.HIGH, "Vindkast-kritisk",
+            ),
+            (
+                has_gust & (wind >= thresholds.wind_speed_gust_warning_gate)
+                & (gust >= thresholds.wind_gust_warning) & frost,
+                RiskLevel.MEDIUM, "Vindkast-advarsel",
+            ),
+            (
+                (wind_chill <= thresholds.wind_chill_critical) & (wind >= thresholds.wind_speed_critical),
+                RiskLevel.HIGH, "ML-kritisk",
+            ),
+            (
+                (wind_chill <= thresholds.wind_chill_warning) & (wind >= thresholds.wind_speed_warning),
+                RiskLevel.MEDIUM, "ML-advarsel",
+            ),
+            (traditional & (wind >= thresholds.wind_speed_critical), RiskLevel.HIGH, "Tradisjonell-kritisk"),
+            (traditional, RiskLevel.MEDIUM, "Tradisjonell-moderat"),
+        ]
+        row_result = self._series_result(row_rules, (RiskLevel.LOW, "Normal"), {}, index)
+        row_priority = row_result['risk_level'].map(
+            {level.value: self._risk_priority(level) for level in RiskLevel}
+        ).to_numpy()
+
+        gust_key = np.where(has_gust, np.round(gust, 1), 0.0)
+        key_loose = np.where(valid, row_priority * 1000.0 + gust_key, -np.inf)
+        key_no_loose = np.where(valid, gust_key, -np.inf)
+        return row_result, key_loose, key_no_loose
+
+    @staticmethod
+    def _window_argmax(key: np.ndarray, start: np.ndarray) -> np.ndarray:
+        """Indeks til første maksimum av `key` i [start_i, i] for hver rad."""
+        n = len(key)
+        idx = np.arange(n)
+        best = start.copy()
+        width = int((idx - start).max()) + 1 if n else 0
+        for offset in range(1, width):
+            cand = start + offset
+            ok = cand <= idx
+            cand = np.minimum(cand, n - 1)
+            better = ok & (key[cand] > key[best])
+            best = np.where(better, cand, best)
+        return best
+
+    def _series_snow_change_rate(self, features: FeatureFrame, hours: float) -> np.ndarray:
+        """Vektorisert `_snow_change_over_window` (cm/h) for vinduet som slutter i hver rad."""
+        column = 'surface_snow_thickness'
+        first, last = features.window_bounds(column, hours, inclusive=True)
+        delta = features.window_delta(column, hours, inclusive=True)
+
+        t = features.times.to_numpy(dtype='datetime64[ns]')
+        elapsed_hours = (t[last] - t[first]) / np.timedelta64(1, 'h')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.where(elapsed_hours > 0, delta / elapsed_hours, delta)
+        return np.where(features.window_has_pair(column, hours, inclusive=True), rate, 0.0)
+
+    @staticmethod
+    def _series_wind_chill(temp: np.ndarray, wind: np.ndarray) -> np.ndarray:
+        """Vektorisert `calculate_wind_chill`."""
+        viz = settings.viz
+        wind_kmh_pow = np.power(np.maximum(wind, 0.0) * 3.6, 0.16)
+        chill = 13.12 + 0.6215 * temp - 11.37 * wind_kmh_pow + 0.3965 * temp * wind_kmh_pow
+        outside = (temp >= viz.wind_chill_valid_temp_max_c) | (wind < viz.wind_chill_valid_wind_min_ms)
+        return np.where(outside, temp, chill)
+
     def _select_recent_window(self, df: pd.DataFrame, hours: int) -> pd.DataFrame:
         """Returner data for de siste N timene, eller hele datasettet hvis kortere."""
         if 'reference_time' not in df.columns or df.empty:
@@ -163,12 +394,18 @@ class SnowdriftAnalyzer(BaseAnalyzer):
             return {"available": True, "reason": "Usikker - mangler temperaturdata"}
 
         temps = last_24h['air_temperature'].dropna()
-        if len(temps) == 0:
-            return {"available": True, "reason": "Usikker - mangler temperaturdata"}
+        return self._loose_snow_state(
+            n_valid=len(temps),
+            mild_hours=int((temps > thresholds.loose_snow_mild_temp_min_c).sum()),
+            continuous_frost=bool((temps <= thresholds.loose_snow_continuous_frost_temp_max_c).all()),
+        )
 
-        # Sjekk for mildvær
-        mild_hours = (temps > thresholds.loose_snow_mild_temp_min_c).sum()
-        continuous_frost = (temps <= thresholds.loose_snow_continuous_frost_temp_max_c).all()
+    @staticmethod
+    def _loose_snow_state(n_valid: int, mild_hours: int, continuous_frost: bool) -> dict:
+        """Løssnø-vurdering fra antall gyldige og milde temperaturer i løssnø-vinduet."""
+        thresholds = settings.snowdrift
+        if n_valid == 0:
+            return {"available": True, "reason": "Usikker - mangler temperaturdata"}
 
         if continuous_frost:
             return {"available": True, "reason": "Kontinuerlig frost bevarer løssnø"}
@@ -200,9 +437,13 @@ class SnowdriftAnalyzer(BaseAnalyzer):
             return delta_cm
         times = pd.to_datetime(df.loc[snow.index, 'reference_time'])
         elapsed_hours = (times.iloc[-1] - times.iloc[0]).total_seconds() / 3600.0
+        return SnowdriftAnalyzer._snow_change_rate(delta_cm, elapsed_hours)
+
+    @staticmethod
+    def _snow_change_rate(delta_cm: float, elapsed_hours: float) -> float:
+        """cm/h, eller rå endring når målingene har samme tidspunkt."""
         if elapsed_hours <= 0:
             return delta_cm
-
         return delta_cm / elapsed_hours
 
     def _evaluate_snapshot(
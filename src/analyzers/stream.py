@@ -0,0 +1,307 @@
+"""
+Strømmodus for analysatorene: én ny observasjon om gangen.
+
+`AnalyzerStream.push(row)` gir samme `AnalysisResult` som `analyze()` på
+vinduet med de siste `history_hours` timene (raden selv inkludert), uten å
+bygge rullerende features på nytt for hvert tidspunkt. `FeatureStream` holder
+en ringbuffer av rader og løpende aggregater per vindu analysatorene spør
+etter (sum, antall gyldige, tellinger, første/siste gyldige verdi,
+vindusmaksimum). Et vindu opprettes første gang det brukes og fylles fra
+bufferen; deretter koster hver ny rad konstant amortisert tid.
+
+For siste rad eksponeres aggregatene som `LatestFeatures` (samme
+`WindowFeatures`-grensesnitt som `FeatureFrame`, én rad). Den bindes
+eksplisitt med `WindowFeatures.scope` rundt `analyze()`, som kjøres uendret på
+én rad uten oppslag eller hashing av rammen.
+
+Eksempel:
+    stream = SlipperyRoadAnalyzer().stream(history_hours=48)
+    for row in df.to_dict('records'):
+        result = stream.push(row)
+
+`feed(row)` oppdaterer bare aggregatene (uten `analyze()`), for rader som
+bare er kontekst for senere vurderinger.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from collections.abc import Callable, Mapping
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+from src.analyzers.features import SUM_DECIMALS, TIME_COLUMN, WindowFeatures
+
+if TYPE_CHECKING:
+    from src.analyzers.base import AnalysisResult, BaseAnalyzer
+
+# Lengste vindu analysatorene bruker er 24t (løssnø); 48t gir god margin
+DEFAULT_HISTORY_HOURS = 48.0
+
+_NS_PER_SECOND = 1_000_000_000
+
+
+def _as_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _span_ns(hours: float) -> int:
+    # Samme avkorting til hele sekunder som `FeatureFrame.window_start`
+    return int(hours * 3600) * _NS_PER_SECOND
+
+
+class _RowWindow:
+    """Løpende aggregater for én kolonne i vinduet som slutter i siste rad."""
+
+    def __init__(self, hours: float, inclusive: bool):
+        self.span = _span_ns(hours)
+        self.inclusive = inclusive
+        self.rows: deque[tuple[int, float]] = deque()
+        self.valid: deque[tuple[int, float]] = deque()
+        self.total = 0.0
+        self.counts: dict[tuple[str, float], int] = {}
+
+    @staticmethod
+    def _hit(op: str, threshold: float, value: float) -> bool:
+        if op == 'le':
+            return value <= threshold
+        if op == 'gt':
+            return value > threshold
+        raise ValueError(f"Ukjent operator: {op}")
+
+    def add(self, t: int, value: float) -> None:
+        self.rows.append((t, value))
+        if math.isnan(value):
+            return
+        self.valid.append((t, value))
+        self.total += value
+        for op, threshold in self.counts:
+            if self._hit(op, threshold, value):
+                self.counts[(op, threshold)] += 1
+
+    def evict(self, now: int, history_start: int) -> None:
+        cutoff = now - self.span
+        while self.rows:
+            t, value = self.rows[0]
+            inside = (t >= cutoff if self.inclusive else t > cutoff) and t >= history_start
+            if inside:
+                break
+            self.rows.popleft()
+            if math.isnan(value):
+                continue
+            self.valid.popleft()
+            self.total -= value
+            for op, threshold in self.counts:
+                if self._hit(op, threshold, value):
+                    self.counts[(op, threshold)] -= 1
+        if not self.valid:
+            self.total = 0.0
+
+    def count(self, op: str, threshold: float) -> int:
+        key = (op, threshold)
+        if key not in self.counts:
+            self.counts[key] = sum(1 for _, v in self.valid if self._hit(op, threshold, v))
+        return self.counts[key]
+
+
+class _WindowMax:
+    """Første rad med størst nøkkel i vinduet (monoton kø)."""
+
+    def __init__(self, hours: float, inclusive: bool, key: Callable[[Mapping[str, Any]], float]):
+        self.span = _span_ns(hours)
+        self.inclusive = inclusive
+        self.key = key
+        self.queue: deque[tuple[int, float, Mapping[str, Any]]] = deque()
+
+    def add(self, t: int, row: Mapping[str, Any]) -> None:
+        k = self.key(row)
+        if k == -math.inf:
+            return
+        # Like nøkler beholdes, så fronten er første maksimum
+        while self.queue and self.queue[-1][1] < k:
+            self.queue.pop()
+        self.queue.append((t, k, row))
+
+    def evict(self, now: int, history_start: int) -> None:
+        cutoff = now - self.span
+        while self.queue:
+            t = self.queue[0][0]
+            if (t >= cutoff if self.inclusive else t > cutoff) and t >= history_start:
+                break
+            self.queue.popleft()
+
+    def best(self) -> Mapping[str, Any] | None:
+        return self.queue[0][2] if self.queue else None
+
+
+class FeatureStream:
+    """
+    Ringbuffer med rader og løpende vindusaggregater.
+
+    Rader må komme i stigende tidsrekkefølge. Bufferen holder radene med
+    tidspunkt >= siste tidspunkt - `history_hours`; alle vinduer er begrenset
+    til bufferen, som i `analyze()` på samme utsnitt.
+    """
+
+    def __init__(self, history_hours: float | None = None):
+        self.history_hours = DEFAULT_HISTORY_HOURS if history_hours is None else float(history_hours)
+        self._history_span = _span_ns(self.history_hours)
+        self._buffer: deque[tuple[int, Mapping[str, Any]]] = deque()
+        self._windows: dict[tuple[str, float, bool], _RowWindow] = {}
+        self._maxima: dict[tuple[str, float, bool], _WindowMax] = {}
+        self._now: int | None = None
+        self._history_start = 0
+
+    def append(self, row: Mapping[str, Any]) -> None:
+        """
+        Legg til én rad og oppdater alle vinduer.
+
+        Raises:
+            ValueError: Manglende eller synkende tidspunkt
+        """
+        ts = pd.Timestamp(row.get(TIME_COLUMN)) if row.get(TIME_COLUMN) is not None else pd.NaT
+        if pd.isna(ts):
+            raise ValueError(f"Rad mangler {TIME_COLUMN}")
+        if ts.tzinfo is None:
+            ts = ts.tz_localize('UTC')
+        t = ts.as_unit('ns').value
+        if self._now is not None and t < self._now:
+            raise ValueError(f"Rader må komme i tidsrekkefølge ({ts} er før forrige rad)")
+
+        self._now = t
+        self._history_start = t - self._history_span
+        self._buffer.append((t, row))
+        while self._buffer[0][0] < self._history_start:
+            self._buffer.popleft()
+
+        for (column, _, _), window in self._windows.items():
+            window.add(t, _as_float(row.get(column)))
+            window.evict(t, self._history_start)
+        for maximum in self._maxima.values():
+            maximum.add(t, row)
+            maximum.evict(t, self._history_start)
+
+    def latest(self) -> LatestFeatures:
+        """Features for siste rad (én-rads DataFrame koblet til aggregatene)."""
+        if not self._buffer:
+            raise ValueError("Strømmen er tom")
+        t, row = self._buffer[-1]
+        return LatestFeatures(pd.DataFrame([row]), pd.Series([pd.Timestamp(t, tz='UTC')]), self)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def window(self, column: str, hours: float, inclusive: bool) -> _RowWindow:
+        """Aggregater for vinduet (opprettes og fylles fra bufferen ved første bruk)."""
+        key = (column, float(hours), bool(inclusive))
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _RowWindow(hours, inclusive)
+            for t, row in self._buffer:
+                window.add(t, _as_float(row.get(column)))
+            if self._now is not None:
+                window.evict(self._now, self._history_start)
+        return window
+
+    def window_max(
+        self, name: str, hours: float, inclusive: bool, key: Callable[[Mapping[str, Any]], float]
+    ) -> Mapping[str, Any] | None:
+        """
+        Første rad i vinduet med størst `key(row)`; None uten rader med endelig nøkkel.
+
+        `name` identifiserer nøkkelfunksjonen mellom kall.
+        """
+        ident = (name, float(hours), bool(inclusive))
+        maximum = self._maxima.get(ident)
+        if maximum is None:
+            maximum = self._maxima[ident] = _WindowMax(hours, inclusive, key)
+            for t, row in self._buffer:
+                maximum.add(t, row)
+            if self._now is not None:
+                maximum.evict(self._now, self._history_start)
+        return maximum.best()
+
+
+class LatestFeatures(WindowFeatures):
+    """
+    `WindowFeatures` for siste rad i en `FeatureStream`.
+
+    Vinduesfeatures leses fra strømmens løpende aggregater og returneres som
+    arrays med én verdi, så analysatorenes `[-1]`-oppslag virker uendret.
+    """
+
+    def __init__(self, df: pd.DataFrame, times: pd.Series, stream: FeatureStream):
+        super().__init__(df, times)
+        self.stream = stream
+
+    def window_rows(self, hours: float, inclusive: bool) -> np.ndarray:
+        return np.array([len(self.stream.window(TIME_COLUMN, hours, inclusive).rows)])
+
+    def window_sum(self, column: str, hours: float, inclusive: bool = False) -> np.ndarray:
+        total = self.stream.window(column, hours, inclusive).total
+        return np.round(np.array([total]), SUM_DECIMALS)
+
+    def window_valid(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        return np.array([len(self.stream.window(column, hours, inclusive).valid)])
+
+    def window_count_where(
+        self, column: str, op: str, value: float, hours: float, inclusive: bool = True
+    ) -> np.ndarray:
+        return np.array([self.stream.window(column, hours, inclusive).count(op, value)])
+
+    def window_has_pair(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        window = self.stream.window(column, hours, inclusive)
+        return np.array([len(window.rows) >= 2 and len(window.valid) >= 2])
+
+    def window_delta(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        window = self.stream.window(column, hours, inclusive)
+        if len(window.rows) < 2 or len(window.valid) < 2:
+            return np.array([0.0])
+        return np.array([window.valid[-1][1] - window.valid[0][1]])
+
+    def window_mean(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        n_valid = self.window_valid(column, hours, inclusive)
+        total = self.window_sum(column, hours, inclusive)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(n_valid > 0, total / n_valid, np.nan)
+
+    def window_last(self, column: str, hours: float, inclusive: bool) -> np.ndarray:
+        window = self.stream.window(column, hours, inclusive)
+        return np.array([window.valid[-1][1] if window.valid else np.nan])
+
+    def window_first_last(
+        self, column: str, hours: float, inclusive: bool
+    ) -> tuple[pd.Timestamp, float, pd.Timestamp, float] | None:
+        """Tid og verdi for første og siste gyldige måling i vinduet (None uten to)."""
+        window = self.stream.window(column, hours, inclusive)
+        if len(window.valid) < 2:
+            return None
+        (t0, v0), (t1, v1) = window.valid[0], window.valid[-1]
+        return pd.Timestamp(t0, tz='UTC'), v0, pd.Timestamp(t1, tz='UTC'), v1
+
+
+class AnalyzerStream:
+    """
+    Inkrementell analyse: `push(row)` gir `AnalysisResult` for raden.
+
+    Opprettes med `analyzer.stream()`.
+    """
+
+    def __init__(self, analyzer: BaseAnalyzer, history_hours: float | None = None):
+        self.analyzer = analyzer
+        self.features = FeatureStream(history_hours)
+
+    def push(self, row: Mapping[str, Any]) -> AnalysisResult:
+        """Legg til én observasjon (dict/Series med reference_time) og vurder den."""
+        self.features.append(row)
+        return self.analyzer._analyze_stream(self.features.latest())
+
+    def feed(self, row: Mapping[str, Any]) -> None:
+        """Legg til én observasjon uten å vurdere den (kontekst/oppvarming)."""
+        self.features.append(row)
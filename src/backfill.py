@@ -0,0 +1,313 @@
+"""
+Sesong-backfill av historiske Frost-observasjoner til det lokale lageret.
+
+Perioden deles i oppgaver (måned × elementgruppe) som kjøres i en avgrenset
+trådpool. Forbigående feil (429/5xx/timeout) gir eksponentiell backoff med en
+felles pause for alle arbeidere, slik at vi ikke hamrer Frost etter rate limit.
+Dette er eneste retry-lag: kallene går uten transportens egen retry.
+Ferdige oppgaver føres i et manifest, så en avbrutt kjøring fortsetter der den
+slapp. Alle rader skrives til `ObservationStore`.
+
+Eksempel:
+    engine = BackfillEngine()
+    report = engine.run(datetime(2018, 1, 1, tzinfo=UTC))
+    print(report.summary())
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+from src.config import settings
+from src.frost_client import (
+    FrostAPIError,
+    FrostAPITransientError,
+    FrostClient,
+    aggregate_10m_to_hourly,
+)
+from src.observation_store import ObservationStore
+
+logger = logging.getLogger(__name__)
+
+
+MANIFEST_FILENAME = "backfill_manifest.json"
+
+
+def _month_starts(start: datetime, end: datetime) -> Iterator[datetime]:
+    current = datetime(start.year, start.month, 1, tzinfo=UTC)
+    while current < end:
+        yield current
+        current = _next_month(current)
+
+
+def _next_month(ts: datetime) -> datetime:
+    if ts.month == 12:
+        return ts.replace(year=ts.year + 1, month=1)
+    return ts.replace(month=ts.month + 1)
+
+
+@dataclass(frozen=True)
+class BackfillTask:
+    """Én Frost-forespørsel: én måned for én elementgruppe."""
+    start: datetime
+    end: datetime
+    elements: tuple[str, ...]
+
+    @property
+    def key(self) -> str:
+        """Stabil manifestnøkkel (måned + elementsett)."""
+        return f"{self.start:%Y-%m}:{'|'.join(sorted(self.elements))}"
+
+    @property
+    def timeresolutions(self) -> str:
+        return "PT10M" if any("PT10M" in e for e in self.elements) else "PT1H"
+
+
+@dataclass
+class BackfillReport:
+    """Oppsummering av én backfill-kjøring."""
+    planned: int = 0
+    skipped: int = 0
+    completed: int = 0
+    rows_written: int = 0
+    failed: list[str] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def summary(self) -> str:
+        return (
+            f"{self.completed}/{self.planned - self.skipped} oppgaver fullført "
+            f"({self.skipped} hoppet over fra manifest, {len(self.failed)} feilet), "
+            f"{self.rows_written} rader på {self.elapsed_seconds:.0f}s"
+        )
+
+
+class BackfillManifest:
+    """JSON-manifest over ferdige oppgaver (trådsikker, atomisk lagring)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._completed: dict[str, dict] = self._load()
+
+    def _load(self) -> dict[str, dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.warning("Kunne ikke lese backfill-manifest %s: %s", self.path, exc)
+            return {}
+        completed = data.get("completed", {})
+        return completed if isinstance(completed, dict) else {}
+
+    def is_done(self, key: str) -> bool:
+        with self._lock:
+            return key in self._completed
+
+    def mark_done(self, key: str, rows: int) -> None:
+        with self._lock:
+            self._completed[key] = {
+                "rows": rows,
+                "finished_at": datetime.now(UTC).isoformat(),
+            }
+            self._save_locked()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._completed = {}
+            self._save_locked()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._completed)
+
+    def _save_locked(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"completed": self._completed}, indent=2, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        tmp.replace(self.path)
+
+
+class BackfillEngine:
+    """Kjører backfill-oppgaver parallelt mot Frost og skriver til observasjonslageret."""
+
+    def __init__(
+        self,
+        client: FrostClient | None = None,
+        store: ObservationStore | None = None,
+        manifest: BackfillManifest | None = None,
+        max_workers: int | None = None,
+        element_group_size: int | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialiser motor.
+
+        Args:
+            client: FrostClient (default: ny klient for standard stasjon)
+            store: Lager å skrive til (default: klientens lager)
+            manifest: Manifest for gjenopptak (default: i stasjonskatalogen i lageret)
+            max_workers: Antall samtidige Frost-kall
+            element_group_size: Antall elementer per Frost-kall
+            sleep: Ventefunksjon (kan byttes ut i tester)
+        """
+        cfg = settings.backfill
+        self.client = client or FrostClient()
+        self.store = store or self.client.store
+        # Manifestet ligger sammen med stasjonens partisjoner, slik at et slettet
+        # lager også nullstiller gjenopptaket.
+        self.manifest = manifest or BackfillManifest(self.store.station_dir / MANIFEST_FILENAME)
+        self.max_workers = max_workers or cfg.max_workers
+        self.element_group_size = element_group_size or cfg.element_group_size
+        self._sleep = sleep
+
+        # Felles pause etter rate limit: alle arbeidere venter til dette tidspunktet.
+        self._cooldown_until = 0.0
+        self._cooldown_lock = threading.Lock()
+
+    def plan(
+        self,
+        start: datetime,
+        end: datetime,
+        elements: list[str] | None = None,
+        winter_only: bool = False,
+    ) -> list[BackfillTask]:
+        """
+        Del perioden i måned × elementgruppe-oppgaver.
+
+        Args:
+            start: Start av perioden (avrundes ned til månedsstart)
+            end: Slutt av perioden
+            elements: Frost-elementer (default: `settings.station.all_elements()`)
+            winter_only: Ta bare med vintermåneder (`settings.WINTER_MONTHS`)
+        """
+        elements = elements or settings.station.all_elements()
+        # PT10M-elementer må hentes med egen oppløsning og holdes i egne grupper.
+        pt10m = [e for e in elements if "PT10M" in e]
+        hourly = [e for e in elements if e not in pt10m]
+        size = self.element_group_size
+        groups = [tuple(hourly[i:i + size]) for i in range(0, len(hourly), size)]
+        groups += [tuple(pt10m[i:i + size]) for i in range(0, len(pt10m), size)]
+
+        tasks = []
+        for month_start in _month_starts(start, end):
+            if winter_only and month_start.month not in settings.WINTER_MONTHS:
+                continue
+            month_end = min(_next_month(month_start), end)
+            for group in groups:
+                tasks.append(BackfillTask(start=month_start, end=month_end, elements=group))
+        return tasks
+
+    def run(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        elements: list[str] | None = None,
+        winter_only: bool = False,
+    ) -> BackfillReport:
+        """
+        Kjør backfill for perioden og hopp over oppgaver som står i manifestet.
+
+        Args:
+            start: Start (default: 1. januar `settings.backfill.first_year`)
+            end: Slutt (default: nå)
+            elements: Frost-elementer (default: alle stasjonselementer)
+            winter_only: Ta bare med vintermåneder
+
+        Returns:
+            BackfillReport med tellere og nøkler for feilede oppgaver
+        """
+        start = start or datetime(settings.backfill.first_year, 1, 1, tzinfo=UTC)
+        end = end or datetime.now(UTC)
+
+        report = BackfillReport()
+        started = time.monotonic()
+
+        tasks = self.plan(start, end, elements=elements, winter_only=winter_only)
+        report.planned = len(tasks)
+        pending = [t for t in tasks if not self.manifest.is_done(t.key)]
+        report.skipped = report.planned - len(pending)
+
+        logger.info(
+            "Backfill %s: %d oppgaver (%d fra manifest), %d arbeidere",
+            self.client.station_id, report.planned, report.skipped, self.max_workers
+        )
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._run_task, task): task for task in pending}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    rows = future.result()
+                except (FrostAPIError, OSError, ValueError) as exc:
+                    logger.error("Backfill %s feilet: %s", task.key, exc)
+                    report.failed.append(task.key)
+                    continue
+                except Exception:
+                    # Uventet feil (f.eks. dekoding/pyarrow) stopper bare denne oppgaven
+                    logger.exception("Backfill %s feilet uventet", task.key)
+                    report.failed.append(task.key)
+                    continue
+                report.completed += 1
+                report.rows_written += rows
+
+        report.elapsed_seconds = time.monotonic() - started
+        logger.info("Backfill ferdig: %s", report.summary())
+        return report
+
+    def _run_task(self, task: BackfillTask) -> int:
+        cfg = settings.backfill
+        delay = cfg.backoff_initial_seconds
+
+        for attempt in range(1, cfg.max_attempts + 1):
+            self._wait_for_cooldown()
+            try:
+                df = self.client.fetch_chunk(
+                    task.start, task.end, task.elements, task.timeresolutions, retry=False
+                )
+                break
+            except FrostAPITransientError as exc:
+                if attempt == cfg.max_attempts:
+                    raise
+                logger.warning(
+                    "Backfill %s: %s (forsøk %d/%d), venter %.0fs",
+                    task.key, exc, attempt, cfg.max_attempts, delay
+                )
+                self._start_cooldown(delay)
+                delay = min(delay * 2, cfg.backoff_max_seconds)
+
+        if not df.empty and task.timeresolutions == "PT10M":
+            df = aggregate_10m_to_hourly(df)
+
+        rows = self.store.append(df) if not df.empty else 0
+
+        # Inneværende måned er ikke komplett; den hentes på nytt ved neste kjøring.
+        if task.end >= _next_month(task.start):
+            self.manifest.mark_done(task.key, rows)
+        return rows
+
+    def _start_cooldown(self, seconds: float) -> None:
+        with self._cooldown_lock:
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + seconds)
+
+    def _wait_for_cooldown(self) -> None:
+        with self._cooldown_lock:
+            remaining = self._cooldown_until - time.monotonic()
+        if remaining > 0:
+            self._sleep(remaining)
+
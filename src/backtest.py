@@ -0,0 +1,234 @@
+"""
+Sesong-backtest av analysatorene mot lagret værhistorikk.
+
+Spiller av timeobservasjoner fra `ObservationStore` gjennom de samme
+analysatorene som dashboardet bruker (`src/analyzers`), med et kausalt vindu:
+hvert tidspunkt vurderes bare med data frem til og med seg selv. Resultatet er
+varseltidslinjen produksjon ville vist, inkludert nedgraderingsholdet fra
+dashboardet (`settings.dashboard.alert_downgrade_hold_minutes`).
+
+Avspillingen bruker `BaseAnalyzer.analyze_series`, så 7 vintre (~35k timer ×
+4 analysatorer) tar sekunder i stedet for ett `analyze`-kall per time.
+
+Eksempel:
+    engine = BacktestEngine()
+    result = engine.run(datetime(2018, 10, 1, tzinfo=UTC), datetime(2025, 5, 1, tzinfo=UTC))
+    print(result.summary())
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.analyzers import (
+    BaseAnalyzer,
+    FreshSnowAnalyzer,
+    RiskLevel,
+    SlapsAnalyzer,
+    SlipperyRoadAnalyzer,
+    SnowdriftAnalyzer,
+)
+from src.config import settings
+from src.observation_store import ObservationStore
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_COLUMNS = ('reference_time', 'analyzer', 'season', 'risk_level', 'raw_risk_level', 'scenario')
+
+_RANK = {RiskLevel.UNKNOWN.value: 0, RiskLevel.LOW.value: 1, RiskLevel.MEDIUM.value: 2, RiskLevel.HIGH.value: 3}
+
+# Lengre hull i dataene avslutter en episode (f.eks. sommer mellom to sesonger)
+EPISODE_MAX_GAP = pd.Timedelta(hours=1)
+
+
+def default_analyzers() -> dict[str, BaseAnalyzer]:
+    """Samme analysatorer og navn som dashboardet."""
+    return {
+        "Nysnø": FreshSnowAnalyzer(),
+        "Snøfokk": SnowdriftAnalyzer(),
+        "Slaps": SlapsAnalyzer(),
+        "Glatte veier": SlipperyRoadAnalyzer(),
+    }
+
+
+def season_label(times: pd.Series) -> pd.Series:
+    """Vintersesong per tidspunkt, f.eks. '2023/24' for oktober 2023 – april 2024."""
+    times = pd.to_datetime(times, utc=True)
+    first_year = np.where(times.dt.month >= 7, times.dt.year, times.dt.year - 1)
+    return pd.Series(
+        [f"{y}/{(y + 1) % 100:02d}" for y in first_year],
+        index=times.index,
+        dtype=object,
+    )
+
+
+def apply_downgrade_hold(times: pd.Series, levels: np.ndarray, hold_minutes: float) -> np.ndarray:
+    """
+    Tidsserieversjon av dashboardets `apply_alert_stability`.
+
+    En nedgradering holdes igjen til nivået har stått i `hold_minutes`;
+    tidspunktet for siste nivåendring oppdateres bare når nytt nivå slipper gjennom.
+    """
+    if hold_minutes <= 0 or len(levels) == 0:
+        return levels
+
+    t = pd.to_datetime(times, utc=True).to_numpy(dtype='datetime64[ns]')
+    hold = np.timedelta64(int(hold_minutes * 60), 's')
+    out = levels.copy()
+    current = levels[0]
+    changed_at = t[0]
+    for i in range(1, len(levels)):
+        incoming = levels[i]
+        if _RANK[incoming] < _RANK[current] and (t[i] - changed_at) < hold:
+            out[i] = current
+            continue
+        if incoming != current:
+            current = incoming
+            changed_at = t[i]
+    return out
+
+
+@dataclass
+class BacktestResult:
+    """Varseltidslinje fra en backtest, én rad per (tidspunkt, analysator)."""
+    timeline: pd.DataFrame
+    elapsed_seconds: float = 0.0
+    rows: int = 0
+    analyzers: list[str] = field(default_factory=list)
+
+    def episodes(self, min_level: RiskLevel = RiskLevel.MEDIUM) -> pd.DataFrame:
+        """
+        Slå sammen sammenhengende varseltimer til episoder per analysator.
+
+        Returns:
+            DataFrame med analyzer, season, start, end, hours, peak_level og
+            scenario (scenario ved høyeste nivå)
+        """
+        columns = ['analyzer', 'season', 'start', 'end', 'hours', 'peak_level', 'scenario']
+        tl = self.timeline
+        if tl.empty:
+            return pd.DataFrame(columns=columns)
+
+        rank = tl['risk_level'].map(_RANK).to_numpy()
+        alert = rank >= _RANK[min_level.value]
+        analyzer = tl['analyzer'].to_numpy()
+        t = tl['reference_time'].to_numpy(dtype='datetime64[ns]')
+        continues = (
+            alert[:-1]
+            & (analyzer[1:] == analyzer[:-1])
+            & ((t[1:] - t[:-1]) <= EPISODE_MAX_GAP.to_timedelta64())
+        )
+        new_group = alert & ~np.concatenate([[False], continues])
+        group = np.cumsum(new_group)
+
+        alerts = tl.loc[alert].assign(_group=group[alert], _rank=rank[alert])
+        if alerts.empty:
+            return pd.DataFrame(columns=columns)
+
+        peak = alerts.sort_values(['_group', '_rank'], ascending=[True, False], kind='stable')
+        peak = peak.drop_duplicates('_group').set_index('_group')
+        grouped = alerts.groupby('_group', sort=True)
+        out = pd.DataFrame({
+            'analyzer': grouped['analyzer'].first(),
+            'season': grouped['season'].first(),
+            'start': grouped['reference_time'].min(),
+            'end': grouped['reference_time'].max(),
+            'hours': grouped.size(),
+            'peak_level': peak['risk_level'],
+            'scenario': peak['scenario'],
+        })
+        return out.reset_index(drop=True)
+
+    def summary(self) -> pd.DataFrame:
+        """Timer per risikonivå og antall episoder per analysator og sesong."""
+        tl = self.timeline
+        if tl.empty:
+            return pd.DataFrame()
+
+        counts = (
+            tl.groupby(['analyzer', 'season', 'risk_level']).size()
+            .unstack('risk_level', fill_value=0)
+            .reindex(columns=[level.value for level in RiskLevel], fill_value=0)
+        )
+        counts.columns = [f"{c}_hours" for c in counts.columns]
+        episodes = self.episodes()
+        counts['episodes'] = (
+            episodes.groupby(['analyzer', 'season']).size()
+            .reindex(counts.index, fill_value=0)
+        )
+        return counts.reset_index()
+
+
+class BacktestEngine:
+    """
+    Spiller av lagret historikk gjennom produksjonsanalysatorene.
+
+    Eksempel:
+        engine = BacktestEngine(store=ObservationStore("SN46220"))
+        timeline = engine.run(start, end).timeline
+    """
+
+    def __init__(
+        self,
+        store: ObservationStore | None = None,
+        analyzers: dict[str, BaseAnalyzer] | None = None,
+        hold_minutes: float | None = None,
+    ):
+        self.store = store or ObservationStore()
+        self.analyzers = analyzers if analyzers is not None else default_analyzers()
+        self.hold_minutes = (
+            settings.dashboard.alert_downgrade_hold_minutes if hold_minutes is None else hold_minutes
+        )
+
+    def run(self, start: datetime, end: datetime, winter_only: bool = True) -> BacktestResult:
+        """
+        Les [start, end] fra lageret og spill av.
+
+        Args:
+            start: Fra (UTC)
+            end: Til (UTC, inkluderende)
+            winter_only: Ta bare med tidspunkter i `settings.WINTER_MONTHS`
+                i tidslinjen (vinduene bruker fortsatt all historikk)
+        """
+        df = self.store.read(start, end)
+        return self.replay(df, winter_only=winter_only)
+
+    def replay(self, df: pd.DataFrame, winter_only: bool = True) -> BacktestResult:
+        """Spill av en ferdig lastet værserie (sortert på reference_time)."""
+        started = time.monotonic()
+        if df is None or df.empty or 'reference_time' not in df.columns:
+            return BacktestResult(timeline=pd.DataFrame(columns=list(TIMELINE_COLUMNS)))
+
+        df = df.sort_values('reference_time', kind='stable').reset_index(drop=True)
+        times = pd.to_datetime(df['reference_time'], utc=True)
+        seasons = season_label(times)
+        keep = times.dt.month.isin(settings.WINTER_MONTHS).to_numpy() if winter_only else np.ones(len(df), bool)
+
+        frames = []
+        for name, analyzer in self.analyzers.items():
+            series = analyzer.analyze_series(df)
+            raw = series['risk_level'].to_numpy(dtype=object)
+            frames.append(pd.DataFrame({
+                'reference_time': times,
+                'analyzer': name,
+                'season': seasons,
+                'risk_level': apply_downgrade_hold(times, raw, self.hold_minutes),
+                'raw_risk_level': raw,
+                'scenario': series['scenario'].to_numpy(dtype=object),
+            }).loc[keep])
+
+        timeline = pd.concat(frames, ignore_index=True)
+        elapsed = time.monotonic() - started
+        logger.info("Backtest: %d timer × %d analysatorer på %.1fs", len(df), len(self.analyzers), elapsed)
+        return BacktestResult(
+            timeline=timeline,
+            elapsed_seconds=elapsed,
+            rows=len(df),
+            analyzers=list(self.analyzers),
+        )
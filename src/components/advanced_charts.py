@@ -10,14 +10,19 @@ import streamlit as st
 from plotly.subplots import make_subplots  # type: ignore[import-untyped]
 
 from src.config import settings
+from src.visualizations.downsample import decimate_indices
 
 
 class AdvancedCharts:
     """Avanserte chart-komponenter for værutforskning"""
 
     @staticmethod
-    def create_multi_weather_chart(df: pd.DataFrame, selected_metrics: list[str]) -> go.Figure:
-        """Lag multi-panel værdata chart"""
+    def create_multi_weather_chart(
+        df: pd.DataFrame,
+        selected_metrics: list[str],
+        target_width_px: int | None = None,
+    ) -> go.Figure:
+        """Lag multi-panel værdata chart (punkter desimert til omtrent `target_width_px`)"""
 
         if df.empty:
             fig = go.Figure()
@@ -72,10 +77,11 @@ class AdvancedCharts:
                         AdvancedCharts._add_categorical_trace(fig, df, col, i, colors[j % len(colors)])
                     elif 'new_snow' in col:
                         # Bar chart for nysnø
+                        x, y = AdvancedCharts._thin(df, col, target_width_px, method="minmax")
                         fig.add_trace(
                             go.Bar(
-                                x=df['time'],
-                                y=df[col],
+                                x=x,
+                                y=y,
                                 name=col.replace('_', ' ').title(),
                                 marker_color=colors[j % len(colors)],
                                 opacity=0.7
@@ -84,10 +90,11 @@ class AdvancedCharts:
                         )
                     else:
                         # Line chart for kontinuerlige data
+                        x, y = AdvancedCharts._thin(df, col, target_width_px)
                         fig.add_trace(
                             go.Scatter(
-                                x=df['time'],
-                                y=df[col],
+                                x=x,
+                                y=y,
                                 mode='lines',
                                 name=col.replace('_', ' ').title(),
                                 line={"color": colors[j % len(colors)], "width": 2}
@@ -118,6 +125,30 @@ class AdvancedCharts:
 
         return fig
 
+    @staticmethod
+    def _thin(
+        df: pd.DataFrame, col: str, target_width_px: int | None, method: str | None = None
+    ) -> tuple[pd.Series, pd.Series]:
+        """Desimer (time, col) slik at nettleseren får et begrenset antall punkter"""
+        viz = settings.viz
+        target = max(viz.downsample_min_points, target_width_px or viz.plotly_target_width_px)
+        values = pd.to_numeric(df[col], errors='coerce')
+        thresholds = []
+        if col == 'surface_temperature':
+            thresholds.append((0, settings.slippery.surface_temp_freeze))
+        elif 'gust' in col:
+            thresholds.append((0, settings.snowdrift.wind_gust_warning))
+        idx = decimate_indices(
+            df['time'].to_numpy(),
+            [values.to_numpy(dtype=float, na_value=float('nan'))],
+            target,
+            method or viz.downsample_method,
+            thresholds,
+        )
+        if idx is None:
+            return df['time'], df[col]
+        return df['time'].iloc[idx], df[col].iloc[idx]
+
     @staticmethod
     def _add_categorical_trace(fig: go.Figure, df: pd.DataFrame, col: str, row: int, color: str) -> None:
         """Legg til kategorisk trace (snøtype)"""
@@ -3,27 +3,31 @@ Historisk værdata service med nysnø-beregninger og brøyting-tracking
 """
 import json
 import os
-from datetime import UTC, datetime, timedelta
+import sqlite3
+from datetime import UTC, date, datetime, timedelta
 from functools import lru_cache
 
 import pandas as pd
 import streamlit as st
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
 
 from src.config import settings
+from src.http_transport import HttpTransport, get_transport
+from src.observation_store import ObservationStore
+from src.rollup_store import RollupStore, get_rollup_store
 
 
 class HistoricalWeatherService:
     """Service for håndtering av historisk værdata og brøyting-tracking"""
 
-    def __init__(self, frost_client_id: str, station_id: str = settings.station.station_id):
+    def __init__(
+        self,
+        frost_client_id: str,
+        station_id: str = settings.station.station_id,
+        transport: HttpTransport | None = None,
+    ):
         self.frost_client_id = frost_client_id
         self.station_id = station_id
+        self.transport = transport or get_transport()
         self.cache_dir = "data/cache"
         self.february_data_file = "data/february_2024_weather.json"
 
@@ -80,7 +84,11 @@ class HistoricalWeatherService:
 
     @lru_cache(maxsize=settings.historical.fetch_cache_maxsize)  # noqa: B019 - bevisst caching
     def fetch_historical_data(self, start_date: str, end_date: str) -> pd.DataFrame:
-        """Hent historisk data fra API med caching"""
+        """Hent historisk data fra lokalt lager eller API med caching"""
+
+        stored = self._read_from_store(start_date, end_date)
+        if not stored.empty:
+            return stored
 
         try:
             import requests
@@ -112,57 +120,18 @@ class HistoricalWeatherService:
                 'maxage': 'PT168H'  # 7 dager max age for historisk data
             }
 
-            class _RetryableRequestError(Exception):
-                pass
-
-            @retry(
-                reraise=True,
-                stop=stop_after_attempt(3),
-                wait=wait_exponential(multiplier=0.5, min=0.5, max=6),
-                retry=retry_if_exception_type(_RetryableRequestError),
+            response = self.transport.get(
+                url,
+                params=params,
+                auth=(self.frost_client_id, ''),
+                timeout=settings.historical.http_timeout_seconds,  # Lengre timeout for historiske data
             )
-            def _get_with_retry() -> requests.Response:
-                try:
-                    resp = requests.get(
-                        url,
-                        params=params,
-                        auth=(self.frost_client_id, ''),
-                        timeout=settings.historical.http_timeout_seconds,  # Lengre timeout for historiske data
-                    )
-                except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
-                    raise _RetryableRequestError(str(e)) from e
-
-                if resp.status_code in {429, 500, 502, 503, 504}:
-                    raise _RetryableRequestError(f"Frost API svarte {resp.status_code}")
-
-                return resp
-
-            response = _get_with_retry()
 
             if response.status_code == 200:
-                data = response.json()
-
-                if not data.get('data'):
-                    return pd.DataFrame()
-
-                records = []
-                for obs in data['data']:
-                    record = {'time': obs['referenceTime']}
-                    for observation in obs.get('observations', []):
-                        element_id = observation['elementId']
-                        value = observation.get('value')
-                        if value is not None:
-                            record[element_id] = float(value)
-                    records.append(record)
+                from src.frost_client import decode_observations
 
-                if not records:
-                    return pd.DataFrame()
-
-                df = pd.DataFrame(records)
-                df['time'] = pd.to_datetime(df['time'])
-                df = df.sort_values('time').reset_index(drop=True)
-
-                return df
+                # Frost-elementnavn beholdes som kolonnenavn her
+                return decode_observations(response.json(), time_column='time', deduplicate=False)
 
             else:
                 st.error(f"API-feil: {response.status_code}")
@@ -178,6 +147,39 @@ class HistoricalWeatherService:
             st.error(f"Feil ved henting av historisk data: {e}")
             return pd.DataFrame()
 
+    def _read_from_store(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        Les perioden fra det lokale observasjonslageret hvis det dekker hele vinduet.
+
+        Returnerer tom DataFrame når lageret mangler data, slik at kallet faller
+        tilbake til Frost API. Kolonnene mappes tilbake til Frost-elementnavn og
+        `time`, som resten av tjenesten forventer.
+        """
+        from src.frost_client import FrostClient
+
+        try:
+            start = pd.Timestamp(start_date)
+            end = pd.Timestamp(end_date)
+            if start.tzinfo is None:
+                start = start.tz_localize(UTC)
+            if end.tzinfo is None:
+                end = end.tz_localize(UTC)
+
+            df = ObservationStore(self.station_id).read(start, end)
+        except (OSError, ValueError, TypeError):
+            return pd.DataFrame()
+
+        if df.empty:
+            return pd.DataFrame()
+
+        # Krev dekning i begge ender (± 1 time) før lageret brukes
+        slack = pd.Timedelta(hours=1)
+        if df['reference_time'].iloc[0] > start + slack or df['reference_time'].iloc[-1] < end - slack:
+            return pd.DataFrame()
+
+        inverse = {v: k for k, v in FrostClient.COLUMN_MAPPING.items()}
+        return df.rename(columns={'reference_time': 'time', **inverse}).reset_index(drop=True)
+
     def calculate_new_snow(self, df: pd.DataFrame) -> pd.DataFrame:
         """Beregn nysnø basert på snødybde-endringer og nedbør"""
 
@@ -246,8 +248,20 @@ class HistoricalWeatherService:
 
         return df
 
-    def calculate_snow_since_plowing(self, df: pd.DataFrame, last_plowed: datetime) -> dict:
-        """Beregn snøfall siden sist brøyting"""
+    def calculate_snow_since_plowing(
+        self,
+        df: pd.DataFrame,
+        last_plowed: datetime,
+        rollups: RollupStore | None = None,
+    ) -> dict:
+        """
+        Beregn snøfall siden sist brøyting.
+
+        Hele lokale døgn mellom brøytingen og i dag summeres fra døgnaggregatene
+        i `RollupStore`; timeradene i `df` brukes bare for de delvise døgnene i
+        hver ende. Mangler aggregatene døgn, summeres alt fra timeradene.
+        Antall hendelser og dominerende snøtype regnes fra timeradene.
+        """
 
         if df.empty:
             return {
@@ -271,7 +285,15 @@ class HistoricalWeatherService:
             }
 
         # Beregn akkumulert nysnø
-        total_new_snow = df_since_plowing['new_snow_cm'].sum()
+        now = datetime.now(UTC)
+        whole_days = self._whole_days_from_rollups(last_plowed, now, rollups)
+        if whole_days is None:
+            total_new_snow = df_since_plowing['new_snow_cm'].sum()
+        else:
+            first_midnight, end_midnight, rollup_snow = whole_days
+            times = df_since_plowing['time']
+            edges = (times < first_midnight) | (times >= end_midnight)
+            total_new_snow = df_since_plowing.loc[edges, 'new_snow_cm'].sum() + rollup_snow
 
         # Tell snø-hendelser (sammenhengende perioder)
         snow_events = (df_since_plowing['new_snow_cm'] > 0).astype(int).diff().clip(lower=0).sum()
@@ -309,9 +331,41 @@ class HistoricalWeatherService:
             'dominant_type': dominant_type,
             'plowing_needed': plowing_needed,
             'recommendation': recommendation,
-            'hours_since_plowing': (datetime.now(UTC) - last_plowed).total_seconds() / 3600
+            'hours_since_plowing': (now - last_plowed).total_seconds() / 3600
         }
 
+    def _whole_days_from_rollups(
+        self,
+        last_plowed: datetime,
+        now: datetime,
+        rollups: RollupStore | None,
+    ) -> tuple[pd.Timestamp, pd.Timestamp, float] | None:
+        """
+        Nysnø for hele lokale døgn i (last_plowed, now) fra døgnaggregatene.
+
+        Returns:
+            (første hele døgns midnatt, midnatt etter siste hele døgn, cm) i UTC,
+            eller None når perioden ikke har hele døgn eller aggregatene er ufullstendige
+        """
+        timezone = settings.rollup.timezone
+        start = pd.Timestamp(last_plowed).tz_convert(timezone)
+        first_day: date = start.date() if start == start.normalize() else start.date() + timedelta(days=1)
+        last_day: date = pd.Timestamp(now).tz_convert(timezone).date() - timedelta(days=1)
+        if first_day > last_day:
+            return None
+
+        try:
+            store = rollups if rollups is not None else get_rollup_store()
+            total, days_with_data = store.snow_between(self.station_id, first_day, last_day)
+        except (OSError, sqlite3.Error):
+            return None
+        if days_with_data < (last_day - first_day).days + 1:
+            return None
+
+        first_midnight = pd.Timestamp(first_day.isoformat()).tz_localize(timezone).tz_convert(UTC)
+        end_midnight = pd.Timestamp((last_day + timedelta(days=1)).isoformat()).tz_localize(timezone).tz_convert(UTC)
+        return first_midnight, end_midnight, total
+
     def save_plowing_event(self, timestamp: datetime, notes: str = "") -> None:
         """Lagre brøyting-hendelse"""
         plowing_file = "data/plowing_log.json"
@@ -3,7 +3,6 @@ Avansert caching system for bedre ytelse på mobil
 Implementerer TTL-basert caching og progressive loading
 """
 import hashlib
-import time
 from collections.abc import Callable
 from typing import Any
 
@@ -12,6 +11,7 @@ import streamlit as st
 
 from src.components import weather_utils
 from src.config import settings
+from src.shared_cache import get_shared_cache
 
 RECOVERABLE_ERRORS = (
     AttributeError,
@@ -26,7 +26,9 @@ RECOVERABLE_ERRORS = (
 
 
 class DataCache:
-    """Avansert data caching med TTL og kompresjon"""
+    """TTL-cache i det delte cache-laget (felles for alle økter, se `src/shared_cache.py`)"""
+
+    NAMESPACE = 'data_cache'
 
     @staticmethod
     def _generate_cache_key(base_key: str, params: dict[str, Any]) -> str:
@@ -45,6 +47,9 @@ class DataCache:
         """
         Hent cached data eller oppdater hvis utløpt
 
+        Etter TTL serveres gamle data i (ttl_fallback_multiplier - 1) × TTL
+        mens nye hentes i bakgrunnen, og ved feil så lenge de finnes.
+
         Args:
             key: Base cache key
             fetch_func: Funksjon for å hente nye data
@@ -55,110 +60,34 @@ class DataCache:
             params = {}
 
         cache_key = DataCache._generate_cache_key(key, params)
-
-        # Initialiser cache hvis den ikke eksisterer
-        if 'data_cache' not in st.session_state:
-            st.session_state.data_cache = {}
-
-        cache = st.session_state.data_cache
-        now = time.time()
-
-        # Sjekk om data eksisterer og er gyldig
-        if cache_key in cache:
-            cached_item = cache[cache_key]
-            age = now - cached_item['timestamp']
-
-            if age < ttl_seconds:
-                return cached_item['data']
-
-        # Hent nye data
-        try:
-            fresh_data = fetch_func()
-            cache[cache_key] = {
-                'data': fresh_data,
-                'timestamp': now,
-                'ttl': ttl_seconds
-            }
-
-            # Rydd opp gamle cache-oppføringer
-            DataCache._cleanup_cache()
-
-            return fresh_data
-
-        except Exception as e:
-            # Returner gamle data hvis tilgjengelig ved feil
-            if cache_key in cache:
-                st.warning(f"Bruker cached data pga. feil: {str(e)[:50]}...")
-                return cache[cache_key]['data']
-            raise
-
-    @staticmethod
-    def _cleanup_cache() -> None:
-        """Fjern utløpte cache-oppføringer"""
-        if 'data_cache' not in st.session_state:
-            return
-
-        cache = st.session_state.data_cache
-        now = time.time()
-
-        # Finn utløpte nøkler
-        expired_keys = []
-        cache_cfg = settings.performance_cache
-        for key, item in cache.items():
-            age = now - item['timestamp']
-            if age > item['ttl'] * cache_cfg.ttl_fallback_multiplier:  # Behold lengre for fallback
-                expired_keys.append(key)
-
-        # Fjern utløpte oppføringer
-        for key in expired_keys:
-            del cache[key]
-
-        # Begrens cache størrelse
-        if len(cache) > cache_cfg.max_entries:
-            # Fjern eldste oppføringer
-            sorted_items = sorted(cache.items(), key=lambda x: x[1]['timestamp'])
-            keep_newest = min(cache_cfg.keep_newest_entries, cache_cfg.max_entries)
-            for key, _ in sorted_items[:-keep_newest]:
-                del cache[key]
+        stale_seconds = ttl_seconds * max(settings.performance_cache.ttl_fallback_multiplier - 1, 0)
+        return get_shared_cache().get_or_fetch(
+            f"{DataCache.NAMESPACE}.{key}",
+            cache_key,
+            fetch_func,
+            ttl_seconds=ttl_seconds,
+            stale_seconds=stale_seconds,
+        )
 
     @staticmethod
     def invalidate_cache(key_pattern: str | None = None) -> None:
-        """Fjern cache oppføringer"""
-        if 'data_cache' not in st.session_state:
-            return
-
-        cache = st.session_state.data_cache
-
-        if key_pattern is None:
-            # Fjern all cache
-            cache.clear()
-        else:
-            # Fjern spesifikke mønstre
-            keys_to_remove = [k for k in cache.keys() if key_pattern in k]
-            for key in keys_to_remove:
-                del cache[key]
+        """Fjern cache oppføringer (alle, eller base-nøkler som starter med `key_pattern`)"""
+        namespace = DataCache.NAMESPACE if key_pattern is None else f"{DataCache.NAMESPACE}.{key_pattern}"
+        get_shared_cache().invalidate(namespace)
 
     @staticmethod
     def get_cache_stats() -> dict[str, Any]:
-        """Hent cache statistikk"""
-        if 'data_cache' not in st.session_state:
-            return {'entries': 0, 'total_size': 0, 'oldest': None, 'newest': None}
-
-        cache = st.session_state.data_cache
-        now = time.time()
-
-        if not cache:
-            return {'entries': 0, 'total_size': 0, 'oldest': None, 'newest': None}
-
-        timestamps = [item['timestamp'] for item in cache.values()]
-
+        """Hent cache statistikk (for hele det delte cache-laget)"""
+        stats = get_shared_cache().stats()
         return {
-            'entries': len(cache),
-            'total_size': sum(len(str(item['data'])) for item in cache.values()),
-            'oldest': min(timestamps) if timestamps else None,
-            'newest': max(timestamps) if timestamps else None,
-            'oldest_age': (now - min(timestamps)) if timestamps else 0,
-            'newest_age': (now - max(timestamps)) if timestamps else 0
+            'backend': stats.backend,
+            'entries': stats.entries,
+            'total_size': stats.bytes,
+            'hits': stats.hits,
+            'stale_hits': stats.stale_hits,
+            'misses': stats.misses,
+            'evictions': stats.evictions,
+            'hit_rate': stats.hit_rate,
         }
 
 
@@ -73,6 +73,8 @@ class APIConfig:
     streamlit_cache_ttl_seconds: int = 300
     forecast_timeout_seconds: int = 15
     forecast_hours: int = 24
+    # Brukes når MET ikke sender Expires; ellers styrer Expires neste henting
+    forecast_default_ttl_seconds: int = 1800
 
     # Default tidsvindu for "siste N timer"-kall (brukes hvis ikke overstyrt i UI)
     default_hours_back: int = 24
@@ -324,10 +326,48 @@ class MobileConfig:
 
 @dataclass(frozen=True)
 class PerformanceCacheConfig:
-    """Terskler for `src/components/performance_cache.py`."""
+    """Terskler for `src/components/performance_cache.py` og `components/performance_cache.py`."""
+    # Gammel verdi beholdes i (multiplier - 1) × TTL etter utløp (servert eller som reserve ved feil)
     ttl_fallback_multiplier: int = 2
-    max_entries: int = 20
-    keep_newest_entries: int = 15
+
+
+@dataclass(frozen=True)
+class SharedCacheConfig:
+    """Delt cache for Frost, prognose, Netatmo og brøyting (`src/shared_cache.py`)."""
+    # Budsjett for serialiserte verdier (minne- og disk-backend; Redis bruker maxmemory)
+    max_bytes: int = 256 * 1024 * 1024
+    # Etter TTL serveres gammel verdi så lenge mens ny hentes i bakgrunnen
+    stale_while_revalidate_seconds: int = 600
+    revalidate_workers: int = 2
+    # Redis: antall nøkler/bytes (skanning + MEMORY USAGE) regnes høyst så ofte
+    redis_usage_ttl_seconds: int = 60
+
+    @property
+    def backend(self) -> str:
+        """Backend: memory (per prosess), disk (delt på maskinen) eller redis (delt bak proxy)."""
+        return get_secret("SHARED_CACHE_BACKEND", "memory")
+
+    @property
+    def disk_path(self) -> str:
+        return get_secret("SHARED_CACHE_PATH", "data/cache/shared")
+
+    @property
+    def redis_url(self) -> str:
+        return get_secret("SHARED_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+
+@dataclass(frozen=True)
+class SnapshotConfig:
+    """Bakgrunnsoppfriskning av ferdig analysert standardperiode (`src/analysis_snapshot.py`)."""
+    # Hvor ofte Frost, prognose og brøyting hentes og analysen kjøres på nytt.
+    # Frost publiserer timesobservasjoner; 5 min fanger ny time uten mye etterslep.
+    refresh_interval_seconds: int = 300
+    # Eldre snapshot brukes ikke (sidevisning beregner da selv)
+    max_age_seconds: int = 1800
+
+    @property
+    def enabled(self) -> bool:
+        return get_secret("ANALYSIS_SNAPSHOT_ENABLED", "true").strip().lower() not in {"0", "false", "no", "off"}
 
 
 @dataclass(frozen=True)
@@ -410,6 +450,18 @@ class VisualizationConfig:
     sample_target: int = 5000
     figure_dpi: int = 100
 
+    # Rendret PNG (samme DPI som st.pyplot) og innholdsadressert figurcache
+    render_dpi: int = 200
+    figure_cache_max_entries: int = 64
+    figure_cache_max_bytes: int = 32 * 1024 * 1024
+    # Visuell desimering: maks punkter ≈ aksebredde i piksler ved figure_dpi
+    downsample_method: str = "lttb"  # "lttb" eller "minmax"
+    downsample_min_points: int = 200
+    plotly_target_width_px: int = 1000
+
+    # Prosesser for WeatherPlots.render_many (0 = antall kjerner, maks 8; 1 = serielt)
+    render_workers: int = 0
+
     # Vindkjøling-formel (gyldighetsområde; brukes i plotting/markering)
     wind_chill_valid_temp_max_c: float = 10.0
     wind_chill_valid_wind_min_ms: float = 1.34
@@ -450,6 +502,22 @@ class DashboardConfig:
     data_coverage_warning_pct: float = 70.0
     data_coverage_unknown_pct: float = 40.0
 
+    # Parallell henting av kilder ved sidelasting (`src/source_fanout.py`).
+    # Tidsfristen gjelder fra kilden startes; en treg kilde gir "utilgjengelig"
+    # i sin egen seksjon i stedet for å holde igjen resten av siden.
+    load_workers: int = 4
+    weather_timeout_seconds: float = 45.0
+    plowing_timeout_seconds: float = 15.0
+    forecast_timeout_seconds: float = 15.0
+    netatmo_timeout_seconds: float = 20.0
+
+    # Seksjoner kjøres som egne fragmenter (`st.fragment`) og oppdaterer seg
+    # selv med dette intervallet uten å kjøre hele siden. 0 = kun ved full kjøring.
+    # Temperaturkartet følger `NetatmoConfig.cache_ttl_seconds`.
+    risk_cards_refresh_seconds: int = 60
+    graphs_refresh_seconds: int = 300
+    forecast_refresh_seconds: int = 900
+
 
 @dataclass(frozen=True)
 class NetatmoConfig:
@@ -482,6 +550,87 @@ class PlowmanConfig:
     http_timeout_seconds: int = 10
 
 
+@dataclass(frozen=True)
+class HttpConfig:
+    """Delt HTTP-lag for Frost/MET-klientene (`src/http_transport.py`)."""
+    user_agent: str = "snofokk-analyse/1.0 (github.com/toro68/snofokk-analyse)"
+    # Keep-alive: antall verter som holdes i pool og åpne forbindelser per vert
+    # (minst like mange som backfill-arbeidere)
+    pool_connections: int = 4
+    pool_maxsize: int = 10
+    # Felles retry for timeout/forbindelsesfeil og 429/5xx
+    retry_attempts: int = 3
+    retry_backoff_multiplier: float = 0.5
+    retry_backoff_min_seconds: float = 0.5
+    retry_backoff_max_seconds: float = 6.0
+    retry_statuses: tuple[int, ...] = (429, 500, 502, 503, 504)
+
+
+@dataclass(frozen=True)
+class BackfillConfig:
+    """Sesong-backfill fra Frost (`src/backfill.py`)."""
+    first_year: int = 2018
+    # Antall elementer per Frost-kall (måned × elementgruppe = én oppgave)
+    element_group_size: int = 5
+    max_workers: int = 4
+    # Retry per oppgave (429/5xx/timeout); erstatter transportens retry for backfill
+    max_attempts: int = 6
+    backoff_initial_seconds: float = 2.0
+    backoff_max_seconds: float = 120.0
+
+
+@dataclass(frozen=True)
+class AlertConfig:
+    """Varslingstjeneste for e-post (`src/alert_service.py`)."""
+    interval_minutes: float = 15.0
+    # Løssnø-vurderingen ser 24t bakover; hent litt mer
+    lookback_hours: int = 30
+    # Analysatorer det varsles for (navn som i dashboardet)
+    analyzers: tuple[str, ...] = ("Snøfokk", "Glatte veier")
+    min_risk_level: str = "MEDIUM"
+    # Samme nivå varsles tidligst igjen etter cooldown; økt nivå varsles straks
+    cooldown_hours: float = 12.0
+    # Ingen varsler på data eldre enn dette (som dashboardets UNKNOWN-grense)
+    max_data_age_minutes: int = 240
+    state_file: str = "data/logs/alert_state.json"
+    smtp_port: int = 587
+
+
+@dataclass(frozen=True)
+class ProjectionConfig:
+    """Risikoprojeksjon fra observasjoner + MET-prognose (`src/projection.py`)."""
+    # Observert historikk foran prognosen (analysatorenes lengste vindu er 24-48t)
+    history_hours: int = 48
+    # Ingen projeksjon hvis siste observasjon er eldre enn dette før første prognosetime
+    max_gap_hours: float = 3.0
+    # Vindkast/vind-forhold og bakke/luft-avvik estimeres fra siste N timer observert
+    gust_ratio_lookback_hours: int = 24
+    surface_offset_lookback_hours: int = 6
+
+
+@dataclass(frozen=True)
+class RollupConfig:
+    """Dags- og ukesaggregater per stasjon (`src/rollup_store.py`)."""
+    # Døgn og ISO-uker regnes i lokal tid (brøyteruter og fredagsregelen følger kalenderen)
+    timezone: str = "Europe/Oslo"
+    # Timer med lufttemperatur under/over disse telles som frost-/mildværstimer
+    frost_air_temp_max: float = 0.0
+    mild_air_temp_min: float = 1.0
+    # Tunbrøyting (weekday 4 = fredag) vurderes på akkumulert nysnø siden forrige tunbrøytingsdag
+    tun_plowing_weekday: int = 4
+
+
+@dataclass(frozen=True)
+class OperationalLogConfig:
+    """Skrivekø for operasjonell logg (`src/operational_logger.py`)."""
+    # Maks antall rader i kø; full kø skrives synkront i stedet for å miste rader
+    queue_maxsize: int = 1000
+    batch_size: int = 200
+    flush_interval_seconds: float = 0.5
+    # Hvor lenge prosessavslutning venter på at køen tømmes
+    shutdown_timeout_seconds: float = 5.0
+
+
 @dataclass(frozen=True)
 class PlowingServiceConfig:
     """Terskler og kapasiteter for `src/plowing_service.py`."""
@@ -998,7 +1147,15 @@ class Settings:
     plowman: PlowmanConfig = field(default_factory=PlowmanConfig)
 
     plowing_service: PlowingServiceConfig = field(default_factory=PlowingServiceConfig)
+    http: HttpConfig = field(default_factory=HttpConfig)
+    backfill: BackfillConfig = field(default_factory=BackfillConfig)
+    alerts: AlertConfig = field(default_factory=AlertConfig)
+    projection: ProjectionConfig = field(default_factory=ProjectionConfig)
+    rollup: RollupConfig = field(default_factory=RollupConfig)
+    operational_log: OperationalLogConfig = field(default_factory=OperationalLogConfig)
     performance_cache: PerformanceCacheConfig = field(default_factory=PerformanceCacheConfig)
+    shared_cache: SharedCacheConfig = field(default_factory=SharedCacheConfig)
+    snapshot: SnapshotConfig = field(default_factory=SnapshotConfig)
     mobile: MobileConfig = field(default_factory=MobileConfig)
     display: TemperatureDisplayThresholds = field(default_factory=TemperatureDisplayThresholds)
     snow_limit: SnowLimitThresholds = field(default_factory=SnowLimitThresholds)
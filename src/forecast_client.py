@@ -1,15 +1,31 @@
-"""MET Locationforecast-klient for korttidsprognose."""
+"""
+MET Locationforecast-klient for korttidsprognose.
+
+Siste prognose per koordinat lagres på disk (`ForecastCache`) sammen med
+`Expires` og `Last-Modified`. Før `Expires` brukes den lagrede prognosen uten
+nettverkskall; etterpå sendes `If-Modified-Since`, og ved 304 gjenbrukes de
+allerede parsede punktene. Alle app-arbeidere og varseljobber på samme maskin
+deler dermed én prognose per koordinat, slik MET ber om i vilkårene, og
+samtidige oppdateringer i samme prosess slås sammen til ett kall.
+"""
 
 from __future__ import annotations
 
+import json
 import logging
+import os
+import threading
 from dataclasses import dataclass
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
+from email.utils import parsedate_to_datetime
+from pathlib import Path
 from typing import Any
 
 import requests
 
-from src.config import settings
+from src.config import get_secret, settings
+from src.http_transport import HttpTransport, get_transport
+from src.single_flight import get_single_flight
 
 logger = logging.getLogger(__name__)
 
@@ -23,35 +39,212 @@ class ForecastPoint:
     wind_speed: float | None = None
     wind_gust: float | None = None
     precipitation_1h: float | None = None
+    wind_from_direction: float | None = None
+    relative_humidity: float | None = None
 
 
 class ForecastClientError(Exception):
     """Feil ved henting/parsing av prognose."""
 
 
+@dataclass
+class CachedForecast:
+    """Parsede prognosepunkter med HTTP-validatorer fra siste svar."""
+
+    lat: float
+    lon: float
+    points: list[ForecastPoint]
+    expires: datetime
+    fetched_at: datetime
+    last_modified: str | None = None
+
+    def is_fresh(self, now: datetime) -> bool:
+        return now < self.expires
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "lat": self.lat,
+            "lon": self.lon,
+            "expires": self.expires.isoformat(),
+            "fetched_at": self.fetched_at.isoformat(),
+            "last_modified": self.last_modified,
+            "points": [
+                {
+                    "reference_time": p.reference_time.isoformat(),
+                    "air_temperature": p.air_temperature,
+                    "wind_speed": p.wind_speed,
+                    "wind_gust": p.wind_gust,
+                    "precipitation_1h": p.precipitation_1h,
+                    "wind_from_direction": p.wind_from_direction,
+                    "relative_humidity": p.relative_humidity,
+                }
+                for p in self.points
+            ],
+        }
+
+    @classmethod
+    def from_json(cls, raw: dict[str, Any]) -> CachedForecast:
+        return cls(
+            lat=float(raw["lat"]),
+            lon=float(raw["lon"]),
+            expires=datetime.fromisoformat(raw["expires"]),
+            fetched_at=datetime.fromisoformat(raw["fetched_at"]),
+            last_modified=raw.get("last_modified"),
+            points=[
+                ForecastPoint(
+                    reference_time=datetime.fromisoformat(p["reference_time"]),
+                    air_temperature=p.get("air_temperature"),
+                    wind_speed=p.get("wind_speed"),
+                    wind_gust=p.get("wind_gust"),
+                    precipitation_1h=p.get("precipitation_1h"),
+                    wind_from_direction=p.get("wind_from_direction"),
+                    relative_humidity=p.get("relative_humidity"),
+                )
+                for p in raw["points"]
+            ],
+        )
+
+
+def _default_cache_dir() -> Path:
+    rel = get_secret("FORECAST_CACHE_PATH", "data/cache/forecast")
+    return (Path(__file__).parent.parent / rel).resolve()
+
+
+class ForecastCache:
+    """
+    Prognose-cache på disk, én JSON-fil per koordinat.
+
+    Filen skrives atomisk (temp-fil + replace), så flere prosesser kan dele
+    katalogen. Innlest innhold holdes i minnet til filens mtime endres.
+    """
+
+    def __init__(self, directory: Path | None = None):
+        self.directory = directory or _default_cache_dir()
+        self._memory: dict[Path, tuple[int, CachedForecast]] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, lat: float, lon: float) -> Path:
+        return self.directory / f"locationforecast_{lat:.4f}_{lon:.4f}.json"
+
+    def load(self, lat: float, lon: float) -> CachedForecast | None:
+        path = self.path_for(lat, lon)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            cached = self._memory.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+        try:
+            entry = CachedForecast.from_json(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError) as exc:
+            logger.warning("Prognose-cache-lesefeil (%s): %s", path, exc)
+            return None
+        with self._lock:
+            self._memory[path] = (mtime, entry)
+        return entry
+
+    def save(self, entry: CachedForecast) -> None:
+        path = self.path_for(entry.lat, entry.lon)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(json.dumps(entry.to_json()), encoding="utf-8")
+            tmp_path.replace(path)
+            mtime = path.stat().st_mtime_ns
+        except OSError as exc:
+            # Cache er en optimalisering; prognosen returneres uansett
+            logger.warning("Kunne ikke lagre prognose-cache (%s): %s", path, exc)
+            return
+        with self._lock:
+            self._memory[path] = (mtime, entry)
+
+
+_shared_cache: ForecastCache | None = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_forecast_cache() -> ForecastCache:
+    """Prosessdelt prognose-cache (katalog fra `FORECAST_CACHE_PATH`)."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ForecastCache()
+        return _shared_cache
+
+
 class ForecastClient:
     """Klient for MET locationforecast."""
 
     USER_AGENT = "snofokk-analyse/1.0 (github.com/toro68/snofokk-analyse)"
 
+    def __init__(self, transport: HttpTransport | None = None, cache: ForecastCache | None = None):
+        """
+        Initialiser klient.
+
+        Args:
+            transport: HTTP-transport (default: prosessens delte, se `get_transport`)
+            cache: Prognose-cache på disk (default: prosessens delte, se `get_forecast_cache`)
+        """
+        self.transport = transport or get_transport()
+        self.cache = cache or get_forecast_cache()
+
     def fetch_hourly_forecast(self, *, lat: float, lon: float, hours: int | None = None) -> list[ForecastPoint]:
-        """Hent timeprognose for koordinat."""
-        url = settings.api.met_forecast_url
-        timeout = settings.api.forecast_timeout_seconds
+        """Hent timeprognose for koordinat (fra cache til `Expires`, deretter betinget)."""
         horizon_hours = settings.api.forecast_hours if hours is None else max(1, int(hours))
+        # MET ber om maks 4 desimaler; samme avrunding gir én cache-fil per sted
+        lat, lon = round(lat, 4), round(lon, 4)
+
+        now_utc = datetime.now(UTC)
+        cached = self.cache.load(lat, lon)
+        if cached is None or not cached.is_fresh(now_utc):
+            # Samtidige forespørsler for samme sted deler ett kall mot MET
+            stale = cached
+            cached = get_single_flight().do(
+                f"forecast:{lat:.4f},{lon:.4f}",
+                lambda: self._refresh(lat, lon, stale, now_utc),
+            )
 
+        points = [p for p in cached.points if p.reference_time >= now_utc][:horizon_hours]
+        if not points:
+            raise ForecastClientError("Fant ingen fremtidige prognosepunkter")
+        return points
+
+    def _refresh(
+        self, lat: float, lon: float, cached: CachedForecast | None, now_utc: datetime
+    ) -> CachedForecast:
         params = {
-            "lat": f"{lat:.5f}",
-            "lon": f"{lon:.5f}",
+            "lat": f"{lat:.4f}",
+            "lon": f"{lon:.4f}",
         }
         headers = {
             "User-Agent": self.USER_AGENT,
             "Accept": "application/json",
         }
+        if cached is not None and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
 
         try:
-            response = requests.get(url, params=params, headers=headers, timeout=timeout)
+            response = self.transport.get(
+                settings.api.met_forecast_url,
+                params=params,
+                headers=headers,
+                timeout=settings.api.forecast_timeout_seconds,
+            )
             response.raise_for_status()
+            if cached is not None and response.status_code == 304:
+                # Uendret prognose: behold punktene, oppdater bare utløpstid
+                entry = CachedForecast(
+                    lat=lat,
+                    lon=lon,
+                    points=cached.points,
+                    expires=_expires(response, now_utc),
+                    fetched_at=now_utc,
+                    last_modified=cached.last_modified,
+                )
+                self.cache.save(entry)
+                return entry
             payload = response.json()
         except (requests.RequestException, ValueError) as exc:
             raise ForecastClientError(f"Kunne ikke hente prognose: {exc}") from exc
@@ -60,47 +253,75 @@ class ForecastClient:
         if not isinstance(timeseries, list) or not timeseries:
             raise ForecastClientError("Prognose inneholder ingen timeseries-data")
 
-        now_utc = datetime.now(UTC)
-        points: list[ForecastPoint] = []
-
-        for item in timeseries:
-            if len(points) >= horizon_hours:
-                break
+        last_modified = _header(response, "Last-Modified")
+        entry = CachedForecast(
+            lat=lat,
+            lon=lon,
+            points=_parse_timeseries(timeseries),
+            expires=_expires(response, now_utc),
+            fetched_at=now_utc,
+            last_modified=last_modified,
+        )
+        self.cache.save(entry)
+        return entry
 
-            time_raw = item.get("time")
-            if not time_raw:
-                continue
 
-            try:
-                ts = datetime.fromisoformat(str(time_raw).replace("Z", "+00:00"))
-                if ts.tzinfo is None:
-                    ts = ts.replace(tzinfo=UTC)
-                else:
-                    ts = ts.astimezone(UTC)
-            except ValueError:
-                continue
+def _parse_timeseries(timeseries: list[dict[str, Any]]) -> list[ForecastPoint]:
+    """Parse alle tidssteg (horisont og 'nå' filtreres ved bruk, ikke ved lagring)."""
+    points: list[ForecastPoint] = []
+    for item in timeseries:
+        time_raw = item.get("time")
+        if not time_raw:
+            continue
 
-            if ts < now_utc:
-                continue
+        try:
+            ts = datetime.fromisoformat(str(time_raw).replace("Z", "+00:00"))
+            if ts.tzinfo is None:
+                ts = ts.replace(tzinfo=UTC)
+            else:
+                ts = ts.astimezone(UTC)
+        except ValueError:
+            continue
 
-            data = item.get("data", {})
-            instant = data.get("instant", {}).get("details", {})
-            next_1h = data.get("next_1_hours", {}).get("details", {})
+        data = item.get("data", {})
+        instant = data.get("instant", {}).get("details", {})
+        next_1h = data.get("next_1_hours", {}).get("details", {})
 
-            points.append(
-                ForecastPoint(
-                    reference_time=ts,
-                    air_temperature=_safe_float(instant.get("air_temperature")),
-                    wind_speed=_safe_float(instant.get("wind_speed")),
-                    wind_gust=_safe_float(instant.get("wind_speed_of_gust")),
-                    precipitation_1h=_safe_float(next_1h.get("precipitation_amount")),
-                )
+        points.append(
+            ForecastPoint(
+                reference_time=ts,
+                air_temperature=_safe_float(instant.get("air_temperature")),
+                wind_speed=_safe_float(instant.get("wind_speed")),
+                wind_gust=_safe_float(instant.get("wind_speed_of_gust")),
+                precipitation_1h=_safe_float(next_1h.get("precipitation_amount")),
+                wind_from_direction=_safe_float(instant.get("wind_from_direction")),
+                relative_humidity=_safe_float(instant.get("relative_humidity")),
             )
+        )
+    points.sort(key=lambda p: p.reference_time)
+    return points
 
-        if not points:
-            raise ForecastClientError("Fant ingen fremtidige prognosepunkter")
 
-        return points
+def _header(response: Any, name: str) -> str | None:
+    try:
+        value = response.headers.get(name)
+    except AttributeError:
+        return None
+    return value if isinstance(value, str) and value else None
+
+
+def _expires(response: Any, now_utc: datetime) -> datetime:
+    """Utløpstid fra `Expires` (HTTP-dato), ellers standard-TTL fra config."""
+    raw = _header(response, "Expires")
+    if raw:
+        try:
+            expires = parsedate_to_datetime(raw)
+            if expires.tzinfo is None:
+                expires = expires.replace(tzinfo=UTC)
+            return expires.astimezone(UTC)
+        except (TypeError, ValueError):
+            logger.debug("Ugyldig Expires-header: %s", raw)
+    return now_utc + timedelta(seconds=settings.api.forecast_default_ttl_seconds)
 
 
 def _safe_float(value: Any) -> float | None:
@@ -6,22 +6,19 @@ Håndterer all kommunikasjon med Meteorologisk institutts Frost API.
 
 import json
 import logging
+import threading
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
-from functools import lru_cache
-from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import requests
-from tenacity import (
-    before_sleep_log,
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
 
 from src.config import get_secret, settings
+from src.http_transport import HttpTransport, get_transport
+from src.observation_store import ObservationStore
+from src.shared_cache import get_shared_cache
+from src.single_flight import get_single_flight
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +28,6 @@ logger = logging.getLogger(__name__)
 # reell måling (-1 cm). Negative dybder ellers er ugyldige og settes til NaN.
 SNOW_DEPTH_SENTINEL_BARE_GROUND = -1.0
 
-CACHE_FILE = Path(__file__).parent.parent / "data" / "cache" / "frost_weather_cache.json"
 def _get_cache_max_age_hours() -> float:
     try:
         return float(get_secret("FROST_CACHE_MAX_AGE_HOURS", "12"))
@@ -46,8 +42,8 @@ class FrostAPIError(Exception):
     """Custom exception for API-feil."""
 
 
-class _FrostAPIRetryableError(Exception):
-    """Internal exception used to trigger retries."""
+class FrostAPITransientError(FrostAPIError):
+    """Forbigående API-feil (rate limit, serverfeil, timeout) som kan prøves igjen senere."""
 
 
 @dataclass
@@ -99,6 +95,93 @@ class WeatherData:
             json.dump(data, f, indent=2, ensure_ascii=False, default=str)
 
 
+@dataclass
+class _ObservationFrame:
+    """Parset observasjonsramme som holdes mellom kall for delta-henting."""
+    covered_start: datetime
+    df: pd.DataFrame
+
+
+def _frost_iso(ts: datetime) -> str:
+    return ts.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def decode_observations(
+    data: dict,
+    column_mapping: dict[str, str] | None = None,
+    *,
+    time_column: str = "reference_time",
+    deduplicate: bool = True,
+) -> pd.DataFrame:
+    """
+    Dekod Frost JSON-LD (`data[].observations[]`) til en kolonnebasert DataFrame.
+
+    Én gjennomgang av payloaden skriver verdiene rett inn i forhåndsallokerte
+    float-buffere per kolonne (lengde = antall tidspunkt), og tidsstemplene
+    konverteres samlet til slutt. Ingen dict per rad og ingen `pd.to_datetime`
+    per rad, så flermåneders historikk dekodes med ett sett buffere.
+
+    Args:
+        data: JSON-respons fra Frost
+        column_mapping: Elementnavn -> kolonnenavn (default: ingen omdøping)
+        time_column: Navn på tidskolonnen
+        deduplicate: Behold første rad per tidspunkt
+
+    Returns:
+        DataFrame sortert på tid, UTC-aware tidskolonne først
+    """
+    items = data.get("data") or []
+    n = len(items)
+    if n == 0:
+        return pd.DataFrame()
+
+    mapping = column_mapping or {}
+    times: list[str] = [""] * n
+    columns: dict[str, np.ndarray] = {}
+
+    for i, item in enumerate(items):
+        times[i] = item["referenceTime"]
+        for observation in item.get("observations", ()):
+            element_id = observation["elementId"]
+            col = mapping.get(element_id, element_id)
+            buf = columns.get(col)
+            if buf is None:
+                buf = columns[col] = np.full(n, np.nan)
+            value = observation.get("value")
+            if value is None:
+                continue
+            try:
+                buf[i] = value
+            except (TypeError, ValueError):
+                # Ikke-numerisk element: behold kolonnen som objekt
+                if buf.dtype != object:
+                    buf = columns[col] = buf.astype(object)
+                buf[i] = value
+
+    df = pd.DataFrame({time_column: pd.to_datetime(times, utc=True, format="ISO8601"), **columns})
+    df = df.sort_values(time_column, kind="stable")
+    if deduplicate:
+        df = df.drop_duplicates(time_column)
+    return df.reset_index(drop=True)
+
+
+def aggregate_10m_to_hourly(df_10m: pd.DataFrame) -> pd.DataFrame:
+    """Slå sammen PT10M-rader til timerader (siste verdi i hver time)."""
+    df_10m = df_10m.copy()
+    df_10m["reference_time"] = pd.to_datetime(df_10m["reference_time"], utc=True, errors="coerce")
+    df_10m = df_10m.dropna(subset=["reference_time"])
+    df_10m["reference_hour"] = df_10m["reference_time"].dt.floor("h")
+
+    agg_cols = [c for c in df_10m.columns if c not in ("reference_time", "reference_hour")]
+    return (
+        df_10m.sort_values("reference_time")
+        .groupby("reference_hour")[agg_cols]
+        .last()
+        .reset_index()
+        .rename(columns={"reference_hour": "reference_time"})
+    )
+
+
 class FrostClient:
     """
     Håndterer all kommunikasjon med Frost API.
@@ -119,15 +202,28 @@ class FrostClient:
         # dew_point_temperature and surface_temperature need no remapping
     }
 
-    def __init__(self, station_id: str | None = None):
+    def __init__(
+        self,
+        station_id: str | None = None,
+        store: ObservationStore | None = None,
+        transport: HttpTransport | None = None,
+    ):
         """
         Initialiser klient.
 
         Args:
             station_id: Overstyr standard stasjon
+            store: Lokalt observasjonslager for fallback (default: stasjonens lager)
+            transport: HTTP-transport (default: prosessens delte, se `get_transport`)
         """
         self.station_id = station_id or settings.station.station_id
         self._validate_config()
+        self.store = store or ObservationStore(self.station_id)
+        self.transport = transport or get_transport()
+        # Delta-henting: siste parsede ramme per (oppløsning, elementsett).
+        # Klienten deles mellom Streamlit-sesjoner (cache_resource), derav låsen.
+        self._observation_frames: dict[tuple[str, tuple[str, ...]], _ObservationFrame] = {}
+        self._frames_lock = threading.Lock()
 
     def _validate_config(self) -> None:
         """Valider at nødvendig konfigurasjon er på plass."""
@@ -157,7 +253,8 @@ class FrostClient:
         self,
         start_time: datetime,
         end_time: datetime,
-        elements: list[str] | None = None
+        elements: list[str] | None = None,
+        incremental: bool = False,
     ) -> WeatherData:
         """
         Hent data for spesifikk periode.
@@ -166,6 +263,8 @@ class FrostClient:
             start_time: Start av periode
             end_time: Slutt av periode
             elements: Spesifikke elementer å hente (default: alle)
+            incremental: Gjenbruk allerede hentede observasjoner og be Frost kun om
+                halen etter siste lagrede `reference_time` (se `_fetch_incremental`)
 
         Returns:
             WeatherData med målinger
@@ -181,39 +280,29 @@ class FrostClient:
         pt10m_elements = [e for e in elements if "PT10M" in e]
         hourly_elements = [e for e in elements if e not in pt10m_elements]
 
+        def _fetch(element_group: list[str], timeresolutions: str) -> pd.DataFrame:
+            if incremental:
+                return self._fetch_incremental(
+                    start_time, end_time, tuple(element_group), timeresolutions
+                )
+            return self._fetch_observations(
+                _frost_iso(start_time),
+                _frost_iso(end_time),
+                tuple(element_group),
+                timeresolutions=timeresolutions
+            )
+
         try:
             df_hourly = pd.DataFrame()
             if hourly_elements:
-                df_hourly = self._fetch_observations(
-                    start_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                    end_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                    tuple(hourly_elements),
-                    timeresolutions="PT1H"
-                )
+                df_hourly = _fetch(hourly_elements, "PT1H")
 
             df_10m = pd.DataFrame()
             if pt10m_elements:
-                df_10m = self._fetch_observations(
-                    start_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                    end_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                    tuple(pt10m_elements),
-                    timeresolutions="PT10M"
-                )
+                df_10m = _fetch(pt10m_elements, "PT10M")
 
             if not df_10m.empty:
-                df_10m = df_10m.copy()
-                df_10m["reference_time"] = pd.to_datetime(df_10m["reference_time"], utc=True, errors="coerce")
-                df_10m = df_10m.dropna(subset=["reference_time"])
-                df_10m["reference_hour"] = df_10m["reference_time"].dt.floor("H")
-
-                agg_cols = [c for c in df_10m.columns if c not in ("reference_time", "reference_hour")]
-                df_10m_hourly = (
-                    df_10m.sort_values("reference_time")
-                    .groupby("reference_hour")[agg_cols]
-                    .last()
-                    .reset_index()
-                    .rename(columns={"reference_hour": "reference_time"})
-                )
+                df_10m_hourly = aggregate_10m_to_hourly(df_10m)
 
                 if df_hourly.empty:
                     df = df_10m_hourly
@@ -225,15 +314,15 @@ class FrostClient:
             else:
                 df = df_hourly
         except FrostAPIError as exc:
-            cached = self._load_cache()
+            cached = self._load_cache(start_time, end_time)
             if cached and not cached.is_empty:
-                logger.warning("Frost API-feil (%s). Bruker cache %s", exc, CACHE_FILE)
+                logger.warning("Frost API-feil (%s). Bruker lokalt lager %s", exc, self.store.station_dir)
                 return cached
             raise
         except (ValueError, TypeError, KeyError) as exc:
-            cached = self._load_cache()
+            cached = self._load_cache(start_time, end_time)
             if cached and not cached.is_empty:
-                logger.warning("Uventet feil (%s). Bruker cache %s", exc, CACHE_FILE)
+                logger.warning("Uventet feil (%s). Bruker lokalt lager %s", exc, self.store.station_dir)
                 return cached
             raise
 
@@ -281,30 +370,58 @@ class FrostClient:
             logger.warning("Kunne ikke hente elementer: %s", e)
             return []
 
-    @retry(
-        reraise=True,
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=0.5, min=0.5, max=6),
-        retry=retry_if_exception_type(_FrostAPIRetryableError),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-    )
-    def _request_with_retry(self, url: str, *, params: dict[str, str]) -> requests.Response:
+    def fetch_chunk(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        elements: tuple[str, ...],
+        timeresolutions: str = "PT1H",
+        *,
+        retry: bool = True,
+    ) -> pd.DataFrame:
+        """
+        Ett observasjonskall mot Frost, uten cache, lokalt lager eller sammenslåing.
+
+        Brukes av backfill (`src/backfill.py`), som skriver rammen til lageret selv.
+
+        Args:
+            start_time: Start av perioden
+            end_time: Slutt av perioden
+            elements: Frost-elementer
+            timeresolutions: Oppløsning (PT1H eller PT10M, ikke aggregert)
+            retry: Bruk transportens retry; med False gjøres ett forsøk, og
+                kalleren står for backoff
+
+        Returns:
+            DataFrame med observasjoner (tom hvis Frost ikke har data)
+
+        Raises:
+            FrostAPITransientError: 429/5xx, timeout eller forbindelsesfeil
+            FrostAPIError: Andre feil fra Frost
+        """
+        return self._perform_observation_request(
+            _frost_iso(start_time), _frost_iso(end_time), elements, timeresolutions, retry=retry
+        )
+
+    def _request_with_retry(
+        self, url: str, *, params: dict[str, str], retry: bool = True
+    ) -> requests.Response:
+        """GET mot Frost med transportens retry; nettverksfeil etter siste forsøk er forbigående."""
         try:
-            response = requests.get(
+            return self.transport.get(
                 url,
                 params=params,
                 auth=(settings.api.client_id, ""),
                 timeout=settings.api.timeout,
+                retry=retry,
             )
         except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
-            raise _FrostAPIRetryableError(str(e)) from e
-
-        if response.status_code in {429, 500, 502, 503, 504}:
-            raise _FrostAPIRetryableError(f"Frost API svarte {response.status_code}")
+            raise FrostAPITransientError("Midlertidig feil mot Frost API. Prøv igjen om litt.") from e
 
-        return response
+    @property
+    def _cache_namespace(self) -> str:
+        return f"frost.{self.station_id}"
 
-    @lru_cache(maxsize=100)  # noqa: B019 - bevisst caching
     def _fetch_observations(
         self,
         start_iso: str,
@@ -313,7 +430,7 @@ class FrostClient:
         timeresolutions: str = "PT1H"
     ) -> pd.DataFrame:
         """
-        Hent observasjoner fra API (cached).
+        Hent observasjoner fra API (via den delte cachen, se `src/shared_cache.py`).
 
         Args:
             start_iso: ISO-format start
@@ -323,6 +440,92 @@ class FrostClient:
         Returns:
             DataFrame med observasjoner
         """
+        return get_shared_cache().get_or_fetch(
+            self._cache_namespace,
+            (start_iso, end_iso, elements, timeresolutions),
+            lambda: self._request_observations(start_iso, end_iso, elements, timeresolutions),
+            ttl_seconds=settings.api.streamlit_cache_ttl_seconds,
+        )
+
+    def _fetch_incremental(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        elements: tuple[str, ...],
+        timeresolutions: str = "PT1H"
+    ) -> pd.DataFrame:
+        """
+        Hent observasjoner med delta-henting mot forrige parsede ramme.
+
+        Dekker lagret ramme starten av perioden, spør vi Frost kun om
+        `referencetime` fra siste lagrede måling og frem til `end_time`.
+        Siste lagrede time hentes på nytt fordi Frost kan etterlevere
+        elementer for den, og nye rader erstatter overlappende. Rammen
+        trimmes til valgt periode slik at minnebruken følger vinduet.
+        """
+        key = (timeresolutions, elements)
+        with self._frames_lock:
+            stored = self._observation_frames.get(key)
+
+        if stored is None or stored.df.empty or stored.covered_start > start_time:
+            df = self._request_observations(
+                _frost_iso(start_time), _frost_iso(end_time), elements, timeresolutions
+            )
+        else:
+            last_time = stored.df["reference_time"].iloc[-1].to_pydatetime()
+            df = stored.df
+            if last_time < end_time:
+                tail = self._request_observations(
+                    _frost_iso(last_time), _frost_iso(end_time), elements, timeresolutions
+                )
+                if not tail.empty:
+                    head = stored.df[stored.df["reference_time"] < tail["reference_time"].iloc[0]]
+                    df = pd.concat([head, tail], ignore_index=True)
+                    df = df.sort_values("reference_time").drop_duplicates("reference_time", keep="last")
+                logger.info(
+                    "Delta-henting %s (%s): %d nye rader etter %s",
+                    self.station_id, timeresolutions, len(tail), _frost_iso(last_time)
+                )
+
+        if df.empty:
+            return df
+
+        df = df[df["reference_time"] >= start_time].reset_index(drop=True)
+        with self._frames_lock:
+            self._observation_frames[key] = _ObservationFrame(covered_start=start_time, df=df)
+
+        return df[df["reference_time"] <= end_time].reset_index(drop=True)
+
+    def _request_observations(
+        self,
+        start_iso: str,
+        end_iso: str,
+        elements: tuple[str, ...],
+        timeresolutions: str = "PT1H"
+    ) -> pd.DataFrame:
+        """
+        Utfør observasjonskallet mot Frost (uten cache).
+
+        Samtidige kall med samme stasjon, vindu og elementer (f.eks. flere
+        økter etter TTL-utløp) slås sammen til ett HTTP-kall; hver kaller
+        får sin egen kopi av rammen.
+        """
+        key = f"frost:{self.station_id}:{timeresolutions}:{start_iso}/{end_iso}:{','.join(elements)}"
+        return get_single_flight().do(
+            key,
+            lambda: self._perform_observation_request(start_iso, end_iso, elements, timeresolutions),
+            share=pd.DataFrame.copy,
+        )
+
+    def _perform_observation_request(
+        self,
+        start_iso: str,
+        end_iso: str,
+        elements: tuple[str, ...],
+        timeresolutions: str,
+        *,
+        retry: bool = True,
+    ) -> pd.DataFrame:
         params = {
             'sources': self.station_id,
             'elements': ','.join(elements),
@@ -333,10 +536,7 @@ class FrostClient:
         logger.info("Henter data: %s, %s til %s", self.station_id, start_iso, end_iso)
 
         try:
-            try:
-                response = self._request_with_retry(settings.api.base_url, params=params)
-            except _FrostAPIRetryableError as e:
-                raise FrostAPIError("Midlertidig feil mot Frost API. Prøv igjen om litt.") from e
+            response = self._request_with_retry(settings.api.base_url, params=params, retry=retry)
 
             # Håndter spesifikke feilkoder
             if response.status_code == 401:
@@ -350,9 +550,9 @@ class FrostClient:
                 logger.warning("Ingen data for perioden %s til %s", start_iso, end_iso)
                 return pd.DataFrame()
             elif response.status_code == 429:
-                raise FrostAPIError("Rate limit fra Frost API (429)")
+                raise FrostAPITransientError("Rate limit fra Frost API (429)")
             elif 500 <= response.status_code <= 599:
-                raise FrostAPIError(f"Serverfeil fra Frost API ({response.status_code})")
+                raise FrostAPITransientError(f"Serverfeil fra Frost API ({response.status_code})")
 
             response.raise_for_status()
 
@@ -375,29 +575,9 @@ class FrostClient:
             logger.warning("Ingen data i API-respons")
             return pd.DataFrame()
 
-        records = []
-        for obs in data['data']:
-            # utc=True ensures timezone-aware timestamps; avoids TypeError in
-            # downstream comparisons against UTC-aware datetimes.
-            record = {'reference_time': pd.to_datetime(obs['referenceTime'], utc=True)}
-
-            for observation in obs['observations']:
-                element_id = observation['elementId']
-                value = observation['value']
-
-                # Normaliser kolonnenavn
-                col_name = self.COLUMN_MAPPING.get(element_id, element_id)
-                record[col_name] = value
-
-            records.append(record)
-
-        if not records:
-            return pd.DataFrame()
-
-        df = pd.DataFrame(records)
-        df = df.sort_values('reference_time')
-        df = df.drop_duplicates('reference_time')
-        df = df.reset_index(drop=True)
+        # UTC-aware tidsstempler; unngår TypeError ved sammenligning mot
+        # UTC-aware datetimes nedstrøms.
+        df = decode_observations(data, self.COLUMN_MAPPING)
         df = self._normalize_snow_depth(df)
 
         logger.info("Parset %d observasjoner med %d kolonner", len(df), len(df.columns))
@@ -423,69 +603,51 @@ class FrostClient:
         return df
 
     def clear_cache(self) -> None:
-        """Tøm API-cache."""
-        self._fetch_observations.cache_clear()
+        """Tøm API-cache (stasjonens navnerom i den delte cachen og delta-rammene)."""
+        get_shared_cache().invalidate(self._cache_namespace)
+        with self._frames_lock:
+            self._observation_frames.clear()
         logger.info("Cache tømt")
 
     def _save_cache(self, weather_data: WeatherData) -> None:
-        """Lagre siste vellykkede værdata til disk."""
+        """Legg siste vellykkede værdata inn i det lokale observasjonslageret."""
         try:
-            CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-            weather_data.to_json(str(CACHE_FILE))
+            self.store.append(weather_data.df)
         except (OSError, ValueError, TypeError) as exc:
             logger.warning("Kunne ikke lagre cache: %s", exc)
 
-    def _load_cache(self, max_age_hours: float | None = None) -> WeatherData | None:
-        """Last cached værdata fra disk."""
+    def _load_cache(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        max_age_hours: float | None = None,
+    ) -> WeatherData | None:
+        """Les perioden fra det lokale observasjonslageret (fallback ved API-feil)."""
         try:
-            if not CACHE_FILE.exists():
+            written_at = self.store.last_modified()
+            if written_at is None:
                 return None
 
-            with open(CACHE_FILE, encoding="utf-8") as f:
-                data = json.load(f)
-
-            observations = data.get("observations", [])
-            if not observations:
+            if max_age_hours is None:
+                max_age_hours = CACHE_MAX_AGE_HOURS
+            cache_age_hours = (datetime.now(UTC) - written_at).total_seconds() / 3600
+            if cache_age_hours > max_age_hours:
                 return None
 
-            df = pd.DataFrame(observations)
-            if "reference_time" in df.columns:
-                df["reference_time"] = pd.to_datetime(df["reference_time"], utc=True, errors="coerce")
-                df = df.dropna(subset=["reference_time"])
-                df = df.sort_values("reference_time").drop_duplicates("reference_time").reset_index(drop=True)
-
+            df = self.store.read(start_time, end_time)
             df = self._normalize_snow_depth(df)
-
             if df.empty:
                 return None
 
-            metadata = data.get("metadata", {})
-            exported_at_raw = metadata.get("exported_at")
-            exported_at = pd.to_datetime(exported_at_raw, utc=True, errors="coerce")
-            if max_age_hours is None:
-                max_age_hours = CACHE_MAX_AGE_HOURS
-            cache_age_hours = None
-            if not pd.isna(exported_at):
-                cache_age_hours = (datetime.now(UTC) - exported_at.to_pydatetime()).total_seconds() / 3600
-                if cache_age_hours > max_age_hours:
-                    return None
-            start_ts = pd.to_datetime(metadata.get("start_time"), utc=True, errors="coerce")
-            end_ts = pd.to_datetime(metadata.get("end_time"), utc=True, errors="coerce")
-
-            start_time = start_ts.to_pydatetime() if not pd.isna(start_ts) else df["reference_time"].iloc[0].to_pydatetime()
-            end_time = end_ts.to_pydatetime() if not pd.isna(end_ts) else df["reference_time"].iloc[-1].to_pydatetime()
-
-            elements_fetched = metadata.get("elements") or [c for c in df.columns if c != "reference_time"]
-
             return WeatherData(
                 df=df,
-                station_id=metadata.get("station_id", self.station_id),
+                station_id=self.station_id,
                 start_time=start_time,
                 end_time=end_time,
-                elements_fetched=elements_fetched,
+                elements_fetched=[c for c in df.columns if c != "reference_time"],
                 source="cache",
                 cache_age_hours=cache_age_hours,
             )
-        except (OSError, ValueError, TypeError, json.JSONDecodeError) as exc:
+        except (OSError, ValueError, TypeError) as exc:
             logger.warning("Kunne ikke lese cache: %s", exc)
             return None
@@ -10,7 +10,6 @@ Fire varslingskategorier for brøytemannskaper og hytteeiere:
 
 # pylint: disable=too-many-lines,wrong-import-position,line-too-long
 
-import json
 import sys
 from pathlib import Path
 from typing import Any
@@ -21,13 +20,20 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import html
 import logging
 import math
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 
-import matplotlib.pyplot as plt
 import pandas as pd
 import pydeck as pdk  # type: ignore[import-untyped]
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
+from src.analysis_snapshot import AnalysisSnapshot, SnapshotRefresher
 from src.analyzers import (
     AnalysisResult,
     FreshSnowAnalyzer,
@@ -43,16 +49,22 @@ from src.frost_client import FrostAPIError, FrostClient
 from src.logging_config import configure_logging
 from src.netatmo_client import NetatmoClient, NetatmoStation
 from src.operational_logger import (
-    _default_log_path,
-    _default_state_path,
     _parse_bool,
+    get_operational_store,
+    get_operational_writer,
     log_medium_high_alerts,
 )
 from src.plowing_service import (
     PlowingInfo,
+    apply_maintenance_suppression,
+    describe_maintenance,
     get_plowing_info,
     should_suppress_alerts,
 )
+from src.projection import project_risk
+from src.shared_cache import get_shared_cache, shared_cached
+from src.single_flight import get_single_flight
+from src.source_fanout import SourceFanout, SourceResult
 from src.visualizations import WeatherPlots
 
 configure_logging()
@@ -497,10 +509,17 @@ def apply_data_quality_guard(
 def apply_alert_stability(
     results: dict[str, AnalysisResult],
     reference_time_utc: datetime,
+    state: dict[str, dict[str, str]] | None = None,
 ) -> dict[str, AnalysisResult]:
-    """Hold på høyere nivå kort tid ved nedgradering for å redusere varselstøy."""
+    """Hold på høyere nivå kort tid ved nedgradering for å redusere varselstøy.
+
+    Args:
+        state: Tilstand mellom kjøringer (None: øktens `st.session_state`)
+    """
     hold_window = timedelta(minutes=settings.dashboard.alert_downgrade_hold_minutes)
-    state: dict[str, dict[str, str]] = st.session_state.setdefault("alert_stability_state", {})
+    use_session = state is None
+    if state is None:
+        state = st.session_state.setdefault("alert_stability_state", {})
     stabilized: dict[str, AnalysisResult] = {}
 
     for name, result in results.items():
@@ -547,7 +566,8 @@ def apply_alert_stability(
                 "changed_at": reference_time_utc.isoformat(),
             }
 
-    st.session_state["alert_stability_state"] = state
+    if use_session:
+        st.session_state["alert_stability_state"] = state
     return stabilized
 
 
@@ -688,83 +708,38 @@ def render_operational_kpis() -> None:
         if caption:
             st.caption(caption)
 
-    log_rel = get_secret("OPERATIONAL_LOG_PATH", "data/logs/operational_alerts.csv")
-    state_rel = get_secret("OPERATIONAL_LOG_STATE_PATH", "data/logs/operational_alerts_state.json")
     enabled = _parse_bool(get_secret("OPERATIONAL_LOG_ENABLED", "true"), default=True)
-
-    log_path = _default_log_path()
-    state_path = _default_state_path()
-
     if not enabled:
         st.info("Operasjonell logging er slått av (OPERATIONAL_LOG_ENABLED=false).")
         st.caption("Aktiver logging for å få KPI-er over tid.")
         return
 
-    if not log_path.exists():
-        state_entries = 0
-        if state_path.exists():
-            try:
-                raw = json.loads(state_path.read_text(encoding="utf-8"))
-                if isinstance(raw, dict):
-                    state_entries = len(raw)
-            except (OSError, ValueError, TypeError):
-                state_entries = 0
-
-        _render_empty_state(
-            "Ingen MEDIUM/HIGH-varsler logget ennå.",
-            (
-                f"Forventer logg på: {log_rel}. Panelet viser 0-verdier til første relevante varsel logges."
-            ),
-        )
-        if state_entries > 0:
-            st.caption(f"Det finnes dedupliseringsstate med {state_entries} nøkler i {state_rel}.")
-        return
-
     try:
-        df = pd.read_csv(log_path)
-    except (OSError, ValueError, pd.errors.EmptyDataError):
+        store = get_operational_store()
+        kpis = store.kpis(since=datetime.now(UTC) - timedelta(days=14))
+        has_rows = kpis.total > 0 or not store.is_empty()
+    except sqlite3.Error:
         _render_empty_state("Kunne ikke lese operasjonell logg.")
         return
 
-    if "logged_at_utc" not in df.columns:
-        _render_empty_state("Operasjonell logg mangler nødvendige kolonner for KPI-beregning.")
-        return
-
-    if df.empty:
+    if not has_rows:
         _render_empty_state(
             "Ingen MEDIUM/HIGH-varsler logget ennå.",
-            "Loggeren er initialisert og vil fylle KPI-panelet når første relevante varsel oppstår.",
+            (
+                f"Forventer logg i: {store.path.name}. Panelet viser 0-verdier til første relevante varsel logges."
+            ),
         )
         return
 
-    logged = pd.to_datetime(df["logged_at_utc"], errors="coerce", utc=True)
-    recent_mask = logged >= (datetime.now(UTC) - timedelta(days=14))
-    recent = df.loc[recent_mask].copy()
-
-    if recent.empty:
+    if kpis.total == 0:
         _render_empty_state("Ingen varsler logget siste 14 dager.")
         return
 
-    total = len(recent)
-    high_share = float((recent["risk_level"] == "HIGH").sum()) / total * 100 if "risk_level" in recent.columns else 0.0
-    suppressed_share = (
-        pd.to_numeric(recent["suppressed_by_maintenance"], errors="coerce").fillna(0).astype(int).clip(0, 1).mean() * 100
-        if "suppressed_by_maintenance" in recent.columns
-        else 0.0
-    )
-
-    maint_hours = pd.to_numeric(recent["maintenance_hours_since"] if "maintenance_hours_since" in recent.columns else pd.Series(dtype=float), errors="coerce")
-    tp_proxy = int((maint_hours <= 6).sum())
-    fp_proxy = int(((maint_hours > 24) | maint_hours.isna()).sum())
-    precision_proxy = (tp_proxy / (tp_proxy + fp_proxy) * 100) if (tp_proxy + fp_proxy) > 0 else 0.0
-
-    maintenance_events = recent.get("maintenance_last_utc")
-    if maintenance_events is not None:
-        unique_events = maintenance_events.dropna().astype(str).unique()
-        denom = len(unique_events)
-        recall_proxy = (tp_proxy / denom * 100) if denom > 0 else 0.0
-    else:
-        recall_proxy = 0.0
+    total = kpis.total
+    high_share = kpis.high_share_pct
+    suppressed_share = kpis.suppressed_share_pct
+    precision_proxy = kpis.precision_pct
+    recall_proxy = kpis.recall_pct
 
     _render_metrics(
         str(total),
@@ -778,6 +753,38 @@ def render_operational_kpis() -> None:
         "Presisjon/recall er proxy basert på vedlikeholdstid, ikke full sannhetstabell."
     )
 
+    writer = get_operational_writer().stats()
+    st.caption(
+        f"Skrivekø: {writer.queue_depth} i kø, {writer.written} skrevet, "
+        f"siste flush {writer.last_flush_ms:.1f} ms (maks {writer.max_flush_ms:.1f} ms)"
+        + (f", {writer.dropped} forkastet." if writer.dropped else ".")
+    )
+
+    cache = get_shared_cache().stats()
+    st.caption(
+        f"Delt cache ({cache.backend}): {cache.entries} oppføringer, {cache.bytes / 1e6:.1f} MB, "
+        f"treff {cache.hit_rate:.0%} ({cache.stale_hits} gamle), {cache.misses} bom, "
+        f"{cache.evictions} utkastet."
+    )
+
+    flights = get_single_flight()
+    fetches, coalesced = flights.totals()
+    in_flight = flights.in_flight()
+    st.caption(
+        f"Eksterne kall: {fetches} hentinger, {coalesced} sammenslått med pågående kall, "
+        f"{len(in_flight)} pågår nå ({sum(in_flight.values())} venter)."
+    )
+
+    if settings.snapshot.enabled:
+        refresher = get_snapshot_refresher().stats()
+        last = refresher.last_refresh_at.strftime("%H:%M UTC") if refresher.last_refresh_at else "aldri"
+        st.caption(
+            f"Bakgrunnsanalyse: {refresher.refreshes} oppfriskninger, {refresher.failures} feilet, "
+            f"siste {last} ({refresher.last_build_seconds:.1f}s)"
+            + (f", feil: {refresher.last_error}" if refresher.last_error else "")
+            + "."
+        )
+
 
 @st.cache_resource
 def get_forecast_client() -> ForecastClient:
@@ -785,7 +792,7 @@ def get_forecast_client() -> ForecastClient:
     return ForecastClient()
 
 
-@st.cache_data(ttl=settings.api.streamlit_cache_ttl_seconds)
+@shared_cached("forecast", ttl_seconds=settings.api.streamlit_cache_ttl_seconds)
 def fetch_forecast_cached(lat: float, lon: float, hours: int) -> pd.DataFrame:
     """Hent prognosedata med cache."""
     client = get_forecast_client()
@@ -799,24 +806,73 @@ def fetch_forecast_cached(lat: float, lon: float, hours: int) -> pd.DataFrame:
                 "wind_speed": p.wind_speed,
                 "max_wind_gust": p.wind_gust,
                 "precipitation_1h": p.precipitation_1h,
+                "wind_from_direction": p.wind_from_direction,
+                "relative_humidity": p.relative_humidity,
             }
         )
     return pd.DataFrame(rows)
 
 
-def render_forecast_section() -> None:
-    """Vis korttidsprognose for neste timer."""
+def render_projected_risk(observed: pd.DataFrame, forecast_df: pd.DataFrame) -> None:
+    """Vis projisert risiko per analysator (observasjon + prognose, se `src/projection.py`)."""
+    projection = project_risk(observed, forecast_df)
+    if projection is None:
+        st.caption("Projisert risiko krever ferske observasjoner rett før prognosen.")
+        return
+
+    st.markdown("**Projisert risiko**")
+    local_tz = datetime.now().astimezone().tzinfo
+    lines = []
+    for name in projection.timeline["analyzer"].unique():
+        warning = projection.first_warning(name)
+        if warning is None:
+            lines.append(f"{name}: {RiskLevel(projection.peak(name)).norwegian} hele perioden")
+            continue
+        ts, level, scenario = warning
+        lines.append(
+            f"{name}: {RiskLevel(level).norwegian} fra kl. {ts.tz_convert(local_tz):%H:%M} ({scenario})"
+        )
+    st.caption(" • ".join(lines))
+
+    with st.expander("Projisert risiko per time"):
+        wide = projection.wide().map(lambda value: RiskLevel(value).norwegian)
+        wide.index = wide.index.tz_convert(local_tz).strftime("%d.%m %H:%M")
+        st.dataframe(wide, width="stretch")
+        st.caption(
+            "Analysatorene kjøres over observert historikk + MET-prognose. Snødybde holdes fast, "
+            "bakketemperatur følger lufttemperatur med siste observerte avvik."
+        )
+
+
+def render_forecast_section(forecast: SourceResult | None = None, observed: pd.DataFrame | None = None) -> None:
+    """Vis korttidsprognose for neste timer.
+
+    Args:
+        forecast: Resultat fra parallell henting (None: hent nå)
+        observed: Observert værdata; gir projisert risiko når den slutter rett før prognosen
+    """
     horizon_hours = max(1, int(settings.api.forecast_hours))
     st.subheader(f"Prognose neste {horizon_hours} timer")
-    try:
-        forecast_df = fetch_forecast_cached(
-            settings.station.lat,
-            settings.station.lon,
-            horizon_hours,
-        )
-    except ForecastClientError as e:
-        st.info(f"Prognose utilgjengelig: {e}")
+    if forecast is None:
+        try:
+            forecast_df = fetch_forecast_cached(
+                settings.station.lat,
+                settings.station.lon,
+                horizon_hours,
+            )
+        except ForecastClientError as e:
+            st.info(f"Prognose utilgjengelig: {e}")
+            return
+    elif forecast.timed_out:
+        st.info(f"Prognose utilgjengelig: MET svarte ikke innen {settings.dashboard.forecast_timeout_seconds:.0f}s")
+        return
+    elif isinstance(forecast.error, ForecastClientError):
+        st.info(f"Prognose utilgjengelig: {forecast.error}")
         return
+    elif forecast.error is not None:
+        raise forecast.error
+    else:
+        forecast_df = forecast.value
 
     if forecast_df is None or forecast_df.empty:
         st.info("Ingen prognosedata tilgjengelig akkurat nå.")
@@ -840,14 +896,27 @@ def render_forecast_section() -> None:
     with col3:
         st.metric("Nedbør sum", f"{precip_series.sum():.1f} mm")
 
-    fig = WeatherPlots.create_compact_plot(forecast_df, title="Prognose: temperatur, vind og nedbør")
-    st.pyplot(fig)
-    plt.close(fig)
+    st.image(
+        WeatherPlots.render_png("compact", forecast_df, title="Prognose: temperatur, vind og nedbør"),
+        width="stretch",
+    )
     st.caption(f"Kilde: MET Locationforecast (kompakt prognose, horisont {horizon_hours}t)")
 
+    if observed is not None:
+        render_projected_risk(observed, forecast_df)
+
+
+WEATHER_GRAPHS = (
+    "snow_depth", "precip", "temperature", "wind_chill", "wind", "wind_direction", "accumulated_precip",
+)
+
+
+def render_weather_graphs(df: pd.DataFrame, charts: Mapping[str, bytes] | None = None) -> None:
+    """Vis forenklet grafoppsett med færre faner og tydeligere grupperinger.
 
-def render_weather_graphs(df: pd.DataFrame) -> None:
-    """Vis forenklet grafoppsett med færre faner og tydeligere grupperinger."""
+    Args:
+        charts: Ferdig rendrede grafer (fra snapshot); manglende rendres nå
+    """
     st.subheader("Værgrafer")
     summary_tab, temp_tab, wind_tab, detail_tab = st.tabs([
         "Snø og nedbør",
@@ -855,66 +924,55 @@ def render_weather_graphs(df: pd.DataFrame) -> None:
         "Vind",
         "Detaljer",
     ])
+    graphs = dict(charts or {})
+    if not all(name in graphs for name in WEATHER_GRAPHS):
+        graphs = dict(zip(WEATHER_GRAPHS, WeatherPlots.render_many(df, WEATHER_GRAPHS), strict=True))
 
     with summary_tab:
         col1, col2 = st.columns(2)
         with col1:
-            fig = WeatherPlots.create_snow_depth_plot(df)
-            st.pyplot(fig)
+            st.image(graphs["snow_depth"], width="stretch")
             st.caption(f"Nysnø vises som endring siste {settings.fresh_snow.lookback_hours} timer")
-            plt.close(fig)
         with col2:
             slaps_precip_scale = max(settings.slaps.precipitation_accum_hours, 1) / 12.0
             slaps_precip_threshold = settings.slaps.precipitation_12h_min * slaps_precip_scale
-            fig = WeatherPlots.create_precip_plot(df)
-            st.pyplot(fig)
+            st.image(graphs["precip"], width="stretch")
             st.caption(
                 f"{settings.slaps.precipitation_accum_hours}t akkumulert linje og slaps-terskel "
                 f"({slaps_precip_threshold:.1f} mm)"
             )
-            plt.close(fig)
 
     with temp_tab:
         col1, col2 = st.columns(2)
         with col1:
-            fig = WeatherPlots.create_temperature_plot(df)
-            st.pyplot(fig)
+            st.image(graphs["temperature"], width="stretch")
             st.caption(f"Duggpunkt < {settings.fresh_snow.dew_point_max:.0f}°C: Nedbør faller som snø")
-            plt.close(fig)
         with col2:
-            fig = WeatherPlots.create_wind_chill_plot(df)
-            st.pyplot(fig)
+            st.image(graphs["wind_chill"], width="stretch")
             st.caption(
                 f"Vindkjøling advarsel/kritisk: {settings.snowdrift.wind_chill_warning:.0f}°C / "
                 f"{settings.snowdrift.wind_chill_critical:.0f}°C"
             )
-            plt.close(fig)
 
     with wind_tab:
         col1, col2 = st.columns(2)
         with col1:
-            fig = WeatherPlots.create_wind_plot(df)
-            st.pyplot(fig)
+            st.image(graphs["wind"], width="stretch")
             st.caption(
                 f"Markering når vindkast overstiger {settings.snowdrift.wind_gust_warning:.0f} m/s"
             )
-            plt.close(fig)
         with col2:
-            fig = WeatherPlots.create_wind_direction_plot(df)
-            st.pyplot(fig)
+            st.image(graphs["wind_direction"], width="stretch")
             st.caption(
                 f"SE-S ({settings.snowdrift.critical_wind_dir_min:.0f}-{settings.snowdrift.critical_wind_dir_max:.0f}°) "
                 "er kritisk retning for snøfokk"
             )
-            plt.close(fig)
 
     with detail_tab:
         col1, col2 = st.columns(2)
         with col1:
-            fig = WeatherPlots.create_accumulated_precip_plot(df)
-            st.pyplot(fig)
+            st.image(graphs["accumulated_precip"], width="stretch")
             st.caption("Total nedbør i valgt periode")
-            plt.close(fig)
         with col2:
             display_cols = [
                 'reference_time', 'air_temperature', 'surface_temperature',
@@ -1062,16 +1120,394 @@ def get_frost_client() -> FrostClient:
     return FrostClient()
 
 
-@st.cache_data(ttl=settings.api.streamlit_cache_ttl_seconds)
+@shared_cached("weather_period", ttl_seconds=settings.api.streamlit_cache_ttl_seconds)
 def fetch_weather_period_cached(start_iso: str, end_iso: str) -> pd.DataFrame:
-    """Hent værdata for valgt periode med Streamlit-cache."""
+    """Hent værdata for valgt periode via den delte cachen (felles for alle økter).
+
+    Frost-klienten deles mellom reruns, så etter TTL-utløp eller "Oppdater"
+    hentes kun nye timer siden forrige kall (delta-henting).
+    """
     start_time = datetime.fromisoformat(start_iso)
     end_time = datetime.fromisoformat(end_iso)
     client = get_frost_client()
-    weather_data = client.fetch_period(start_time, end_time)
+    weather_data = client.fetch_period(start_time, end_time, incremental=True)
     return weather_data.df
 
 
+@st.cache_resource
+def get_load_executor() -> ThreadPoolExecutor:
+    """Delt trådpool for parallell henting av datakilder (overlever reruns)."""
+    return ThreadPoolExecutor(
+        max_workers=max(1, int(settings.dashboard.load_workers)),
+        thread_name_prefix="dashboard-load",
+    )
+
+
+def _attach_script_context(task: Callable[[], Any]) -> Callable[[], Any]:
+    """Koble arbeidertråden til denne kjøringens Streamlit-kontekst (cache/secrets)."""
+    ctx = get_script_run_ctx()
+
+    def run() -> Any:
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return task()
+
+    return run
+
+
+# Bakgrunnsoppdateringer i den delte cachen kjører fetchere med `st.*`-cacher
+# (klienter); de får samme kontekst som kildene i fan-out.
+get_shared_cache().wrap = _attach_script_context
+
+
+def start_data_sources(selected_start_utc: datetime, selected_end_utc: datetime) -> SourceFanout:
+    """Start Frost, vedlikehold, prognose og Netatmo samtidig.
+
+    Hver seksjon venter kun på sin egen kilde (med egen tidsfrist), så treg
+    Netatmo eller vedlikeholds-API holder ikke igjen varselkortene.
+    """
+    cfg = settings.dashboard
+    sources = SourceFanout(get_load_executor(), wrap=_attach_script_context)
+    sources.submit(
+        "weather",
+        fetch_weather_period_cached,
+        selected_start_utc.isoformat(),
+        selected_end_utc.isoformat(),
+        timeout=cfg.weather_timeout_seconds,
+    )
+    sources.submit("plowing", get_cached_plowing_info, timeout=cfg.plowing_timeout_seconds)
+    sources.submit(
+        "forecast",
+        fetch_forecast_cached,
+        settings.station.lat,
+        settings.station.lon,
+        max(1, int(settings.api.forecast_hours)),
+        timeout=cfg.forecast_timeout_seconds,
+    )
+    sources.submit("netatmo", fetch_netatmo_stations, timeout=cfg.netatmo_timeout_seconds)
+    return sources
+
+
+def resolve_plowing_info(plowing: SourceResult) -> PlowingInfo:
+    """Brøyteinfo fra parallell henting; feil/tidsavbrudd gir et feilobjekt."""
+    if plowing.ok:
+        return plowing.value
+    if plowing.error is not None and not isinstance(
+        plowing.error, (RuntimeError, ValueError, TypeError, KeyError, OSError)
+    ):
+        raise plowing.error
+    reason = plowing.error or f"svarte ikke innen {settings.dashboard.plowing_timeout_seconds:.0f}s"
+    logger.error("Error fetching plowing info: %s", reason)
+    return PlowingInfo(
+        last_plowing=None,
+        hours_since=None,
+        is_recent=False,
+        all_timestamps=[],
+        source="error",
+        error=f"Klarte ikke hente brøyting: {reason}",
+    )
+
+
+def build_analysis_snapshot(
+    df: pd.DataFrame,
+    plowing_info: PlowingInfo,
+    selected_start_utc: datetime,
+    selected_end_utc: datetime,
+    *,
+    forecast: SourceResult | None = None,
+    stability_state: dict[str, dict[str, str]] | None = None,
+    render_charts: bool = False,
+) -> AnalysisSnapshot:
+    """Kjør hele analysekjeden for en periode og logg MEDIUM/HIGH-varsler.
+
+    Brukes både ved sidevisning og av bakgrunnsoppfriskningen.
+
+    Args:
+        stability_state: Tilstand for varsel-stabilisering (None: øktens)
+        render_charts: Rendre værgrafene nå (bakgrunn) i stedet for ved visning
+    """
+    started = time.perf_counter()
+    quality_metrics = get_data_quality_metrics(df, selected_start_utc, selected_end_utc)
+
+    analyzers = {
+        "Nysnø": FreshSnowAnalyzer(),
+        "Snøfokk": SnowdriftAnalyzer(),
+        "Slaps": SlapsAnalyzer(),
+        "Glatte veier": SlipperyRoadAnalyzer(),
+    }
+    results = {name: analyzer.analyze(df) for name, analyzer in analyzers.items()}
+
+    # Capture raw analyzer output BEFORE any downstream transformations.
+    # This ensures audit logging records what sensors actually detected,
+    # regardless of whether data_quality_guard later downgrades to UNKNOWN.
+    raw_results = dict(results)
+
+    results, quality_note = apply_data_quality_guard(results, quality_metrics)
+
+    reference_time_utc = quality_metrics.get("latest_time_utc") if quality_metrics.get("valid") else datetime.now(UTC)
+    if not isinstance(reference_time_utc, datetime):
+        reference_time_utc = datetime.now(UTC)
+    results = apply_alert_stability(results, reference_time_utc, stability_state)
+
+    suppress_alerts = should_suppress_alerts(plowing_info)
+    maintenance_reason = describe_maintenance(plowing_info)
+
+    # Stans farevarsel ved nylig vedlikehold (brøyting/strøing)
+    results = apply_maintenance_suppression(results, plowing_info)
+
+    confidence_map = _compute_confidence_map(results, quality_metrics, suppress_alerts)
+
+    # Operational logging: use raw analyzer results (before quality guard and
+    # suppression) so that HIGH-risk events are captured even when
+    # data_quality_guard has downgraded them to UNKNOWN for display purposes.
+    try:
+        log_medium_high_alerts(
+            results=raw_results,
+            df=df,
+            plowing_info=plowing_info,
+            suppressed_by_maintenance=suppress_alerts,
+            suppression_reason=maintenance_reason if suppress_alerts else "",
+            quality_guard_note=quality_note or "",
+        )
+    except (RuntimeError, ValueError, TypeError, KeyError, OSError) as e:
+        logger.warning("Operational logger failed: %s", e)
+
+    charts: dict[str, bytes] = {}
+    if render_charts:
+        charts = dict(zip(WEATHER_GRAPHS, WeatherPlots.render_many(df, WEATHER_GRAPHS), strict=True))
+
+    return AnalysisSnapshot(
+        period_start_utc=selected_start_utc,
+        period_end_utc=selected_end_utc,
+        weather=df,
+        plowing_info=plowing_info,
+        raw_results=raw_results,
+        results=results,
+        confidence=confidence_map,
+        quality_metrics=quality_metrics,
+        quality_note=quality_note,
+        suppress_alerts=suppress_alerts,
+        maintenance_reason=maintenance_reason,
+        forecast=forecast,
+        charts=charts,
+        build_seconds=time.perf_counter() - started,
+    )
+
+
+def refresh_default_snapshot(stability_state: dict[str, dict[str, str]]) -> AnalysisSnapshot:
+    """Hent kilder for standardperioden (siste N timer) og bygg snapshot (bakgrunnstråd)."""
+    end_utc = datetime.now(UTC).replace(second=0, microsecond=0)
+    start_utc = end_utc - timedelta(hours=settings.dashboard.default_period_hours)
+    sources = start_data_sources(start_utc, end_utc)
+
+    weather = sources.result("weather")
+    if weather.timed_out:
+        raise TimeoutError(f"Frost svarte ikke innen {settings.dashboard.weather_timeout_seconds:.0f}s")
+    if weather.error is not None:
+        raise weather.error
+    df = weather.value
+    if df is None or df.empty:
+        raise ValueError("Ingen værdata for standardperioden")
+
+    return build_analysis_snapshot(
+        df,
+        resolve_plowing_info(sources.result("plowing")),
+        start_utc,
+        end_utc,
+        forecast=sources.result("forecast"),
+        stability_state=stability_state,
+        render_charts=True,
+    )
+
+
+@st.cache_resource
+def get_snapshot_refresher() -> SnapshotRefresher:
+    """Prosessdelt bakgrunnsoppfriskning av standardperioden (startes ved første sidevisning).
+
+    Stabiliseringstilstanden er felles for alle økter som leser snapshotet.
+    """
+    stability_state: dict[str, dict[str, str]] = {}
+    return SnapshotRefresher(
+        lambda: refresh_default_snapshot(stability_state),
+        interval_seconds=settings.snapshot.refresh_interval_seconds,
+        max_age_seconds=settings.snapshot.max_age_seconds,
+    ).start()
+
+
+def latest_default_snapshot(selected_start_utc: datetime, selected_end_utc: datetime) -> AnalysisSnapshot | None:
+    """Siste bakgrunnssnapshot når valgt periode er standardperioden, ellers None."""
+    if not settings.snapshot.enabled:
+        return None
+    length = selected_end_utc - selected_start_utc
+    if abs(length - timedelta(hours=settings.dashboard.default_period_hours)) > timedelta(minutes=1):
+        return None
+    if datetime.now(UTC) - selected_end_utc > timedelta(seconds=settings.snapshot.max_age_seconds):
+        return None
+    return get_snapshot_refresher().latest()
+
+
+# --- Fragmenter -------------------------------------------------------------
+#
+# Hver seksjon er et eget `st.fragment` som kan kjøres på nytt alene (knapp i
+# seksjonen eller eget intervall), uten at analysatorer, logging og de andre
+# seksjonene kjøres. Avhengighetene deklareres ved navn og hentes ved HVER
+# kjøring av fragmentet, ikke fra argumentene ved første kjøring.
+
+
+@dataclass(frozen=True)
+class FragmentSpec:
+    """Datagrunnlag og oppdateringsintervall for én seksjon."""
+    depends_on: tuple[str, ...]
+    run_every_seconds: float | None = None
+
+
+DASHBOARD_FRAGMENTS: dict[str, FragmentSpec] = {}
+
+
+def _current_snapshot() -> AnalysisSnapshot | None:
+    """Snapshot for siden: nyeste bakgrunnssnapshot for standardperioden, ellers sidens eget."""
+    page_snapshot = st.session_state.get("dashboard_snapshot")
+    if st.session_state.get("dashboard_snapshot_live"):
+        return get_snapshot_refresher().latest() or page_snapshot
+    return page_snapshot
+
+
+def _prefetched(name: str) -> SourceResult | None:
+    """Resultat fra sidens parallelle henting, brukt én gang (fragment-reruns henter selv)."""
+    pending: dict[str, Callable[[], SourceResult | None]] = st.session_state.get("dashboard_prefetched", {})
+    load = pending.pop(name, None)
+    return load() if load is not None else None
+
+
+_FRAGMENT_SOURCES: dict[str, Callable[[], Any]] = {
+    "snapshot": _current_snapshot,
+    "forecast": lambda: _prefetched("forecast"),
+    "netatmo": lambda: _prefetched("netatmo"),
+}
+
+
+def dashboard_fragment(
+    name: str,
+    depends_on: tuple[str, ...] = (),
+    run_every_seconds: float | None = None,
+) -> Callable[[Callable[..., None]], Callable[[], None]]:
+    """Gjør en seksjon til et fragment som får avhengighetene sine som nøkkelord-argumenter.
+
+    Args:
+        name: Seksjonsnavn (nøkkel i `DASHBOARD_FRAGMENTS`)
+        depends_on: Navn i `_FRAGMENT_SOURCES`; seksjonen hoppes over uten snapshot
+        run_every_seconds: Eget oppdateringsintervall (None/0: kun ved full kjøring)
+    """
+    run_every = run_every_seconds or None
+    DASHBOARD_FRAGMENTS[name] = FragmentSpec(depends_on=depends_on, run_every_seconds=run_every)
+
+    def decorate(render: Callable[..., None]) -> Callable[[], None]:
+        def run() -> None:
+            data = {dep: _FRAGMENT_SOURCES[dep]() for dep in depends_on}
+            if "snapshot" in data and data["snapshot"] is None:
+                return
+            render(**data)
+
+        # Fragment-ID-en bygger på funksjonsnavnet; gi hver seksjon sitt eget.
+        run.__name__ = run.__qualname__ = render.__name__
+        run.__doc__ = render.__doc__
+        return st.fragment(run, run_every=run_every)
+
+    return decorate
+
+
+@dashboard_fragment(
+    "risk_cards",
+    depends_on=("snapshot",),
+    run_every_seconds=settings.dashboard.risk_cards_refresh_seconds,
+)
+def render_risk_cards_fragment(snapshot: AnalysisSnapshot) -> None:
+    """Vedlikehold, varselkort og nåværende forhold."""
+    plowing_info = snapshot.plowing_info
+    results = snapshot.results
+    confidence_map = snapshot.confidence
+
+    # Ingen overordnet varselboks over kortene.
+    # Brukeren forholder seg til de fire kortene i "Varsler nå".
+
+    # Flyttet opp: Siste vedlikehold (erstatter tidligere "NORMALE FORHOLD"-banner)
+    render_maintenance_top(plowing_info, snapshot.suppress_alerts)
+
+    if snapshot.suppress_alerts:
+        if plowing_info.hours_since is not None:
+            st.caption(
+                f"Varsler er midlertidig undertrykt av vedlikehold: {snapshot.maintenance_reason} "
+                f"({float(plowing_info.hours_since):.1f}t siden)"
+            )
+        else:
+            st.caption(
+                f"Varsler er midlertidig undertrykt av vedlikehold: {snapshot.maintenance_reason}"
+            )
+
+    st.divider()
+
+    # Compact status summary
+    st.subheader("Varsler nå")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        render_compact_risk_card("Nysnø", results["Nysnø"], confidence_map.get("Nysnø"))
+    with col2:
+        render_compact_risk_card("Snøfokk", results["Snøfokk"], confidence_map.get("Snøfokk"))
+
+    col3, col4 = st.columns(2)
+    with col3:
+        render_compact_risk_card("Slaps", results["Slaps"], confidence_map.get("Slaps"))
+    with col4:
+        render_compact_risk_card("Glatte veier", results["Glatte veier"], confidence_map.get("Glatte veier"))
+
+    # Current metrics
+    st.subheader("Nåværende forhold")
+
+    render_key_metrics(snapshot.weather)
+
+
+@dashboard_fragment(
+    "forecast",
+    depends_on=("forecast", "snapshot"),
+    run_every_seconds=settings.dashboard.forecast_refresh_seconds,
+)
+def render_forecast_fragment(forecast: SourceResult | None, snapshot: AnalysisSnapshot) -> None:
+    """Prognose og projisert risiko."""
+    render_forecast_section(forecast, observed=snapshot.weather)
+
+
+@dashboard_fragment(
+    "graphs",
+    depends_on=("snapshot",),
+    run_every_seconds=settings.dashboard.graphs_refresh_seconds,
+)
+def render_graphs_fragment(snapshot: AnalysisSnapshot) -> None:
+    """Værgrafer (ferdig rendret i snapshotet når det finnes)."""
+    render_weather_graphs(snapshot.weather, snapshot.charts)
+
+
+@dashboard_fragment(
+    "netatmo_map",
+    depends_on=("netatmo",),
+    run_every_seconds=settings.netatmo.cache_ttl_seconds,
+)
+def render_netatmo_fragment(netatmo: SourceResult | None) -> None:
+    """Temperaturkart fra Netatmo."""
+    render_netatmo_map(netatmo)
+
+
+@dashboard_fragment("wax_guide", depends_on=("snapshot",))
+def render_wax_guide_fragment(snapshot: AnalysisSnapshot) -> None:
+    """Smøreguide."""
+    render_wax_guide(snapshot.weather)
+
+
+@dashboard_fragment("kpis")
+def render_kpis_fragment() -> None:
+    """Operasjonelle KPI-er."""
+    render_operational_kpis()
+
+
 def main() -> None:
     """Main app function."""
 
@@ -1181,7 +1617,7 @@ def main() -> None:
             else:
                 st.session_state["period_start_local"] = candidate_start
                 st.session_state["period_end_local"] = candidate_end
-                st.cache_data.clear()
+                fetch_weather_period_cached.clear()
                 st.rerun()
 
         st.divider()
@@ -1249,164 +1685,70 @@ def main() -> None:
     selected_start_utc = st.session_state["period_start_local"].astimezone(UTC)
     selected_end_utc = st.session_state["period_end_local"].astimezone(UTC)
 
-    try:
-        with st.spinner("Henter værdata..."):
-            df = fetch_weather_period_cached(
-                selected_start_utc.isoformat(),
-                selected_end_utc.isoformat(),
-            )
-    except FrostAPIError as e:
-        st.error(f"Kunne ikke hente data: {e}")
-        st.stop()
-
-    if df is None or df.empty:
-        st.warning("Ingen data tilgjengelig for valgt periode")
-        st.stop()
-
-    quality_metrics = get_data_quality_metrics(df, selected_start_utc, selected_end_utc)
-    with st.expander("Datakvalitet og periode", expanded=False):
-        render_period_summary(df, selected_start_utc, selected_end_utc)
+    # Standardperioden leses fra bakgrunnssnapshot; egen periode beregnes her.
+    sources: SourceFanout | None = None
+    snapshot = latest_default_snapshot(selected_start_utc, selected_end_utc)
+    if snapshot is None:
+        sources = start_data_sources(selected_start_utc, selected_end_utc)
 
-    # Fetch plowing/maintenance info (available via vedlikeholds-endepunkt)
-    try:
-        plowing_info = get_cached_plowing_info()
-    except (RuntimeError, ValueError, TypeError, KeyError, OSError) as e:
-        logger.error("Error fetching plowing info: %s", e)
-        plowing_info = PlowingInfo(
-            last_plowing=None,
-            hours_since=None,
-            is_recent=False,
-            all_timestamps=[],
-            source="error",
-            error=f"Klarte ikke hente brøyting: {e}",
+        with st.spinner("Henter værdata..."):
+            weather = sources.result("weather")
+        if weather.timed_out:
+            st.error(f"Kunne ikke hente data: Frost svarte ikke innen {settings.dashboard.weather_timeout_seconds:.0f}s")
+            st.stop()
+        if isinstance(weather.error, FrostAPIError):
+            st.error(f"Kunne ikke hente data: {weather.error}")
+            st.stop()
+        if weather.error is not None:
+            raise weather.error
+
+        if weather.value is None or weather.value.empty:
+            st.warning("Ingen data tilgjengelig for valgt periode")
+            st.stop()
+
+        snapshot = build_analysis_snapshot(
+            weather.value,
+            resolve_plowing_info(sources.result("plowing")),
+            selected_start_utc,
+            selected_end_utc,
         )
 
-    # Run all analyzers
-    analyzers = {
-        "Nysnø": FreshSnowAnalyzer(),
-        "Snøfokk": SnowdriftAnalyzer(),
-        "Slaps": SlapsAnalyzer(),
-        "Glatte veier": SlipperyRoadAnalyzer(),
-    }
-
-    results = {}
-    for name, analyzer in analyzers.items():
-        results[name] = analyzer.analyze(df)
-
-    # Capture raw analyzer output BEFORE any downstream transformations.
-    # This ensures audit logging records what sensors actually detected,
-    # regardless of whether data_quality_guard later downgrades to UNKNOWN.
-    raw_results_for_log = dict(results)
-
-    results, quality_note = apply_data_quality_guard(results, quality_metrics)
-
-    reference_time_utc = quality_metrics.get("latest_time_utc") if quality_metrics.get("valid") else datetime.now(UTC)
-    if not isinstance(reference_time_utc, datetime):
-        reference_time_utc = datetime.now(UTC)
-    results = apply_alert_stability(results, reference_time_utc)
-
-    suppress_alerts = should_suppress_alerts(plowing_info)
-
-    maintenance_reason = "ukjent vedlikeholdstype"
-    if plowing_info.last_work_types:
-        maintenance_reason = ", ".join([str(x) for x in plowing_info.last_work_types if str(x).strip()])
-    elif plowing_info.last_event_type:
-        maintenance_reason = str(plowing_info.last_event_type)
-
-    # Stans farevarsel ved nylig vedlikehold (brøyting/strøing)
-    if suppress_alerts:
-        suppressed = {}
-        for name, r in results.items():
-            if r.risk_level != RiskLevel.LOW:
-                suppressed[name] = AnalysisResult(
-                    risk_level=RiskLevel.LOW,
-                    message=f"Nylig vedlikehold ({maintenance_reason}) – farevarsel stanset",
-                    scenario=r.scenario,
-                    factors=(r.factors or []) + [f"Nylig vedlikehold: {maintenance_reason}"],
-                    details={
-                        **(r.details or {}),
-                        "suppressed_by_maintenance": True,
-                        "maintenance_hours_since": plowing_info.hours_since,
-                        "maintenance_event_type": plowing_info.last_event_type,
-                        "maintenance_work_types": plowing_info.last_work_types,
-                        "maintenance_operator_id": plowing_info.last_operator_id,
-                    },
-                    timestamp=r.timestamp,
-                )
-            else:
-                suppressed[name] = r
-        results = suppressed
-
-    confidence_map = _compute_confidence_map(results, quality_metrics, suppress_alerts)
-
-    # Ingen overordnet varselboks over kortene.
-    # Brukeren forholder seg til de fire kortene i "Varsler nå".
-
-    # Flyttet opp: Siste vedlikehold (erstatter tidligere "NORMALE FORHOLD"-banner)
-    render_maintenance_top(plowing_info, suppress_alerts)
-
-    if suppress_alerts:
-        if plowing_info.hours_since is not None:
-            st.caption(
-                f"Varsler er midlertidig undertrykt av vedlikehold: {maintenance_reason} "
-                f"({float(plowing_info.hours_since):.1f}t siden)"
-            )
-        else:
+    df = snapshot.weather
+    with st.expander("Datakvalitet og periode", expanded=False):
+        render_period_summary(df, snapshot.period_start_utc, snapshot.period_end_utc)
+        if sources is None:
             st.caption(
-                f"Varsler er midlertidig undertrykt av vedlikehold: {maintenance_reason}"
+                f"Analyse oppdatert {snapshot.created_at.astimezone(local_tz):%H:%M} i bakgrunnen "
+                f"(hvert {settings.snapshot.refresh_interval_seconds // 60}. min)."
             )
 
-    st.divider()
-
-    # Compact status summary
-    st.subheader("Varsler nå")
-
-    col1, col2 = st.columns(2)
-    with col1:
-        render_compact_risk_card("Nysnø", results["Nysnø"], confidence_map.get("Nysnø"))
-    with col2:
-        render_compact_risk_card("Snøfokk", results["Snøfokk"], confidence_map.get("Snøfokk"))
-
-    col3, col4 = st.columns(2)
-    with col3:
-        render_compact_risk_card("Slaps", results["Slaps"], confidence_map.get("Slaps"))
-    with col4:
-        render_compact_risk_card("Glatte veier", results["Glatte veier"], confidence_map.get("Glatte veier"))
-
-    # Current metrics
-    st.subheader("Nåværende forhold")
-
-    # Operational logging: use raw analyzer results (before quality guard and
-    # suppression) so that HIGH-risk events are captured even when
-    # data_quality_guard has downgraded them to UNKNOWN for display purposes.
-    try:
-        log_medium_high_alerts(
-            results=raw_results_for_log,
-            df=df,
-            plowing_info=plowing_info,
-            suppressed_by_maintenance=suppress_alerts,
-            suppression_reason=maintenance_reason if suppress_alerts else "",
-            quality_guard_note=quality_note or "",
-        )
-    except (RuntimeError, ValueError, TypeError, KeyError, OSError) as e:
-        logger.warning("Operational logger failed: %s", e)
+    # Grunnlag for fragmentene (leses på nytt når et fragment kjøres alene)
+    st.session_state["dashboard_snapshot"] = snapshot
+    st.session_state["dashboard_snapshot_live"] = sources is None
+    if sources is None:
+        st.session_state["dashboard_prefetched"] = {"forecast": lambda: snapshot.forecast}
+    else:
+        st.session_state["dashboard_prefetched"] = {
+            "forecast": lambda: sources.result("forecast"),
+            "netatmo": lambda: sources.result("netatmo"),
+        }
 
-    render_key_metrics(df)
+    render_risk_cards_fragment()
 
     st.divider()
 
-    render_forecast_section()
+    render_forecast_fragment()
     st.divider()
 
-    render_weather_graphs(df)
+    render_graphs_fragment()
 
     st.divider()
 
     # Netatmo temperaturkart flyttes opp før footer for å være synlig i normal lese-rekkefølge.
-    render_netatmo_map()
+    render_netatmo_fragment()
 
     # Smøreguide under temperaturkart for bedre kontekst.
-    render_wax_guide(df)
+    render_wax_guide_fragment()
 
     # Footer
     st.divider()
@@ -1415,14 +1757,14 @@ def main() -> None:
         f"Stasjon: {settings.station.station_id} {settings.station.name}"
     )
     with st.expander("Operasjonelle KPI-er (admin)", expanded=False):
-        render_operational_kpis()
+        render_kpis_fragment()
 
 
-@st.cache_data(ttl=settings.netatmo.cache_ttl_seconds)
+@shared_cached("netatmo", ttl_seconds=settings.netatmo.cache_ttl_seconds)
 def fetch_netatmo_stations() -> dict[str, Any]:
-    """Hent Netatmo-stasjoner (cached).
+    """Hent Netatmo-stasjoner (delt cache).
 
-    Viktig: `st.cache_data` krever at returverdien kan serialiseres.
+    Viktig: den delte cachen lagrer returverdien serialisert (pickle).
     Derfor cacher vi kun en liste med enkle dicts, ikke NetatmoStation-objekter.
     """
     try:
@@ -1514,18 +1856,31 @@ def get_netatmo_client() -> NetatmoClient:
     return NetatmoClient()
 
 
-def render_netatmo_map() -> None:
-    """Render temperaturkart for tilgjengelige Netatmo-stasjoner."""
+def render_netatmo_map(prefetched: SourceResult | None = None) -> None:
+    """Render temperaturkart for tilgjengelige Netatmo-stasjoner.
+
+    Args:
+        prefetched: Resultat fra parallell henting (None: hent nå)
+    """
 
     col_title, col_btn = st.columns([4, 1])
     with col_title:
         st.subheader("Temperaturkart")
     with col_btn:
+        # Knappen kjører kun kart-fragmentet på nytt; tøm cachen og hent under.
         if st.button("Oppdater kart", key="netatmo_refresh"):
             fetch_netatmo_stations.clear()
-            st.rerun()
+            prefetched = None
 
-    cached = fetch_netatmo_stations()
+    if prefetched is None:
+        cached = fetch_netatmo_stations()
+    elif prefetched.timed_out:
+        st.info(f"Temperaturkart utilgjengelig: Netatmo svarte ikke innen {settings.dashboard.netatmo_timeout_seconds:.0f}s")
+        return
+    elif prefetched.error is not None:
+        raise prefetched.error
+    else:
+        cached = prefetched.value
     cached_rows = cached.get("rows", [])
     cached_error = cached.get("error")
     auth_ok = bool(cached.get("auth_ok"))
@@ -1781,9 +2136,9 @@ def render_netatmo_map() -> None:
         )
 
 
-@st.cache_data(ttl=settings.plowing_service.streamlit_cache_ttl_seconds)
+@shared_cached("plowing", ttl_seconds=settings.plowing_service.streamlit_cache_ttl_seconds)
 def get_cached_plowing_info() -> PlowingInfo:
-    """Henter brøyteinformasjon fra service (cached)."""
+    """Henter brøyteinformasjon fra service (delt cache)."""
     return get_plowing_info()
 
 
@@ -0,0 +1,139 @@
+"""
+Delt HTTP-transport for Frost, MET locationforecast og historikktjenesten.
+
+Én `requests.Session` per prosess gir keep-alive-pool per vert
+(frost.met.no / api.met.no), så dashboard-kaldstart og varselskript slipper
+ny TCP+TLS-handshake for hvert kall. Transporten ber om gzip og har én felles
+retry-policy (timeout/forbindelsesfeil og 429/5xx, eksponentiell backoff).
+
+Klientene tar imot en transport i konstruktøren; tester kan gi en lokal
+falsk transport med samme `get`-signatur.
+
+Eksempel:
+    transport = get_transport()
+    response = transport.get(url, params=params, auth=(client_id, ""), timeout=30)
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import (
+    Retrying,
+    before_sleep_log,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _RetryableResponse(Exception):
+    """Intern: svar med status som skal prøves igjen."""
+
+    def __init__(self, response: requests.Response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+class HttpTransport:
+    """
+    Trådsikker HTTP-klient med keep-alive-pool og felles retry.
+
+    Etter siste forsøk returneres svaret (også 429/5xx), slik at klientene
+    selv avgjør hvilken feil det blir; nettverksfeil kastes videre.
+    """
+
+    def __init__(self, session: requests.Session | None = None):
+        """
+        Initialiser transport.
+
+        Args:
+            session: Ferdig sesjon (default: ny sesjon med pool fra `settings.http`)
+        """
+        cfg = settings.http
+        self.session = session or self._create_session()
+        self._retry_statuses = frozenset(cfg.retry_statuses)
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        cfg = settings.http
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=cfg.pool_connections, pool_maxsize=cfg.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "User-Agent": cfg.user_agent,
+            "Accept-Encoding": "gzip, deflate",
+        })
+        return session
+
+    def get(
+        self,
+        url: str,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        auth: tuple[str, str] | None = None,
+        timeout: float | None = None,
+        retry: bool = True,
+    ) -> requests.Response:
+        """
+        GET med felles retry-policy.
+
+        Raises:
+            requests.RequestException: Nettverksfeil etter siste forsøk
+        """
+        def send() -> requests.Response:
+            response = self.session.get(url, params=params, headers=headers, auth=auth, timeout=timeout)
+            if response.status_code in self._retry_statuses:
+                raise _RetryableResponse(response)
+            return response
+
+        if not retry:
+            return self.session.get(url, params=params, headers=headers, auth=auth, timeout=timeout)
+
+        cfg = settings.http
+        retrying = Retrying(
+            reraise=True,
+            stop=stop_after_attempt(cfg.retry_attempts),
+            wait=wait_exponential(
+                multiplier=cfg.retry_backoff_multiplier,
+                min=cfg.retry_backoff_min_seconds,
+                max=cfg.retry_backoff_max_seconds,
+            ),
+            retry=retry_if_exception_type((
+                _RetryableResponse,
+                requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError,
+            )),
+            before_sleep=before_sleep_log(logger, logging.WARNING),
+        )
+        try:
+            return retrying(send)
+        except _RetryableResponse as e:
+            return e.response
+
+    def close(self) -> None:
+        """Lukk forbindelsene i poolen."""
+        self.session.close()
+
+
+_shared: HttpTransport | None = None
+_shared_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """Prosessens delte transport (opprettes ved første kall)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HttpTransport()
+        return _shared
@@ -0,0 +1,226 @@
+"""
+Lokalt kolonnebasert lager for Frost-observasjoner.
+
+Én Parquet-fil per stasjon per måned (UTC), f.eks.
+`data/store/observations/SN46220/2026-01.parquet`. Lesing er kolonne- og
+tidsfiltrerte skann med minnemapping, slik at kaldstart og cache-fallback
+ikke trenger å parse hele historikken.
+
+Kolonnene følger FrostClient sitt normaliserte format (`reference_time`,
+`precipitation_1h`, `max_wind_gust`, ...).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.config import get_secret, settings
+
+logger = logging.getLogger(__name__)
+
+TIME_COLUMN = "reference_time"
+
+
+def _project_root() -> Path:
+    return Path(__file__).parent.parent
+
+
+def _default_store_dir() -> Path:
+    rel = get_secret("OBSERVATION_STORE_PATH", "data/store/observations")
+    return (_project_root() / rel).resolve()
+
+
+def _to_utc_timestamp(value: datetime | pd.Timestamp | str) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        return ts.tz_localize(UTC)
+    return ts.tz_convert(UTC)
+
+
+class ObservationStore:
+    """
+    Partisjonert, append-only lager for timeobservasjoner.
+
+    Eksempel:
+        store = ObservationStore()
+        store.append(weather_data.df)
+        df = store.read(start, end, columns=["air_temperature"])
+    """
+
+    # Én lås per prosess holder samtidige append-kall (Streamlit-tråder,
+    # backfill-arbeidere) fra å overskrive hverandres partisjoner.
+    _write_lock = threading.Lock()
+
+    def __init__(self, station_id: str | None = None, root: Path | None = None):
+        """
+        Initialiser lager.
+
+        Args:
+            station_id: Stasjon (default: `settings.station.station_id`)
+            root: Rotkatalog (default: OBSERVATION_STORE_PATH / data/store/observations)
+        """
+        self.station_id = station_id or settings.station.station_id
+        self.root = root if root is not None else _default_store_dir()
+
+    @property
+    def station_dir(self) -> Path:
+        """Katalog med stasjonens månedspartisjoner."""
+        return self.root / self.station_id
+
+    @staticmethod
+    def partition_key(ts: pd.Timestamp) -> str:
+        """Partisjonsnøkkel (YYYY-MM) for et UTC-tidspunkt."""
+        return f"{ts.year:04d}-{ts.month:02d}"
+
+    def partition_path(self, key: str) -> Path:
+        """Filsti for en månedspartisjon."""
+        return self.station_dir / f"{key}.parquet"
+
+    def partitions(self) -> list[Path]:
+        """Alle partisjoner sortert kronologisk."""
+        if not self.station_dir.exists():
+            return []
+        return sorted(self.station_dir.glob("*.parquet"))
+
+    def is_empty(self) -> bool:
+        """Sjekk om lageret mangler data for stasjonen."""
+        return not self.partitions()
+
+    def last_modified(self) -> datetime | None:
+        """Tidspunkt for siste skriving (nyeste partisjon-mtime)."""
+        mtimes = [p.stat().st_mtime for p in self.partitions()]
+        if not mtimes:
+            return None
+        return datetime.fromtimestamp(max(mtimes), tz=UTC)
+
+    def latest_time(self) -> pd.Timestamp | None:
+        """Siste lagrede `reference_time`, eller None hvis lageret er tomt."""
+        for path in reversed(self.partitions()):
+            df = self._read_partition(path, columns=[TIME_COLUMN])
+            if not df.empty:
+                return df[TIME_COLUMN].max()
+        return None
+
+    def read(
+        self,
+        start: datetime | pd.Timestamp | None = None,
+        end: datetime | pd.Timestamp | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Les observasjoner i [start, end].
+
+        Args:
+            start: Inkluderende start (default: første lagrede)
+            end: Inkluderende slutt (default: siste lagrede)
+            columns: Kolonner å lese (reference_time tas alltid med)
+
+        Returns:
+            DataFrame sortert på reference_time (tom hvis ingen treff)
+        """
+        start_ts = _to_utc_timestamp(start) if start is not None else None
+        end_ts = _to_utc_timestamp(end) if end is not None else None
+
+        start_key = self.partition_key(start_ts) if start_ts is not None else None
+        end_key = self.partition_key(end_ts) if end_ts is not None else None
+
+        wanted = None
+        if columns is not None:
+            wanted = [TIME_COLUMN] + [c for c in columns if c != TIME_COLUMN]
+
+        filters: list[tuple[str, str, pd.Timestamp]] = []
+        if start_ts is not None:
+            filters.append((TIME_COLUMN, ">=", start_ts))
+        if end_ts is not None:
+            filters.append((TIME_COLUMN, "<=", end_ts))
+
+        frames = []
+        for path in self.partitions():
+            key = path.stem
+            if start_key is not None and key < start_key:
+                continue
+            if end_key is not None and key > end_key:
+                continue
+            df = self._read_partition(path, columns=wanted, filters=filters or None)
+            if not df.empty:
+                frames.append(df)
+
+        if not frames:
+            return pd.DataFrame(columns=wanted or [TIME_COLUMN])
+
+        df = pd.concat(frames, ignore_index=True)
+        return df.sort_values(TIME_COLUMN).reset_index(drop=True)
+
+    def append(self, df: pd.DataFrame) -> int:
+        """
+        Legg til observasjoner.
+
+        Rader fordeles på månedspartisjoner. Berørte partisjoner skrives på nytt
+        atomisk (tmp + replace); månedsfiler er små (~750 timerader), så dette
+        er billig. For overlappende tidspunkter vinner nye verdier, mens
+        kolonner som mangler (eller er NaN) i de nye radene beholdes fra
+        lageret. Dermed kan elementgrupper for samme måned skrives hver for seg.
+
+        Returns:
+            Antall rader skrevet
+        """
+        if df is None or df.empty or TIME_COLUMN not in df.columns:
+            return 0
+
+        df = df.copy()
+        df[TIME_COLUMN] = pd.to_datetime(df[TIME_COLUMN], utc=True, errors="coerce")
+        df = df.dropna(subset=[TIME_COLUMN])
+        if df.empty:
+            return 0
+
+        keys = df[TIME_COLUMN].dt.strftime("%Y-%m")
+        written = 0
+
+        with self._write_lock:
+            self.station_dir.mkdir(parents=True, exist_ok=True)
+            for key, chunk in df.groupby(keys, sort=True):
+                path = self.partition_path(str(key))
+                existing = self._read_partition(path) if path.exists() else pd.DataFrame()
+                combined = (
+                    chunk.sort_values(TIME_COLUMN)
+                    .drop_duplicates(TIME_COLUMN, keep="last")
+                    .set_index(TIME_COLUMN)
+                )
+                if not existing.empty:
+                    combined = combined.combine_first(existing.set_index(TIME_COLUMN))
+                combined = combined.sort_index().reset_index()
+                self._write_partition(path, combined)
+                written += len(chunk)
+
+        logger.debug("ObservationStore: skrev %d rader for %s", written, self.station_id)
+        return written
+
+    @staticmethod
+    def _read_partition(
+        path: Path,
+        columns: list[str] | None = None,
+        filters: list[tuple[str, str, pd.Timestamp]] | None = None,
+    ) -> pd.DataFrame:
+        try:
+            if columns is not None:
+                available = set(pq.read_schema(path).names)
+                columns = [c for c in columns if c in available]
+            table = pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+        except (OSError, pa.ArrowException) as exc:
+            logger.warning("ObservationStore: kunne ikke lese %s: %s", path, exc)
+            return pd.DataFrame()
+        return table.to_pandas()
+
+    @staticmethod
+    def _write_partition(path: Path, df: pd.DataFrame) -> None:
+        tmp = path.with_suffix(".tmp")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, tmp)
+        tmp.replace(path)
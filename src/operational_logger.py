@@ -1,56 +1,50 @@
 """Operational event logging.
 
-Logs only MEDIUM/HIGH analyzer results to a CSV file, with deduplication, so the
-app can be run continuously without spamming duplicate rows on every Streamlit
-rerun.
+Logs only MEDIUM/HIGH analyzer results to the operational log store
+(`src/operational_store.py`, SQLite in WAL mode). Deduplication is a unique
+index on (reference_time, analyzer, risk_level), so the app can be run
+continuously without spamming duplicate rows on every Streamlit rerun.
 
 The log is intended for real-world validation: what did we alert on, and what
-maintenance (brøyting/strøing) actually happened.
+maintenance (brøyting/strøing) actually happened. A legacy
+`operational_alerts.csv` is imported into the store once.
 """
 
 from __future__ import annotations
 
-import csv
-import json
+import atexit
 import logging
-import os
-from datetime import UTC, datetime, timedelta
+import queue
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
 import pandas as pd
 
 from src.analyzers import RiskLevel
-from src.config import get_secret
+from src.config import get_secret, settings
+from src.operational_store import OPERATIONAL_LOG_FIELDS, OperationalLogStore
 from src.plowing_service import PlowingInfo
 
 logger = logging.getLogger(__name__)
 
-
-OPERATIONAL_LOG_FIELDS = [
-    "logged_at_utc",
-    "reference_time_utc",
-    "analyzer",
-    "risk_level",
-    "message",
-    "air_temperature",
-    "surface_temperature",
-    "wind_speed",
-    "wind_gust",
-    "precipitation_1h",
-    "surface_snow_thickness",
-    "maintenance_last_utc",
-    "maintenance_hours_since",
-    "maintenance_source",
-    "maintenance_event_type",
-    "maintenance_work_types",
-    "maintenance_operator_id",
-    "maintenance_error",
-    "suppressed_by_maintenance",
-    "suppression_reason",
-    "quality_guard_note",
+__all__ = [
+    "OPERATIONAL_LOG_FIELDS",
+    "OperationalLogWriter",
+    "get_operational_store",
+    "get_operational_writer",
+    "log_medium_high_alerts",
 ]
 
+_stores: dict[Path, OperationalLogStore] = {}
+_writers: dict[Path, OperationalLogWriter] = {}
+_stores_lock = threading.Lock()
+
 
 def _parse_bool(value: str | None, default: bool = False) -> bool:
     if value is None:
@@ -63,15 +57,271 @@ def _project_root() -> Path:
 
 
 def _default_log_path() -> Path:
+    """Legacy CSV log (imported into the store once)."""
     rel = get_secret("OPERATIONAL_LOG_PATH", "data/logs/operational_alerts.csv")
     return (_project_root() / rel).resolve()
 
 
-def _default_state_path() -> Path:
-    rel = get_secret("OPERATIONAL_LOG_STATE_PATH", "data/logs/operational_alerts_state.json")
+def _default_db_path() -> Path:
+    rel = get_secret("OPERATIONAL_LOG_DB_PATH", "data/logs/operational_alerts.sqlite")
     return (_project_root() / rel).resolve()
 
 
+def get_operational_store() -> OperationalLogStore:
+    """Shared store for the configured path; imports the legacy CSV on first use."""
+    db_path = _default_db_path()
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            store = _stores[db_path] = OperationalLogStore(db_path)
+            try:
+                store.ensure_schema()
+                store.import_csv(_default_log_path())
+            except sqlite3.Error as e:
+                logger.warning("Operational logger: failed to initialise %s: %s", db_path, e)
+    return store
+
+
+def get_operational_writer() -> OperationalLogWriter:
+    """Shared write-behind writer for the configured store (started on first use)."""
+    store = get_operational_store()
+    with _stores_lock:
+        writer = _writers.get(store.path)
+        if writer is None:
+            writer = _writers[store.path] = OperationalLogWriter(store)
+    return writer
+
+
+@dataclass(frozen=True)
+class WriterStats:
+    """Counters for `OperationalLogWriter`."""
+    queue_depth: int
+    unwritten: int
+    enqueued: int
+    written: int
+    flushes: int
+    failed_flushes: int
+    sync_fallbacks: int
+    dropped: int
+    last_flush_ms: float
+    max_flush_ms: float
+
+
+class OperationalLogWriter:
+    """
+    Write-behind sink: rows go onto a bounded queue, a daemon thread flushes batches.
+
+    The store's dedupe key and row are written in the same transaction, so a row
+    is either durable or will be retried; batches that fail on I/O (`sqlite3.Error`,
+    `OSError`) are kept and retried (at-least-once; duplicates are ignored by the
+    unique index). A batch rejected for any other reason is written row by row and
+    rows that can never be stored are counted as `dropped`. A full queue
+    falls back to a synchronous write rather than dropping rows; if that write
+    fails too, the rows go to the writer thread's retry buffer (bounded by the
+    queue size, excess counted as `dropped`), so `submit` never blocks. On
+    interpreter exit the queue is drained for up to `shutdown_timeout_seconds`.
+    """
+
+    def __init__(
+        self,
+        store: OperationalLogStore,
+        *,
+        maxsize: int | None = None,
+        batch_size: int | None = None,
+        flush_interval: float | None = None,
+    ):
+        cfg = settings.operational_log
+        self.store = store
+        self.batch_size = batch_size or cfg.batch_size
+        self.flush_interval = cfg.flush_interval_seconds if flush_interval is None else flush_interval
+        self._queue: queue.Queue[Mapping[str, Any]] = queue.Queue(maxsize or cfg.queue_maxsize)
+        self._pending: list[Mapping[str, Any]] = []  # failed batch, owned by the writer thread
+        self._retry: list[Mapping[str, Any]] = []  # failed inline writes, guarded by _cond
+
+        self._cond = threading.Condition()
+        self._unwritten = 0
+        self._enqueued = 0
+        self._written = 0
+        self._flushes = 0
+        self._failed_flushes = 0
+        self._sync_fallbacks = 0
+        self._dropped = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, rows: list[Mapping[str, Any]]) -> None:
+        """Queue rows for writing (non-blocking; writes inline only if the queue is full)."""
+        if not rows:
+            return
+        self._ensure_started()
+        with self._cond:
+            self._unwritten += len(rows)
+            self._enqueued += len(rows)
+
+        overflow: list[Mapping[str, Any]] = []
+        for i, row in enumerate(rows):
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                overflow = rows[i:]
+                break
+
+        if overflow:
+            with self._cond:
+                self._sync_fallbacks += 1
+            retry = self._write(overflow)
+            if retry:
+                self._hand_over(retry)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every submitted row is durable. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._unwritten > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float | None = None) -> bool:
+        """Drain the queue and stop the writer thread."""
+        timeout = settings.operational_log.shutdown_timeout_seconds if timeout is None else timeout
+        drained = self.flush(timeout)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if not drained:
+            logger.warning("Operational logger: %s rows not written at shutdown", self.stats().unwritten)
+        return drained
+
+    def stats(self) -> WriterStats:
+        with self._cond:
+            return WriterStats(
+                queue_depth=self._queue.qsize(),
+                unwritten=self._unwritten,
+                enqueued=self._enqueued,
+                written=self._written,
+                flushes=self._flushes,
+                failed_flushes=self._failed_flushes,
+                sync_fallbacks=self._sync_fallbacks,
+                dropped=self._dropped,
+                last_flush_ms=self._last_flush_ms,
+                max_flush_ms=self._max_flush_ms,
+            )
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="operational-log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._run_once()
+            except Exception:
+                # The thread must outlive any single failure, or flush/close would hang
+                logger.exception("Operational logger: writer loop failed, retrying")
+                self._stop.wait(self.flush_interval)
+
+    def _run_once(self) -> None:
+        batch = self._pending or self._take_retry() or self._next_batch()
+        if not batch:
+            return
+        self._pending = self._write(batch)
+        if self._pending:
+            self._stop.wait(self.flush_interval)
+
+    def _hand_over(self, rows: list[Mapping[str, Any]]) -> None:
+        """Give rows the inline write could not store to the writer thread (never blocks)."""
+        with self._cond:
+            room = max(0, self._queue.maxsize - len(self._retry))
+            dropped = len(rows) - min(room, len(rows))
+            self._retry.extend(rows[:room])
+            if dropped:
+                self._dropped += dropped
+                self._unwritten -= dropped
+                self._cond.notify_all()
+        if dropped:
+            logger.warning("Operational logger: retry buffer full, dropped %s rows", dropped)
+
+    def _take_retry(self) -> list[Mapping[str, Any]]:
+        with self._cond:
+            batch = self._retry[: self.batch_size]
+            del self._retry[: self.batch_size]
+        return batch
+
+    def _next_batch(self) -> list[Mapping[str, Any]]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, rows: list[Mapping[str, Any]]) -> list[Mapping[str, Any]]:
+        """Write a batch. Returns the rows to retry (empty when every row was stored or dropped)."""
+        started = time.perf_counter()
+        try:
+            inserted = self.store.append(rows)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Operational logger: failed to write %s rows to %s: %s", len(rows), self.store.path, e)
+            with self._cond:
+                self._failed_flushes += 1
+            return rows
+        except Exception:
+            logger.exception("Operational logger: batch of %s rows rejected, writing rows one by one", len(rows))
+            with self._cond:
+                self._failed_flushes += 1
+            return self._write_each(rows)
+
+        self._record_flush(len(rows), started)
+        if inserted:
+            logger.info("Operational logger: wrote %s rows to %s", inserted, self.store.path)
+        return []
+
+    def _write_each(self, rows: list[Mapping[str, Any]]) -> list[Mapping[str, Any]]:
+        """Write rows one at a time so a row that can never be stored is dropped alone."""
+        retry: list[Mapping[str, Any]] = []
+        for row in rows:
+            started = time.perf_counter()
+            try:
+                self.store.append([row])
+            except (sqlite3.Error, OSError):
+                retry.append(row)
+            except Exception:
+                logger.exception("Operational logger: dropped row that cannot be stored: %r", row)
+                with self._cond:
+                    self._dropped += 1
+                    self._unwritten -= 1
+                    self._cond.notify_all()
+            else:
+                self._record_flush(1, started)
+        return retry
+
+    def _record_flush(self, n_rows: int, started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._cond:
+            self._unwritten -= n_rows
+            self._written += n_rows
+            self._flushes += 1
+            self._last_flush_ms = elapsed_ms
+            self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+            self._cond.notify_all()
+
+
 def _latest_reference_time_utc(df: pd.DataFrame) -> datetime | None:
     if df is None or df.empty:
         return None
@@ -95,89 +345,6 @@ def _latest_reference_time_utc(df: pd.DataFrame) -> datetime | None:
     return None
 
 
-def _load_state(path: Path) -> dict[str, str]:
-    if not path.exists():
-        return {}
-    try:
-        with open(path, encoding="utf-8") as f:
-            data = json.load(f)
-        if isinstance(data, dict):
-            # key -> logged_at_iso
-            return {str(k): str(v) for k, v in data.items()}
-    except (OSError, ValueError, TypeError) as e:
-        logger.warning("Operational logger: failed to load state: %s", e)
-    return {}
-
-
-def _save_state(path: Path, state: dict[str, str]) -> None:
-    try:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        tmp = path.with_suffix(".tmp")
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(state, f, ensure_ascii=False, indent=2)
-        tmp.replace(path)
-    except (OSError, TypeError, ValueError) as e:
-        logger.warning("Operational logger: failed to save state: %s", e)
-
-
-def _ensure_log_file(path: Path) -> None:
-    """Sørg for at CSV-en finnes med gjeldende header (OPERATIONAL_LOG_FIELDS).
-
-    Tomme/manglende filer får en header, og filer skrevet med en eldre header
-    (skjemadrift, f.eks. før nye kolonner ble lagt til) migreres ved å lese inn
-    eksisterende rader og skrive dem på nytt med full kolonneliste. Dette hindrer
-    at append legger til rader med flere/færre felt enn headeren, noe som ellers
-    korrumperer filen for pandas.read_csv.
-    """
-    try:
-        path.parent.mkdir(parents=True, exist_ok=True)
-
-        if not path.exists() or path.stat().st_size == 0:
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=OPERATIONAL_LOG_FIELDS)
-                writer.writeheader()
-            return
-
-        with open(path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            existing_header = reader.fieldnames or []
-            if existing_header == OPERATIONAL_LOG_FIELDS:
-                return
-            existing_rows = list(reader)
-
-        # Skjemadrift: skriv på nytt med gjeldende header. Ukjente felt i gamle
-        # rader droppes, manglende felt fylles med tom verdi.
-        tmp = path.with_suffix(".tmp")
-        with open(tmp, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=OPERATIONAL_LOG_FIELDS, extrasaction="ignore")
-            writer.writeheader()
-            for row in existing_rows:
-                writer.writerow({field: row.get(field, "") for field in OPERATIONAL_LOG_FIELDS})
-        tmp.replace(path)
-        logger.info("Operational logger: migrated csv header from %s to current schema", existing_header)
-    except (OSError, csv.Error, TypeError, ValueError) as e:
-        logger.warning("Operational logger: failed to bootstrap csv: %s", e)
-
-
-def _prune_state(state: dict[str, str], keep_for: timedelta) -> dict[str, str]:
-    cutoff = datetime.now(UTC) - keep_for
-    pruned: dict[str, str] = {}
-    for key, logged_at_str in state.items():
-        try:
-            logged_at = datetime.fromisoformat(logged_at_str.replace("Z", "+00:00"))
-            if logged_at.tzinfo is None:
-                logged_at = logged_at.replace(tzinfo=UTC)
-        except (ValueError, TypeError):
-            # Keep unknown entries to avoid accidental spam
-            pruned[key] = logged_at_str
-            continue
-
-        if logged_at >= cutoff:
-            pruned[key] = logged_at_str
-
-    return pruned
-
-
 def log_medium_high_alerts(
     *,
     results: dict[str, Any],
@@ -187,7 +354,7 @@ def log_medium_high_alerts(
     suppression_reason: str = "",
     quality_guard_note: str = "",
 ) -> None:
-    """Append MEDIUM/HIGH analyzer results to a CSV (deduped).
+    """Queue MEDIUM/HIGH analyzer results for the operational log store (deduped).
 
     Always logs raw analyzer output (before quality-guard and suppression
     transformations) so that real risk events are captured even when
@@ -195,18 +362,14 @@ def log_medium_high_alerts(
 
     Controlled via:
     - OPERATIONAL_LOG_ENABLED (default: true)
-    - OPERATIONAL_LOG_PATH (default: data/logs/operational_alerts.csv)
-    - OPERATIONAL_LOG_STATE_PATH (default: data/logs/operational_alerts_state.json)
+    - OPERATIONAL_LOG_DB_PATH (default: data/logs/operational_alerts.sqlite)
+    - OPERATIONAL_LOG_PATH (legacy csv to import, default: data/logs/operational_alerts.csv)
     """
 
     enabled = _parse_bool(get_secret("OPERATIONAL_LOG_ENABLED", "true"), default=True)
     if not enabled:
         return
 
-    log_path = _default_log_path()
-    state_path = _default_state_path()
-    _ensure_log_file(log_path)
-
     reference_time_utc = _latest_reference_time_utc(df)
     reference_time_iso = reference_time_utc.isoformat().replace("+00:00", "Z") if reference_time_utc else ""
 
@@ -248,11 +411,7 @@ def log_medium_high_alerts(
             maintenance_work_types = ",".join([str(x) for x in plowing_info.last_work_types])
         maintenance_operator_id = plowing_info.last_operator_id or ""
 
-    state = _load_state(state_path)
-    state = _prune_state(state, keep_for=timedelta(days=14))
-
-    rows_to_append: list[dict[str, object]] = []
-    pending_keys: list[str] = []
+    rows_to_append: list[Mapping[str, object]] = []
 
     for analyzer_name, result in results.items():
         risk_level = getattr(result, "risk_level", None)
@@ -262,10 +421,6 @@ def log_medium_high_alerts(
         risk_name = getattr(risk_level, "name", str(risk_level))
         message = getattr(result, "message", "") or ""
 
-        dedupe_key = f"{reference_time_iso}|{analyzer_name}|{risk_name}"
-        if dedupe_key in state:
-            continue
-
         rows_to_append.append(
             {
                 "logged_at_utc": logged_at_iso,
@@ -291,38 +446,6 @@ def log_medium_high_alerts(
                 "quality_guard_note": quality_guard_note,
             }
         )
-        pending_keys.append(dedupe_key)
-
-    if not rows_to_append:
-        _save_state(state_path, state)
-        return
-
-    try:
-        file_exists = log_path.exists()
-        file_has_content = file_exists and log_path.stat().st_size > 0
-
-        with open(log_path, "a", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=OPERATIONAL_LOG_FIELDS)
-            if not file_has_content:
-                writer.writeheader()
-            writer.writerows(rows_to_append)
-            # Sørg for at radene faktisk er på disk før dedupe-state oppdateres,
-            # slik at en krasj ikke kan etterlate state uten rader (eller motsatt).
-            f.flush()
-            os.fsync(f.fileno())
-    except (OSError, csv.Error, TypeError, ValueError) as e:
-        # Skriving feilet: behold IKKE dedupe-nøklene, så varslene logges på nytt
-        # ved neste forsøk i stedet for å gå tapt.
-        logger.warning("Operational logger: failed to write csv: %s", e)
-        return
-
-    # Først nå, når radene er trygt skrevet, persister vi dedupe-state.
-    for dedupe_key in pending_keys:
-        state[dedupe_key] = logged_at_iso
-    _save_state(state_path, state)
 
-    logger.info(
-        "Operational logger: wrote %s rows to %s",
-        len(rows_to_append),
-        log_path,
-    )
+    # Skrives av bakgrunnstråden; render-stien betaler bare for køinnlegging
+    get_operational_writer().submit(rows_to_append)
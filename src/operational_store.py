@@ -0,0 +1,276 @@
+"""
+SQLite-lager (WAL) for den operasjonelle varselloggen.
+
+Én tabell med samme felter som den gamle CSV-en (`OPERATIONAL_LOG_FIELDS`).
+Dedupe skjer med en unik indeks på (reference_time_utc, analyzer, risk_level),
+så en rerun bare gjør `INSERT OR IGNORE` i stedet for å lese og skrive en
+JSON-tilstand. KPI-ene for dashboardet er én aggregatspørring over en indeksert
+tidsrange, slik at kostnaden ikke vokser med sesongene.
+
+Eksisterende `operational_alerts.csv` importeres én gang (og på nytt bare hvis
+filen endres); duplikater hoppes over av den unike indeksen.
+
+Eksempel:
+    store = OperationalLogStore(path)
+    store.append(rows)
+    kpis = store.kpis(since=datetime.now(UTC) - timedelta(days=14))
+"""
+
+from __future__ import annotations
+
+import csv
+import logging
+import sqlite3
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+OPERATIONAL_LOG_FIELDS = [
+    "logged_at_utc",
+    "reference_time_utc",
+    "analyzer",
+    "risk_level",
+    "message",
+    "air_temperature",
+    "surface_temperature",
+    "wind_speed",
+    "wind_gust",
+    "precipitation_1h",
+    "surface_snow_thickness",
+    "maintenance_last_utc",
+    "maintenance_hours_since",
+    "maintenance_source",
+    "maintenance_event_type",
+    "maintenance_work_types",
+    "maintenance_operator_id",
+    "maintenance_error",
+    "suppressed_by_maintenance",
+    "suppression_reason",
+    "quality_guard_note",
+]
+
+_REAL_FIELDS = {
+    "air_temperature",
+    "surface_temperature",
+    "wind_speed",
+    "wind_gust",
+    "precipitation_1h",
+    "surface_snow_thickness",
+    "maintenance_hours_since",
+}
+_TIME_FIELDS = {"logged_at_utc", "maintenance_last_utc"}
+
+_KEY_FIELDS = ("reference_time_utc", "analyzer", "risk_level")
+
+
+def _column_sql(name: str) -> str:
+    if name in _REAL_FIELDS:
+        return f"{name} REAL"
+    if name == "suppressed_by_maintenance":
+        return f"{name} INTEGER NOT NULL DEFAULT 0"
+    if name in _KEY_FIELDS:
+        # NULL er aldri lik NULL i en unik indeks; tom streng dedupes som før
+        return f"{name} TEXT NOT NULL DEFAULT ''"
+    return f"{name} TEXT"
+
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS alerts ({", ".join(_column_sql(name) for name in OPERATIONAL_LOG_FIELDS)});
+CREATE UNIQUE INDEX IF NOT EXISTS alerts_dedupe ON alerts ({", ".join(_KEY_FIELDS)});
+CREATE INDEX IF NOT EXISTS alerts_logged_at ON alerts (logged_at_utc);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+# Presisjon/recall-proxy: vedlikehold innen 6t regnes som treff, >24t/ukjent som bom
+_TP_MAX_HOURS = 6
+_FP_MIN_HOURS = 24
+
+
+def _iso_z(value: Any) -> str | None:
+    """Normaliser tidspunkt til `YYYY-MM-DDTHH:MM:SSZ` (sorterbart som tekst)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        ts = value
+    else:
+        try:
+            ts = datetime.fromisoformat(str(value).strip())
+        except ValueError:
+            return None
+    ts = ts.replace(tzinfo=UTC) if ts.tzinfo is None else ts.astimezone(UTC)
+    return ts.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _as_real(value: Any) -> float | None:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_flag(value: Any) -> int:
+    if isinstance(value, str):
+        return int(value.strip().lower() in {"1", "true", "yes", "y", "on"})
+    try:
+        return int(float(value) >= 1)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _normalize_row(row: Mapping[str, Any]) -> tuple:
+    values = []
+    for name in OPERATIONAL_LOG_FIELDS:
+        value = row.get(name)
+        if name in _TIME_FIELDS:
+            values.append(_iso_z(value))
+        elif name == "reference_time_utc":
+            values.append(_iso_z(value) or "")
+        elif name in _REAL_FIELDS:
+            values.append(_as_real(value))
+        elif name == "suppressed_by_maintenance":
+            values.append(_as_flag(value))
+        elif name in _KEY_FIELDS:
+            values.append("" if value is None else str(value))
+        else:
+            values.append(None if value in (None, "") else str(value))
+    return tuple(values)
+
+
+@dataclass(frozen=True)
+class OperationalKpis:
+    """Aggregater for varsler logget i en periode."""
+    total: int = 0
+    high: int = 0
+    suppressed: int = 0
+    tp_proxy: int = 0
+    fp_proxy: int = 0
+    maintenance_events: int = 0
+
+    @property
+    def high_share_pct(self) -> float:
+        return self.high / self.total * 100 if self.total else 0.0
+
+    @property
+    def suppressed_share_pct(self) -> float:
+        return self.suppressed / self.total * 100 if self.total else 0.0
+
+    @property
+    def precision_pct(self) -> float:
+        denom = self.tp_proxy + self.fp_proxy
+        return self.tp_proxy / denom * 100 if denom else 0.0
+
+    @property
+    def recall_pct(self) -> float:
+        return self.tp_proxy / self.maintenance_events * 100 if self.maintenance_events else 0.0
+
+
+class OperationalLogStore:
+    """SQLite-database for varselloggen (WAL, én kortlivet forbindelse per operasjon)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=10.0)) as conn:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                self._initialized = True
+            with conn:
+                yield conn
+
+    def ensure_schema(self) -> None:
+        """Opprett databasefil, WAL-modus og tabeller hvis de mangler."""
+        with self._connect():
+            pass
+
+    def append(self, rows: Iterable[Mapping[str, Any]]) -> int:
+        """Sett inn rader; rader med eksisterende dedupe-nøkkel hoppes over. Returnerer antall nye."""
+        values = [_normalize_row(row) for row in rows]
+        if not values:
+            return 0
+        placeholders = ", ".join("?" for _ in OPERATIONAL_LOG_FIELDS)
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                f"INSERT OR IGNORE INTO alerts ({', '.join(OPERATIONAL_LOG_FIELDS)}) VALUES ({placeholders})",
+                values,
+            )
+            return conn.total_changes - before
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0]
+
+    def is_empty(self) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM alerts LIMIT 1").fetchone() is None
+
+    def kpis(self, since: datetime) -> OperationalKpis:
+        """KPI-er for varsler logget fra og med `since` (indeksert range-spørring)."""
+        query = f"""
+            SELECT
+                COUNT(*),
+                COALESCE(SUM(risk_level = 'HIGH'), 0),
+                COALESCE(SUM(suppressed_by_maintenance > 0), 0),
+                COALESCE(SUM(maintenance_hours_since <= {_TP_MAX_HOURS}), 0),
+                COALESCE(SUM(maintenance_hours_since > {_FP_MIN_HOURS} OR maintenance_hours_since IS NULL), 0),
+                COUNT(DISTINCT maintenance_last_utc)
+            FROM alerts
+            WHERE logged_at_utc >= ?
+        """
+        with self._connect() as conn:
+            row = conn.execute(query, (_iso_z(since),)).fetchone()
+        return OperationalKpis(*row)
+
+    def reference_times(self, start: datetime, end: datetime) -> list[tuple[str, str]]:
+        """(reference_time_utc, risk_level) for varsler som ikke er undertrykt, med referansetid i [start, end)."""
+        query = """
+            SELECT reference_time_utc, risk_level
+            FROM alerts
+            WHERE reference_time_utc >= ? AND reference_time_utc < ? AND suppressed_by_maintenance = 0
+        """
+        with self._connect() as conn:
+            return conn.execute(query, (_iso_z(start), _iso_z(end))).fetchall()
+
+    def import_csv(self, csv_path: Path) -> int:
+        """
+        Importer en eksisterende CSV-logg én gang.
+
+        Filens størrelse og endringstid lagres i `meta`; samme fil importeres
+        ikke på nytt. Manglende kolonner (eldre header) blir tomme.
+        """
+        if not csv_path.exists():
+            return 0
+        stat = csv_path.stat()
+        marker = f"{stat.st_size}:{stat.st_mtime_ns}"
+        key = f"imported_csv:{csv_path.resolve()}"
+
+        with self._connect() as conn:
+            done = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        if done is not None and done[0] == marker:
+            return 0
+
+        try:
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                inserted = self.append(csv.DictReader(f))
+        except (OSError, csv.Error, UnicodeDecodeError) as exc:
+            logger.warning("Kunne ikke importere operasjonell CSV %s: %s", csv_path, exc)
+            return 0
+
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, marker))
+        logger.info("Importerte %d rader fra %s til %s", inserted, csv_path, self.path)
+        return inserted
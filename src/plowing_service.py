@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
+from src.analyzers.base import AnalysisResult, RiskLevel
 from src.config import get_secret, settings
 from src.plowman_client import get_last_maintenance_result
 
@@ -185,6 +186,51 @@ Vinduet styres via env/secrets:
     return is_maintenance_action(plowing_info)
 
 
+def describe_maintenance(plowing_info: "PlowingInfo") -> str:
+    """Kort tekst om siste vedlikehold (arbeidstyper, ellers hendelsestype)."""
+    if plowing_info.last_work_types:
+        return ", ".join([str(x) for x in plowing_info.last_work_types if str(x).strip()])
+    if plowing_info.last_event_type:
+        return str(plowing_info.last_event_type)
+    return "ukjent vedlikeholdstype"
+
+
+def apply_maintenance_suppression(
+    results: dict[str, AnalysisResult],
+    plowing_info: "PlowingInfo",
+) -> dict[str, AnalysisResult]:
+    """Sett farevarsler til LAV ved nylig vedlikehold (`should_suppress_alerts`).
+
+Felles for dashboardet og varslingstjenesten (`src/alert_service.py`).
+"""
+
+    if not should_suppress_alerts(plowing_info):
+        return results
+
+    reason = describe_maintenance(plowing_info)
+    suppressed = {}
+    for name, r in results.items():
+        if r.risk_level != RiskLevel.LOW:
+            suppressed[name] = AnalysisResult(
+                risk_level=RiskLevel.LOW,
+                message=f"Nylig vedlikehold ({reason}) – farevarsel stanset",
+                scenario=r.scenario,
+                factors=(r.factors or []) + [f"Nylig vedlikehold: {reason}"],
+                details={
+                    **(r.details or {}),
+                    "suppressed_by_maintenance": True,
+                    "maintenance_hours_since": plowing_info.hours_since,
+                    "maintenance_event_type": plowing_info.last_event_type,
+                    "maintenance_work_types": plowing_info.last_work_types,
+                    "maintenance_operator_id": plowing_info.last_operator_id,
+                },
+                timestamp=r.timestamp,
+            )
+        else:
+            suppressed[name] = r
+    return suppressed
+
+
 def get_maintenance_suppress_hours() -> float:
     """Returnerer hvor lenge farevarsel skal stanses etter vedlikehold."""
     try:
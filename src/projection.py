@@ -0,0 +1,180 @@
+"""
+Projisert risiko per time: observert historikk + MET-prognose.
+
+Frost-historikken og prognosepunktene skjøtes til én sammenhengende
+timeserie, og hver analysator kjøres én gang med `analyze_series` over hele
+rammen. Radene etter siste observasjon er «projisert risiko» for de neste
+`settings.api.forecast_hours` timene, med de samme kausale vinduene som
+`analyze()` bruker (f.eks. snøendring og nedbør over flere timer strekker seg
+fra observert inn i prognose).
+
+Prognosen mangler noen variabler; de fylles med enkle persistens-antakelser:
+
+- snødybde: siste observerte verdi
+- bakketemperatur: prognosert lufttemperatur + siste observerte bakke/luft-avvik
+- vindkast: prognosert vind × observert kast/vind-forhold (hvis MET ikke gir kast)
+- duggpunkt: fra prognosert temperatur og relativ fuktighet (Magnus)
+
+Eksempel:
+    projection = project_risk(observed_df, forecast_df)
+    if projection is not None:
+        print(projection.first_warning("Snøfokk"))
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.analyzers import BaseAnalyzer, RiskLevel
+from src.backtest import default_analyzers
+from src.config import settings
+
+PROJECTION_COLUMNS = ('reference_time', 'analyzer', 'risk_level', 'scenario')
+
+_RANK = {RiskLevel.UNKNOWN.value: 0, RiskLevel.LOW.value: 1, RiskLevel.MEDIUM.value: 2, RiskLevel.HIGH.value: 3}
+
+# Magnus-koeffisienter (over vann), samme som WMO-veiledningen
+_MAGNUS_A = 17.62
+_MAGNUS_B = 243.12
+
+
+@dataclass
+class RiskProjection:
+    """Projisert risiko per time og analysator (lang tabell, `PROJECTION_COLUMNS`)."""
+
+    timeline: pd.DataFrame
+    observed_until: pd.Timestamp
+
+    def wide(self) -> pd.DataFrame:
+        """Én rad per prognosetime, én kolonne per analysator (risk_level)."""
+        if self.timeline.empty:
+            return pd.DataFrame()
+        return self.timeline.pivot(index='reference_time', columns='analyzer', values='risk_level')
+
+    def peak(self, analyzer: str) -> str:
+        """Høyeste projiserte nivå (RiskLevel.value) for analysatoren."""
+        levels = self.timeline.loc[self.timeline['analyzer'] == analyzer, 'risk_level']
+        if levels.empty:
+            return RiskLevel.UNKNOWN.value
+        return max(levels, key=lambda level: _RANK.get(level, 0))
+
+    def first_warning(self, analyzer: str) -> tuple[pd.Timestamp, str, str] | None:
+        """Første time med MEDIUM/HIGH: (tidspunkt, nivå, scenario), ellers None."""
+        rows = self.timeline[
+            (self.timeline['analyzer'] == analyzer)
+            & self.timeline['risk_level'].isin([RiskLevel.MEDIUM.value, RiskLevel.HIGH.value])
+        ]
+        if rows.empty:
+            return None
+        first = rows.iloc[0]
+        return first['reference_time'], first['risk_level'], first['scenario']
+
+
+def _dew_point(temp: pd.Series, humidity: pd.Series) -> pd.Series:
+    rh = humidity.clip(lower=1.0, upper=100.0)
+    gamma = np.log(rh / 100.0) + _MAGNUS_A * temp / (_MAGNUS_B + temp)
+    return _MAGNUS_B * gamma / (_MAGNUS_A - gamma)
+
+
+def _recent(history: pd.DataFrame, hours: float) -> pd.DataFrame:
+    cutoff = history['reference_time'].iloc[-1] - pd.Timedelta(hours=hours)
+    return history[history['reference_time'] > cutoff]
+
+
+def _numeric(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series(np.nan, index=df.index, dtype=float)
+    return pd.to_numeric(df[col], errors='coerce')
+
+
+def fill_unobserved(history: pd.DataFrame, forecast: pd.DataFrame) -> pd.DataFrame:
+    """Fyll variabler prognosen ikke har, etter persistens-antakelsene i modulens docstring."""
+    cfg = settings.projection
+    out = forecast.copy()
+    air = _numeric(out, 'air_temperature')
+
+    snow = _numeric(history, 'surface_snow_thickness').dropna()
+    out['surface_snow_thickness'] = snow.iloc[-1] if not snow.empty else np.nan
+
+    recent = _recent(history, cfg.surface_offset_lookback_hours)
+    offset = (_numeric(recent, 'surface_temperature') - _numeric(recent, 'air_temperature')).median()
+    out['surface_temperature'] = air + offset if pd.notna(offset) else np.nan
+
+    gust = _numeric(out, 'max_wind_gust')
+    if gust.isna().all():
+        recent = _recent(history, cfg.gust_ratio_lookback_hours)
+        wind_obs = _numeric(recent, 'wind_speed')
+        ratio = (_numeric(recent, 'max_wind_gust') / wind_obs.where(wind_obs >= 1.0)).median()
+        if pd.notna(ratio):
+            out['max_wind_gust'] = _numeric(out, 'wind_speed') * max(float(ratio), 1.0)
+
+    humidity = _numeric(out, 'relative_humidity')
+    out['dew_point_temperature'] = _dew_point(air, humidity)
+    return out
+
+
+def build_projection_frame(observed: pd.DataFrame, forecast: pd.DataFrame) -> tuple[pd.DataFrame, int] | None:
+    """
+    Skjøt observert historikk og prognose til én ramme.
+
+    Returns:
+        (ramme sortert på tid, indeks til første prognoserad), eller None når
+        en av delene mangler eller gapet mellom dem er for stort
+    """
+    cfg = settings.projection
+    if observed is None or observed.empty or forecast is None or forecast.empty:
+        return None
+    if 'reference_time' not in observed.columns or 'reference_time' not in forecast.columns:
+        return None
+
+    history = observed.copy()
+    history['reference_time'] = pd.to_datetime(history['reference_time'], utc=True, errors='coerce')
+    history = history.dropna(subset=['reference_time']).sort_values('reference_time')
+    if history.empty:
+        return None
+    observed_until = history['reference_time'].iloc[-1]
+    history = history[history['reference_time'] > observed_until - pd.Timedelta(hours=cfg.history_hours)]
+
+    future = forecast.copy()
+    future['reference_time'] = pd.to_datetime(future['reference_time'], utc=True, errors='coerce')
+    future = future[future['reference_time'] > observed_until].sort_values('reference_time')
+    if future.empty:
+        return None
+    if future['reference_time'].iloc[0] - observed_until > pd.Timedelta(hours=cfg.max_gap_hours):
+        return None
+
+    future = fill_unobserved(history, future)
+    frame = pd.concat([history, future], ignore_index=True, sort=False)
+    return frame, len(history)
+
+
+def project_risk(
+    observed: pd.DataFrame,
+    forecast: pd.DataFrame,
+    analyzers: dict[str, BaseAnalyzer] | None = None,
+) -> RiskProjection | None:
+    """
+    Projisert risiko per prognosetime for hver analysator (én `analyze_series` hver).
+
+    Returns:
+        RiskProjection, eller None når observasjon og prognose ikke kan skjøtes
+    """
+    built = build_projection_frame(observed, forecast)
+    if built is None:
+        return None
+    frame, first_forecast = built
+
+    parts = []
+    for name, analyzer in (analyzers or default_analyzers()).items():
+        series = analyzer.analyze_series(frame).iloc[first_forecast:]
+        parts.append(pd.DataFrame({
+            'reference_time': series['reference_time'].to_numpy(),
+            'analyzer': name,
+            'risk_level': series['risk_level'].to_numpy(),
+            'scenario': series['scenario'].to_numpy(),
+        }))
+    timeline = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=list(PROJECTION_COLUMNS))
+    return RiskProjection(timeline=timeline, observed_until=frame['reference_time'].iloc[first_forecast - 1])
@@ -0,0 +1,480 @@
+"""
+Materialiserte dags- og ukesaggregater per stasjon (SQLite, WAL).
+
+Timeobservasjonene i `ObservationStore` rulles opp til én rad per lokalt døgn
+(`daily`) og én rad per ISO-uke (`weekly`): nysnø, nedbør etter fase, maks
+vindkast, frost- og mildværstimer og antall varsler fra den operasjonelle
+loggen. Ukesoppsummeringer, sesongsammenligning og fredagsregelen for
+tunbrøyting leser dermed noen hundre rader i stedet for titusenvis av timer.
+
+Oppdateringen er inkrementell: `sync()` husker størrelse og mtime for hver
+månedspartisjon og regner bare om døgnene i partisjoner som er endret siden
+forrige gang (live-henting berører normalt bare inneværende måned, backfill
+de månedene den skriver). Berørte ISO-uker aggregeres på nytt fra `daily`.
+Omregning fra værdata skriver bare værkolonnene; varseltellerne telles på
+nytt fra loggen ved hver `sync()` med `alerts`, siden varsler kan logges
+etter at måneden er rullet opp.
+
+Nysnø følger samme regel som `HistoricalWeatherService.calculate_new_snow`
+(positiv snødybdeendring ved kald luft, med timetak). Nedbørsfase:
+snø ved duggpunkt under `fresh_snow.dew_point_max` (lufttemperatur når
+duggpunkt mangler), sludd opp til `snow_limit.slaps_temp_c`, ellers regn.
+
+Eksempel:
+    rollups = get_rollup_store()
+    rollups.sync(ObservationStore(), alerts=get_operational_store())
+    print(rollups.weekly(station_id, start=date(2026, 1, 1)))
+    print(rollups.tun_plowing_status(station_id, date.today()))
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from datetime import UTC, date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config import get_secret, settings
+from src.observation_store import TIME_COLUMN, ObservationStore
+from src.operational_store import OperationalLogStore
+
+logger = logging.getLogger(__name__)
+
+
+# Kolonner som leses fra observasjonslageret
+INPUT_COLUMNS = [
+    "air_temperature",
+    "dew_point_temperature",
+    "precipitation_1h",
+    "max_wind_gust",
+    "surface_snow_thickness",
+]
+
+# Døgnverdier: summer, maks og min (samme aggregering brukes videre til uke)
+_SUM_FIELDS = (
+    "hours",
+    "new_snow_cm",
+    "precip_mm",
+    "precip_snow_mm",
+    "precip_sleet_mm",
+    "precip_rain_mm",
+    "frost_hours",
+    "mild_hours",
+    "alerts_medium",
+    "alerts_high",
+)
+_MAX_FIELDS = ("max_gust", "max_air_temp")
+_MIN_FIELDS = ("min_air_temp",)
+
+DAILY_FIELDS = ["day", "iso_year", "iso_week", *_SUM_FIELDS, *_MAX_FIELDS, *_MIN_FIELDS, "snow_depth_cm"]
+WEEKLY_FIELDS = ["iso_year", "iso_week", "first_day", "last_day", "days", *_SUM_FIELDS, *_MAX_FIELDS, *_MIN_FIELDS]
+
+_ALERT_FIELDS = ("alerts_medium", "alerts_high")
+# Kolonner som regnes fra værdata (alt unntatt nøkkel og varseltellere)
+_WEATHER_FIELDS = [name for name in DAILY_FIELDS if name != "day" and name not in _ALERT_FIELDS]
+
+_INTEGER_FIELDS = {"iso_year", "iso_week", "hours", "frost_hours", "mild_hours", "alerts_medium", "alerts_high"}
+
+
+def _column_sql(name: str) -> str:
+    if name in _INTEGER_FIELDS:
+        return f"{name} INTEGER NOT NULL DEFAULT 0"
+    return f"{name} REAL"
+
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS daily (
+    station_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    {", ".join(_column_sql(name) for name in DAILY_FIELDS[1:])},
+    PRIMARY KEY (station_id, day)
+);
+CREATE INDEX IF NOT EXISTS daily_week ON daily (station_id, iso_year, iso_week);
+CREATE TABLE IF NOT EXISTS weekly (
+    station_id TEXT NOT NULL,
+    iso_year INTEGER NOT NULL,
+    iso_week INTEGER NOT NULL,
+    first_day TEXT NOT NULL,
+    last_day TEXT NOT NULL,
+    days INTEGER NOT NULL,
+    {", ".join(_column_sql(name) for name in (*_SUM_FIELDS, *_MAX_FIELDS, *_MIN_FIELDS))},
+    PRIMARY KEY (station_id, iso_year, iso_week)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+_WEEKLY_SELECT = f"""
+    SELECT station_id, iso_year, iso_week, MIN(day), MAX(day), COUNT(*),
+        {", ".join(f"SUM({name})" for name in _SUM_FIELDS)},
+        {", ".join(f"MAX({name})" for name in _MAX_FIELDS)},
+        {", ".join(f"MIN({name})" for name in _MIN_FIELDS)}
+    FROM daily
+    WHERE station_id = ? AND iso_year = ? AND iso_week = ?
+    GROUP BY station_id, iso_year, iso_week
+"""
+
+
+def _numeric(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series(np.nan, index=df.index, dtype=float)
+    return pd.to_numeric(df[col], errors="coerce").astype(float)
+
+
+def _empty_daily() -> pd.DataFrame:
+    return pd.DataFrame(columns=DAILY_FIELDS)
+
+
+def daily_rollups(hourly: pd.DataFrame, timezone: str | None = None) -> pd.DataFrame:
+    """
+    Aggreger timeobservasjoner til lokale døgn.
+
+    Snødybdeendringen for første time i rammen mangler forgjenger; ta med
+    timen før første døgn som skal regnes (se `RollupStore._rollup_month`).
+
+    Returns:
+        Én rad per døgn med `DAILY_FIELDS` (varseltellere er 0)
+    """
+    if hourly is None or hourly.empty or TIME_COLUMN not in hourly.columns:
+        return _empty_daily()
+    hist = settings.historical
+    fresh = settings.fresh_snow
+    cfg = settings.rollup
+
+    df = hourly.copy()
+    df[TIME_COLUMN] = pd.to_datetime(df[TIME_COLUMN], utc=True, errors="coerce")
+    df = df.dropna(subset=[TIME_COLUMN]).sort_values(TIME_COLUMN).drop_duplicates(TIME_COLUMN, keep="last")
+    if df.empty:
+        return _empty_daily()
+
+    air = _numeric(df, "air_temperature")
+    dew = _numeric(df, "dew_point_temperature")
+    precip = _numeric(df, "precipitation_1h").clip(lower=0.0)
+
+    change = _numeric(df, "surface_snow_thickness").diff()
+    is_new_snow = (change > hist.new_snow_change_min_cm) & (air < hist.new_snow_air_temp_max)
+    new_snow = change.where(is_new_snow, 0.0).clip(upper=hist.new_snow_hourly_cap_cm)
+
+    is_snow = (dew < fresh.dew_point_max) | (dew.isna() & (air < fresh.air_temp_max))
+    is_sleet = ~is_snow & (air <= settings.snow_limit.slaps_temp_c)
+    is_rain = ~is_snow & ~is_sleet & air.notna()
+
+    days = df[TIME_COLUMN].dt.tz_convert(timezone or cfg.timezone).dt.strftime("%Y-%m-%d")
+    frame = pd.DataFrame({
+        "day": days,
+        "hours": 1,
+        "new_snow_cm": new_snow,
+        "precip_mm": precip,
+        "precip_snow_mm": precip.where(is_snow),
+        "precip_sleet_mm": precip.where(is_sleet),
+        "precip_rain_mm": precip.where(is_rain),
+        "frost_hours": (air < cfg.frost_air_temp_max).astype(int),
+        "mild_hours": (air > cfg.mild_air_temp_min).astype(int),
+        "max_gust": _numeric(df, "max_wind_gust"),
+        "max_air_temp": air,
+        "min_air_temp": air,
+        "snow_depth_cm": _numeric(df, "surface_snow_thickness"),
+    })
+    grouped = frame.groupby("day", sort=True)
+    out = grouped[list(_SUM_FIELDS[:-2])].sum(min_count=0)
+    out["max_gust"] = grouped["max_gust"].max()
+    out["max_air_temp"] = grouped["max_air_temp"].max()
+    out["min_air_temp"] = grouped["min_air_temp"].min()
+    # Snødybde ved døgnets slutt (siste gyldige måling)
+    out["snow_depth_cm"] = grouped["snow_depth_cm"].last()
+    out["alerts_medium"] = 0
+    out["alerts_high"] = 0
+    out = out.reset_index()
+
+    iso = pd.to_datetime(out["day"]).dt.isocalendar()
+    out["iso_year"] = iso["year"].astype(int).to_numpy()
+    out["iso_week"] = iso["week"].astype(int).to_numpy()
+    return out[DAILY_FIELDS]
+
+
+def _local_midnight_utc(day: date, timezone: str) -> pd.Timestamp:
+    return pd.Timestamp(day.isoformat()).tz_localize(timezone).tz_convert(UTC)
+
+
+def _file_marker(path: Path) -> str | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _sql_value(value: object) -> object:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+@dataclass(frozen=True)
+class TunPlowingStatus:
+    """Akkumulert nysnø i døgnene [since, until] (fredagsregelen for tunbrøyting)."""
+    since: date
+    until: date
+    new_snow_cm: float
+    days_with_data: int
+
+    @property
+    def complete(self) -> bool:
+        """Alle døgn i vinduet har data."""
+        return self.days_with_data >= (self.until - self.since).days + 1
+
+
+class RollupStore:
+    """SQLite-database for dags-/ukesaggregater (WAL, én kortlivet forbindelse per operasjon)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=10.0)) as conn:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                self._initialized = True
+            with conn:
+                yield conn
+
+    def sync(
+        self,
+        observations: ObservationStore,
+        alerts: OperationalLogStore | None = None,
+        full: bool = False,
+    ) -> int:
+        """
+        Oppdater aggregater for månedspartisjoner endret siden forrige sync.
+
+        Args:
+            observations: Observasjonslageret for stasjonen
+            alerts: Operasjonell logg å telle varsler fra (loggen gjelder den
+                konfigurerte stasjonen; utelat for andre stasjoner). Uten logg
+                beholdes lagrede varseltellere.
+            full: Regn om alle partisjoner
+
+        Returns:
+            Antall døgn skrevet (omregnet fra værdata eller med endrede varseltellere)
+        """
+        station_id = observations.station_id
+        prefix = f"partition:{station_id}:"
+        with self._connect() as conn:
+            marks = dict(conn.execute("SELECT key, value FROM meta WHERE key LIKE ?", (prefix + "%",)).fetchall())
+
+        touched: set[str] = set()
+        for path in observations.partitions():
+            key = prefix + path.stem
+            marker = _file_marker(path)
+            if marker is None or (not full and marks.get(key) == marker):
+                continue
+            touched.update(self._rollup_month(observations, path.stem))
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, marker))
+        if alerts is not None:
+            touched.update(self._recount_alerts(station_id, alerts))
+        written = len(touched)
+        if written:
+            logger.info("Rollup %s: %d døgn oppdatert", station_id, written)
+        return written
+
+    def _rollup_month(self, observations: ObservationStore, month: str) -> list[str]:
+        timezone = settings.rollup.timezone
+        month_start = pd.Timestamp(f"{month}-01", tz=UTC)
+        month_end = month_start + pd.DateOffset(months=1)
+        # Lokale døgn som overlapper UTC-måneden, lest i sin helhet
+        first_day = month_start.tz_convert(timezone).date()
+        last_day = (month_end - pd.Timedelta(seconds=1)).tz_convert(timezone).date()
+        window_start = _local_midnight_utc(first_day, timezone)
+        window_end = _local_midnight_utc(last_day + timedelta(days=1), timezone)
+
+        # Én time foran vinduet gir snødybdeendringen for døgnets første time
+        hourly = observations.read(
+            window_start - pd.Timedelta(hours=1),
+            window_end - pd.Timedelta(seconds=1),
+            columns=INPUT_COLUMNS,
+        )
+        days = daily_rollups(hourly, timezone)
+        days = days[(days["day"] >= first_day.isoformat()) & (days["day"] <= last_day.isoformat())]
+        self.upsert_days(observations.station_id, days)
+        return days["day"].tolist()
+
+    def _recount_alerts(self, station_id: str, alerts: OperationalLogStore) -> list[str]:
+        """Tell varsler per døgn fra loggen og skriv døgn der tellerne er endret (returneres)."""
+        timezone = settings.rollup.timezone
+        with self._connect() as conn:
+            stored = pd.DataFrame(
+                conn.execute(
+                    "SELECT day, iso_year, iso_week, alerts_medium, alerts_high FROM daily WHERE station_id = ?",
+                    (station_id,),
+                ).fetchall(),
+                columns=["day", "iso_year", "iso_week", *_ALERT_FIELDS],
+            )
+        if stored.empty:
+            return []
+
+        start = _local_midnight_utc(date.fromisoformat(stored["day"].min()), timezone)
+        end = _local_midnight_utc(date.fromisoformat(stored["day"].max()) + timedelta(days=1), timezone)
+        try:
+            rows = alerts.reference_times(start.to_pydatetime(), end.to_pydatetime())
+        except sqlite3.Error as exc:
+            logger.warning("Rollup: kunne ikke lese varsler fra %s: %s", alerts.path, exc)
+            return []
+
+        counted = stored.copy()
+        counted[list(_ALERT_FIELDS)] = 0
+        if rows:
+            logged = pd.DataFrame(rows, columns=["reference_time_utc", "risk_level"])
+            logged["day"] = (
+                pd.to_datetime(logged["reference_time_utc"], utc=True).dt.tz_convert(timezone).dt.strftime("%Y-%m-%d")
+            )
+            counts = pd.crosstab(logged["day"], logged["risk_level"])
+            for level, column in (("MEDIUM", "alerts_medium"), ("HIGH", "alerts_high")):
+                if level in counts.columns:
+                    counted[column] = counted["day"].map(counts[level]).fillna(0).astype(int).to_numpy()
+
+        changed = counted[(counted[list(_ALERT_FIELDS)] != stored[list(_ALERT_FIELDS)]).any(axis=1)]
+        if changed.empty:
+            return []
+        weeks = sorted({(int(y), int(w)) for y, w in zip(changed["iso_year"], changed["iso_week"], strict=True)})
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE daily SET alerts_medium = ?, alerts_high = ? WHERE station_id = ? AND day = ?",
+                [
+                    (int(row.alerts_medium), int(row.alerts_high), station_id, row.day)
+                    for row in changed.itertuples(index=False)
+                ],
+            )
+            self._reaggregate_weeks(conn, station_id, weeks)
+        return changed["day"].tolist()
+
+    @staticmethod
+    def _reaggregate_weeks(conn: sqlite3.Connection, station_id: str, weeks: list[tuple[int, int]]) -> None:
+        for iso_year, iso_week in weeks:
+            conn.execute(
+                f"INSERT OR REPLACE INTO weekly (station_id, {', '.join(WEEKLY_FIELDS)}) {_WEEKLY_SELECT}",
+                (station_id, iso_year, iso_week),
+            )
+
+    def upsert_days(self, station_id: str, days: pd.DataFrame) -> int:
+        """
+        Skriv døgnrader (`DAILY_FIELDS`) og aggreger berørte ISO-uker på nytt.
+
+        Eksisterende døgn får bare værkolonnene oppdatert; varseltellerne
+        eies av `_recount_alerts` og beholdes.
+        """
+        if days.empty:
+            return 0
+        values = [
+            (station_id, *(_sql_value(row[name]) for name in DAILY_FIELDS))
+            for row in days[DAILY_FIELDS].to_dict("records")
+        ]
+        placeholders = ", ".join("?" for _ in range(len(DAILY_FIELDS) + 1))
+        weeks = sorted({(int(y), int(w)) for y, w in zip(days["iso_year"], days["iso_week"], strict=True)})
+        updates = ", ".join(f"{name} = excluded.{name}" for name in _WEATHER_FIELDS)
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT INTO daily (station_id, {', '.join(DAILY_FIELDS)}) VALUES ({placeholders}) "
+                f"ON CONFLICT (station_id, day) DO UPDATE SET {updates}",
+                values,
+            )
+            self._reaggregate_weeks(conn, station_id, weeks)
+        return len(values)
+
+    def daily(self, station_id: str, start: date | None = None, end: date | None = None) -> pd.DataFrame:
+        """Døgnrader i [start, end] (inkluderende), sortert på dag."""
+        query = f"SELECT {', '.join(DAILY_FIELDS)} FROM daily WHERE station_id = ? AND day >= ? AND day <= ? ORDER BY day"
+        params = (station_id, start.isoformat() if start else "", end.isoformat() if end else "9999")
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return pd.DataFrame(rows, columns=DAILY_FIELDS)
+
+    def weekly(self, station_id: str, start: date | None = None, end: date | None = None) -> pd.DataFrame:
+        """ISO-uker som overlapper [start, end], sortert kronologisk."""
+        query = f"""
+            SELECT {', '.join(WEEKLY_FIELDS)} FROM weekly
+            WHERE station_id = ? AND last_day >= ? AND first_day <= ?
+            ORDER BY iso_year, iso_week
+        """
+        params = (station_id, start.isoformat() if start else "", end.isoformat() if end else "9999")
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return pd.DataFrame(rows, columns=WEEKLY_FIELDS)
+
+    def seasons(self, station_id: str) -> pd.DataFrame:
+        """
+        Sesongtotaler for vintermånedene (`Settings.WINTER_MONTHS`).
+
+        Sesongen navngis etter året den starter (oktober 2025 → 2025).
+        """
+        months = ", ".join(str(m) for m in settings.WINTER_MONTHS)
+        month = "CAST(substr(day, 6, 2) AS INTEGER)"
+        year = "CAST(substr(day, 1, 4) AS INTEGER)"
+        query = f"""
+            SELECT CASE WHEN {month} >= 7 THEN {year} ELSE {year} - 1 END AS season,
+                COUNT(*) AS days,
+                {", ".join(f"SUM({name}) AS {name}" for name in _SUM_FIELDS)},
+                {", ".join(f"MAX({name}) AS {name}" for name in _MAX_FIELDS)},
+                {", ".join(f"MIN({name}) AS {name}" for name in _MIN_FIELDS)}
+            FROM daily
+            WHERE station_id = ? AND {month} IN ({months})
+            GROUP BY season
+            ORDER BY season
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(query, (station_id,))
+            columns = [d[0] for d in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    def snow_between(self, station_id: str, start: date, end: date) -> tuple[float, int]:
+        """(nysnø i cm, antall døgn med data) for døgn i [start, end]."""
+        with self._connect() as conn:
+            total, count = conn.execute(
+                "SELECT COALESCE(SUM(new_snow_cm), 0), COUNT(*) FROM daily WHERE station_id = ? AND day >= ? AND day <= ?",
+                (station_id, start.isoformat(), end.isoformat()),
+            ).fetchone()
+        return float(total), int(count)
+
+    def tun_plowing_status(self, station_id: str, day: date) -> TunPlowingStatus:
+        """
+        Nysnø siden forrige tunbrøytingsdag, til og med `day`.
+
+        Vinduet starter dagen etter siste `settings.rollup.tun_plowing_weekday`
+        før `day`; på en fredag er det altså lørdag-fredag (7 døgn).
+        """
+        weekday = settings.rollup.tun_plowing_weekday
+        days_back = (day.weekday() - weekday) % 7 or 7
+        since = day - timedelta(days=days_back - 1)
+        total, count = self.snow_between(station_id, since, day)
+        return TunPlowingStatus(since=since, until=day, new_snow_cm=total, days_with_data=count)
+
+
+def _default_db_path() -> Path:
+    rel = get_secret("ROLLUP_DB_PATH", "data/store/rollups.sqlite")
+    return (Path(__file__).parent.parent / rel).resolve()
+
+
+_shared: RollupStore | None = None
+_shared_lock = threading.Lock()
+
+
+def get_rollup_store() -> RollupStore:
+    """Prosessdelt aggregatlager (sti fra `ROLLUP_DB_PATH`)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = RollupStore(_default_db_path())
+        return _shared
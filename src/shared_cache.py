@@ -0,0 +1,550 @@
+"""
+Prosessdelt cache-lag for resultater fra eksterne kilder.
+
+Frost-observasjoner, MET-prognose, Netatmo-stasjoner og brøyteinformasjon
+caches her i stedet for i `st.session_state` (per nettleserøkt),
+`st.cache_data` (per prosess) og `lru_cache` på klientinstansen. Alle økter
+i prosessen deler én kopi, og med disk- eller Redis-backend deler også flere
+Streamlit-arbeidere bak en proxy den samme kopien.
+
+Verdier lagres serialisert (pickle), slik at bytebudsjettet er reelt og hver
+leser får sin egen kopi (samme semantikk som `st.cache_data`). Hver verdi har
+en TTL og et stale-while-revalidate-vindu: etter TTL serveres den gamle
+verdien mens en bakgrunnstråd henter ny. Feiler hentingen, serveres den gamle
+verdien så lenge den finnes. Samtidige bom på samme nøkkel slås sammen til én
+henting (`src/single_flight.py`).
+
+Backends (`SHARED_CACHE_BACKEND`):
+- `memory`: LRU i prosessen
+- `disk`: én fil per nøkkel under `SHARED_CACHE_PATH`, delt på maskinen
+- `redis`: Redis-protokoll (`SHARED_CACHE_REDIS_URL`); krever pakken `redis`
+
+Eksempel:
+    cache = get_shared_cache()
+    df = cache.get_or_fetch("frost", (start, end), lambda: fetch(start, end), ttl_seconds=300)
+
+    @shared_cached("netatmo", ttl_seconds=600)
+    def fetch_stations() -> dict: ...
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol, TypeVar, cast
+
+from src.config import settings
+from src.single_flight import SingleFlight, get_single_flight
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+T_co = TypeVar("T_co", covariant=True)
+
+_EXPIRY = struct.Struct("<d")
+
+
+def _own_copy(result: tuple[bytes | None, Any]) -> tuple[bytes | None, Any]:
+    """Egen kopi til en ventende kaller (samme semantikk som et cache-treff)."""
+    payload, value = result
+    if payload is None:
+        return result
+    return payload, pickle.loads(payload)[1]
+
+
+def _namespace_of(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+class CacheBackend(ABC):
+    """Nøkkel/verdi-lager for serialiserte verdier med hard utløpstid."""
+
+    name = "backend"
+
+    def __init__(self) -> None:
+        self.evictions = 0
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        """Verdien for nøkkelen, eller None hvis den mangler eller er utløpt."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        """Lagre verdien; den forsvinner senest etter `ttl_seconds`."""
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> int:
+        """Slett nøkler i navnerom som starter med `prefix` ("" = alle). Returnerer antall."""
+
+    @abstractmethod
+    def usage(self) -> tuple[int, int]:
+        """(antall oppføringer, antall bytes)."""
+
+
+class MemoryBackend(CacheBackend):
+    """LRU i prosessen, begrenset på bytes (trådsikker)."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.time() + ttl_seconds, value)
+            self._bytes += len(value)
+            while self._bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            doomed = [k for k in self._entries if _namespace_of(k).startswith(prefix)]
+            for key in doomed:
+                self._drop(key)
+            return len(doomed)
+
+    def usage(self) -> tuple[int, int]:
+        with self._lock:
+            return len(self._entries), self._bytes
+
+    def _drop(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+
+
+class DiskBackend(CacheBackend):
+    """
+    Én fil per nøkkel (`<katalog>/<navnerom>/<hash>.bin`), delt mellom prosesser.
+
+    Filen starter med utløpstiden; skriving er atomisk (temp-fil + replace).
+    Lesing oppdaterer mtime, og ved overskredet budsjett slettes filene med
+    eldst mtime først (LRU på tvers av prosessene).
+    """
+
+    name = "disk"
+
+    def __init__(self, directory: Path, max_bytes: int):
+        super().__init__()
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        namespace, _, digest = key.partition(":")
+        return self.directory / namespace / f"{digest}.bin"
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return None
+        if len(raw) < _EXPIRY.size or _EXPIRY.unpack_from(raw)[0] <= time.time():
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return raw[_EXPIRY.size:]
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(_EXPIRY.pack(time.time() + ttl_seconds) + value)
+            tmp_path.replace(path)
+        except OSError as exc:
+            # Cache er en optimalisering; verdien returneres uansett
+            logger.warning("Delt cache: kunne ikke skrive %s: %s", path, exc)
+            return
+        self._enforce_budget()
+
+    def delete_prefix(self, prefix: str) -> int:
+        removed = 0
+        for path in self._files():
+            if path.parent.name.startswith(prefix):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def usage(self) -> tuple[int, int]:
+        sizes = [size for _, size, _ in self._stat_files()]
+        return len(sizes), sum(sizes)
+
+    def _files(self) -> list[Path]:
+        if not self.directory.exists():
+            return []
+        return list(self.directory.glob("*/*.bin"))
+
+    def _stat_files(self) -> list[tuple[Path, int, int]]:
+        stats = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            stats.append((path, stat.st_size, stat.st_mtime_ns))
+        return stats
+
+    def _enforce_budget(self) -> None:
+        files = self._stat_files()
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_bytes:
+            return
+        for path, size, _ in sorted(files, key=lambda item: item[2]):
+            path.unlink(missing_ok=True)
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+class RedisBackend(CacheBackend):
+    """
+    Redis-protokoll (Redis, Valkey, KeyDB ...), delt mellom maskiner.
+
+    Utløp håndteres av serveren (`SET ... PX`). Bytebudsjett og utkasting
+    styres av serverens `maxmemory`/`maxmemory-policy` (f.eks. allkeys-lru).
+    `usage()` må skanne alle nøkler, så tallet holdes i `usage_ttl_seconds`.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, key_prefix: str = "snofokk:", usage_ttl_seconds: float = 60.0):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("SHARED_CACHE_BACKEND=redis krever pakken 'redis'") from exc
+        self.key_prefix = key_prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=2.0, socket_connect_timeout=2.0)
+        self._errors: tuple[type[Exception], ...] = (redis.RedisError, OSError)
+        self.usage_ttl_seconds = usage_ttl_seconds
+        self._usage_lock = threading.Lock()
+        self._usage: tuple[float, tuple[int, int]] | None = None
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            return self._client.get(self.key_prefix + key)
+        except self._errors as exc:
+            logger.warning("Delt cache (redis): lesefeil: %s", exc)
+            return None
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        try:
+            self._client.set(self.key_prefix + key, value, px=max(1, int(ttl_seconds * 1000)))
+        except self._errors as exc:
+            logger.warning("Delt cache (redis): skrivefeil: %s", exc)
+
+    def delete_prefix(self, prefix: str) -> int:
+        removed = 0
+        try:
+            for key in self._client.scan_iter(match=f"{self.key_prefix}{prefix}*", count=500):
+                removed += self._client.delete(key)
+        except self._errors as exc:
+            logger.warning("Delt cache (redis): slettefeil: %s", exc)
+        with self._usage_lock:
+            self._usage = None
+        return removed
+
+    def usage(self) -> tuple[int, int]:
+        with self._usage_lock:
+            cached = self._usage
+            if cached is not None and time.monotonic() - cached[0] < self.usage_ttl_seconds:
+                return cached[1]
+            try:
+                keys = list(self._client.scan_iter(match=f"{self.key_prefix}*", count=500))
+                pipe = self._client.pipeline(transaction=False)
+                for key in keys:
+                    pipe.memory_usage(key)
+                size = sum(n or 0 for n in pipe.execute()) if keys else 0
+            except self._errors:
+                return 0, 0
+            self._usage = (time.monotonic(), (len(keys), size))
+            return len(keys), size
+
+
+@dataclass(frozen=True)
+class SharedCacheStats:
+    backend: str
+    entries: int
+    bytes: int
+    hits: int
+    stale_hits: int
+    misses: int
+    evictions: int
+    revalidations: int
+    fetch_errors: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / lookups if lookups else 0.0
+
+
+class SharedCache:
+    """TTL + stale-while-revalidate over en `CacheBackend`, med tellere (trådsikker)."""
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        stale_seconds: float | None = None,
+        revalidate_workers: int | None = None,
+        flights: SingleFlight | None = None,
+        wrap: Callable[[Callable[[], Any]], Callable[[], Any]] | None = None,
+    ):
+        """
+        Args:
+            wrap: Innpakning av bakgrunnsoppdateringer, kalt i tråden som ber om
+                verdien (f.eks. for å koble Streamlit-kontekst til arbeidertråden)
+        """
+        cfg = settings.shared_cache
+        self.backend = backend
+        self._flights = flights or get_single_flight()
+        self.stale_seconds = cfg.stale_while_revalidate_seconds if stale_seconds is None else stale_seconds
+        self._revalidate_workers = revalidate_workers or cfg.revalidate_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._revalidating: set[str] = set()
+        self.wrap = wrap
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._revalidations = 0
+        self._fetch_errors = 0
+
+    @staticmethod
+    def key(namespace: str, parts: Any) -> str:
+        """Backend-nøkkel: navnerom + hash av nøkkeldelene (repr)."""
+        digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+        return f"{namespace}:{digest}"
+
+    def _load(self, key: str) -> tuple[float, Any] | None:
+        raw = self.backend.get(key)
+        if raw is None:
+            return None
+        try:
+            fresh_until, value = pickle.loads(raw)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError, ValueError) as exc:
+            logger.warning("Delt cache: ugyldig oppføring %s: %s", key, exc)
+            return None
+        return fresh_until, value
+
+    def _store(self, key: str, value: Any, ttl_seconds: float, stale_seconds: float) -> bytes | None:
+        try:
+            payload = pickle.dumps((time.time() + ttl_seconds, value), protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as exc:
+            logger.warning("Delt cache: kan ikke serialisere %s: %s", key, exc)
+            return None
+        self.backend.set(key, payload, ttl_seconds + stale_seconds)
+        return payload
+
+    def _fetch_and_store(
+        self, key: str, fetch: Callable[[], Any], ttl_seconds: float, stale_seconds: float
+    ) -> tuple[bytes | None, Any]:
+        """Én henting per nøkkel om gangen (single-flight); ventende kallere får payloaden."""
+        def run() -> tuple[bytes | None, Any]:
+            value = fetch()
+            return self._store(key, value, ttl_seconds, stale_seconds), value
+
+        return self._flights.do(key, run, share=_own_copy)
+
+    def set(self, namespace: str, parts: Any, value: Any, ttl_seconds: float, stale_seconds: float | None = None) -> None:
+        """Lagre en verdi direkte."""
+        stale = self.stale_seconds if stale_seconds is None else stale_seconds
+        self._store(self.key(namespace, parts), value, ttl_seconds, stale)
+
+    def get_or_fetch(
+        self,
+        namespace: str,
+        parts: Any,
+        fetch: Callable[[], T],
+        ttl_seconds: float,
+        stale_seconds: float | None = None,
+        serve_stale: bool = True,
+    ) -> T:
+        """
+        Hent fra cache, ellers kall `fetch` og lagre resultatet.
+
+        Etter TTL (innen stale-vinduet) returneres den gamle verdien og
+        `fetch` kjøres i bakgrunnen. Med `serve_stale=False` hentes utløpte
+        verdier på nytt med en gang, og stale-vinduet brukes bare som
+        reserve ved feil. Feil fra `fetch` propageres bare når det ikke
+        finnes noen gammel verdi å falle tilbake på.
+        """
+        stale = self.stale_seconds if stale_seconds is None else stale_seconds
+        key = self.key(namespace, parts)
+        cached = self._load(key)
+        now = time.time()
+
+        if cached is not None and now < cached[0]:
+            with self._lock:
+                self._hits += 1
+            return cached[1]
+        if cached is not None and stale > 0 and serve_stale:
+            with self._lock:
+                self._stale_hits += 1
+            self._revalidate(key, fetch, ttl_seconds, stale)
+            return cached[1]
+
+        with self._lock:
+            self._misses += 1
+        try:
+            _, value = self._fetch_and_store(key, fetch, ttl_seconds, stale)
+        except Exception:  # noqa: BLE001 - gammel verdi serveres, ellers propageres feilen
+            if cached is None:
+                raise
+            with self._lock:
+                self._fetch_errors += 1
+            logger.warning("Delt cache: henting feilet for %s, bruker gammel verdi", key, exc_info=True)
+            return cached[1]
+        return value
+
+    def _revalidate(self, key: str, fetch: Callable[[], Any], ttl_seconds: float, stale_seconds: float) -> None:
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._revalidate_workers, thread_name_prefix="cache-revalidate"
+                )
+            executor = self._executor
+
+        def task() -> None:
+            try:
+                self._fetch_and_store(key, fetch, ttl_seconds, stale_seconds)
+            except Exception:  # noqa: BLE001 - gammel verdi beholdes til neste forsøk
+                with self._lock:
+                    self._fetch_errors += 1
+                logger.warning("Delt cache: bakgrunnsoppdatering feilet for %s", key, exc_info=True)
+            else:
+                with self._lock:
+                    self._revalidations += 1
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        executor.submit(self.wrap(task) if self.wrap is not None else task)
+
+    def invalidate(self, namespace: str = "") -> int:
+        """Slett oppføringer i navnerom som starter med `namespace` ("" = alle)."""
+        return self.backend.delete_prefix(namespace)
+
+    def stats(self) -> SharedCacheStats:
+        entries, size = self.backend.usage()
+        with self._lock:
+            return SharedCacheStats(
+                backend=self.backend.name,
+                entries=entries,
+                bytes=size,
+                hits=self._hits,
+                stale_hits=self._stale_hits,
+                misses=self._misses,
+                evictions=self.backend.evictions,
+                revalidations=self._revalidations,
+                fetch_errors=self._fetch_errors,
+            )
+
+
+def _project_root() -> Path:
+    return Path(__file__).parent.parent
+
+
+def create_backend(name: str | None = None) -> CacheBackend:
+    """Backend fra konfigurasjonen; ukjent eller utilgjengelig backend gir `memory`."""
+    cfg = settings.shared_cache
+    name = (name or cfg.backend).strip().lower()
+    if name == "disk":
+        return DiskBackend((_project_root() / cfg.disk_path).resolve(), cfg.max_bytes)
+    if name == "redis":
+        try:
+            return RedisBackend(cfg.redis_url, usage_ttl_seconds=cfg.redis_usage_ttl_seconds)
+        except RuntimeError as exc:
+            logger.warning("Delt cache: %s; bruker minne-backend", exc)
+    elif name != "memory":
+        logger.warning("Delt cache: ukjent backend %r; bruker minne-backend", name)
+    return MemoryBackend(cfg.max_bytes)
+
+
+_shared: SharedCache | None = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache() -> SharedCache:
+    """Prosessdelt cache (backend fra `SHARED_CACHE_BACKEND`)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SharedCache(create_backend())
+        return _shared
+
+
+class SharedCachedFunction(Protocol[T_co]):
+    """Funksjon dekorert med `shared_cached`."""
+
+    clear: Callable[[], int]
+
+    def __call__(self, *args: Any, **kwargs: Any) -> T_co: ...
+
+
+def shared_cached(
+    namespace: str,
+    ttl_seconds: float,
+    stale_seconds: float | None = None,
+) -> Callable[[Callable[..., T]], SharedCachedFunction[T]]:
+    """
+    Dekoratør: cache funksjonsresultatet i den delte cachen, nøklet på argumentene.
+
+    Den dekorerte funksjonen får `.clear()` (som `st.cache_data`), som tømmer
+    navnerommet.
+    """
+
+    def decorator(func: Callable[..., T]) -> SharedCachedFunction[T]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            parts = (args, tuple(sorted(kwargs.items())))
+            return get_shared_cache().get_or_fetch(
+                namespace, parts, lambda: func(*args, **kwargs), ttl_seconds, stale_seconds
+            )
+
+        cached = cast(SharedCachedFunction[T], wrapper)
+        cached.clear = lambda: get_shared_cache().invalidate(namespace)
+        return cached
+
+    return decorator
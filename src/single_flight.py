@@ -0,0 +1,152 @@
+"""
+Sammenslåing av samtidige, identiske kall mot eksterne kilder (single-flight).
+
+Når flere økter åpner dashboardet samtidig etter at cachen har gått ut, ber
+alle om det samme Frost-vinduet, den samme prognosen osv. Med `SingleFlight`
+utfører første kaller hentingen, mens samtidige kallere med samme nøkkel
+venter på den samme `Future`-en. Antall kall mot Frost, MET, Netatmo og
+brøyte-API-et følger dermed antall ulike nøkler, ikke antall brukere.
+
+Per nøkkel telles kall, ledere (faktiske hentinger), sammenslåtte kall og
+hvor mange som venter akkurat nå.
+
+Eksempel:
+    flights = get_single_flight()
+    df = flights.do(f"frost:{station}:{start}/{end}", fetch, share=pd.DataFrame.copy)
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# Nøkler med statistikk som beholdes (eldste droppes først)
+_MAX_TRACKED_KEYS = 256
+
+
+@dataclass(frozen=True)
+class FlightStats:
+    """Tellere for én nøkkel."""
+    key: str
+    calls: int
+    leaders: int
+    coalesced: int
+    in_flight: int
+
+
+class _Call:
+    __slots__ = ("future", "waiters")
+
+    def __init__(self) -> None:
+        self.future: Future[Any] = Future()
+        self.waiters = 0
+
+
+class _Counters:
+    __slots__ = ("calls", "leaders", "coalesced")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.leaders = 0
+        self.coalesced = 0
+
+
+class SingleFlight:
+    """Én pågående henting per nøkkel; samtidige kallere deler resultatet (trådsikker)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+        self._counters: OrderedDict[str, _Counters] = OrderedDict()
+
+    def do(self, key: str, fn: Callable[[], T], share: Callable[[T], T] | None = None) -> T:
+        """
+        Kjør `fn`, eller vent på en pågående kjøring med samme nøkkel.
+
+        Args:
+            key: Identifiserer kallet (samme nøkkel = samme resultat)
+            fn: Hentingen
+            share: Kopierer resultatet for ventende kallere (f.eks. `pd.DataFrame.copy`),
+                slik at de ikke deler et muterbart objekt med lederen
+
+        Unntak fra `fn` gis til lederen og alle som ventet på den.
+        """
+        with self._lock:
+            counters = self._counters.get(key)
+            if counters is None:
+                counters = self._counters[key] = _Counters()
+                if len(self._counters) > _MAX_TRACKED_KEYS:
+                    self._counters.popitem(last=False)
+            else:
+                self._counters.move_to_end(key)
+            counters.calls += 1
+            existing = self._calls.get(key)
+            leader = existing is None
+            if existing is None:
+                call = self._calls[key] = _Call()
+                counters.leaders += 1
+            else:
+                call = existing
+                call.waiters += 1
+                counters.coalesced += 1
+
+        if not leader:
+            try:
+                value = call.future.result()
+            finally:
+                with self._lock:
+                    call.waiters -= 1
+            return share(value) if share is not None else value
+
+        try:
+            value = fn()
+        except BaseException as exc:
+            call.future.set_exception(exc)
+            raise
+        else:
+            call.future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> dict[str, int]:
+        """Pågående hentinger: nøkkel → antall ventende kallere."""
+        with self._lock:
+            return {key: call.waiters for key, call in self._calls.items()}
+
+    def stats(self) -> list[FlightStats]:
+        """Tellere per nøkkel, sist brukte først."""
+        with self._lock:
+            return [
+                FlightStats(
+                    key=key,
+                    calls=c.calls,
+                    leaders=c.leaders,
+                    coalesced=c.coalesced,
+                    in_flight=self._calls[key].waiters + 1 if key in self._calls else 0,
+                )
+                for key, c in reversed(self._counters.items())
+            ]
+
+    def totals(self) -> tuple[int, int]:
+        """(antall hentinger, antall sammenslåtte kall) for alle sporede nøkler."""
+        with self._lock:
+            return (
+                sum(c.leaders for c in self._counters.values()),
+                sum(c.coalesced for c in self._counters.values()),
+            )
+
+
+_shared = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Prosessdelt sammenslåing (felles for alle økter og klienter)."""
+    return _shared
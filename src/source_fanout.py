@@ -0,0 +1,131 @@
+"""
+Parallell henting av uavhengige datakilder for dashboardet.
+
+Frost-observasjoner, vedlikeholds-API, MET-prognose og Netatmo er uavhengige
+nettverkskall. `SourceFanout` starter alle samtidig i en trådpool, og hver
+kilde har sin egen tidsfrist målt fra start. Seksjonene i appen henter
+resultatet sitt med `result(name)` når de skal tegnes, så en treg kilde bare
+holder igjen sin egen seksjon.
+
+Feil og tidsavbrudd kastes ikke videre, men returneres i `SourceResult`, slik
+at hver seksjon selv velger reservevisning.
+
+Eksempel:
+    fanout = SourceFanout(executor)
+    fanout.submit("forecast", fetch_forecast, lat, lon, timeout=15)
+    ...
+    forecast = fanout.result("forecast")
+    if forecast.ok:
+        render(forecast.value)
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SourceResult:
+    """Resultat fra én kilde: verdi, eller feil/tidsavbrudd."""
+    name: str
+    value: Any = None
+    error: BaseException | None = None
+    timed_out: bool = False
+    elapsed_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.timed_out
+
+
+@dataclass
+class _Pending:
+    future: Future
+    started: float
+    timeout: float | None
+
+
+class SourceFanout:
+    """
+    Starter navngitte kilder i en delt executor og samler resultatene.
+
+    Executoren eies av kalleren (gjenbrukes mellom Streamlit-reruns), så en
+    kilde som overskrider fristen får fullføre i bakgrunnen uten å blokkere.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        *,
+        wrap: Callable[[Callable[[], Any]], Callable[[], Any]] | None = None,
+    ):
+        """
+        Initialiser fan-out.
+
+        Args:
+            executor: Trådpool kildene kjøres i
+            wrap: Valgfri innpakning av hver oppgave før innsending
+                  (f.eks. for å koble Streamlit-kontekst til arbeidertråden)
+        """
+        self.executor = executor
+        self._wrap = wrap
+        self._pending: dict[str, _Pending] = {}
+        self._results: dict[str, SourceResult] = {}
+
+    def submit(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Start kilden `name` nå; `timeout` regnes fra dette tidspunktet."""
+        if name in self._pending:
+            raise ValueError(f"Kilde er allerede startet: {name}")
+
+        def task() -> Any:
+            return fn(*args, **kwargs)
+
+        job = self._wrap(task) if self._wrap else task
+        self._pending[name] = _Pending(self.executor.submit(job), time.monotonic(), timeout)
+
+    def result(self, name: str) -> SourceResult:
+        """
+        Vent på kilden til fristen går ut.
+
+        Raises:
+            KeyError: Kilden er ikke startet
+        """
+        if name in self._results:
+            return self._results[name]
+
+        pending = self._pending[name]
+        remaining = None
+        if pending.timeout is not None:
+            remaining = max(0.0, pending.timeout - (time.monotonic() - pending.started))
+
+        try:
+            value = pending.future.result(timeout=remaining)
+            outcome = SourceResult(name, value=value, elapsed_seconds=time.monotonic() - pending.started)
+        except FutureTimeoutError:
+            logger.warning("Kilde %s svarte ikke innen %.0fs", name, pending.timeout or 0.0)
+            outcome = SourceResult(name, timed_out=True, elapsed_seconds=time.monotonic() - pending.started)
+        except Exception as e:  # noqa: BLE001 - feilen leveres til seksjonen
+            logger.warning("Kilde %s feilet: %s", name, e)
+            outcome = SourceResult(name, error=e, elapsed_seconds=time.monotonic() - pending.started)
+
+        self._results[name] = outcome
+        return outcome
+
+    def done(self, name: str) -> bool:
+        """Om kilden er ferdig (uten å vente)."""
+        return name in self._results or self._pending[name].future.done()
@@ -1,5 +1,6 @@
 """Visualiseringsmoduler."""
 
+from src.visualizations.figure_cache import FigureCache, get_figure_cache
 from src.visualizations.plots import WeatherPlots
 
-__all__ = ['WeatherPlots']
+__all__ = ['FigureCache', 'WeatherPlots', 'get_figure_cache']
@@ -0,0 +1,141 @@
+"""
+Visuell desimering av tidsserier før tegning.
+
+Lange perioder (og 10-minuttersdata) gir langt flere punkter enn det er
+piksler i grafen. Her velges et begrenset utvalg rad-indekser:
+
+- `lttb`: Largest-Triangle-Three-Buckets, bevarer formen på linjer
+- `minmax`: min og maks per pikselbøtte, bevarer topper (søyler, vindkast)
+
+I tillegg beholdes alltid første/siste punkt, begge sider av hver
+terskelkryssing (f.eks. vindkast ≥ advarsel, bakketemperatur ≤ 0) og
+kantene av NaN-hull, så markeringer og brudd i linjen ikke forsvinner.
+Serier som allerede er kortere enn målet returneres uendret.
+
+Eksempel:
+    idx = decimate_indices(times, [gust], target_points=600,
+                           thresholds=[(0, 14.0)])
+    ax.plot(times.iloc[idx], gust.iloc[idx])
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+def _as_float(values: Any) -> np.ndarray:
+    arr = np.asarray(values)
+    if arr.dtype == object and len(arr) and isinstance(arr[0], pd.Timestamp):
+        # Tidssonebevisste tidspunkter kommer ut som Timestamp-objekter
+        arr = pd.to_datetime(arr, utc=True).tz_localize(None).to_numpy()
+    if np.issubdtype(arr.dtype, np.datetime64):
+        return arr.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return np.asarray(arr, dtype=float)
+
+
+def lttb_indices(x: Any, y: Any, n_out: int) -> np.ndarray:
+    """Indekser valgt med LTTB (NaN-punkter hoppes over; se `gap_indices`)."""
+    xs = _as_float(x)
+    ys = _as_float(y)
+    finite = np.flatnonzero(np.isfinite(xs) & np.isfinite(ys))
+    if len(finite) <= max(n_out, 2):
+        return finite
+    xs, ys = xs[finite], ys[finite]
+    n = len(xs)
+
+    # Første og siste punkt er faste; resten deles i n_out-2 bøtter
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    prev = 0
+    for b in range(n_out - 2):
+        start, stop = edges[b], edges[b + 1]
+        next_stop = edges[b + 2] if b + 2 < len(edges) else n
+        next_start = stop if stop < n else n - 1
+        avg_x = xs[next_start:next_stop].mean() if next_stop > next_start else xs[-1]
+        avg_y = ys[next_start:next_stop].mean() if next_stop > next_start else ys[-1]
+        # Arealet av trekanten (forrige valgt, kandidat, snitt av neste bøtte)
+        area = np.abs(
+            (xs[prev] - avg_x) * (ys[start:stop] - ys[prev])
+            - (xs[prev] - xs[start:stop]) * (avg_y - ys[prev])
+        )
+        prev = start + int(np.argmax(area))
+        selected[b + 1] = prev
+    selected[-1] = n - 1
+    return finite[selected]
+
+
+def minmax_indices(y: Any, n_buckets: int) -> np.ndarray:
+    """Indeks for minimum og maksimum i hver av `n_buckets` like store bøtter."""
+    ys = _as_float(y)
+    n = len(ys)
+    if n <= 2 * n_buckets:
+        return np.flatnonzero(np.isfinite(ys))
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    picked: list[int] = []
+    for start, stop in zip(edges[:-1], edges[1:], strict=True):
+        bucket = ys[start:stop]
+        finite = np.isfinite(bucket)
+        if not finite.any():
+            continue
+        masked_low = np.where(finite, bucket, np.inf)
+        masked_high = np.where(finite, bucket, -np.inf)
+        picked.extend((start + int(np.argmin(masked_low)), start + int(np.argmax(masked_high))))
+    return np.unique(np.asarray(picked, dtype=np.int64))
+
+
+def crossing_indices(y: Any, threshold: float) -> np.ndarray:
+    """Begge naboene rundt hvert skifte i `y >= threshold`."""
+    ys = _as_float(y)
+    above = ys >= threshold
+    changes = np.flatnonzero(above[1:] != above[:-1])
+    return np.unique(np.concatenate([changes, changes + 1]))
+
+
+def gap_indices(y: Any) -> np.ndarray:
+    """Første NaN i hvert hull og de gyldige punktene på hver side."""
+    missing = ~np.isfinite(_as_float(y))
+    if not missing.any():
+        return np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(missing & ~np.concatenate([[False], missing[:-1]]))
+    ends = np.flatnonzero(missing & ~np.concatenate([missing[1:], [False]]))
+    candidates = np.concatenate([starts - 1, starts, ends + 1])
+    return np.unique(candidates[(candidates >= 0) & (candidates < len(missing))])
+
+
+def decimate_indices(
+    x: Any,
+    ys: Sequence[Any],
+    target_points: int,
+    method: str = "lttb",
+    thresholds: Sequence[tuple[int, float]] = (),
+) -> np.ndarray | None:
+    """
+    Sorterte rad-indekser som skal tegnes, eller None hvis alt skal med.
+
+    Args:
+        x: Tidsakse (datetime eller tall), sortert stigende
+        ys: Seriene som tegnes mot `x`; utvalget er unionen for alle serier
+        target_points: Omtrentlig bredde i piksler
+        method: "lttb" eller "minmax"
+        thresholds: (serie-indeks, terskel) der kryssinger alltid beholdes
+    """
+    n = len(x)
+    target_points = max(int(target_points), 3)
+    if n <= target_points:
+        return None
+
+    parts = [np.array([0, n - 1], dtype=np.int64)]
+    for y in ys:
+        if method == "minmax":
+            parts.append(minmax_indices(y, target_points // 2))
+        else:
+            parts.append(lttb_indices(x, y, target_points))
+        parts.append(gap_indices(y))
+    for series_index, threshold in thresholds:
+        parts.append(crossing_indices(ys[series_index], threshold))
+    return np.unique(np.concatenate(parts))
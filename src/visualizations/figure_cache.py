@@ -0,0 +1,163 @@
+"""
+Innholdsadressert cache for ferdig rendrede figurer.
+
+Nøkkelen er plotnavn + argumenter + et fingeravtrykk av DataFrame-innholdet
+(`pd.util.hash_pandas_object`, kolonnenavn og dtypes) + konfigurasjonen
+plottene leser (`settings.viz` og tersklene) + lokal tidssone. Verdien er
+PNG-bytes som kan gis direkte til `st.image`, så en uendret graf koster ett
+hash-oppslag i stedet for en full matplotlib-tegning.
+
+Cachen er delt i prosessen (samme data gir samme bilde for alle økter), med
+LRU-utkasting og grense både på antall figurer og totalt antall bytes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from src.config import settings
+
+
+def frame_fingerprint(df: pd.DataFrame | None) -> str:
+    """Stabil hash av DataFrame-innhold (verdier, kolonnenavn og dtypes, ikke indeks)."""
+    digest = hashlib.blake2b(digest_size=16)
+    if df is None:
+        digest.update(b"none")
+        return digest.hexdigest()
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    if not df.empty:
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _settings_fingerprint() -> str:
+    # Frosne dataclasses har deterministisk repr
+    parts = (settings.viz, settings.snowdrift, settings.slippery, settings.fresh_snow, settings.slaps)
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def figure_to_png(fig: plt.Figure) -> bytes:
+    """Rendre figuren til PNG og lukk den (samme utdata som st.pyplot: tett beskjæring, høy DPI)."""
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=settings.viz.render_dpi, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+@dataclass(frozen=True)
+class FigureCacheStats:
+    entries: int
+    bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    render_ms: float
+
+
+class FigureCache:
+    """LRU-cache for rendrede figurer, begrenset på antall og bytes (trådsikker)."""
+
+    def __init__(self, max_entries: int | None = None, max_bytes: int | None = None):
+        viz = settings.viz
+        self.max_entries = max_entries or viz.figure_cache_max_entries
+        self.max_bytes = max_bytes or viz.figure_cache_max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._render_ms = 0.0
+
+    def key(self, name: str, df: pd.DataFrame | None, **kwargs: Any) -> str:
+        local_tz = time.strftime("%z")
+        args = repr(sorted(kwargs.items()))
+        return f"{name}|{args}|{frame_fingerprint(df)}|{_settings_fingerprint()}|{local_tz}"
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = data
+            self._bytes += len(data)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._evictions += 1
+
+    def render(
+        self,
+        name: str,
+        build: Callable[..., plt.Figure],
+        df: pd.DataFrame | None,
+        **kwargs: Any,
+    ) -> bytes:
+        """PNG for `build(df, **kwargs)`, fra cache hvis data og konfigurasjon er uendret."""
+        key = self.key(name, df, **kwargs)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        data = figure_to_png(build(df, **kwargs))
+        self.record_render((time.perf_counter() - started) * 1000)
+        self.put(key, data)
+        return data
+
+    def record_render(self, elapsed_ms: float) -> None:
+        """Legg til rendretid for figurer tegnet utenfor `render` (f.eks. i en prosesspool)."""
+        with self._lock:
+            self._render_ms += elapsed_ms
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> FigureCacheStats:
+        with self._lock:
+            return FigureCacheStats(
+                entries=len(self._entries),
+                bytes=self._bytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                render_ms=self._render_ms,
+            )
+
+
+_shared: FigureCache | None = None
+_shared_lock = threading.Lock()
+
+
+def get_figure_cache() -> FigureCache:
+    """Prosessdelt figurcache."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = FigureCache()
+        return _shared
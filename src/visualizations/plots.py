@@ -4,16 +4,36 @@ Værdata-visualiseringer.
 Modulære plotting-funksjoner for Streamlit-appen.
 """
 
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import time
 import warnings
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from typing import Any
 
+import matplotlib
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
 from src.config import settings
+from src.visualizations.downsample import decimate_indices
+from src.visualizations.figure_cache import figure_to_png, get_figure_cache
+
+logger = logging.getLogger(__name__)
+
+# Markør i DataFrame.attrs for tidsserier som allerede er klargjort (lokal tid, sortert)
+_PREPARED_ATTR = "weather_plots_prepared"
+
+# Et plot er enten "navn" eller ("navn", {kwargs})
+PlotSpec = str | tuple[str, Mapping[str, Any]]
 
 
 class WeatherPlots:
@@ -23,6 +43,48 @@ class WeatherPlots:
     Alle metoder er klassemetoder for enkel bruk uten instansiering.
     """
 
+    @classmethod
+    def render_png(cls, plot: str, df: pd.DataFrame | None, **kwargs: Any) -> bytes:
+        """
+        Rendret PNG for `create_<plot>_plot(df, **kwargs)` via den delte figurcachen.
+
+        Uendrede data og innstillinger gir cache-treff uten at figuren tegnes
+        på nytt; bytes kan gis direkte til `st.image`.
+        """
+        build = getattr(cls, f"create_{plot}_plot")
+        return get_figure_cache().render(plot, build, df, **kwargs)
+
+    @classmethod
+    def render_many(cls, df: pd.DataFrame | None, specs: Sequence[PlotSpec]) -> list[bytes]:
+        """
+        Rendre flere plot av samme DataFrame og returner PNG-bytes i samme rekkefølge.
+
+        Cache-treff hentes fra figurcachen; resten tegnes i en prosesspool
+        (Agg-backend) slik at matplotlib ikke holder GIL-en for hele settet.
+        Tidsserien klargjøres én gang og deles av alle plottene. Med én
+        arbeider eller feil i poolen rendres det serielt i denne prosessen.
+        """
+        cache = get_figure_cache()
+        jobs = [(spec, {}) if isinstance(spec, str) else (spec[0], dict(spec[1])) for spec in specs]
+        keys = [cache.key(plot, df, **kwargs) for plot, kwargs in jobs]
+        images: list[bytes | None] = [cache.get(key) for key in keys]
+        missing = [i for i, image in enumerate(images) if image is None]
+        if not missing:
+            return images  # type: ignore[return-value]
+
+        prepared, _ = cls._prepare_time_series(df)
+        if prepared is not None:
+            prepared.attrs[_PREPARED_ATTR] = True
+        source = prepared if prepared is not None else df
+
+        started = time.perf_counter()
+        rendered = _render_parallel(source, [jobs[i] for i in missing])
+        cache.record_render((time.perf_counter() - started) * 1000)
+        for i, image in zip(missing, rendered, strict=True):
+            cache.put(keys[i], image)
+            images[i] = image
+        return images  # type: ignore[return-value]
+
     @classmethod
     def create_overview_plot(
         cls,
@@ -264,6 +326,14 @@ class WeatherPlots:
 
         temp = pd.to_numeric(df_prepared['air_temperature'], errors='coerce')
         wind = pd.to_numeric(df_prepared['wind_speed'], errors='coerce')
+        # Vindkjøling er radvis, så radene kan desimeres før beregningen
+        times, temp, wind = cls._thin(
+            ax, times, temp, wind,
+            thresholds=[
+                (0, settings.viz.wind_chill_valid_temp_max_c),
+                (1, settings.viz.wind_chill_valid_wind_min_ms),
+            ],
+        )
 
         # Beregn vindkjøling
         wind_chill: list[float] = []
@@ -361,6 +431,11 @@ class WeatherPlots:
         if 'reference_time' not in df.columns:
             return None, None
 
+        if df.attrs.get(_PREPARED_ATTR):
+            # Klargjort av render_many; grunn kopi så plottene ikke endrer originalen
+            df_prepared = df.copy(deep=False)
+            return df_prepared, df_prepared['reference_time']
+
         df_prepared = df.copy()
         times = pd.to_datetime(df_prepared['reference_time'], errors='coerce', utc=True)
         mask = times.notna()
@@ -395,28 +470,31 @@ class WeatherPlots:
         """Plot temperatur med bakketemperatur og duggpunkt."""
         if 'air_temperature' in df.columns:
             temp = cls._numeric(df, 'air_temperature').ffill()
-            ax.plot(times, temp, color=viz.color_temp,
+            ax.plot(*cls._thin(ax, times, temp), color=viz.color_temp,
                    linewidth=2, label='Lufttemperatur')
 
         # Bakketemperatur - kritisk for isdannelse
         if 'surface_temperature' in df.columns:
+            freeze_point = settings.slippery.surface_temp_freeze
             surface_temp = cls._numeric(df, 'surface_temperature').ffill()
-            ax.plot(times, surface_temp, color='#1E88E5',
+            ax.plot(*cls._thin(ax, times, surface_temp, thresholds=[(0, freeze_point)]), color='#1E88E5',
                     linewidth=2, linestyle='-', label='Bakketemperatur')
             # Marker frysefare: luft > 0, bakke < 0
             if 'air_temperature' in df.columns:
                 temp = cls._numeric(df, 'air_temperature').ffill()
-                freeze_point = settings.slippery.surface_temp_freeze
+                t, temp, surface_temp = cls._thin(
+                    ax, times, temp, surface_temp, thresholds=[(0, freeze_point), (1, freeze_point)]
+                )
                 freeze_risk = (temp > freeze_point) & (surface_temp < freeze_point)
                 if freeze_risk.any():
-                    ax.fill_between(times, temp, surface_temp,
+                    ax.fill_between(t, temp, surface_temp,
                                    where=freeze_risk, alpha=0.3,
                                    color='#E53935', label='Skjult frysefare')
 
         # Duggpunkt - kritisk for snø vs regn
         if 'dew_point_temperature' in df.columns:
             dew_point = cls._numeric(df, 'dew_point_temperature').ffill()
-            ax.plot(times, dew_point, color='#7E57C2',
+            ax.plot(*cls._thin(ax, times, dew_point), color='#7E57C2',
                     linewidth=1.5, linestyle='--', label='Duggpunkt')
 
         # Frysepunkt-linje
@@ -433,8 +511,10 @@ class WeatherPlots:
 
         if 'wind_speed' in df.columns:
             wind = cls._numeric(df, 'wind_speed').ffill()
-            ax.plot(times, wind, color=viz.color_wind,
-                    linewidth=2, label='Vind')
+            ax.plot(
+                *cls._thin(ax, times, wind, thresholds=[(0, thresholds.wind_speed_warning)]),
+                color=viz.color_wind, linewidth=2, label='Vind',
+            )
 
             # Marker terskler for snittvind
             ax.axhline(
@@ -458,13 +538,16 @@ class WeatherPlots:
             gust_col = 'max_wind_gust' if 'max_wind_gust' in df.columns else 'wind_gust'
             if gust_col in df.columns:
                 gust = cls._numeric(df, gust_col).ffill()
-                ax.plot(times, gust, color=viz.color_wind,
+                gust_times, gust = cls._thin(
+                    ax, times, gust, method="minmax", thresholds=[(0, thresholds.wind_gust_warning)]
+                )
+                ax.plot(gust_times, gust, color=viz.color_wind,
                         linewidth=1, alpha=0.6, linestyle='--', label='Vindkast')
 
                 high_gust = gust >= thresholds.wind_gust_warning
                 if high_gust.any():
                     ax.fill_between(
-                        times,
+                        gust_times,
                         0,
                         gust,
                         where=high_gust,
@@ -504,9 +587,10 @@ class WeatherPlots:
 
         if 'surface_snow_thickness' in df.columns:
             snow = cls._numeric(df, 'surface_snow_thickness').ffill()
-            ax.fill_between(times, 0, snow, color=viz.color_snow,
+            snow_times, snow_line = cls._thin(ax, times, snow)
+            ax.fill_between(snow_times, 0, snow_line, color=viz.color_snow,
                            alpha=0.3, label='Snødybde')
-            ax.plot(times, snow, color=viz.color_snow, linewidth=2)
+            ax.plot(snow_times, snow_line, color=viz.color_snow, linewidth=2)
 
             lookback = max(1, int(settings.fresh_snow.lookback_hours))
             snow_change_lookback = snow.diff(periods=lookback).fillna(0)
@@ -539,7 +623,7 @@ class WeatherPlots:
         # Nedbør (høyre akse)
         if 'precipitation_1h' in df.columns:
             precip = cls._numeric(df, 'precipitation_1h').fillna(0)
-            ax2.bar(times, precip, width=0.03, alpha=0.6,
+            ax2.bar(*cls._thin(ax2, times, precip, method="minmax"), width=0.03, alpha=0.6,
                    color=viz.color_precip, label='Nedbør')
 
 
@@ -560,9 +644,10 @@ class WeatherPlots:
             return
 
         snow = cls._numeric(df, 'surface_snow_thickness').ffill()
-        ax.fill_between(times, 0, snow, color=viz.color_snow,
+        snow_times, snow_line = cls._thin(ax, times, snow)
+        ax.fill_between(snow_times, 0, snow_line, color=viz.color_snow,
                         alpha=0.3)
-        ax.plot(times, snow, color=viz.color_snow, linewidth=2, label='Snødybde')
+        ax.plot(snow_times, snow_line, color=viz.color_snow, linewidth=2, label='Snødybde')
 
         # Beregn snøendring siste N timer (nysnø-indikator)
         ax2 = ax.twinx()
@@ -571,7 +656,7 @@ class WeatherPlots:
 
         # Vis bare positive endringer (nysnø)
         new_snow = snow_change_lookback.clip(lower=0)
-        ax2.bar(times, new_snow, width=0.02, alpha=0.6,
+        ax2.bar(*cls._thin(ax2, times, new_snow, method="minmax"), width=0.02, alpha=0.6,
             color='#43A047', label=f'Nysnø ({lookback}t)')
 
         # Marker signifikant nysnø (terskel fra config)
@@ -601,7 +686,7 @@ class WeatherPlots:
             return
 
         precip = cls._numeric(df, 'precipitation_1h').fillna(0)
-        ax.bar(times, precip, width=0.03, alpha=0.6,
+        ax.bar(*cls._thin(ax, times, precip, method="minmax"), width=0.03, alpha=0.6,
                color=viz.color_precip, label='Nedbør (mm/h)')
 
         # Vis akkumulert nedbør siste 12 timer for slaps-vurdering
@@ -612,8 +697,7 @@ class WeatherPlots:
         slaps_heavy_threshold = settings.slaps.precipitation_12h_heavy * scale
         ax2 = ax.twinx()
         ax2.plot(
-            times,
-            precip_accum,
+            *cls._thin(ax2, times, precip_accum, thresholds=[(0, slaps_warning_threshold)]),
             color=viz.color_warning,
             linewidth=1.8,
             label=f'Nedbør siste {accum_window}t',
@@ -653,7 +737,7 @@ class WeatherPlots:
         wind_dir = cls._numeric(df, 'wind_from_direction').ffill()
 
         # Plott vindretning
-        ax.scatter(times, wind_dir, c=viz.color_wind, s=15, alpha=0.7, label='Vindretning')
+        ax.scatter(*cls._thin(ax, times, wind_dir), c=viz.color_wind, s=15, alpha=0.7, label='Vindretning')
 
         # Marker kritisk sektor (vindretning) - spesielt utsatt for snøfokk
         sd = settings.snowdrift
@@ -692,8 +776,9 @@ class WeatherPlots:
         accumulated = precip.cumsum()
 
         # Akkumulert linje
-        ax.fill_between(times, 0, accumulated, alpha=0.3, color=viz.color_precip)
-        ax.plot(times, accumulated, color=viz.color_precip, linewidth=2, label='Akkumulert nedbør')
+        acc_times, acc_line = cls._thin(ax, times, accumulated)
+        ax.fill_between(acc_times, 0, acc_line, alpha=0.3, color=viz.color_precip)
+        ax.plot(acc_times, acc_line, color=viz.color_precip, linewidth=2, label='Akkumulert nedbør')
 
         # Vis total
         total = accumulated.iloc[-1] if len(accumulated) > 0 else 0
@@ -712,12 +797,12 @@ class WeatherPlots:
         # Temperatur (venstre)
         if 'air_temperature' in df.columns:
             temp = cls._numeric(df, 'air_temperature').ffill()
-            ax.plot(times, temp, color=viz.color_temp,
+            ax.plot(*cls._thin(ax, times, temp), color=viz.color_temp,
                    linewidth=2, label='Lufttemperatur')
 
         if 'dew_point_temperature' in df.columns:
             dew_point = cls._numeric(df, 'dew_point_temperature').ffill()
-            ax.plot(times, dew_point, color='#7E57C2', linestyle='--',
+            ax.plot(*cls._thin(ax, times, dew_point), color='#7E57C2', linestyle='--',
                     linewidth=1.6, label='Duggpunkt')
 
         ax.set_ylabel('°C', color=viz.color_temp)
@@ -726,13 +811,16 @@ class WeatherPlots:
         # Vind (høyre)
         if 'wind_speed' in df.columns:
             wind = cls._numeric(df, 'wind_speed').ffill()
-            ax2.plot(times, wind, color=viz.color_wind,
+            ax2.plot(*cls._thin(ax2, times, wind), color=viz.color_wind,
                      linewidth=2, label='Vind')
 
         gust_col = 'max_wind_gust' if 'max_wind_gust' in df.columns else 'wind_gust'
         if gust_col in df.columns:
             gust = cls._numeric(df, gust_col).ffill()
-            ax2.plot(times, gust, color=viz.color_wind,
+            gust_thin = cls._thin(
+                ax2, times, gust, method="minmax", thresholds=[(0, settings.snowdrift.wind_gust_warning)]
+            )
+            ax2.plot(*gust_thin, color=viz.color_wind,
                      linewidth=1.2, linestyle='--', alpha=0.7, label='Vindkast')
 
         ax2.set_ylabel('m/s', color=viz.color_wind)
@@ -745,6 +833,35 @@ class WeatherPlots:
 
         ax.grid(True, alpha=0.3)
 
+    @classmethod
+    def _thin(
+        cls: Any,
+        ax: Any,
+        times: pd.Series,
+        *series: pd.Series,
+        method: str | None = None,
+        thresholds: Sequence[tuple[int, float]] = (),
+    ) -> tuple[pd.Series, ...]:
+        """
+        Desimer (times, *series) til omtrent aksebredden i piksler.
+
+        Korte serier returneres uendret. Terskelkryssinger (indeks i `series`)
+        og NaN-hull beholdes; se `src.visualizations.downsample`.
+        """
+        viz = settings.viz
+        width_px = ax.get_figure().get_figwidth() * ax.get_position().width * viz.figure_dpi
+        target = max(viz.downsample_min_points, int(width_px))
+        idx = decimate_indices(
+            times.to_numpy(),
+            [s.to_numpy(dtype=float, na_value=np.nan) for s in series],
+            target,
+            method or viz.downsample_method,
+            thresholds,
+        )
+        if idx is None:
+            return (times, *series)
+        return (times.iloc[idx], *(s.iloc[idx] for s in series))
+
     @staticmethod
     def _numeric(df: pd.DataFrame, col: str) -> pd.Series:
         """Returner kolonne som numerisk serie (float) uten å kaste."""
@@ -789,3 +906,58 @@ class WeatherPlots:
                fontsize=14, color='gray', transform=ax.transAxes)
         ax.axis('off')
         return fig
+
+
+def _render_worker_init() -> None:
+    matplotlib.use("Agg")
+
+
+def _render_spec(plot: str, df: pd.DataFrame | None, kwargs: dict[str, Any]) -> bytes:
+    build = getattr(WeatherPlots, f"create_{plot}_plot")
+    return figure_to_png(build(df, **kwargs))
+
+
+_render_pool: ProcessPoolExecutor | None = None
+_render_pool_lock = threading.Lock()
+
+
+def _render_workers() -> int:
+    configured = settings.viz.render_workers
+    return configured if configured > 0 else min(8, os.cpu_count() or 1)
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            # spawn: Streamlit-prosessen har tråder, og fork av tråder er ikke trygt
+            _render_pool = ProcessPoolExecutor(
+                max_workers=_render_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_render_worker_init,
+            )
+        return _render_pool
+
+
+def _reset_render_pool() -> None:
+    global _render_pool
+    with _render_pool_lock:
+        pool, _render_pool = _render_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_reset_render_pool)
+
+
+def _render_parallel(df: pd.DataFrame | None, jobs: list[tuple[str, dict[str, Any]]]) -> list[bytes]:
+    if len(jobs) < 2 or _render_workers() <= 1:
+        return [_render_spec(plot, df, kwargs) for plot, kwargs in jobs]
+    try:
+        pool = _get_render_pool()
+        futures: list[Future[bytes]] = [pool.submit(_render_spec, plot, df, kwargs) for plot, kwargs in jobs]
+        return [future.result() for future in futures]
+    except (BrokenProcessPool, OSError) as exc:
+        logger.warning("Prosesspool for figurer feilet (%s); rendrer serielt", exc)
+        _reset_render_pool()
+        return [_render_spec(plot, df, kwargs) for plot, kwargs in jobs]
@@ -0,0 +1,153 @@
+"""Tester for varslingstjenesten: én henting per runde, vedlikeholdsstans og cooldown."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+
+import pandas as pd
+
+from src.alert_service import AlertService, AlertState
+from src.analyzers import AnalysisResult, RiskLevel
+from src.frost_client import FrostAPIError, WeatherData
+from src.plowing_service import PlowingInfo
+
+NOW = datetime(2025, 1, 10, 12, 0, tzinfo=UTC)
+
+
+class _FakeClient:
+    def __init__(self, error: Exception | None = None, end=lambda: NOW):
+        self.calls = 0
+        self.error = error
+        self.end = end
+
+    def fetch_recent(self, hours_back=None) -> WeatherData:
+        self.calls += 1
+        if self.error:
+            raise self.error
+        df = pd.DataFrame({
+            "reference_time": pd.date_range(end=self.end(), periods=3, freq="h"),
+            "air_temperature": [-5.0, -5.0, -5.0],
+        })
+        return WeatherData(df, "SN46220", NOW - timedelta(hours=3), NOW, ["air_temperature"])
+
+
+class _FixedAnalyzer:
+    def __init__(self, level: RiskLevel):
+        self.level = level
+        self.frames = []
+
+    def analyze(self, df: pd.DataFrame) -> AnalysisResult:
+        self.frames.append(df)
+        return AnalysisResult(risk_level=self.level, message="test", scenario="Test")
+
+
+@dataclass
+class _FakeNotifier:
+    configured: bool = True
+    sent: list[str] = field(default_factory=list)
+
+    def send(self, subject: str, body: str) -> None:
+        self.sent.append(subject)
+
+
+def _no_maintenance() -> PlowingInfo:
+    return PlowingInfo(last_plowing=None, hours_since=None, is_recent=False, all_timestamps=[], source="test")
+
+
+def _service(tmp_path, analyzers, clock, plowing=_no_maintenance, client=None):
+    notifier = _FakeNotifier()
+    service = AlertService(
+        client=client or _FakeClient(),
+        analyzers=analyzers,
+        state=AlertState(tmp_path / "state.json"),
+        notifier=notifier,
+        plowing=plowing,
+        clock=clock,
+        cooldown_hours=12,
+    )
+    return service, notifier
+
+
+def test_tick_fetches_once_and_shares_frame_between_analyzers(tmp_path) -> None:
+    client = _FakeClient()
+    a, b = _FixedAnalyzer(RiskLevel.HIGH), _FixedAnalyzer(RiskLevel.LOW)
+    service, notifier = _service(tmp_path, {"Snøfokk": a, "Glatte veier": b}, lambda: NOW, client=client)
+
+    report = service.tick()
+
+    assert client.calls == 1
+    assert a.frames[0] is b.frames[0]
+    assert report.sent == ["Snøfokk"]
+    assert len(notifier.sent) == 1
+
+
+def test_cooldown_survives_restart_and_escalation_bypasses_it(tmp_path) -> None:
+    now = [NOW]
+    clock = lambda: now[0]  # noqa: E731
+    analyzer = _FixedAnalyzer(RiskLevel.MEDIUM)
+    service, notifier = _service(tmp_path, {"Snøfokk": analyzer}, clock, client=_FakeClient(end=clock))
+    assert service.tick().sent == ["Snøfokk"]
+
+    # Ny prosess med samme tilstandsfil: samme nivå holdes tilbake
+    now[0] = NOW + timedelta(minutes=30)
+    service, notifier = _service(tmp_path, {"Snøfokk": analyzer}, clock, client=_FakeClient(end=clock))
+    assert service.tick().skipped_cooldown == ["Snøfokk"]
+    assert notifier.sent == []
+
+    analyzer.level = RiskLevel.HIGH
+    assert service.tick().sent == ["Snøfokk"]
+
+    analyzer.level = RiskLevel.MEDIUM
+    # Cooldown regnes fra siste sendte varsel (HIGH kl. 12:30)
+    now[0] = NOW + timedelta(hours=12, minutes=29)
+    assert service.tick().sent == []
+    now[0] = NOW + timedelta(hours=12, minutes=30)
+    assert service.tick().sent == ["Snøfokk"]
+
+
+def test_recent_maintenance_suppresses_alerts(tmp_path) -> None:
+    def plowed() -> PlowingInfo:
+        return PlowingInfo(
+            last_plowing=NOW - timedelta(hours=1),
+            hours_since=1.0,
+            is_recent=True,
+            all_timestamps=[],
+            source="test",
+            last_work_types=["brøyting"],
+        )
+
+    service, notifier = _service(tmp_path, {"Snøfokk": _FixedAnalyzer(RiskLevel.HIGH)}, lambda: NOW, plowing=plowed)
+    report = service.tick()
+
+    assert report.suppressed_by_maintenance
+    assert report.results["Snøfokk"].risk_level == RiskLevel.LOW
+    assert notifier.sent == []
+
+
+def test_frost_error_and_stale_data_send_nothing(tmp_path) -> None:
+    service, notifier = _service(
+        tmp_path, {"Snøfokk": _FixedAnalyzer(RiskLevel.HIGH)}, lambda: NOW, client=_FakeClient(FrostAPIError("nede"))
+    )
+    assert service.tick().error == "nede"
+
+    service, notifier = _service(
+        tmp_path, {"Snøfokk": _FixedAnalyzer(RiskLevel.HIGH)}, lambda: NOW + timedelta(days=1)
+    )
+    assert service.tick().error is not None
+    assert notifier.sent == []
+
+
+def test_unknown_level_in_state_file_counts_as_never_sent(tmp_path) -> None:
+    path = tmp_path / "alert_state.json"
+    path.write_text(
+        '{"sent": {"a": {"level": "EXTREME", "sent_at": "2025-01-10T11:00:00+00:00"},'
+        ' "b": {"level": ["HIGH"], "sent_at": "2025-01-10T11:00:00+00:00"},'
+        ' "c": {"level": "HIGH", "sent_at": 12}}}',
+        encoding="utf-8",
+    )
+    state = AlertState(path)
+
+    for name in ("a", "b", "c"):
+        assert state.last_sent(name) is None
+        assert state.should_send(name, RiskLevel.MEDIUM, NOW, timedelta(hours=12))
@@ -0,0 +1,78 @@
+"""Tester for bakgrunnsoppfriskning av analyse-snapshot."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from src.analysis_snapshot import AnalysisSnapshot, SnapshotRefresher
+from src.analyzers import AnalysisResult, RiskLevel
+from src.plowing_service import PlowingInfo
+
+_NO_PLOWING = PlowingInfo(last_plowing=None, hours_since=None, is_recent=False, all_timestamps=[], source="none")
+
+
+def _snapshot(level: RiskLevel = RiskLevel.LOW, created_at: datetime | None = None) -> AnalysisSnapshot:
+    now = datetime.now(UTC)
+    return AnalysisSnapshot(
+        period_start_utc=now - timedelta(hours=24),
+        period_end_utc=now,
+        weather=pd.DataFrame({"air_temperature": [-3.0]}),
+        plowing_info=_NO_PLOWING,
+        raw_results={"Nysnø": AnalysisResult(risk_level=level, message="")},
+        results={"Nysnø": AnalysisResult(risk_level=level, message="")},
+        confidence={"Nysnø": 80},
+        quality_metrics={"valid": True},
+        created_at=created_at or now,
+    )
+
+
+def test_snapshot_mappings_are_read_only() -> None:
+    results = {"Nysnø": AnalysisResult(risk_level=RiskLevel.HIGH, message="")}
+    snapshot = AnalysisSnapshot(
+        period_start_utc=datetime.now(UTC),
+        period_end_utc=datetime.now(UTC),
+        weather=pd.DataFrame(),
+        plowing_info=_NO_PLOWING,
+        raw_results=results,
+        results=results,
+        confidence={},
+        quality_metrics={},
+    )
+    results["Slaps"] = results["Nysnø"]
+
+    assert list(snapshot.results) == ["Nysnø"]
+    with pytest.raises(TypeError):
+        snapshot.results["Slaps"] = results["Nysnø"]  # type: ignore[index]
+
+
+def test_failed_refresh_keeps_previous_snapshot() -> None:
+    outcomes = iter([_snapshot(RiskLevel.MEDIUM), ConnectionError("Frost nede")])
+
+    def build() -> AnalysisSnapshot:
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    refresher = SnapshotRefresher(build, interval_seconds=60, max_age_seconds=600)
+    first = refresher.refresh()
+    assert refresher.refresh() is None
+
+    assert refresher.latest() is first
+    stats = refresher.stats()
+    assert (stats.refreshes, stats.failures, stats.last_error) == (1, 1, "Frost nede")
+
+
+def test_background_thread_publishes_and_old_snapshots_expire() -> None:
+    refresher = SnapshotRefresher(_snapshot, interval_seconds=60, max_age_seconds=600).start()
+    try:
+        snapshot = refresher.wait_for_snapshot(timeout=2.0)
+        assert snapshot is not None
+        assert refresher.stats().running
+        assert refresher.latest(now=snapshot.created_at + timedelta(seconds=601)) is None
+    finally:
+        refresher.stop(timeout=2.0)
+    assert not refresher.stats().running
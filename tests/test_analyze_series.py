@@ -0,0 +1,80 @@
+"""Paritetstester: `analyze_series` skal gi samme risiko som `analyze` på hvert prefiks."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analyzers import (
+    BaseAnalyzer,
+    FreshSnowAnalyzer,
+    SlapsAnalyzer,
+    SlipperyRoadAnalyzer,
+    SnowdriftAnalyzer,
+)
+
+ANALYZERS = [FreshSnowAnalyzer, SnowdriftAnalyzer, SlapsAnalyzer, SlipperyRoadAnalyzer]
+
+
+def _synthetic_winter(seed: int, hours: int = 96, temp_offset: float = -3.0) -> pd.DataFrame:
+    """Urolig januarvær som treffer mange grener (mildvær, regn, nysnø, vind, hull i data)."""
+    rng = np.random.default_rng(seed)
+    temp = np.cumsum(rng.normal(0, 1.2, hours)) + temp_offset
+    snow = 30 + np.cumsum(rng.choice([0, 0, 0, 1, 2, 4, -1, -3], hours))
+    precip = np.where(rng.random(hours) < 0.4, rng.gamma(1.2, 1.5, hours), 0.0)
+    wind = np.abs(rng.normal(7, 4, hours))
+    df = pd.DataFrame({
+        "reference_time": pd.date_range("2024-01-05", periods=hours, freq="h", tz="UTC"),
+        "air_temperature": temp,
+        "surface_temperature": temp - rng.uniform(0, 3, hours),
+        "dew_point_temperature": temp - rng.uniform(0, 2.5, hours),
+        "relative_humidity": rng.uniform(70, 100, hours),
+        "precipitation_1h": precip,
+        "surface_snow_thickness": snow.astype(float),
+        "wind_speed": wind,
+        "max_wind_gust": wind * rng.uniform(1.2, 2.2, hours),
+    })
+    for col in ["air_temperature", "surface_temperature", "dew_point_temperature", "surface_snow_thickness"]:
+        df.loc[rng.random(hours) < 0.05, col] = np.nan
+    return df
+
+
+@pytest.fixture(autouse=True)
+def _winter(monkeypatch):
+    monkeypatch.setattr(BaseAnalyzer, "is_winter_season", staticmethod(lambda: True))
+
+
+@pytest.mark.parametrize("analyzer_cls", ANALYZERS)
+@pytest.mark.parametrize(("seed", "temp_offset"), [(1, -3.0), (7, -3.0), (42, -3.0), (5, 1.5), (11, 3.0)])
+def test_series_matches_scalar_analysis_on_every_prefix(analyzer_cls, seed, temp_offset) -> None:
+    df = _synthetic_winter(seed, temp_offset=temp_offset)
+    analyzer = analyzer_cls()
+
+    series = analyzer.analyze_series(df)
+    assert len(series) == len(df)
+
+    for i in range(len(df)):
+        expected = analyzer.analyze(df.iloc[: i + 1])
+        row = series.iloc[i]
+        assert (row["risk_level"], row["scenario"]) == (expected.risk_level.value, expected.scenario), (
+            f"rad {i} ({row['reference_time']})"
+        )
+
+
+@pytest.mark.parametrize("analyzer_cls", ANALYZERS)
+def test_series_uses_row_month_for_season(analyzer_cls) -> None:
+    df = _synthetic_winter(3, hours=6)
+    df["reference_time"] = pd.date_range("2024-07-01", periods=6, freq="h", tz="UTC")
+
+    series = analyzer_cls().analyze_series(df)
+    assert set(series["scenario"]) <= {"Sommer", "Sommer-snø", "Sommerregn", "Rimfrost"}
+
+
+def test_series_without_required_columns_is_unknown() -> None:
+    df = pd.DataFrame({
+        "reference_time": pd.date_range("2024-01-01", periods=3, freq="h", tz="UTC"),
+        "wind_speed": [5.0, 6.0, 7.0],
+    })
+    series = SnowdriftAnalyzer().analyze_series(df)
+    assert (series["risk_level"] == "unknown").all()
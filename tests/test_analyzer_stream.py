@@ -0,0 +1,104 @@
+"""Paritetstester: `analyzer.stream().push(row)` skal gi samme resultat som `analyze()` på samme vindu."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analyzers import (
+    BaseAnalyzer,
+    FreshSnowAnalyzer,
+    SlapsAnalyzer,
+    SlipperyRoadAnalyzer,
+    SnowdriftAnalyzer,
+)
+
+ANALYZERS = [FreshSnowAnalyzer, SnowdriftAnalyzer, SlapsAnalyzer, SlipperyRoadAnalyzer]
+
+
+def _weather(seed: int, hours: int = 160, temp_offset: float = -2.0) -> pd.DataFrame:
+    """Urolig vintervær med hull i tidsaksen og manglende verdier."""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2024-01-05", periods=hours, freq="h", tz="UTC")
+    keep = rng.random(hours) > 0.1
+    times, n = times[keep], int(keep.sum())
+    temp = np.round(np.cumsum(rng.normal(0, 1.2, n)) + temp_offset, 1)
+    wind = np.round(np.abs(rng.normal(8, 4, n)), 1)
+    df = pd.DataFrame({
+        "reference_time": times,
+        "air_temperature": temp,
+        "surface_temperature": np.round(temp - rng.uniform(0, 3, n), 1),
+        "dew_point_temperature": np.round(temp - rng.uniform(0, 2.5, n), 1),
+        "relative_humidity": np.round(rng.uniform(70, 100, n), 0),
+        "precipitation_1h": np.round(np.where(rng.random(n) < 0.4, rng.gamma(1.2, 1.5, n), 0.0), 1),
+        "surface_snow_thickness": (30 + np.cumsum(rng.choice([0, 0, 0, 1, 2, 4, -1, -3], n))).astype(float),
+        "wind_speed": wind,
+        "max_wind_gust": np.round(wind * rng.uniform(1.2, 2.4, n), 1),
+    })
+    for col in ["air_temperature", "surface_temperature", "dew_point_temperature", "surface_snow_thickness"]:
+        df.loc[rng.random(n) < 0.06, col] = np.nan
+    return df
+
+
+def _key(result) -> tuple:
+    return (result.risk_level, result.scenario, result.message, result.factors, result.details, result.caveat)
+
+
+@pytest.mark.parametrize("winter", [True, False])
+@pytest.mark.parametrize("analyzer_cls", ANALYZERS)
+@pytest.mark.parametrize(("seed", "temp_offset"), [(3, -2.0), (8, 1.0), (21, 2.5)])
+def test_stream_matches_analyze_on_history_window(monkeypatch, analyzer_cls, seed, temp_offset, winter) -> None:
+    monkeypatch.setattr(BaseAnalyzer, "is_winter_season", staticmethod(lambda: winter))
+    df = _weather(seed, temp_offset=temp_offset)
+    analyzer = analyzer_cls()
+    history = 30
+    stream = analyzer.stream(history_hours=history)
+
+    for i, row in enumerate(df.to_dict("records")):
+        got = stream.push(row)
+        t = df["reference_time"].iloc[i]
+        window = df.iloc[: i + 1]
+        window = window[window["reference_time"] >= t - pd.Timedelta(hours=history)]
+        expected = analyzer.analyze(window)
+        assert _key(got) == _key(expected), f"{analyzer_cls.__name__} rad {i} ({t})"
+
+
+def test_stream_rejects_rows_out_of_order() -> None:
+    df = _weather(1, hours=5)
+    stream = SlipperyRoadAnalyzer().stream()
+    stream.push(df.iloc[3].to_dict())
+    with pytest.raises(ValueError):
+        stream.push(df.iloc[1].to_dict())
+    with pytest.raises(ValueError):
+        stream.push({"air_temperature": 1.0})
+
+
+def test_stream_buffer_is_bounded_by_history() -> None:
+    df = _weather(2, hours=200)
+    stream = FreshSnowAnalyzer().stream(history_hours=12)
+    for row in df.to_dict("records"):
+        stream.push(row)
+    assert len(stream.features) <= 13
+
+
+def test_feed_updates_context_without_analyzing() -> None:
+    rows = _weather(5).to_dict("records")
+    pushed = SlipperyRoadAnalyzer().stream(history_hours=24)
+    fed = SlipperyRoadAnalyzer().stream(history_hours=24)
+    for row in rows[:-1]:
+        pushed.push(row)
+        fed.feed(row)
+    assert _key(fed.push(rows[-1])) == _key(pushed.push(rows[-1]))
+
+
+@pytest.mark.parametrize("analyzer_cls", ANALYZERS)
+def test_stream_uses_running_windows_for_rows_with_unhashable_values(monkeypatch, analyzer_cls) -> None:
+    monkeypatch.setattr(BaseAnalyzer, "is_winter_season", staticmethod(lambda: True))
+    rows = _weather(13).to_dict("records")
+    plain = analyzer_cls().stream(history_hours=30)
+    flagged = analyzer_cls().stream(history_hours=30)
+    for row in rows:
+        expected = plain.push(row)
+        got = flagged.push({**row, "quality_flags": [0, 1]})
+        assert _key(got) == _key(expected)
@@ -0,0 +1,126 @@
+"""Tester for sesong-backfill (oppgaveplan, gjenopptak og backoff)."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import pandas as pd
+import pytest
+
+from src.backfill import BackfillEngine
+from src.frost_client import FrostAPIError, FrostAPITransientError, FrostClient
+from src.observation_store import ObservationStore
+
+ELEMENTS = ["air_temperature", "wind_speed", "relative_humidity"]
+
+
+def _response(start: datetime, elements: tuple[str, ...]) -> pd.DataFrame:
+    times = pd.date_range(start, periods=3, freq="h", tz="UTC")
+    return pd.DataFrame({"reference_time": times, **{e: [1.0, 2.0, 3.0] for e in elements}})
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path) -> BackfillEngine:
+    monkeypatch.setenv("FROST_CLIENT_ID", "test-client-id")
+    client = FrostClient(store=ObservationStore("SN46220", root=tmp_path))
+    sleeps: list[float] = []
+    engine = BackfillEngine(client=client, max_workers=2, element_group_size=2, sleep=sleeps.append)
+    engine.sleeps = sleeps
+    return engine
+
+
+def test_plan_splits_months_and_element_groups(engine) -> None:
+    tasks = engine.plan(datetime(2024, 3, 15, tzinfo=UTC), datetime(2024, 6, 1, tzinfo=UTC), ELEMENTS)
+    assert len(tasks) == 3 * 2
+    assert tasks[0].start == datetime(2024, 3, 1, tzinfo=UTC)
+
+    winter = engine.plan(
+        datetime(2024, 3, 1, tzinfo=UTC), datetime(2024, 6, 1, tzinfo=UTC), ELEMENTS, winter_only=True
+    )
+    assert {t.start.month for t in winter} == {3, 4}
+
+
+def test_run_writes_store_and_resumes_from_manifest(engine, monkeypatch) -> None:
+    calls: list[str] = []
+
+    def fake_request(start_time, end_time, elements, timeresolutions="PT1H", *, retry=True):
+        assert retry is False
+        calls.append(start_time)
+        return _response(start_time, elements)
+
+    monkeypatch.setattr(engine.client, "fetch_chunk", fake_request)
+    start, end = datetime(2024, 1, 1, tzinfo=UTC), datetime(2024, 3, 1, tzinfo=UTC)
+
+    report = engine.run(start, end, elements=ELEMENTS)
+    assert report.ok and report.completed == 4
+    df = engine.store.read(start, end)
+    assert set(ELEMENTS) <= set(df.columns)
+    assert len(df) == 6
+
+    again = engine.run(start, end, elements=ELEMENTS)
+    assert again.skipped == 4 and again.completed == 0
+    assert len(calls) == 4
+
+
+def test_transient_error_backs_off_and_retries(engine, monkeypatch) -> None:
+    attempts = {"n": 0}
+
+    def flaky_request(start_time, end_time, elements, timeresolutions="PT1H", *, retry=True):
+        attempts["n"] += 1
+        if attempts["n"] == 1:
+            raise FrostAPITransientError("Rate limit fra Frost API (429)")
+        return _response(start_time, elements)
+
+    monkeypatch.setattr(engine.client, "fetch_chunk", flaky_request)
+    report = engine.run(
+        datetime(2024, 1, 1, tzinfo=UTC), datetime(2024, 2, 1, tzinfo=UTC), elements=ELEMENTS[:1]
+    )
+
+    assert report.ok and report.completed == 1
+    assert engine.sleeps and engine.sleeps[0] > 0
+
+
+def test_permanent_error_is_reported_and_not_marked_done(engine, monkeypatch) -> None:
+    def denied(*args, **kwargs):
+        raise FrostAPIError("Ugyldig API-nøkkel (401)")
+
+    monkeypatch.setattr(engine.client, "fetch_chunk", denied)
+    report = engine.run(
+        datetime(2024, 1, 1, tzinfo=UTC), datetime(2024, 2, 1, tzinfo=UTC), elements=ELEMENTS[:1]
+    )
+
+    assert not report.ok and len(report.failed) == 1
+    assert len(engine.manifest) == 0
+
+
+def test_unexpected_error_fails_only_its_task(engine, monkeypatch) -> None:
+    def broken_january(start_time, end_time, elements, timeresolutions="PT1H", *, retry=True):
+        if start_time.month == 1:
+            raise KeyError("referenceTime")
+        return _response(start_time, elements)
+
+    monkeypatch.setattr(engine.client, "fetch_chunk", broken_january)
+    report = engine.run(
+        datetime(2024, 1, 1, tzinfo=UTC), datetime(2024, 3, 1, tzinfo=UTC), elements=ELEMENTS[:1]
+    )
+
+    assert report.completed == 1
+    assert len(report.failed) == 1 and report.failed[0].startswith("2024-01")
+    assert len(engine.manifest) == 1
+
+
+def test_pt10m_chunks_are_stored_hourly(engine, monkeypatch) -> None:
+    element = "sum(precipitation_amount PT10M)"
+
+    def ten_minute_request(start_time, end_time, elements, timeresolutions="PT1H", *, retry=True):
+        assert timeresolutions == "PT10M"
+        times = pd.date_range(start_time, periods=12, freq="10min", tz="UTC")
+        return pd.DataFrame({"reference_time": times, element: [float(i) for i in range(12)]})
+
+    monkeypatch.setattr(engine.client, "fetch_chunk", ten_minute_request)
+    start, end = datetime(2024, 1, 1, tzinfo=UTC), datetime(2024, 2, 1, tzinfo=UTC)
+    report = engine.run(start, end, elements=[element])
+
+    assert report.ok and report.completed == 1
+    df = engine.store.read(start, end)
+    assert list(df[element]) == [5.0, 11.0]
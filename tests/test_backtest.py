@@ -0,0 +1,82 @@
+"""Tester for sesong-backtest (tidslinje, episoder og nedgraderingshold)."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analyzers import BaseAnalyzer, FreshSnowAnalyzer, RiskLevel
+from src.backtest import BacktestEngine, apply_downgrade_hold, season_label
+from src.observation_store import ObservationStore
+
+
+def _snowfall(start: str = "2024-01-10", hours: int = 48) -> pd.DataFrame:
+    """Kaldt vær med kraftig snøfall midt i perioden."""
+    snow = np.full(hours, 40.0)
+    snow[20:] += np.minimum(np.arange(hours - 20) * 2.0, 20.0)
+    return pd.DataFrame({
+        "reference_time": pd.date_range(start, periods=hours, freq="h", tz="UTC"),
+        "air_temperature": np.full(hours, -4.0),
+        "dew_point_temperature": np.full(hours, -6.0),
+        "surface_snow_thickness": snow,
+        "precipitation_1h": np.where((np.arange(hours) >= 20) & (np.arange(hours) < 30), 2.0, 0.0),
+        "wind_speed": np.full(hours, 2.0),
+    })
+
+
+@pytest.fixture(autouse=True)
+def _winter(monkeypatch):
+    monkeypatch.setattr(BaseAnalyzer, "is_winter_season", staticmethod(lambda: True))
+
+
+def test_replay_matches_scalar_analysis_at_each_hour() -> None:
+    df = _snowfall()
+    result = BacktestEngine(store=None, analyzers={"Nysnø": FreshSnowAnalyzer()}, hold_minutes=0).replay(df)
+
+    timeline = result.timeline
+    assert len(timeline) == len(df)
+    for i in (10, 25, 35, 47):
+        expected = FreshSnowAnalyzer().analyze(df.iloc[: i + 1])
+        assert timeline["risk_level"].iloc[i] == expected.risk_level.value
+
+
+def test_run_reads_from_store_and_builds_episodes(tmp_path) -> None:
+    store = ObservationStore("SN46220", root=tmp_path)
+    store.append(_snowfall())
+    engine = BacktestEngine(store=store, analyzers={"Nysnø": FreshSnowAnalyzer()}, hold_minutes=0)
+
+    result = engine.run(datetime(2024, 1, 1, tzinfo=UTC), datetime(2024, 2, 1, tzinfo=UTC))
+    episodes = result.episodes()
+
+    assert result.rows == 48
+    assert len(episodes) >= 1
+    assert set(episodes["season"]) == {"2023/24"}
+    assert episodes["peak_level"].isin([RiskLevel.MEDIUM.value, RiskLevel.HIGH.value]).all()
+
+    summary = result.summary()
+    assert summary["episodes"].sum() == len(episodes)
+    assert summary[[f"{level.value}_hours" for level in RiskLevel]].to_numpy().sum() == 48
+
+
+def test_winter_only_drops_summer_hours() -> None:
+    df = _snowfall(start="2024-06-10")
+    engine = BacktestEngine(store=None, analyzers={"Nysnø": FreshSnowAnalyzer()})
+    assert engine.replay(df).timeline.empty
+    assert len(engine.replay(df, winter_only=False).timeline) == len(df)
+
+
+def test_downgrade_hold_keeps_higher_level_within_window() -> None:
+    times = pd.Series(pd.date_range("2024-01-10", periods=5, freq="10min", tz="UTC"))
+    levels = np.array(["low", "high", "low", "low", "low"], dtype=object)
+
+    held = apply_downgrade_hold(times, levels, hold_minutes=30)
+    assert list(held) == ["low", "high", "high", "high", "low"]
+    assert list(apply_downgrade_hold(times, levels, hold_minutes=0)) == list(levels)
+
+
+def test_season_label_spans_new_year() -> None:
+    times = pd.Series(pd.to_datetime(["2023-10-01", "2024-03-01", "2024-11-01"], utc=True))
+    assert list(season_label(times)) == ["2023/24", "2023/24", "2024/25"]
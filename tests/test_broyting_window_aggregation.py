@@ -0,0 +1,80 @@
+"""Vindusaggregering i analyze_broyting_correlation skal matche naiv maskering per hendelse."""
+
+from __future__ import annotations
+
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from analyze_broyting_correlation import WINDOW_STATS, aggregate_windows  # noqa: E402
+
+
+def _weather(hours: int = 400, seed: int = 2) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2024-01-01", periods=hours, freq="h", tz="UTC")
+    # Hull i dataene, så vinduene får ulikt antall rader
+    times = times[rng.random(hours) > 0.15]
+    n = len(times)
+    df = pd.DataFrame({
+        "timestamp_utc": times,
+        "air_temperature": rng.normal(-2, 4, n),
+        "surface_temperature": rng.normal(-3, 4, n),
+        "wind_speed": rng.gamma(3, 2, n),
+        "max_wind_gust": rng.gamma(4, 3, n),
+        "precipitation_1h": rng.gamma(0.5, 1, n),
+        "surface_snow_thickness": 40 + np.cumsum(rng.normal(0, 1, n)),
+        "relative_humidity": rng.uniform(60, 100, n),
+    })
+    for col in ["air_temperature", "surface_snow_thickness", "max_wind_gust"]:
+        df.loc[rng.random(n) < 0.1, col] = np.nan
+    return df
+
+
+def _naive(wx: pd.DataFrame, event: pd.Timestamp, hours: int) -> dict:
+    window = wx[(wx["timestamp_utc"] >= event - timedelta(hours=hours)) & (wx["timestamp_utc"] <= event)]
+    out: dict = {"wx_rows": len(window)}
+    for name, candidates, stat in WINDOW_STATS:
+        col = next((c for c in candidates if c in wx.columns), None)
+        if col is None:
+            out[name] = None
+            continue
+        s = window[col]
+        if stat in ("first", "last", "change") and len(s) == 0:
+            out[name] = np.nan
+        elif stat == "first":
+            out[name] = s.iloc[0]
+        elif stat == "last":
+            out[name] = s.iloc[-1]
+        elif stat == "change":
+            out[name] = s.iloc[-1] - s.iloc[0]
+        else:
+            out[name] = float(getattr(s, stat)())
+    return out
+
+
+@pytest.mark.parametrize("seed", [2, 9])
+def test_aggregate_windows_matches_naive_masks(seed) -> None:
+    wx = _weather(seed=seed)
+    rng = np.random.default_rng(seed)
+    events = pd.Series(
+        pd.Timestamp("2024-01-01", tz="UTC") + pd.to_timedelta(rng.uniform(-30, 430, 40), unit="h")
+    ).sort_values(ignore_index=True)
+
+    windows = aggregate_windows(wx, events, [6, 12, 24])
+
+    for hours, frame in windows.items():
+        expected = pd.DataFrame([_naive(wx, ev, hours) for ev in events])
+        assert list(frame["wx_rows"]) == list(expected["wx_rows"])
+        assert frame["dew_point_avg"].isna().all()
+        for name, _, _ in WINDOW_STATS:
+            if name == "dew_point_avg":
+                continue
+            np.testing.assert_allclose(
+                frame[name].astype(float), expected[name].astype(float), atol=1e-8, err_msg=f"{name} h={hours}"
+            )
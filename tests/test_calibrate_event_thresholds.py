@@ -0,0 +1,82 @@
+"""Kalibrering: vektorisert rutenett-søk skal gi samme topp-K som fullt søk med predict_trigger."""
+
+from __future__ import annotations
+
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts" / "reports"))
+
+from calibrate_event_thresholds import (  # noqa: E402
+    Grid,
+    Params,
+    Weights,
+    derive_labels,
+    grid_search,
+    predict_trigger,
+    score,
+)
+
+GRID = Grid(
+    snow_change_cm=(3.0, 5.0, 7.0),
+    slaps_precip_mm=(3.0, 6.0),
+    slaps_temp_max=(2.0, 4.0),
+    gust_mps=(13.0, 17.0, 21.0),
+    wind_mps=(6.0, 10.0),
+    freeze_surface_max=(-0.5, -2.0),
+    freeze_air_max=(1.0, 3.0),
+    freeze_precip_mm=(0.0, 1.0),
+    slaps_temp_min=-1.0,
+    drift_temp_max=-1.0,
+    freeze_air_min=0.0,
+)
+WEIGHTS = Weights(w_fn=3.0, w_fp=1.0, w_fp_no_need=2.0, target_alert_rate=30.0, w_alert_rate=6.0)
+
+
+def _events(n: int = 300, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "air_temp_avg": rng.normal(-2, 4, n),
+        "surface_temp_avg": rng.normal(-3, 4, n),
+        "wind_avg": rng.gamma(3, 2.5, n),
+        "gust_max": rng.gamma(4, 4, n),
+        "precip_total": rng.gamma(0.8, 4, n),
+        "snow_change": rng.normal(2, 4, n),
+        "duration_minutes": rng.gamma(2, 60, n),
+        "distance_km": rng.gamma(2, 8, n),
+    })
+    for col in ["air_temp_avg", "surface_temp_avg", "gust_max", "snow_change"]:
+        df.loc[rng.random(n) < 0.1, col] = np.nan
+    df = derive_labels(df, 90.0, 15.0)
+    return df.loc[df["need_event"] | df["no_need_event"]].reset_index(drop=True)
+
+
+def _brute_force(df: pd.DataFrame) -> pd.DataFrame:
+    rows = []
+    for values in itertools.product(
+        GRID.snow_change_cm, GRID.slaps_precip_mm, GRID.slaps_temp_max, GRID.gust_mps,
+        GRID.wind_mps, GRID.freeze_surface_max, GRID.freeze_air_max, GRID.freeze_precip_mm,
+    ):
+        snow, sp, st, gust, wind, fs, fa, fp = values
+        p = Params(snow, sp, GRID.slaps_temp_min, st, gust, wind, GRID.drift_temp_max, fs, GRID.freeze_air_min, fa, fp)
+        s = score(df, predict_trigger(df, p), WEIGHTS.w_fn, WEIGHTS.w_fp, WEIGHTS.w_fp_no_need)
+        over = max(0.0, s["alert_rate_pct"] - WEIGHTS.target_alert_rate)
+        s["loss"] = float(s["loss"] + WEIGHTS.w_alert_rate * over ** 2)
+        rows.append({**p.__dict__, **s})
+    return pd.DataFrame(rows).sort_values(["loss", "alert_rate_pct", "fn", "fp_no_need", "fp"], kind="stable")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_grid_search_matches_brute_force(workers) -> None:
+    df = _events()
+    expected = _brute_force(df).head(15).reset_index(drop=True)
+    got = grid_search(df, GRID, WEIGHTS, top=15, workers=workers)
+
+    cols = list(Params.__dataclass_fields__) + ["tp", "fn", "fp", "fp_no_need"]
+    pd.testing.assert_frame_equal(got[cols], expected[cols], check_dtype=False)
+    np.testing.assert_allclose(got["loss"], expected["loss"])
@@ -0,0 +1,73 @@
+"""Tester for fragmentenes avhengighetsoppslag i dashboardet (Streamlit er byttet ut)."""
+
+from __future__ import annotations
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+# Appen konfigurerer fillogging ved import; testene skal ikke skrive til logs/app.log
+os.environ.setdefault("LOG_FILE", "")
+
+from src import gullingen_app as app  # noqa: E402
+from src.source_fanout import SourceResult
+
+
+@pytest.fixture
+def fake_st(monkeypatch) -> SimpleNamespace:
+    fake = SimpleNamespace(
+        session_state={},
+        fragment=lambda fn, run_every=None: fn,
+    )
+    monkeypatch.setattr(app, "st", fake)
+    monkeypatch.setattr(app, "DASHBOARD_FRAGMENTS", {})
+    return fake
+
+
+def _fragment(name: str, depends_on: tuple[str, ...], calls: list) -> object:
+    @app.dashboard_fragment(name, depends_on=depends_on)
+    def render(**data) -> None:
+        calls.append(data)
+
+    return render
+
+
+def test_fragment_is_skipped_without_snapshot(fake_st) -> None:
+    calls: list = []
+    run = _fragment("test_skip", ("snapshot",), calls)
+
+    run()
+    assert calls == []
+
+    fake_st.session_state["dashboard_snapshot"] = "side"
+    run()
+    assert calls == [{"snapshot": "side"}]
+    assert app.DASHBOARD_FRAGMENTS["test_skip"].depends_on == ("snapshot",)
+
+
+def test_prefetched_result_is_used_once(fake_st) -> None:
+    prefetched = SourceResult(name="netatmo", value={"stations": []})
+    fake_st.session_state["dashboard_prefetched"] = {"netatmo": lambda: prefetched}
+    calls: list = []
+    run = _fragment("test_prefetched", ("netatmo",), calls)
+
+    run()
+    run()
+
+    # Første kjøring bruker sidens henting; fragment-reruns henter selv (None)
+    assert calls == [{"netatmo": prefetched}, {"netatmo": None}]
+
+
+def test_live_refresher_snapshot_is_preferred_over_session_copy(fake_st, monkeypatch) -> None:
+    latest: list = ["bakgrunn"]
+    monkeypatch.setattr(app, "get_snapshot_refresher", lambda: SimpleNamespace(latest=lambda: latest[0]))
+    fake_st.session_state.update(dashboard_snapshot="side", dashboard_snapshot_live=True)
+
+    assert app._current_snapshot() == "bakgrunn"
+    latest[0] = None  # bakgrunnssnapshot utløpt
+    assert app._current_snapshot() == "side"
+
+    fake_st.session_state["dashboard_snapshot_live"] = False
+    latest[0] = "bakgrunn"
+    assert app._current_snapshot() == "side"
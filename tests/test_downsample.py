@@ -0,0 +1,69 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+
+from src.config import settings
+from src.visualizations import WeatherPlots
+from src.visualizations.downsample import decimate_indices, lttb_indices, minmax_indices
+
+
+def _series(n: int) -> tuple[np.ndarray, np.ndarray]:
+    x = np.arange(n, dtype=float)
+    rng = np.random.default_rng(7)
+    return x, np.sin(x / 200.0) * 5 + rng.normal(0, 0.3, n)
+
+
+def test_short_series_are_left_untouched() -> None:
+    x, y = _series(100)
+    assert decimate_indices(x, [y], target_points=500) is None
+
+
+def test_lttb_and_minmax_bound_points_and_keep_extremes() -> None:
+    x, y = _series(20_000)
+    y[12_345] = 40.0
+
+    lttb = lttb_indices(x, y, 500)
+    minmax = minmax_indices(y, 250)
+
+    assert len(lttb) == 500
+    assert lttb[0] == 0 and lttb[-1] == len(x) - 1
+    assert 12_345 in lttb
+    assert len(minmax) <= 500
+    assert 12_345 in minmax
+
+
+def test_threshold_crossings_and_nan_gaps_are_kept() -> None:
+    x, y = _series(20_000)
+    y[:] = 0.0
+    y[7_001:7_003] = 15.0  # kort vindkast over terskel
+    y[9_000:9_100] = np.nan
+
+    idx = decimate_indices(x, [y], target_points=400, thresholds=[(0, 14.0)])
+
+    assert idx is not None
+    assert len(idx) < 1_000
+    assert {7_000, 7_001, 7_002, 7_003} <= set(idx.tolist())
+    assert {8_999, 9_000, 9_100} <= set(idx.tolist())
+
+
+def test_long_ten_minute_period_draws_bounded_points() -> None:
+    n = 6 * 24 * 60  # 60 dager med 10-minuttersdata
+    times = pd.date_range("2025-12-01T00:00:00Z", periods=n, freq="10min")
+    gust = np.full(n, 5.0)
+    gust[5_000] = settings.snowdrift.wind_gust_warning + 5
+    df = pd.DataFrame({
+        "reference_time": times,
+        "wind_speed": np.linspace(0, 10, n),
+        "max_wind_gust": gust,
+    })
+
+    fig = WeatherPlots.create_wind_plot(df)
+    lines = [line for line in fig.axes[0].get_lines() if len(line.get_xdata()) > 2]
+
+    assert lines
+    assert all(len(line.get_xdata()) < 2_000 for line in lines)
+    gust_line = next(line for line in lines if line.get_label() == "Vindkast")
+    assert gust_line.get_ydata().max() == gust.max()
@@ -0,0 +1,123 @@
+"""Tester for FeatureFrame: delte, memoiserte rullerende features."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analyzers import (
+    BaseAnalyzer,
+    FeatureFrame,
+    FreshSnowAnalyzer,
+    SlapsAnalyzer,
+    SlipperyRoadAnalyzer,
+    SnowdriftAnalyzer,
+)
+from src.analyzers.features import sort_by_time
+
+
+def _frame(hours: int = 24) -> pd.DataFrame:
+    return pd.DataFrame({
+        "reference_time": pd.date_range("2024-01-05", periods=hours, freq="h", tz="UTC"),
+        "air_temperature": np.linspace(-5.0, 2.0, hours),
+        "precipitation_1h": np.arange(hours, dtype=float),
+        "surface_snow_thickness": [30.0 + i for i in range(hours)],
+    })
+
+
+def test_of_returns_shared_instance_for_same_frame() -> None:
+    df = _frame()
+    features = FeatureFrame.of(df)
+    assert FeatureFrame.of(df) is features
+    assert FeatureFrame.of(df.copy()) is not features
+
+
+def test_of_rebuilds_when_columns_change() -> None:
+    df = _frame()
+    features = FeatureFrame.of(df)
+    df["wind_speed"] = 5.0
+    rebuilt = FeatureFrame.of(df)
+    assert rebuilt is not features
+    assert rebuilt.has("wind_speed")
+
+
+def test_of_rebuilds_after_in_place_value_edit() -> None:
+    df = _frame()
+    before = FeatureFrame.of(df).precip_total(12)[-1]
+    df.loc[len(df) - 2, "precipitation_1h"] = 100.0
+    rebuilt = FeatureFrame.of(df)
+    assert rebuilt.precip_total(12)[-1] > before
+    assert FeatureFrame.of(df) is rebuilt
+
+
+def test_scope_binds_features_without_fingerprinting(monkeypatch) -> None:
+    df = _frame()
+    features = FeatureFrame.of(df)
+    calls = []
+    original = FeatureFrame._fingerprint_of
+    monkeypatch.setattr(FeatureFrame, "_fingerprint_of", staticmethod(lambda d: calls.append(1) or original(d)))
+    with FeatureFrame.scope(features):
+        assert FeatureFrame.of(df) is features
+        assert FeatureFrame.of(df) is features
+    assert calls == []
+    FeatureFrame.of(df)
+    assert calls == [1]
+
+
+def test_analyze_fingerprints_frame_once(monkeypatch) -> None:
+    df = _frame(48)
+    calls = []
+    original = FeatureFrame._fingerprint_of
+    monkeypatch.setattr(FeatureFrame, "_fingerprint_of", staticmethod(lambda d: calls.append(1) or original(d)))
+    monkeypatch.setattr(SlipperyRoadAnalyzer, "is_winter_season", staticmethod(lambda: True))
+    SlipperyRoadAnalyzer().analyze(df)
+    assert len(calls) == 1
+
+
+def test_features_are_memoized() -> None:
+    features = FeatureFrame(_frame())
+    assert features.precip_total(12) is features.precip_total(12)
+    assert features.window_start(6, True) is features.window_start(6, True)
+
+
+def test_windows_are_causal_and_respect_cutoff() -> None:
+    features = FeatureFrame(_frame())
+    # (t-3h, t]: tre siste timer; [t-3h, t]: fire siste timer
+    assert features.precip_total(3)[-1] == 21 + 22 + 23
+    assert features.window_sum("precipitation_1h", 3, inclusive=True)[-1] == 20 + 21 + 22 + 23
+    assert features.precip_total(3)[0] == 0.0
+    assert features.snow_change(6)[-1] == 5.0
+    assert features.frost_hours(24)[-1] == int((np.linspace(-5.0, 2.0, 24) <= 0).sum())
+
+
+def test_missing_columns_give_neutral_features() -> None:
+    features = FeatureFrame(_frame().drop(columns=["precipitation_1h", "surface_snow_thickness"]))
+    assert not features.precip_total(12).any()
+    assert not features.snow_change(6).any()
+    assert np.isnan(features.values("wind_speed")).all()
+
+
+def test_unsorted_frame_is_rejected() -> None:
+    df = _frame().iloc[::-1]
+    with pytest.raises(ValueError):
+        FeatureFrame(df)
+    assert sort_by_time(df)["reference_time"].is_monotonic_increasing
+    sorted_df = _frame()
+    assert sort_by_time(sorted_df) is sorted_df
+
+
+@pytest.mark.parametrize("analyzer_cls", [FreshSnowAnalyzer, SnowdriftAnalyzer, SlapsAnalyzer, SlipperyRoadAnalyzer])
+def test_shuffled_rows_give_same_result_as_sorted_frame(monkeypatch, analyzer_cls) -> None:
+    monkeypatch.setattr(BaseAnalyzer, "is_winter_season", staticmethod(lambda: True))
+    rng = np.random.default_rng(7)
+    df = _frame(48)
+    df["wind_speed"] = rng.uniform(2, 18, len(df))
+    df["max_wind_gust"] = df["wind_speed"] * 1.8
+    shuffled = df.sample(frac=1.0, random_state=3)
+    analyzer = analyzer_cls()
+
+    assert analyzer.analyze(shuffled).to_dict() | {"timestamp": None} == (
+        analyzer.analyze(df).to_dict() | {"timestamp": None}
+    )
+    pd.testing.assert_frame_equal(analyzer.analyze_series(shuffled), analyzer.analyze_series(df))
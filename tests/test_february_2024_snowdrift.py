@@ -207,6 +207,25 @@ class TestFebruary2024SnowdriftEpisode:
         assert high_medium_hours >= 24, \
             f"Bør ha minst 24 timer med medium/high risiko, fikk {high_medium_hours}"
 
+    @patch('src.analyzers.base.BaseAnalyzer.is_winter_season', return_value=True)
+    def test_unsorted_input_matches_sorted(self, mock_winter, analyzer, episode_data):
+        """Stokkede rader skal gi samme vindusvalg og resultat som sortert input."""
+        for end in (30, 60, 66, len(episode_data)):
+            window = episode_data.iloc[max(0, end - 12):end]
+            shuffled = window.sample(frac=1.0, random_state=end)
+
+            expected = analyzer.analyze(window)
+            result = analyzer.analyze(shuffled)
+
+            assert result.risk_level == expected.risk_level
+            assert result.message == expected.message
+            assert result.details == expected.details
+
+        pd.testing.assert_frame_equal(
+            analyzer.analyze_series(episode_data.sample(frac=1.0, random_state=1)),
+            analyzer.analyze_series(episode_data),
+        )
+
 
 class TestSnowdriftThresholdValidation:
     """Tester for å validere snøfokk-terskler."""
@@ -0,0 +1,123 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+from src.config import settings
+from src.visualizations import FigureCache, WeatherPlots
+from src.visualizations import figure_cache as figure_cache_module
+
+
+def _df(n: int = 24) -> pd.DataFrame:
+    times = pd.date_range("2025-12-10T00:00:00Z", periods=n, freq="h")
+    return pd.DataFrame(
+        {
+            "reference_time": times,
+            "air_temperature": np.linspace(-8, 2, n),
+            "wind_speed": np.linspace(0, 12, n),
+            "surface_snow_thickness": np.full(n, 12.0),
+        }
+    )
+
+
+class _CountingBuilder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, df, **kwargs):
+        self.calls += 1
+        return WeatherPlots.create_temperature_plot(df, **kwargs)
+
+
+def test_identical_content_is_served_from_cache_without_redraw() -> None:
+    cache = FigureCache()
+    build = _CountingBuilder()
+
+    first = cache.render("temperature", build, _df())
+    second = cache.render("temperature", build, _df())  # ny DataFrame, samme innhold
+
+    assert first == second
+    assert first.startswith(b"\x89PNG")
+    assert build.calls == 1
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+
+def test_changed_column_kwargs_or_settings_miss(monkeypatch) -> None:
+    cache = FigureCache()
+    build = _CountingBuilder()
+    df = _df()
+    cache.render("temperature", build, df)
+
+    changed = df.copy()
+    changed.loc[5, "air_temperature"] = 3.0
+    cache.render("temperature", build, changed)
+    cache.render("temperature", build, df, title="Annen tittel")
+    assert build.calls == 3
+
+    monkeypatch.setattr(settings, "viz", replace(settings.viz, color_temp="#000000"))
+    cache.render("temperature", build, df)
+    assert build.calls == 4
+
+
+def test_lru_is_bounded_by_bytes_and_entries() -> None:
+    cache = FigureCache(max_entries=3, max_bytes=250)
+
+    for key in "abcd":
+        cache.put(key, b"x" * 100)
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.get("d") is not None
+    assert cache.stats().bytes == 200
+    assert cache.stats().evictions == 2
+
+    cache.put("big", b"x" * 1000)  # større enn hele budsjettet: lagres ikke
+    assert cache.get("big") is None
+    assert cache.stats().entries == 2
+
+
+def test_render_png_uses_shared_cache(monkeypatch) -> None:
+    monkeypatch.setattr(figure_cache_module, "_shared", FigureCache())
+    df = _df()
+
+    png = WeatherPlots.render_png("snow_depth", df)
+
+    assert png == WeatherPlots.render_png("snow_depth", df)
+    assert figure_cache_module.get_figure_cache().stats().hits == 1
+
+
+def test_render_many_matches_single_renders_in_order(monkeypatch) -> None:
+    monkeypatch.setattr(figure_cache_module, "_shared", FigureCache())
+    df = _df()
+    specs = ["snow_depth", ("temperature", {"title": "Temp"}), "wind"]
+
+    batch = WeatherPlots.render_many(df, specs)
+
+    # Fersk cache: enkeltrendringene må tegnes på nytt og gi identiske bytes
+    monkeypatch.setattr(figure_cache_module, "_shared", FigureCache())
+    assert batch == [
+        WeatherPlots.render_png("snow_depth", df),
+        WeatherPlots.render_png("temperature", df, title="Temp"),
+        WeatherPlots.render_png("wind", df),
+    ]
+    assert df.attrs == {}
+
+
+def test_render_many_in_process_pool(monkeypatch) -> None:
+    import src.visualizations.plots as plots
+
+    monkeypatch.setattr(figure_cache_module, "_shared", FigureCache())
+    monkeypatch.setattr(settings, "viz", replace(settings.viz, render_workers=2))
+    df = _df()
+
+    try:
+        pooled = WeatherPlots.render_many(df, ["snow_depth", "wind"])
+    finally:
+        plots._reset_render_pool()
+
+    assert pooled == [plots._render_spec("snow_depth", df, {}), plots._render_spec("wind", df, {})]
@@ -1,18 +1,28 @@
 from datetime import UTC, datetime, timedelta
-from unittest.mock import MagicMock, patch
+from email.utils import format_datetime
+from unittest.mock import MagicMock
 
 import pytest
 import requests
 
-from src.forecast_client import ForecastClient, ForecastClientError
+from src.forecast_client import ForecastCache, ForecastClient, ForecastClientError
 
 
 def _iso(dt: datetime) -> str:
     return dt.astimezone(UTC).isoformat().replace('+00:00', 'Z')
 
 
-@patch('src.forecast_client.requests.get')
-def test_fetch_hourly_forecast_filters_past_and_limits_horizon(mock_get):
+@pytest.fixture
+def transport():
+    return MagicMock()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ForecastCache(tmp_path)
+
+
+def test_fetch_hourly_forecast_filters_past_and_limits_horizon(transport, cache):
     now = datetime.now(UTC)
 
     payload = {
@@ -58,9 +68,9 @@ def test_fetch_hourly_forecast_filters_past_and_limits_horizon(mock_get):
     response = MagicMock()
     response.raise_for_status.return_value = None
     response.json.return_value = payload
-    mock_get.return_value = response
+    transport.get.return_value = response
 
-    points = ForecastClient().fetch_hourly_forecast(lat=59.4, lon=6.4, hours=1)
+    points = ForecastClient(transport=transport, cache=cache).fetch_hourly_forecast(lat=59.4, lon=6.4, hours=1)
 
     assert len(points) == 1
     assert points[0].air_temperature == -3.0
@@ -69,8 +79,7 @@ def test_fetch_hourly_forecast_filters_past_and_limits_horizon(mock_get):
     assert points[0].precipitation_1h == 0.2
 
 
-@patch('src.forecast_client.requests.get')
-def test_fetch_hourly_forecast_handles_missing_fields(mock_get):
+def test_fetch_hourly_forecast_handles_missing_fields(transport, cache):
     now = datetime.now(UTC)
     payload = {
         "properties": {
@@ -88,9 +97,9 @@ def test_fetch_hourly_forecast_handles_missing_fields(mock_get):
     response = MagicMock()
     response.raise_for_status.return_value = None
     response.json.return_value = payload
-    mock_get.return_value = response
+    transport.get.return_value = response
 
-    points = ForecastClient().fetch_hourly_forecast(lat=59.4, lon=6.4, hours=3)
+    points = ForecastClient(transport=transport, cache=cache).fetch_hourly_forecast(lat=59.4, lon=6.4, hours=3)
 
     assert len(points) == 1
     assert points[0].air_temperature is None
@@ -99,9 +108,65 @@ def test_fetch_hourly_forecast_handles_missing_fields(mock_get):
     assert points[0].precipitation_1h is None
 
 
-@patch('src.forecast_client.requests.get')
-def test_fetch_hourly_forecast_raises_on_http_error(mock_get):
-    mock_get.side_effect = requests.RequestException("network down")
+def test_fetch_hourly_forecast_raises_on_http_error(transport, cache):
+    transport.get.side_effect = requests.RequestException("network down")
 
     with pytest.raises(ForecastClientError):
-        ForecastClient().fetch_hourly_forecast(lat=59.4, lon=6.4, hours=3)
+        ForecastClient(transport=transport, cache=cache).fetch_hourly_forecast(lat=59.4, lon=6.4, hours=3)
+
+
+def _http_date(dt: datetime) -> str:
+    return format_datetime(dt.astimezone(UTC), usegmt=True)
+
+
+def _payload(now: datetime, temps: list[float]) -> dict:
+    return {
+        "properties": {
+            "timeseries": [
+                {
+                    "time": _iso(now + timedelta(hours=i + 1)),
+                    "data": {"instant": {"details": {"air_temperature": t}}},
+                }
+                for i, t in enumerate(temps)
+            ]
+        }
+    }
+
+
+def _response(status: int, payload: dict | None, expires: datetime, last_modified: str) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status
+    response.raise_for_status.return_value = None
+    response.json.return_value = payload
+    response.headers = {"Expires": _http_date(expires), "Last-Modified": last_modified}
+    return response
+
+
+def test_cached_forecast_is_reused_until_expires_then_revalidated(transport, cache):
+    now = datetime.now(UTC)
+    modified = _http_date(now - timedelta(minutes=10))
+    transport.get.return_value = _response(200, _payload(now, [-3.0, -2.0]), now + timedelta(minutes=30), modified)
+
+    first = ForecastClient(transport=transport, cache=cache).fetch_hourly_forecast(lat=59.41284, lon=6.46971, hours=2)
+    # Ny klient og ny cache-instans (som en annen arbeider) leser samme fil
+    again = ForecastClient(transport=transport, cache=ForecastCache(cache.directory)).fetch_hourly_forecast(
+        lat=59.4128, lon=6.4697, hours=2
+    )
+
+    assert transport.get.call_count == 1
+    assert transport.get.call_args.kwargs["params"] == {"lat": "59.4128", "lon": "6.4697"}
+    assert [p.air_temperature for p in again] == [p.air_temperature for p in first] == [-3.0, -2.0]
+
+    # Utløpt: betinget forespørsel, 304 gjenbruker parsede punkter uten å lese body
+    entry = cache.load(59.4128, 6.4697)
+    entry.expires = now - timedelta(seconds=1)
+    cache.save(entry)
+    not_modified = _response(304, None, now + timedelta(minutes=30), modified)
+    transport.get.return_value = not_modified
+
+    points = ForecastClient(transport=transport, cache=cache).fetch_hourly_forecast(lat=59.4128, lon=6.4697, hours=2)
+
+    assert transport.get.call_args.kwargs["headers"]["If-Modified-Since"] == modified
+    not_modified.json.assert_not_called()
+    assert [p.air_temperature for p in points] == [-3.0, -2.0]
+    assert cache.load(59.4128, 6.4697).expires > now
@@ -0,0 +1,60 @@
+"""Tester for kolonnebasert dekoding av Frost JSON-LD (`decode_observations`)."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src.frost_client import FrostClient, decode_observations
+
+
+def _item(ts: str, **values) -> dict:
+    return {
+        "referenceTime": ts,
+        "observations": [{"elementId": k, "value": v} for k, v in values.items()],
+    }
+
+
+PAYLOAD = {
+    "data": [
+        _item("2024-01-10T02:00:00.000Z", air_temperature=-4.0),
+        _item("2024-01-10T00:00:00.000Z", air_temperature=-2.5, **{"max(wind_speed_of_gust PT1H)": 14.2}),
+        _item("2024-01-10T01:00:00.000Z", **{"max(wind_speed_of_gust PT1H)": 9.0, "surface_snow_thickness": -1}),
+        _item("2024-01-10T00:00:00.000Z", air_temperature=99.0),
+    ]
+}
+
+
+def test_decode_sorts_maps_and_keeps_first_duplicate() -> None:
+    df = decode_observations(PAYLOAD, FrostClient.COLUMN_MAPPING)
+
+    assert list(df.columns) == ["reference_time", "air_temperature", "max_wind_gust", "surface_snow_thickness"]
+    assert str(df["reference_time"].dt.tz) == "UTC"
+    assert df["reference_time"].is_monotonic_increasing
+    np.testing.assert_array_equal(df["air_temperature"], [-2.5, np.nan, -4.0])
+    np.testing.assert_array_equal(df["max_wind_gust"], [14.2, 9.0, np.nan])
+
+
+def test_historical_layout_keeps_element_names_and_duplicates() -> None:
+    df = decode_observations(PAYLOAD, time_column="time", deduplicate=False)
+
+    assert "max(wind_speed_of_gust PT1H)" in df.columns
+    assert len(df) == 4
+    assert df["time"].iloc[0] == pd.Timestamp("2024-01-10T00:00:00Z")
+
+
+def test_parse_response_normalizes_snow_and_handles_empty() -> None:
+    df = FrostClient._parse_response(FrostClient.__new__(FrostClient), PAYLOAD)
+    assert df["surface_snow_thickness"].iloc[1] == 0.0
+
+    assert decode_observations({"data": []}).empty
+    assert decode_observations({}).empty
+
+
+def test_null_and_non_numeric_values() -> None:
+    df = decode_observations({"data": [
+        _item("2024-01-10T00:00:00Z", weather_symbol="cloudy", air_temperature=None),
+        _item("2024-01-10T01:00:00Z", weather_symbol=3, air_temperature=1.0),
+    ]})
+    assert df["weather_symbol"].tolist() == ["cloudy", 3]
+    assert np.isnan(df["air_temperature"].iloc[0])
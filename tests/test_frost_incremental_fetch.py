@@ -0,0 +1,101 @@
+"""Tester for delta-henting i FrostClient.
+
+Ved gjentatte kall med `incremental=True` skal klienten gjenbruke allerede
+parsede observasjoner og kun be Frost om halen etter siste lagrede time.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from src.frost_client import FrostClient
+
+
+def _frame(start: datetime, hours: int, temp0: float = -5.0) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "reference_time": pd.to_datetime(
+                [start + timedelta(hours=i) for i in range(hours)], utc=True
+            ),
+            "air_temperature": [temp0 + i for i in range(hours)],
+        }
+    )
+
+
+@pytest.fixture
+def client(monkeypatch) -> FrostClient:
+    monkeypatch.setenv("FROST_CLIENT_ID", "test-client-id")
+    frost = FrostClient()
+    monkeypatch.setattr(frost, "_save_cache", lambda weather_data: None)
+    return frost
+
+
+def test_second_call_requests_only_tail(client, monkeypatch) -> None:
+    start = datetime(2026, 1, 10, 0, 0, tzinfo=UTC)
+    calls: list[tuple[str, str]] = []
+
+    def fake_request(start_iso, end_iso, elements, timeresolutions="PT1H"):
+        calls.append((start_iso, end_iso))
+        req_start = pd.Timestamp(start_iso)
+        req_end = pd.Timestamp(end_iso)
+        hours = int((req_end - req_start) / pd.Timedelta(hours=1))
+        return _frame(req_start.to_pydatetime(), hours, temp0=100.0 if calls[1:] else -5.0)
+
+    monkeypatch.setattr(client, "_request_observations", fake_request)
+
+    first = client.fetch_period(
+        start, start + timedelta(hours=24), elements=["air_temperature"], incremental=True
+    )
+    second = client.fetch_period(
+        start + timedelta(hours=2),
+        start + timedelta(hours=27),
+        elements=["air_temperature"],
+        incremental=True,
+    )
+
+    assert first.record_count == 24
+    assert calls[1] == ("2026-01-10T23:00:00Z", "2026-01-11T03:00:00Z")
+    # Trimmet til nytt vindu, med halen spleiset inn (siste gamle time erstattet).
+    times = second.df["reference_time"]
+    assert times.iloc[0] == pd.Timestamp(start + timedelta(hours=2))
+    assert times.iloc[-1] == pd.Timestamp(start + timedelta(hours=26))
+    assert times.is_unique
+    assert second.df.loc[times == pd.Timestamp(start + timedelta(hours=23)), "air_temperature"].item() == 100.0
+
+
+def test_window_extending_backwards_triggers_full_fetch(client, monkeypatch) -> None:
+    start = datetime(2026, 1, 10, 0, 0, tzinfo=UTC)
+    calls: list[tuple[str, str]] = []
+
+    def fake_request(start_iso, end_iso, elements, timeresolutions="PT1H"):
+        calls.append((start_iso, end_iso))
+        req_start = pd.Timestamp(start_iso)
+        hours = int((pd.Timestamp(end_iso) - req_start) / pd.Timedelta(hours=1))
+        return _frame(req_start.to_pydatetime(), hours)
+
+    monkeypatch.setattr(client, "_request_observations", fake_request)
+
+    end = start + timedelta(hours=24)
+    client.fetch_period(start, end, elements=["air_temperature"], incremental=True)
+    client.fetch_period(start - timedelta(hours=6), end, elements=["air_temperature"], incremental=True)
+
+    assert calls[1] == ("2026-01-09T18:00:00Z", "2026-01-11T00:00:00Z")
+
+
+def test_empty_tail_keeps_stored_frame(client, monkeypatch) -> None:
+    start = datetime(2026, 1, 10, 0, 0, tzinfo=UTC)
+    responses = [_frame(start, 24), pd.DataFrame()]
+
+    monkeypatch.setattr(
+        client, "_request_observations", lambda *args, **kwargs: responses.pop(0)
+    )
+
+    end = start + timedelta(hours=25)
+    client.fetch_period(start, end, elements=["air_temperature"], incremental=True)
+    again = client.fetch_period(start, end, elements=["air_temperature"], incremental=True)
+
+    assert again.record_count == 24
+    assert not responses
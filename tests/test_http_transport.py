@@ -0,0 +1,106 @@
+"""Tester for delt HTTP-transport (retry-policy og injisering i klientene)."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import pytest
+import requests
+
+from src.config import HttpConfig, settings
+from src.frost_client import FrostAPITransientError, FrostClient
+from src.http_transport import HttpTransport, get_transport
+from src.observation_store import ObservationStore
+
+
+class _Response:
+    def __init__(self, status_code: int, payload: dict | None = None):
+        self.status_code = status_code
+        self._payload = payload or {}
+
+    def json(self) -> dict:
+        return self._payload
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}")
+
+
+class _FakeSession:
+    """Spiller av en fast sekvens av svar/unntak og husker kallene."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls: list[dict] = []
+
+    def get(self, url, **kwargs):
+        self.calls.append({"url": url, **kwargs})
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture(autouse=True)
+def _no_backoff(monkeypatch):
+    monkeypatch.setattr(
+        settings, "http", HttpConfig(retry_backoff_multiplier=0.0, retry_backoff_min_seconds=0.0)
+    )
+
+
+def test_retries_retryable_status_then_succeeds() -> None:
+    session = _FakeSession(_Response(503), _Response(200))
+    response = HttpTransport(session=session).get("https://frost.met.no/x", params={"a": "1"})
+    assert response.status_code == 200
+    assert len(session.calls) == 2
+    assert session.calls[0]["params"] == {"a": "1"}
+
+
+def test_returns_last_response_when_retries_exhausted() -> None:
+    session = _FakeSession(_Response(429), _Response(429), _Response(429))
+    assert HttpTransport(session=session).get("https://frost.met.no/x").status_code == 429
+    assert len(session.calls) == settings.http.retry_attempts
+
+
+def test_network_error_is_raised_after_retries() -> None:
+    session = _FakeSession(*[requests.ConnectionError("down")] * 3)
+    with pytest.raises(requests.ConnectionError):
+        HttpTransport(session=session).get("https://frost.met.no/x")
+    assert len(session.calls) == 3
+
+
+def test_default_session_pools_and_negotiates_gzip() -> None:
+    transport = HttpTransport()
+    assert "gzip" in transport.session.headers["Accept-Encoding"]
+    assert transport.session.get_adapter("https://frost.met.no")._pool_maxsize == settings.http.pool_maxsize
+    assert get_transport() is get_transport()
+
+
+def test_frost_client_uses_injected_transport(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("FROST_CLIENT_ID", "test-client-id")
+    payload = {"data": [{
+        "referenceTime": "2024-01-10T00:00:00.000Z",
+        "observations": [{"elementId": "air_temperature", "value": -3.0}],
+    }]}
+    session = _FakeSession(_Response(200, payload), *[requests.Timeout("slow")] * 3)
+    client = FrostClient(store=ObservationStore("SN46220", root=tmp_path), transport=HttpTransport(session=session))
+
+    df = client._request_observations("2024-01-10T00:00:00Z", "2024-01-10T01:00:00Z", ("air_temperature",))
+    assert df["air_temperature"].tolist() == [-3.0]
+    assert session.calls[0]["auth"] == ("test-client-id", "")
+
+    with pytest.raises(FrostAPITransientError):
+        client._request_observations("2024-01-10T00:00:00Z", "2024-01-10T01:00:00Z", ("air_temperature",))
+
+
+def test_fetch_chunk_without_retry_makes_one_attempt(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("FROST_CLIENT_ID", "test-client-id")
+    session = _FakeSession(_Response(503), _Response(200))
+    client = FrostClient(store=ObservationStore("SN46220", root=tmp_path), transport=HttpTransport(session=session))
+
+    with pytest.raises(FrostAPITransientError):
+        client.fetch_chunk(
+            datetime(2024, 1, 10, tzinfo=UTC), datetime(2024, 1, 11, tzinfo=UTC), ("air_temperature",), retry=False
+        )
+    assert len(session.calls) == 1
+    assert session.calls[0]["params"]["referencetime"] == "2024-01-10T00:00:00Z/2024-01-11T00:00:00Z"
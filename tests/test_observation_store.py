@@ -0,0 +1,90 @@
+"""Tester for det partisjonerte observasjonslageret og FrostClient-fallback."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from src.frost_client import FrostAPIError, FrostClient
+from src.observation_store import ObservationStore
+
+
+def _frame(start: datetime, hours: int, temp0: float = -5.0) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "reference_time": pd.to_datetime(
+                [start + timedelta(hours=i) for i in range(hours)], utc=True
+            ),
+            "air_temperature": [temp0 + i for i in range(hours)],
+            "wind_speed": [3.0] * hours,
+        }
+    )
+
+
+@pytest.fixture
+def store(tmp_path) -> ObservationStore:
+    return ObservationStore("SN46220", root=tmp_path)
+
+
+def test_append_partitions_by_month_and_reads_window(store) -> None:
+    start = datetime(2026, 1, 31, 20, 0, tzinfo=UTC)
+    store.append(_frame(start, 8))
+
+    assert [p.stem for p in store.partitions()] == ["2026-01", "2026-02"]
+
+    df = store.read(start + timedelta(hours=2), start + timedelta(hours=5))
+    assert len(df) == 4
+    assert df["reference_time"].is_monotonic_increasing
+    assert store.latest_time() == pd.Timestamp(start + timedelta(hours=7))
+
+
+def test_read_selects_columns(store) -> None:
+    start = datetime(2026, 1, 10, tzinfo=UTC)
+    store.append(_frame(start, 3))
+
+    df = store.read(columns=["air_temperature", "missing_column"])
+    assert list(df.columns) == ["reference_time", "air_temperature"]
+
+
+def test_append_overwrites_duplicate_timestamps(store) -> None:
+    start = datetime(2026, 1, 10, tzinfo=UTC)
+    store.append(_frame(start, 3, temp0=-5.0))
+    store.append(_frame(start + timedelta(hours=2), 2, temp0=1.0))
+
+    df = store.read()
+    assert len(df) == 4
+    assert df["air_temperature"].tolist() == [-5.0, -4.0, 1.0, 2.0]
+
+
+def test_frost_client_falls_back_to_store(monkeypatch, store) -> None:
+    monkeypatch.setenv("FROST_CLIENT_ID", "test-client-id")
+    client = FrostClient(store=store)
+    start = datetime(2026, 1, 10, tzinfo=UTC)
+    store.append(_frame(start, 6))
+
+    def failing_request(*args, **kwargs):
+        raise FrostAPIError("nede")
+
+    monkeypatch.setattr(client, "_request_observations", failing_request)
+    weather = client.fetch_period(start, start + timedelta(hours=3), elements=["air_temperature"])
+
+    assert weather.source == "cache"
+    assert len(weather.df) == 4
+
+
+def test_append_merges_columns_for_same_timestamps(store) -> None:
+    start = datetime(2026, 1, 10, tzinfo=UTC)
+    store.append(_frame(start, 3))
+    extra = pd.DataFrame(
+        {
+            "reference_time": pd.to_datetime([start + timedelta(hours=i) for i in range(3)], utc=True),
+            "relative_humidity": [90.0, 91.0, 92.0],
+        }
+    )
+    store.append(extra)
+
+    df = store.read()
+    assert df["air_temperature"].tolist() == [-5.0, -4.0, -3.0]
+    assert df["relative_humidity"].tolist() == [90.0, 91.0, 92.0]
@@ -1,79 +1,252 @@
 from __future__ import annotations
 
 import csv
-from datetime import UTC, datetime
+import sqlite3
+import time
+from datetime import UTC, datetime, timedelta
 
 import pandas as pd
+import pytest
 
+from src.analyzers import AnalysisResult, RiskLevel
 from src.operational_logger import (
     OPERATIONAL_LOG_FIELDS,
-    _ensure_log_file,
+    OperationalLogWriter,
+    get_operational_writer,
     log_medium_high_alerts,
 )
+from src.operational_store import OperationalLogStore
 from src.plowing_service import PlowingInfo
 
 
-def test_operational_logger_bootstraps_csv_without_alert_rows(monkeypatch, tmp_path) -> None:
-    log_path = tmp_path / "operational_alerts.csv"
-    state_path = tmp_path / "operational_alerts_state.json"
+@pytest.fixture
+def log_paths(monkeypatch, tmp_path):
+    db_path = tmp_path / "operational_alerts.sqlite"
+    csv_path = tmp_path / "operational_alerts.csv"
 
     monkeypatch.setenv("OPERATIONAL_LOG_ENABLED", "true")
-    monkeypatch.setenv("OPERATIONAL_LOG_PATH", str(log_path.relative_to(tmp_path)))
-    monkeypatch.setenv("OPERATIONAL_LOG_STATE_PATH", str(state_path.relative_to(tmp_path)))
+    monkeypatch.setenv("OPERATIONAL_LOG_DB_PATH", db_path.name)
+    monkeypatch.setenv("OPERATIONAL_LOG_PATH", csv_path.name)
 
     import src.operational_logger as operational_logger
 
     monkeypatch.setattr(operational_logger, "_project_root", lambda: tmp_path)
+    monkeypatch.setattr(operational_logger, "_stores", {})
+    monkeypatch.setattr(operational_logger, "_writers", {})
+    yield db_path, csv_path
+    for writer in operational_logger._writers.values():
+        writer.close(timeout=5)
 
-    df = pd.DataFrame(
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
         {
             "reference_time": [datetime(2026, 3, 6, 10, 0, tzinfo=UTC)],
             "air_temperature": [-2.0],
         }
     )
 
+
+def _no_plowing() -> PlowingInfo:
+    return PlowingInfo(last_plowing=None, hours_since=None, is_recent=False, all_timestamps=[], source="none")
+
+
+def test_operational_logger_bootstraps_store_without_alert_rows(log_paths) -> None:
+    db_path, _ = log_paths
+
     class DummyResult:
         risk_level = None
 
-    log_medium_high_alerts(
-        results={"Snøfokk": DummyResult()},
-        df=df,
-        plowing_info=PlowingInfo(
-            last_plowing=None,
-            hours_since=None,
-            is_recent=False,
-            all_timestamps=[],
-            source="none",
-        ),
-    )
+    log_medium_high_alerts(results={"Snøfokk": DummyResult()}, df=_frame(), plowing_info=_no_plowing())
+
+    assert db_path.exists()
+    assert OperationalLogStore(db_path).count() == 0
+
 
-    assert log_path.exists()
-    with open(log_path, newline="", encoding="utf-8") as f:
-        rows = list(csv.reader(f))
-    assert len(rows) == 1
-    assert rows[0] == OPERATIONAL_LOG_FIELDS
+def test_reruns_are_deduplicated_by_reference_time_analyzer_and_level(log_paths) -> None:
+    db_path, _ = log_paths
+    results = {
+        "Snøfokk": AnalysisResult(risk_level=RiskLevel.HIGH, message="Snøfokk"),
+        "Slaps": AnalysisResult(risk_level=RiskLevel.LOW, message="Ingen"),
+    }
 
+    for _ in range(3):
+        log_medium_high_alerts(results=results, df=_frame(), plowing_info=_no_plowing())
+    results["Snøfokk"] = AnalysisResult(risk_level=RiskLevel.MEDIUM, message="Snøfokk")
+    log_medium_high_alerts(results=results, df=_frame(), plowing_info=_no_plowing())
 
-def test_ensure_log_file_migrates_outdated_header(tmp_path) -> None:
-    """En CSV skrevet med en eldre, smalere header skal migreres til full header
-    slik at etterfølgende append ikke gir kolonne-mismatch i pandas.read_csv."""
-    log_path = tmp_path / "operational_alerts.csv"
+    assert get_operational_writer().flush(timeout=5)
+    assert OperationalLogStore(db_path).count() == 2
 
+
+def test_legacy_csv_with_outdated_header_is_imported_once(log_paths) -> None:
+    """En CSV skrevet med en eldre, smalere header importeres; manglende felt blir tomme."""
+    db_path, csv_path = log_paths
     old_fields = OPERATIONAL_LOG_FIELDS[:-1]  # mangler nyeste kolonne (quality_guard_note)
-    with open(log_path, "w", newline="", encoding="utf-8") as f:
+    logged = datetime.now(UTC).replace(microsecond=0)
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=old_fields)
         writer.writeheader()
-        writer.writerow(dict.fromkeys(old_fields, "x"))
+        for hour in range(3):
+            row = dict.fromkeys(old_fields, "")
+            row.update(
+                logged_at_utc=logged.isoformat().replace("+00:00", "Z"),
+                reference_time_utc=f"2026-03-06T0{hour}:00:00Z",
+                analyzer="Snøfokk",
+                risk_level="HIGH",
+                suppressed_by_maintenance="False",
+            )
+            writer.writerow(row)
+
+    store = OperationalLogStore(db_path)
+    assert store.import_csv(csv_path) == 3
+    assert store.import_csv(csv_path) == 0
+    assert store.count() == 3
+
+
+def test_kpis_match_csv_computation(tmp_path) -> None:
+    """KPI-spørringen gir samme tall som den gamle pandas-beregningen på CSV-en."""
+    now = datetime.now(UTC)
+    rows = []
+    for i, (level, hours, suppressed) in enumerate(
+        [("HIGH", 1.0, True), ("MEDIUM", 30.0, False), ("HIGH", None, False), ("MEDIUM", 5.0, False)]
+    ):
+        rows.append({
+            "logged_at_utc": (now - timedelta(days=2 * i)).isoformat(),
+            "reference_time_utc": f"2026-03-0{i + 1}T00:00:00Z",
+            "analyzer": "Glatte veier",
+            "risk_level": level,
+            "maintenance_hours_since": hours,
+            "maintenance_last_utc": f"2026-03-0{i + 1}T00:00:00Z" if hours is not None else "",
+            "suppressed_by_maintenance": suppressed,
+        })
+    rows.append({**rows[0], "logged_at_utc": (now - timedelta(days=20)).isoformat(), "reference_time_utc": "2026-02-01T00:00:00Z"})
+
+    store = OperationalLogStore(tmp_path / "log.sqlite")
+    store.append(rows)
+    kpis = store.kpis(since=now - timedelta(days=14))
+
+    assert kpis.total == 4
+    assert kpis.high_share_pct == 50.0
+    assert kpis.suppressed_share_pct == 25.0
+    # TP: <=6t (1.0, 5.0); FP: >24t eller ukjent (30.0, None)
+    assert kpis.precision_pct == 50.0
+    assert kpis.recall_pct == pytest.approx(2 / 3 * 100)
+
+
+class _FlakyStore:
+    """Feiler første skriving, som en låst database."""
+
+    def __init__(self, inner: OperationalLogStore):
+        self.inner = inner
+        self.path = inner.path
+        self.calls = 0
+
+    def append(self, rows) -> int:
+        self.calls += 1
+        if self.calls == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return self.inner.append(rows)
+
+
+def _rows(n: int) -> list[dict]:
+    return [
+        {"logged_at_utc": "2026-03-06T10:00:00Z", "reference_time_utc": f"2026-03-06T10:{i:02d}:00Z",
+         "analyzer": "Snøfokk", "risk_level": "HIGH"}
+        for i in range(n)
+    ]
+
+
+def test_writer_retries_failed_batch_and_reports_counters(tmp_path) -> None:
+    store = _FlakyStore(OperationalLogStore(tmp_path / "log.sqlite"))
+    writer = OperationalLogWriter(store, flush_interval=0.01)
+
+    writer.submit(_rows(5))
+    assert writer.flush(timeout=5)
+    writer.close(timeout=5)
+
+    stats = writer.stats()
+    assert store.inner.count() == 5
+    assert stats.failed_flushes == 1
+    assert stats.written == 5
+    assert stats.unwritten == 0
+    assert stats.queue_depth == 0
+    assert stats.max_flush_ms >= stats.last_flush_ms > 0
+
+
+def test_full_queue_falls_back_to_synchronous_write(tmp_path) -> None:
+    store = OperationalLogStore(tmp_path / "log.sqlite")
+    writer = OperationalLogWriter(store, maxsize=2, flush_interval=0.01)
+
+    writer.submit(_rows(10))
+    assert writer.flush(timeout=5)
+    writer.close(timeout=5)
+
+    assert store.count() == 10
+    assert writer.stats().sync_fallbacks >= 1
+
+
+class _LockedStore:
+    """Store that fails every write until `unlock()` is called."""
+
+    def __init__(self, inner: OperationalLogStore):
+        self.inner = inner
+        self.path = inner.path
+        self.locked = True
+
+    def append(self, rows) -> int:
+        if self.locked:
+            raise sqlite3.OperationalError("database is locked")
+        return self.inner.append(rows)
+
+
+def test_submit_never_blocks_when_queue_is_full_and_store_is_locked(tmp_path) -> None:
+    store = _LockedStore(OperationalLogStore(tmp_path / "log.sqlite"))
+    writer = OperationalLogWriter(store, maxsize=2, batch_size=1, flush_interval=0.01)
+
+    started = time.perf_counter()
+    writer.submit(_rows(10))
+    assert time.perf_counter() - started < 1.0
+
+    stats = writer.stats()
+    assert stats.dropped > 0
+    store.locked = False
+    assert writer.flush(timeout=5)
+    writer.close(timeout=5)
+    assert store.inner.count() == 10 - stats.dropped
+
+
+class _UnwritableStore:
+    """Fails the first write with OSError (read-only directory) and rejects one row outright."""
+
+    def __init__(self, inner: OperationalLogStore, bad_reference_time: str):
+        self.inner = inner
+        self.path = inner.path
+        self.bad_reference_time = bad_reference_time
+        self.calls = 0
+
+    def append(self, rows) -> int:
+        self.calls += 1
+        if self.calls == 1:
+            raise PermissionError(13, "Permission denied", str(self.path.parent))
+        if any(row["reference_time_utc"] == self.bad_reference_time for row in rows):
+            raise ValueError("cannot normalize row")
+        return self.inner.append(rows)
 
-    _ensure_log_file(log_path)
 
-    with open(log_path, newline="", encoding="utf-8") as f:
-        rows = list(csv.reader(f))
-    assert rows[0] == OPERATIONAL_LOG_FIELDS
-    # Eksisterende rad bevares, manglende felt fylles tomt.
-    assert len(rows) == 2
-    assert rows[1][-1] == ""
+def test_writer_survives_os_and_row_errors(tmp_path) -> None:
+    rows = _rows(5)
+    store = _UnwritableStore(OperationalLogStore(tmp_path / "log.sqlite"), rows[2]["reference_time_utc"])
+    writer = OperationalLogWriter(store, flush_interval=0.01)
+
+    writer.submit(rows)
+    assert writer.flush(timeout=5)
+    writer.submit(_rows(7)[5:])
+    assert writer.flush(timeout=5)
+    writer.close(timeout=5)
 
-    # Filen kan nå leses uten ParserError.
-    df = pd.read_csv(log_path)
-    assert list(df.columns) == OPERATIONAL_LOG_FIELDS
+    stats = writer.stats()
+    assert store.inner.count() == 6
+    assert stats.dropped == 1
+    assert stats.failed_flushes == 2
+    assert stats.unwritten == 0
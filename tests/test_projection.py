@@ -0,0 +1,71 @@
+"""Tester for risikoprojeksjon (observasjon + prognose i én analyze_series-pass)."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src.analyzers import RiskLevel, SnowdriftAnalyzer
+from src.projection import build_projection_frame, project_risk
+
+
+def _observed(hours: int = 48) -> pd.DataFrame:
+    times = pd.date_range("2026-01-10T00:00:00Z", periods=hours, freq="h")
+    return pd.DataFrame({
+        "reference_time": times,
+        "air_temperature": np.full(hours, -8.0),
+        "surface_temperature": np.full(hours, -10.0),
+        "wind_speed": np.full(hours, 3.0),
+        "max_wind_gust": np.full(hours, 6.0),
+        "wind_from_direction": np.full(hours, 180.0),
+        "surface_snow_thickness": np.full(hours, 40.0),
+        "precipitation_1h": np.zeros(hours),
+        "relative_humidity": np.full(hours, 80.0),
+        "dew_point_temperature": np.full(hours, -11.0),
+    })
+
+
+def _forecast(start: pd.Timestamp, wind: list[float]) -> pd.DataFrame:
+    times = pd.date_range(start, periods=len(wind), freq="h")
+    return pd.DataFrame({
+        "reference_time": times,
+        "air_temperature": np.full(len(wind), -8.0),
+        "wind_speed": wind,
+        "max_wind_gust": np.full(len(wind), np.nan),
+        "precipitation_1h": np.zeros(len(wind)),
+        "wind_from_direction": np.full(len(wind), 180.0),
+        "relative_humidity": np.full(len(wind), 80.0),
+    })
+
+
+def test_projection_runs_analyzers_once_over_observed_plus_forecast() -> None:
+    observed = _observed()
+    start = observed["reference_time"].iloc[-1] + pd.Timedelta(hours=1)
+    forecast = _forecast(start, [3.0, 6.0, 12.0, 14.0, 14.0, 8.0])
+    analyzer = SnowdriftAnalyzer()
+
+    projection = project_risk(observed, forecast, analyzers={"Snøfokk": analyzer})
+    frame, first = build_projection_frame(observed, forecast)
+
+    assert projection is not None
+    assert len(projection.timeline) == len(forecast)
+    # Vindkast estimeres fra observert kast/vind-forhold (6/3)
+    assert frame["max_wind_gust"].iloc[first + 3] == 28.0
+    # Snødybde og bakke/luft-avvik holdes fra siste observasjon
+    assert (frame["surface_snow_thickness"].iloc[first:] == 40.0).all()
+    assert (frame["surface_temperature"].iloc[first:] == -10.0).all()
+
+    expected = analyzer.analyze_series(frame)["risk_level"].iloc[first:].tolist()
+    assert projection.timeline["risk_level"].tolist() == expected
+    warning = projection.first_warning("Snøfokk")
+    assert warning is not None
+    assert warning[1] in (RiskLevel.MEDIUM.value, RiskLevel.HIGH.value)
+    assert projection.wide().shape == (len(forecast), 1)
+
+
+def test_no_projection_for_stale_observations() -> None:
+    observed = _observed()
+    start = observed["reference_time"].iloc[-1] + pd.Timedelta(hours=12)
+
+    assert project_risk(observed, _forecast(start, [3.0, 3.0])) is None
+    assert project_risk(observed.iloc[0:0], _forecast(start, [3.0])) is None
@@ -0,0 +1,163 @@
+"""Tester for dags-/ukesaggregater og fredagsregelen for tunbrøyting."""
+
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.observation_store import ObservationStore
+from src.operational_store import OperationalLogStore
+from src.rollup_store import DAILY_FIELDS, RollupStore, daily_rollups
+
+
+def _hours(start: datetime, hours: int, **columns) -> pd.DataFrame:
+    data = {"reference_time": pd.date_range(start, periods=hours, freq="h")}
+    for name, value in columns.items():
+        data[name] = np.resize(np.asarray(value, dtype=float), hours)
+    return pd.DataFrame(data)
+
+
+@pytest.fixture
+def observations(tmp_path) -> ObservationStore:
+    return ObservationStore("SN46220", root=tmp_path / "observations")
+
+
+@pytest.fixture
+def rollups(tmp_path) -> RollupStore:
+    return RollupStore(tmp_path / "rollups.sqlite")
+
+
+def test_daily_rollup_uses_local_days_and_precip_phase() -> None:
+    # 23:00 UTC 14. jan = 00:00 lokal 15. jan (vintertid, UTC+1)
+    df = _hours(
+        datetime(2026, 1, 14, 23, tzinfo=UTC), 24,
+        air_temperature=[-3.0] * 12 + [3.0] * 12,
+        dew_point_temperature=[-4.0] * 12 + [2.0] * 12,
+        precipitation_1h=1.0,
+        max_wind_gust=np.arange(24),
+        surface_snow_thickness=np.r_[np.arange(40.0, 52.0), np.full(12, 51.0)],
+    )
+
+    days = daily_rollups(df, "Europe/Oslo")
+
+    assert days["day"].tolist() == ["2026-01-15"]
+    row = days.iloc[0]
+    assert row["hours"] == 24
+    # Første time mangler forgjenger; 11 timer med +1 cm
+    assert row["new_snow_cm"] == 11.0
+    assert row["precip_snow_mm"] == 12.0 and row["precip_rain_mm"] == 12.0
+    assert row["frost_hours"] == 12 and row["mild_hours"] == 12
+    assert row["max_gust"] == 23.0
+    assert (row["iso_year"], row["iso_week"]) == (2026, 3)
+
+
+def test_sync_is_incremental_and_weeks_match_days(observations, rollups, tmp_path) -> None:
+    observations.append(_hours(
+        datetime(2026, 1, 1, tzinfo=UTC), 24 * 20,
+        air_temperature=-5.0, precipitation_1h=0.5, surface_snow_thickness=np.arange(24 * 20) * 0.6,
+    ))
+    alerts = OperationalLogStore(tmp_path / "alerts.sqlite")
+    alerts.append([
+        {"reference_time_utc": "2026-01-05T10:00:00Z", "analyzer": "Snøfokk", "risk_level": "HIGH"},
+        {"reference_time_utc": "2026-01-05T11:00:00Z", "analyzer": "Snøfokk", "risk_level": "MEDIUM"},
+        {"reference_time_utc": "2026-01-05T12:00:00Z", "analyzer": "Snøfokk", "risk_level": "HIGH",
+         "suppressed_by_maintenance": "1"},
+    ])
+
+    written = rollups.sync(observations, alerts=alerts)
+    assert written == 21  # lokal 1. jan - 21. jan (siste time er 21. jan 00:00 lokal)
+    assert rollups.sync(observations, alerts=alerts) == 0
+
+    daily = rollups.daily("SN46220", date(2026, 1, 1), date(2026, 1, 31))
+    weekly = rollups.weekly("SN46220")
+    assert daily["hours"].sum() == 24 * 20
+    assert weekly["days"].sum() == len(daily)
+    assert weekly["new_snow_cm"].sum() == pytest.approx(daily["new_snow_cm"].sum())
+    jan5 = daily.set_index("day").loc["2026-01-05"]
+    assert (jan5["alerts_high"], jan5["alerts_medium"]) == (1, 1)
+
+    # Nye timer i samme måned regner bare om den partisjonen
+    observations.append(_hours(datetime(2026, 1, 21, tzinfo=UTC), 6, air_temperature=2.0))
+    assert rollups.sync(observations) == 21
+    assert rollups.daily("SN46220", date(2026, 1, 21), date(2026, 1, 21))["hours"].iloc[0] == 7
+
+
+def test_alert_counts_survive_sync_without_alerts_and_late_alerts_are_counted(
+    observations, rollups, tmp_path
+) -> None:
+    observations.append(_hours(datetime(2026, 1, 1, tzinfo=UTC), 24 * 10, air_temperature=-5.0))
+    alerts = OperationalLogStore(tmp_path / "alerts.sqlite")
+    alerts.append([{"reference_time_utc": "2026-01-05T10:00:00Z", "analyzer": "Snøfokk", "risk_level": "HIGH"}])
+
+    def jan(day: int) -> pd.Series:
+        return rollups.daily("SN46220", date(2026, 1, day), date(2026, 1, day)).iloc[0]
+
+    rollups.sync(observations, alerts=alerts)
+    assert jan(5)["alerts_high"] == 1
+
+    # Backfill uten logg regner om måneden, men beholder tellerne
+    observations.append(_hours(datetime(2026, 1, 11, tzinfo=UTC), 6, air_temperature=-2.0))
+    assert rollups.sync(observations) == 11
+    assert jan(5)["alerts_high"] == 1
+
+    # Varsel logget etter at måneden er rullet opp telles uten ny partisjonsendring
+    alerts.append([{"reference_time_utc": "2026-01-06T08:00:00Z", "analyzer": "Nysnø", "risk_level": "MEDIUM"}])
+    assert rollups.sync(observations, alerts=alerts) == 1
+    assert (jan(5)["alerts_high"], jan(6)["alerts_medium"]) == (1, 1)
+    week = rollups.weekly("SN46220", date(2026, 1, 5), date(2026, 1, 5)).iloc[0]
+    assert (week["alerts_high"], week["alerts_medium"]) == (1, 1)
+
+
+def test_tun_plowing_status_sums_snow_since_previous_friday(observations, rollups) -> None:
+    # 2 cm nysnø per døgn fra tirsdag 6. jan
+    snow = np.repeat(np.arange(15) * 2.0, 24)
+    observations.append(_hours(datetime(2026, 1, 5, 23, tzinfo=UTC), len(snow),
+                               air_temperature=-6.0, surface_snow_thickness=snow))
+    rollups.sync(observations)
+
+    friday = date(2026, 1, 16)
+    status = rollups.tun_plowing_status("SN46220", friday)
+
+    assert status.since == friday - timedelta(days=6)
+    assert status.until == friday
+    assert status.new_snow_cm == pytest.approx(14.0)
+    assert status.complete
+    assert rollups.tun_plowing_status("SN46220", date(2026, 1, 14)).since == date(2026, 1, 10)
+    assert not rollups.seasons("SN46220").empty
+
+
+def test_snow_since_plowing_reads_whole_days_from_rollups(rollups, monkeypatch) -> None:
+    from src.components import historical_service as module
+
+    class _FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2026, 1, 20, 10, 30, tzinfo=UTC)
+
+    monkeypatch.setattr(module, "datetime", _FixedDatetime)
+    service = module.HistoricalWeatherService(frost_client_id="test", station_id="SN46220")
+
+    # Brøytet 21:00 lokal 16. jan; hele døgn 17.-19. jan, delvise døgn i hver ende
+    last_plowed = datetime(2026, 1, 16, 20, tzinfo=UTC)
+    hourly = pd.DataFrame({
+        "time": pd.date_range(last_plowed, datetime(2026, 1, 20, 10, tzinfo=UTC), freq="h"),
+        "new_snow_cm": 1.0,
+        "snow_type": "tørr",
+    })
+    days = pd.DataFrame({name: [0] * 3 for name in DAILY_FIELDS})
+    days["day"] = ["2026-01-17", "2026-01-18", "2026-01-19"]
+    days["iso_year"], days["iso_week"] = 2026, 3
+    days["new_snow_cm"] = 2.0
+
+    # Bare 17. og 18. jan finnes: ufullstendige aggregater gir timesummen
+    rollups.upsert_days("SN46220", days.iloc[:2])
+    assert service.calculate_snow_since_plowing(hourly, last_plowed, rollups)["total_new_snow"] == 87.0
+
+    rollups.upsert_days("SN46220", days)
+    result = service.calculate_snow_since_plowing(hourly, last_plowed, rollups)
+    # 3 + 12 kanttimer à 1 cm og 3 døgn à 2 cm fra aggregatene
+    assert result["total_new_snow"] == 21.0
+    assert result["dominant_type"] == "tørr"
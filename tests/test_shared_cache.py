@@ -0,0 +1,196 @@
+"""Tester for det delte cache-laget (TTL, stale-while-revalidate, budsjett, backends)."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import types
+
+import pandas as pd
+import pytest
+
+from src.shared_cache import DiskBackend, MemoryBackend, RedisBackend, SharedCache
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_hit_returns_independent_copy_and_counts() -> None:
+    cache = SharedCache(MemoryBackend(max_bytes=1_000_000), stale_seconds=0)
+    calls = []
+
+    def fetch() -> pd.DataFrame:
+        calls.append(1)
+        return pd.DataFrame({"wind_speed": [3.0, 4.0]})
+
+    first = cache.get_or_fetch("frost", ("a", "b"), fetch, ttl_seconds=60)
+    first.loc[0, "wind_speed"] = 99.0
+    second = cache.get_or_fetch("frost", ("a", "b"), fetch, ttl_seconds=60)
+
+    assert len(calls) == 1
+    assert second["wind_speed"].tolist() == [3.0, 4.0]
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+
+def test_stale_value_is_served_while_revalidating() -> None:
+    cache = SharedCache(MemoryBackend(max_bytes=1_000_000), stale_seconds=60)
+    values = iter(["old", "new"])
+
+    assert cache.get_or_fetch("netatmo", (), lambda: next(values), ttl_seconds=0.05) == "old"
+    time.sleep(0.1)
+    assert cache.get_or_fetch("netatmo", (), lambda: next(values), ttl_seconds=0.05) == "old"
+    _wait_for(lambda: cache.stats().revalidations == 1)
+
+    assert cache.get_or_fetch("netatmo", (), lambda: "unused", ttl_seconds=60) == "new"
+    assert cache.stats().stale_hits == 1
+
+
+def test_revalidation_runs_through_wrap_from_calling_thread() -> None:
+    wrapped = []
+
+    def wrap(task):
+        wrapped.append(threading.current_thread().name)
+        return task
+
+    cache = SharedCache(MemoryBackend(max_bytes=1_000_000), stale_seconds=60, wrap=wrap)
+    cache.set("forecast", (), "old", ttl_seconds=-1)
+    assert cache.get_or_fetch("forecast", (), lambda: "new", ttl_seconds=60) == "old"
+    _wait_for(lambda: cache.stats().revalidations == 1)
+
+    assert wrapped == [threading.current_thread().name]
+    assert cache.get_or_fetch("forecast", (), lambda: "unused", ttl_seconds=60) == "new"
+
+
+def test_fetch_error_falls_back_to_stale_value_without_swr() -> None:
+    cache = SharedCache(MemoryBackend(max_bytes=1_000_000), stale_seconds=0)
+    cache.set("plowing", (), "cached", ttl_seconds=-1, stale_seconds=60)
+
+    def failing() -> str:
+        raise ConnectionError("nede")
+
+    assert cache.get_or_fetch("plowing", (), failing, ttl_seconds=60) == "cached"
+    assert cache.stats().fetch_errors == 1
+    with pytest.raises(ConnectionError):
+        cache.get_or_fetch("plowing", ("annen",), failing, ttl_seconds=60)
+
+
+def test_memory_budget_evicts_least_recently_used() -> None:
+    backend = MemoryBackend(max_bytes=2_500)
+    cache = SharedCache(backend, stale_seconds=0)
+    for key in ("a", "b"):
+        cache.set("x", key, b"1" * 1_000, ttl_seconds=60)
+    cache.get_or_fetch("x", "a", lambda: b"", ttl_seconds=60)  # "a" blir nyest
+    cache.set("x", "c", b"1" * 1_000, ttl_seconds=60)
+
+    assert backend.evictions == 1
+    assert cache.get_or_fetch("x", "a", lambda: b"refetched", ttl_seconds=60) != b"refetched"
+    assert cache.get_or_fetch("x", "b", lambda: b"refetched", ttl_seconds=60) == b"refetched"
+
+
+def test_disk_backend_is_shared_between_instances_and_invalidates(tmp_path) -> None:
+    writer = SharedCache(DiskBackend(tmp_path, max_bytes=1_000_000), stale_seconds=0)
+    reader = SharedCache(DiskBackend(tmp_path, max_bytes=1_000_000), stale_seconds=0)
+
+    writer.get_or_fetch("forecast", (59.4, 6.4), lambda: [1, 2, 3], ttl_seconds=60)
+    assert reader.get_or_fetch("forecast", (59.4, 6.4), lambda: [], ttl_seconds=60) == [1, 2, 3]
+    assert reader.stats().hits == 1
+
+    assert reader.invalidate("forecast") == 1
+    assert writer.get_or_fetch("forecast", (59.4, 6.4), lambda: [4], ttl_seconds=60) == [4]
+
+
+class _FakeRedis:
+    """Minimal Redis-klient som teller skanninger."""
+
+    def __init__(self) -> None:
+        self.data: dict[bytes, bytes] = {}
+        self.scans = 0
+
+    def set(self, key, value, px=None) -> None:
+        self.data[key.encode()] = value
+
+    def scan_iter(self, match, count=None):
+        self.scans += 1
+        prefix = match.rstrip("*").encode()
+        return [key for key in self.data if key.startswith(prefix)]
+
+    def delete(self, key) -> int:
+        return int(self.data.pop(key, None) is not None)
+
+    def pipeline(self, transaction=True):
+        client = self
+
+        class _Pipeline:
+            def __init__(self) -> None:
+                self.keys: list[bytes] = []
+
+            def memory_usage(self, key) -> None:
+                self.keys.append(key)
+
+            def execute(self) -> list[int]:
+                return [len(client.data[key]) for key in self.keys]
+
+        return _Pipeline()
+
+
+def test_redis_usage_is_cached_between_stats_calls(monkeypatch) -> None:
+    fake = _FakeRedis()
+    module = types.ModuleType("redis")
+    module.RedisError = type("RedisError", (Exception,), {})
+    module.Redis = types.SimpleNamespace(from_url=lambda url, **kwargs: fake)
+    monkeypatch.setitem(sys.modules, "redis", module)
+
+    backend = RedisBackend("redis://test", usage_ttl_seconds=60)
+    backend.set("frost:a", b"12345", ttl_seconds=60)
+    assert backend.usage() == (1, 5)
+
+    backend.set("frost:b", b"123", ttl_seconds=60)
+    assert backend.usage() == (1, 5)
+    assert fake.scans == 1
+
+    assert backend.delete_prefix("frost:b") == 1
+    assert backend.usage() == (1, 5)
+    assert fake.scans == 3
+
+
+def test_expired_value_is_refetched_inline_and_kept_as_error_fallback() -> None:
+    cache = SharedCache(MemoryBackend(max_bytes=1_000_000), stale_seconds=0)
+    cache.set("data_cache.weather", (), "old", ttl_seconds=-1, stale_seconds=60)
+
+    assert cache.get_or_fetch("data_cache.weather", (), lambda: "new", ttl_seconds=-1, stale_seconds=60,
+                              serve_stale=False) == "new"
+    assert cache.stats().stale_hits == 0
+
+    def failing() -> str:
+        raise ConnectionError("nede")
+
+    assert cache.get_or_fetch("data_cache.weather", (), failing, ttl_seconds=60, stale_seconds=60,
+                              serve_stale=False) == "new"
+    assert cache.stats().fetch_errors == 1
+
+
+def test_data_cache_falls_back_to_expired_data_on_fetch_error(monkeypatch) -> None:
+    from components import performance_cache
+
+    cache = SharedCache(MemoryBackend(max_bytes=1_000_000))
+    monkeypatch.setattr(performance_cache, "get_shared_cache", lambda: cache)
+    clock = [1_000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+
+    def fetch(station_id: str) -> str:
+        return f"data {station_id}"
+
+    def failing(station_id: str) -> str:
+        raise ConnectionError("nede")
+
+    get = performance_cache.DataCache.get_cached_data
+    assert get("weather", fetch, ttl_seconds=60, params={"station_id": "SN46220"}) == "data SN46220"
+    clock[0] += 90
+    assert get("weather", failing, ttl_seconds=60, params={"station_id": "SN46220"}) == "data SN46220"
+    assert get("weather", lambda station_id: "fresh", ttl_seconds=60, params={"station_id": "SN46220"}) == "fresh"
+    assert cache.stats().stale_hits == 0
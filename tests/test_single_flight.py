@@ -0,0 +1,86 @@
+"""Tester for sammenslåing av samtidige, identiske hentinger."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from src.shared_cache import MemoryBackend, SharedCache
+from src.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_fetch_and_get_own_copies() -> None:
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch() -> pd.DataFrame:
+        calls.append(1)
+        release.wait(2.0)
+        return pd.DataFrame({"wind_speed": [5.0]})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flights.do, "frost:window", fetch, pd.DataFrame.copy) for _ in range(8)]
+        deadline = time.monotonic() + 2.0
+        while sum(flights.in_flight().values()) < 7 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert flights.in_flight() == {"frost:window": 7}
+        release.set()
+        frames = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert len({id(frame) for frame in frames}) == 8
+    stats = flights.stats()[0]
+    assert (stats.calls, stats.leaders, stats.coalesced, stats.in_flight) == (8, 1, 7, 0)
+    assert flights.totals() == (1, 7)
+
+
+def test_errors_reach_all_waiters_and_next_call_retries() -> None:
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing() -> str:
+        started.set()
+        release.wait(2.0)
+        raise ConnectionError("Frost nede")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flights.do, "k", failing)
+        started.wait(2.0)
+        waiter = pool.submit(flights.do, "k", lambda: "aldri")
+        while not flights.in_flight().get("k"):
+            time.sleep(0.01)
+        release.set()
+        for future in (leader, waiter):
+            with pytest.raises(ConnectionError):
+                future.result()
+
+    assert flights.do("k", lambda: "ok") == "ok"
+
+
+def test_shared_cache_misses_are_coalesced() -> None:
+    flights = SingleFlight()
+    cache = SharedCache(MemoryBackend(max_bytes=1_000_000), stale_seconds=0, flights=flights)
+    release = threading.Event()
+    calls = []
+
+    def fetch() -> list[int]:
+        calls.append(1)
+        release.wait(2.0)
+        return [1, 2, 3]
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(cache.get_or_fetch, "netatmo", (), fetch, 60) for _ in range(5)]
+        while sum(flights.in_flight().values()) < 4:
+            time.sleep(0.01)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert results == [[1, 2, 3]] * 5
+    assert len({id(r) for r in results}) == 5
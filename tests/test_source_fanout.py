@@ -0,0 +1,75 @@
+"""Tester for parallell henting av dashboard-kilder."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.source_fanout import SourceFanout
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=4)
+    yield pool
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+def test_sources_run_concurrently(executor) -> None:
+    barrier = threading.Barrier(3, timeout=2)
+
+    def source(value):
+        barrier.wait()  # feiler hvis kildene kjøres etter hverandre
+        return value
+
+    fanout = SourceFanout(executor)
+    for name in ("weather", "plowing", "forecast"):
+        fanout.submit(name, source, name, timeout=5)
+
+    assert [fanout.result(n).value for n in ("weather", "plowing", "forecast")] == ["weather", "plowing", "forecast"]
+
+
+def test_slow_source_times_out_without_blocking_others(executor) -> None:
+    release = threading.Event()
+    fanout = SourceFanout(executor)
+    fanout.submit("netatmo", release.wait, 5, timeout=0.05)
+    fanout.submit("weather", lambda: 42, timeout=5)
+
+    assert fanout.result("weather").value == 42
+    started = time.monotonic()
+    slow = fanout.result("netatmo")
+    assert slow.timed_out and not slow.ok
+    assert time.monotonic() - started < 1
+    assert fanout.result("netatmo") is slow
+    release.set()
+
+
+def test_error_is_returned_not_raised(executor) -> None:
+    def broken():
+        raise OSError("nede")
+
+    fanout = SourceFanout(executor)
+    fanout.submit("plowing", broken, timeout=5)
+    result = fanout.result("plowing")
+    assert isinstance(result.error, OSError)
+    assert not result.timed_out and not result.ok
+
+
+def test_wrap_is_applied_and_duplicate_name_rejected(executor) -> None:
+    calls = []
+
+    def wrap(task):
+        def run():
+            calls.append(threading.current_thread().name)
+            return task()
+        return run
+
+    fanout = SourceFanout(executor, wrap=wrap)
+    fanout.submit("forecast", lambda: "ok")
+    assert fanout.result("forecast").value == "ok"
+    assert len(calls) == 1
+    with pytest.raises(ValueError):
+        fanout.submit("forecast", lambda: "igjen")